@@ -58,14 +58,15 @@ def validate_key_names(key_names_list):
 
 
 def get_pagination_params(request):
-    """Return marker, limit tuple from request.
-
-    :param request: `wsgi.Request` possibly containing 'marker' and 'limit'
-                    GET variables. 'marker' is the id of the last element
-                    the client has seen, and 'limit' is the maximum number
-                    of items to return. If 'limit' is not specified, 0, or
-                    > max_limit, we default to max_limit. Negative values
-                    for either marker or limit will cause
+    """Return marker, limit and offset params from request.
+
+    :param request: `wsgi.Request` possibly containing 'marker', 'limit'
+                    and 'offset' GET variables. 'marker' is the id of the
+                    last element the client has seen, 'limit' is the
+                    maximum number of items to return and 'offset' is the
+                    number of items to skip. If 'limit' is not specified,
+                    0, or > max_limit, we default to max_limit. Negative
+                    values for either offset or limit will cause
                     exc.HTTPBadRequest() exceptions to be raised.
 
     """
@@ -74,6 +75,8 @@ def get_pagination_params(request):
         params['limit'] = _get_limit_param(request)
     if 'marker' in request.GET:
         params['marker'] = _get_marker_param(request)
+    if 'offset' in request.GET:
+        params['offset'] = _get_offset_param(request)
     return params
 
 
@@ -95,6 +98,19 @@ def _get_marker_param(request):
     return request.GET['marker']
 
 
+def _get_offset_param(request):
+    """Extract integer offset from request or fail."""
+    try:
+        offset = int(request.GET['offset'])
+    except ValueError:
+        msg = _('offset param must be an integer')
+        raise webob.exc.HTTPBadRequest(explanation=msg)
+    if offset < 0:
+        msg = _('offset param must be positive')
+        raise webob.exc.HTTPBadRequest(explanation=msg)
+    return offset
+
+
 def limited(items, request, max_limit=CONF.osapi_max_limit):
     """Return a slice of items according to requested offset and limit.
 
@@ -21,8 +21,12 @@ import collections
 import copy
 import math
 import re
+import sqlite3
 import time
 
+from eventlet import semaphore
+from eventlet import tpool
+from oslo_log import log
 from oslo_serialization import jsonutils
 from oslo_utils import importutils
 from six.moves import http_client
@@ -32,9 +36,11 @@ import webob.exc
 from manila.api.openstack import wsgi
 from manila.api.views import limits as limits_views
 from manila.i18n import _
+from manila.i18n import _LW
 from manila import quota
 from manila import wsgi as base_wsgi
 
+LOG = log.getLogger(__name__)
 QUOTAS = quota.QUOTAS
 
 
@@ -345,6 +351,253 @@ class Limiter(object):
         return result
 
 
+def _leak(state, now):
+    """Return water level of a limit after leaking since its last request."""
+    if state is None:
+        return 0
+    level, last_request = state
+    return max(level - (now - last_request), 0)
+
+
+def _fill(state, capacity, request_value, now):
+    """Account one request in water level of a limit.
+
+    Follows the leaky bucket algorithm of `Limit`.
+
+    @return: Tuple of new state and delay (or None if request is allowed)
+    """
+    level = _leak(state, now) + request_value
+    difference = level - capacity
+    if difference > 0:
+        return (level - request_value, now), difference
+    return (level, now), None
+
+
+class LimiterBackend(object):
+    """Base class for storages of `BackendLimiter` water levels.
+
+    State of a limit is a tuple of water level and time of last request,
+    keys identify a limit of a given user.
+    """
+
+    def get_states(self, keys):
+        """Return states of given limits, None for unknown ones."""
+        raise NotImplementedError()
+
+    def fill(self, requests, now):
+        """Account one request in several limits at once.
+
+        @param requests: List of (key, capacity, request_value) tuples
+        @param now: Current time
+        @return: List of delays (or None if request is allowed), one for
+                 each limit
+        """
+        raise NotImplementedError()
+
+
+class MemoryLimiterBackend(LimiterBackend):
+    """Keeps water levels in memory of the API worker.
+
+    API workers are single threaded green thread processes, so states are
+    updated without any locking.
+    """
+
+    def __init__(self):
+        self._states = {}
+
+    def get_states(self, keys):
+        return [self._states.get(key) for key in keys]
+
+    def fill(self, requests, now):
+        delays = []
+        for key, capacity, request_value in requests:
+            self._states[key], delay = _fill(
+                self._states.get(key), capacity, request_value, now)
+            delays.append(delay)
+        return delays
+
+
+class SQLiteLimiterBackend(LimiterBackend):
+    """Shares water levels through a SQLite database.
+
+    Limits are enforced together by all API workers of a single host that
+    use the same local database file, it is not meant to be shared between
+    hosts. Queries run in native threads, so waiting for the database lock,
+    which is bounded by `timeout` seconds, does not block other requests of
+    the API worker. Requests are allowed if the lock is not acquired in time.
+    Rows of drained buckets are pruned every `PRUNE_INTERVAL` seconds.
+    """
+
+    PRUNE_INTERVAL = 60
+
+    def __init__(self, path=':memory:', timeout=1):
+        self._conn = sqlite3.connect(path, timeout=float(timeout),
+                                     isolation_level=None,
+                                     check_same_thread=False)
+        # NOTE: With write-ahead logging readers do not wait for writers and
+        # commits do not sync the database file, which keeps the lock held
+        # by each worker short. Rate limit state is not worth more than that.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rate_limits "
+                           "(key TEXT PRIMARY KEY, level REAL NOT NULL, "
+                           "last_request REAL NOT NULL)")
+        # NOTE: Connection is shared by green threads of the API worker,
+        # so its transactions must not interleave.
+        self._lock = semaphore.Semaphore()
+        self._last_prune = 0
+
+    def _get_states(self, keys):
+        query = ("SELECT key, level, last_request FROM rate_limits "
+                 "WHERE key IN (%s)" % ", ".join("?" * len(keys)))
+        states = {row[0]: (row[1], row[2])
+                  for row in self._conn.execute(query, keys)}
+        return [states.get(key) for key in keys]
+
+    def get_states(self, keys):
+        if not keys:
+            return []
+        with self._lock:
+            return tpool.execute(self._get_states, keys)
+
+    def _fill(self, requests, now):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            states = self._get_states([request[0] for request in requests])
+            rows = []
+            delays = []
+            for (key, capacity, request_value), state in zip(requests,
+                                                             states):
+                state, delay = _fill(state, capacity, request_value, now)
+                rows.append((key, state[0], state[1]))
+                delays.append(delay)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO rate_limits "
+                "(key, level, last_request) VALUES (?, ?, ?)", rows)
+            if now - self._last_prune >= self.PRUNE_INTERVAL:
+                # NOTE: Water leaks one unit per second, a drained bucket
+                # behaves the same as a missing one.
+                self._conn.execute("DELETE FROM rate_limits "
+                                   "WHERE last_request + level <= ?", (now,))
+                self._last_prune = now
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        return delays
+
+    def fill(self, requests, now):
+        if not requests:
+            return []
+
+        try:
+            with self._lock:
+                return tpool.execute(self._fill, requests, now)
+        except sqlite3.OperationalError as e:
+            LOG.warning(_LW("Failed to update rate limits, allowing the "
+                            "request: %s"), e)
+            return [None] * len(requests)
+
+
+class BackendLimiter(Limiter):
+    """Rate-limit checking class which keeps limit state in a backend.
+
+    Limits matching a request are filled with a single backend call.
+    Backend is given as a class path with 'backend' argument, other
+    arguments prefixed with 'backend_' are passed to its constructor.
+    `MemoryLimiterBackend` is used by default.
+    """
+
+    def __init__(self, limits, backend=None, **kwargs):
+        """Initialize the new `BackendLimiter`.
+
+        @param limits: List of `Limit` objects
+        @param backend: String identifying class of `LimiterBackend`
+        """
+        self.limits = limits
+        self.user_limits = {}
+        backend_kwargs = {}
+        for key, value in kwargs.items():
+            if key.startswith('user:'):
+                self.user_limits[key[5:]] = self.parse_limits(value)
+            elif key.startswith('backend_'):
+                backend_kwargs[key[8:]] = value
+
+        if backend is None:
+            self.backend = MemoryLimiterBackend(**backend_kwargs)
+        else:
+            self.backend = importutils.import_object(backend,
+                                                     **backend_kwargs)
+
+        self._rules = {}
+
+    def _get_rules(self, username):
+        """Return limits of a user grouped by verb, with compiled regexes."""
+        rules = self._rules.get(username)
+        if rules is None:
+            rules = collections.defaultdict(list)
+            for index, limit in enumerate(self._get_user_limits(username)):
+                rules[limit.verb].append((self._get_key(index, username),
+                                          re.compile(limit.regex), limit))
+            self._rules[username] = rules
+        return rules
+
+    def _get_user_limits(self, username):
+        return self.user_limits.get(username, self.limits)
+
+    @staticmethod
+    def _get_key(index, username):
+        return "%s:%s" % (index, username or '')
+
+    def _get_time(self):
+        """Retrieve the current time. Broken out for testability."""
+        return time.time()
+
+    def get_limits(self, username=None):
+        """Return the limits for a given user."""
+        user_limits = self._get_user_limits(username)
+        states = self.backend.get_states(
+            [self._get_key(index, username)
+             for index in range(len(user_limits))])
+        now = self._get_time()
+
+        result = []
+        for limit, state in zip(user_limits, states):
+            level = _leak(state, now)
+            display = limit.display()
+            capacity = float(limit.capacity)
+            display['remaining'] = int(math.floor(
+                (capacity - level) / capacity * limit.value))
+            display['resetTime'] = int(
+                now + max(level + limit.request_value - limit.capacity, 0))
+            result.append(display)
+        return result
+
+    def check_for_delay(self, verb, url, username=None):
+        """Check the given verb/user/user triplet for limit.
+
+        @return: Tuple of delay (in seconds) and error message (or None, None)
+        """
+        rules = self._get_rules(username).get(verb, ())
+        matched = [(key, limit) for key, regex, limit in rules
+                   if regex.match(url)]
+        if not matched:
+            return None, None
+
+        results = self.backend.fill(
+            [(key, limit.capacity, limit.request_value)
+             for key, limit in matched],
+            self._get_time())
+
+        delays = [(delay, limit.error_message)
+                  for (key, limit), delay in zip(matched, results) if delay]
+        if delays:
+            delays.sort()
+            return delays[0]
+
+        return None, None
+
+
 class WsgiLimiter(object):
     """Rate-limit checking from a WSGI application.
 
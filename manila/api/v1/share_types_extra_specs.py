@@ -90,6 +90,7 @@ class ShareTypeExtraSpecsController(wsgi.Controller):
         self._verify_extra_specs(specs, False)
         self._check_key_names(specs.keys())
         db.share_type_extra_specs_update_or_create(context, type_id, specs)
+        share_types.invalidate_cache(context)
         notifier_info = dict(type_id=type_id, specs=specs)
         notifier = rpc.get_notifier('shareTypeExtraSpecs')
         notifier.info(context, 'share_type_extra_specs.create', notifier_info)
@@ -110,6 +111,7 @@ class ShareTypeExtraSpecsController(wsgi.Controller):
             raise webob.exc.HTTPBadRequest(explanation=expl)
         self._verify_extra_specs(body, False)
         db.share_type_extra_specs_update_or_create(context, type_id, body)
+        share_types.invalidate_cache(context)
         notifier_info = dict(type_id=type_id, id=id)
         notifier = rpc.get_notifier('shareTypeExtraSpecs')
         notifier.info(context, 'share_type_extra_specs.update', notifier_info)
@@ -138,6 +140,7 @@ class ShareTypeExtraSpecsController(wsgi.Controller):
 
         try:
             db.share_type_extra_specs_delete(context, type_id, id)
+            share_types.invalidate_cache(context)
         except exception.ShareTypeExtraSpecsNotFound as error:
             raise webob.exc.HTTPNotFound(explanation=error.msg)
 
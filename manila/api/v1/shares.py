@@ -19,6 +19,7 @@ import ast
 import re
 import string
 
+from oslo_config import cfg
 from oslo_log import log
 from oslo_utils import strutils
 from oslo_utils import uuidutils
@@ -36,6 +37,7 @@ from manila.i18n import _LI
 from manila import share
 from manila.share import share_types
 
+CONF = cfg.CONF
 LOG = log.getLogger(__name__)
 
 
@@ -190,9 +192,16 @@ class ShareMixin(object):
         search_opts = {}
         search_opts.update(req.GET)
 
+        # Pagination is applied by DB, so page cost does not depend on
+        # the total amount of shares.
+        pagination_params = common.get_pagination_params(req)
+        limit = min(CONF.osapi_max_limit,
+                    pagination_params.get('limit') or CONF.osapi_max_limit)
+
         # Remove keys that are not related to share attrs
         search_opts.pop('limit', None)
         search_opts.pop('offset', None)
+        search_opts.pop('marker', None)
         sort_key = search_opts.pop('sort_key', 'created_at')
         sort_dir = search_opts.pop('sort_dir', 'desc')
 
@@ -216,14 +225,14 @@ class ShareMixin(object):
 
         shares = self.share_api.get_all(
             context, search_opts=search_opts, sort_key=sort_key,
-            sort_dir=sort_dir)
-
-        limited_list = common.limited(shares, req)
+            sort_dir=sort_dir, limit=limit,
+            offset=pagination_params.get('offset'),
+            marker=pagination_params.get('marker'))
 
         if is_detail:
-            shares = self._view_builder.detail_list(req, limited_list)
+            shares = self._view_builder.detail_list(req, shares)
         else:
-            shares = self._view_builder.summary_list(req, limited_list)
+            shares = self._view_builder.summary_list(req, shares)
         return shares
 
     def _get_share_search_options(self):
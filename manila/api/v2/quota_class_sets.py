@@ -59,6 +59,7 @@ class QuotaClassSetsMixin(object):
                     db.quota_class_create(context, quota_class, key, value)
                 except exception.AdminRequired:
                     raise webob.exc.HTTPForbidden()
+        QUOTAS.invalidate_cache()
         return self._view_builder.detail_list(
             QUOTAS.get_class_quotas(context, quota_class))
 
@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import copy
 
 from keystoneauth1 import loading as ks_loading
@@ -24,7 +25,25 @@ from manila import exception
 from manila.i18n import _
 from manila.i18n import _LW
 
+client_auth_opts = [
+    cfg.IntOpt('client_cache_size',
+               default=16,
+               min=0,
+               help='Maximum number of nova, cinder and neutron clients '
+                    'kept for reuse by each of these services. Least '
+                    'recently used clients are evicted. Zero value '
+                    'disables reuse of clients.'),
+    cfg.IntOpt('client_token_refresh_window',
+               default=300,
+               min=0,
+               help='Number of seconds before expiry of the admin token '
+                    'used by nova, cinder and neutron clients when the '
+                    'token is renewed on next client lookup. Zero value '
+                    'leaves renewal to the auth plugin.'),
+]
+
 CONF = cfg.CONF
+CONF.register_opts(client_auth_opts)
 LOG = log.getLogger(__name__)
 
 """Helper class to support keystone v2 and v3 for clients
@@ -48,6 +67,9 @@ class AuthClientLoader(object):
         self.session = None
         self.auth_plugin = None
         self.deprecated_opts_for_v2 = deprecated_opts_for_v2
+        self._clients = collections.OrderedDict()
+        self.cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0,
+                            'token_refreshes': 0}
 
     @staticmethod
     def list_opts(group):
@@ -109,5 +131,37 @@ class AuthClientLoader(object):
             raise exception.ManilaException(
                 _("Client (%s) is not flagged as admin") % self.group)
 
-        return self.client_class(session=self.session, auth=auth_plugin,
-                                 **kwargs)
+        self._refresh_token(auth_plugin)
+
+        # NOTE: Clients are reused per auth scope, which is always admin
+        # for now, and client arguments, which select the endpoint.
+        key = ('admin', ) + tuple(sorted(kwargs.items()))
+        client = self._clients.pop(key, None)
+        if client is None:
+            self.cache_stats['misses'] += 1
+            client = self.client_class(session=self.session,
+                                       auth=auth_plugin, **kwargs)
+        else:
+            self.cache_stats['hits'] += 1
+
+        cache_size = self.conf.client_cache_size
+        if cache_size:
+            self._clients[key] = client
+            while len(self._clients) > cache_size:
+                self._clients.popitem(last=False)
+                self.cache_stats['evictions'] += 1
+        return client
+
+    def _refresh_token(self, auth_plugin):
+        """Renews token of the auth plugin if it expires soon."""
+        window = self.conf.client_token_refresh_window
+        auth_ref = getattr(auth_plugin, 'auth_ref', None)
+        if not (window and auth_ref and auth_ref.will_expire_soon(window)):
+            return
+        try:
+            auth_plugin.invalidate()
+            auth_plugin.get_access(self.session)
+            self.cache_stats['token_refreshes'] += 1
+        except Exception as e:
+            LOG.warning(_LW("Failed to renew token for %(group)s clients: "
+                            "%(error)s"), {'group': self.group, 'error': e})
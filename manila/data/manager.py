@@ -16,6 +16,7 @@
 Data Service
 """
 
+import glob
 import os
 
 from oslo_config import cfg
@@ -38,11 +39,34 @@ data_opts = [
         'migration_tmp_location',
         default='/tmp/',
         help="Temporary path to create and mount shares during migration."),
+    cfg.StrOpt(
+        'data_copy_engine',
+        default='cp',
+        choices=['cp', 'native'],
+        help="Engine used to copy data of shares. 'cp' engine runs "
+             "commands as root for every file, 'native' engine copies "
+             "files with native file I/O of the data service and requires "
+             "the service to have access to all files of shares."),
+    cfg.IntOpt(
+        'data_copy_workers',
+        default=4,
+        min=1,
+        help="Number of files copied concurrently by 'native' data copy "
+             "engine."),
+    cfg.IntOpt(
+        'data_copy_retries',
+        default=1,
+        min=0,
+        help="Number of times failed data copy of 'native' data copy "
+             "engine is resumed before migration fails. Resumed copy skips "
+             "files copied already."),
 ]
 
 CONF = cfg.CONF
 CONF.register_opts(data_opts)
 
+COPY_JOURNAL_SUFFIX = '.copy_journal'
+
 
 class DataManager(manager.Manager):
     """Receives requests to handle data and sends responses."""
@@ -62,6 +86,18 @@ class DataManager(manager.Manager):
                     ctxt, share['id'],
                     {'task_state': constants.TASK_STATE_DATA_COPYING_ERROR})
 
+        # NOTE: Copies interrupted by restart of the service are not
+        # resumed, so journals left by them are stale.
+        journals = glob.glob(os.path.join(CONF.migration_tmp_location,
+                                          '*' + COPY_JOURNAL_SUFFIX))
+        for journal_path in journals:
+            try:
+                os.remove(journal_path)
+            except OSError as e:
+                LOG.warning(_LW("Failed to remove stale data copy journal "
+                                "%(path)s: %(error)s"),
+                            {'path': journal_path, 'error': e})
+
     def migration_start(self, context, ignore_list, share_id,
                         share_instance_id, dest_share_instance_id,
                         migration_info_src, migration_info_dest, notify):
@@ -79,7 +115,7 @@ class DataManager(manager.Manager):
         mount_path = CONF.migration_tmp_location
 
         try:
-            copy = data_utils.Copy(
+            copy = self._get_copy(
                 os.path.join(mount_path, share_instance_id),
                 os.path.join(mount_path, dest_share_instance_id),
                 ignore_list)
@@ -152,6 +188,42 @@ class DataManager(manager.Manager):
             LOG.error(msg)
             raise exception.InvalidShare(reason=msg)
 
+    def _get_copy(self, src, dest, ignore_list):
+        if CONF.data_copy_engine == 'native':
+            # Journal is kept next to mount point of destination share, so
+            # that failed copy is resumed while the share is mounted.
+            journal_path = os.path.normpath(dest) + COPY_JOURNAL_SUFFIX
+            return data_utils.NativeCopy(src, dest, ignore_list,
+                                         workers=CONF.data_copy_workers,
+                                         journal_path=journal_path)
+        return data_utils.Copy(src, dest, ignore_list)
+
+    def _run_copy(self, copy):
+        """Runs copy, resuming it after failures if it is resumable."""
+        attempt = 0
+        try:
+            while True:
+                try:
+                    copy.run()
+                    return
+                except Exception as e:
+                    if (not copy.resumable or copy.cancelled or
+                            attempt >= CONF.data_copy_retries):
+                        raise
+                    attempt += 1
+                    LOG.warning(_LW("Data copy from %(src)s to %(dest)s "
+                                    "failed, resuming it. Attempt %(attempt)s "
+                                    "of %(retries)s. Error: %(error)s"),
+                                {'src': copy.src, 'dest': copy.dest,
+                                 'attempt': attempt,
+                                 'retries': CONF.data_copy_retries,
+                                 'error': e})
+        finally:
+            if copy.resumable:
+                # Destination share is not kept after this copy, so its
+                # journal would never be used again.
+                copy.remove_journal()
+
     def _copy_share_data(
             self, context, copy, src_share, share_instance_id,
             dest_share_instance_id, migration_info_src, migration_info_dest):
@@ -216,7 +288,7 @@ class DataManager(manager.Manager):
             {'task_state': constants.TASK_STATE_DATA_COPYING_IN_PROGRESS})
 
         try:
-            copy.run()
+            self._run_copy(copy)
 
             self.db.share_update(
                 context, src_share['id'],
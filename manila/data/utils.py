@@ -12,11 +12,21 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import errno
 import os
+import shutil
+import stat
 
+from eventlet import greenpool
+from eventlet import greenthread
+from eventlet import queue
+from eventlet import tpool
 from oslo_log import log
+from oslo_serialization import jsonutils
 import six
 
+from manila.i18n import _LI
+from manila.i18n import _LW
 from manila import utils
 
 LOG = log.getLogger(__name__)
@@ -34,6 +44,8 @@ class Copy(object):
         self.current_copy = None
         self.ignore_list = ignore_list
         self.cancelled = False
+        # Whether failed run may be repeated to resume the copy
+        self.resumable = False
 
     def get_progress(self):
 
@@ -158,3 +170,326 @@ class Copy(object):
                               run_as_root=True)
                 utils.execute("chown", "--reference=%s" % src_item, dest_item,
                               run_as_root=True)
+
+
+class NativeCopy(Copy):
+    """Copies data with native file I/O of the service process.
+
+    Unlike Copy, it does not spawn processes per file: the tree is walked
+    once and files are copied by a pool of workers running in native threads
+    while the walk goes on, progress is tracked in memory. Until the walk is
+    finished total progress is relative to files found so far. Service
+    should be able to read all source files and to write to destination,
+    e.g. run as root.
+    """
+
+    BUFFER_SIZE = 4 * 1024 * 1024
+    # Max number of walked files waiting to be copied. Walk running ahead
+    # of the copy finds total size of small trees early, while memory used
+    # for large trees stays bounded.
+    WALK_AHEAD = 10000
+
+    def __init__(self, src, dest, ignore_list, workers=1, journal_path=None):
+        super(NativeCopy, self).__init__(src, dest, ignore_list)
+        self.workers = workers
+        # Files being copied, with count of bytes copied so far
+        self.in_progress = {}
+        self.total_files = 0
+        self.completed_files = 0
+        self._walk_done = False
+        self._error = None
+        # Journal of copied files allows to resume interrupted copy. Each
+        # line of it is a JSON list of relative path, size and mtime of
+        # copied file.
+        self.journal_path = journal_path
+        self.resumable = journal_path is not None
+        self._journal = {}
+        self._journal_file = None
+
+    def get_progress(self):
+
+        if self.current_copy is not None:
+
+            copied = self.current_size + sum(
+                item['copied'] for item in self.in_progress.values())
+
+            if self.total_size > 0:
+                total_progress = copied * 100 / self.total_size
+                if not self._walk_done:
+                    total_progress = min(total_progress, 99)
+            elif (self._walk_done and
+                    self.completed_files == self.total_files):
+                total_progress = 100
+            else:
+                total_progress = 0
+            current_file_progress = 0
+            if self.current_copy['size'] > 0:
+                current_file_progress = (
+                    self.current_copy['copied'] * 100 /
+                    self.current_copy['size'])
+
+            return {
+                'total_progress': total_progress,
+                'current_file_path': self.current_copy['file_path'],
+                'current_file_progress': current_file_progress
+            }
+        else:
+            return {'total_progress': 100}
+
+    def run(self):
+
+        # Progress is counted from scratch when failed copy is run again.
+        self.total_size = self.current_size = 0
+        self.total_files = self.completed_files = 0
+        self.dirs = []
+        self.current_copy = None
+        self._walk_done = False
+        self._error = None
+
+        if self.journal_path:
+            self._journal = self._load_journal()
+            self._journal_file = open(self.journal_path, 'a')
+
+        pool = greenpool.GreenPool(self.workers)
+        walked = queue.LightQueue(self.WALK_AHEAD)
+        greenthread.spawn_n(self._walk_files, walked)
+        try:
+            # NOTE: Files are passed to the pool while the tree is walked
+            # instead of being collected first, so that memory used does not
+            # grow with the number of files.
+            item = walked.get()
+            while item is not None:
+                if not (self.cancelled or self._error):
+                    pool.spawn_n(self._copy_item, item)
+                # Walk stops on cancel or error, its queue is drained.
+                item = walked.get()
+        finally:
+            pool.waitall()
+            if self._journal_file:
+                self._journal_file.close()
+                self._journal_file = None
+
+        if self._error:
+            if self.journal_path:
+                # NOTE: Journal is kept, so that copy restarted to the same
+                # destination skips files copied already.
+                LOG.info(_LI("Copy of %(src)s to %(dest)s failed, journal "
+                             "%(journal)s is kept to resume it."),
+                         {'src': self.src, 'dest': self.dest,
+                          'journal': self.journal_path})
+            raise self._error
+
+        if self.cancelled:
+            if self.journal_path:
+                # Cancelled copy is not resumed, its destination is
+                # discarded.
+                self.remove_journal()
+        else:
+            tpool.execute(self._copy_dirs_stats)
+            if self.journal_path:
+                # Copy is complete, nothing to resume anymore
+                self.remove_journal()
+
+        LOG.info(six.text_type(self.get_progress()))
+
+    def _load_journal(self):
+        journal = {}
+        if not os.path.exists(self.journal_path):
+            return journal
+        with open(self.journal_path) as f:
+            for line in f:
+                try:
+                    path, size, mtime = jsonutils.loads(line)
+                except ValueError:
+                    # Last record may be incomplete if service was stopped
+                    # while writing it.
+                    continue
+                journal[path] = (size, mtime)
+        LOG.info(_LI("Resuming copy of %(src)s to %(dest)s, %(count)s "
+                     "files were copied already."),
+                 {'src': self.src, 'dest': self.dest, 'count': len(journal)})
+        return journal
+
+    def remove_journal(self):
+        """Removes journal, so that the copy is not resumed anymore."""
+        try:
+            os.remove(self.journal_path)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+
+    def _is_copied(self, rel_path, dest, st):
+        """Checks whether journal has unchanged file copied already."""
+        if self._journal.get(rel_path) != (st.st_size, st.st_mtime):
+            return False
+        try:
+            dest_st = os.lstat(dest)
+        except OSError:
+            return False
+        return (stat.S_ISLNK(st.st_mode) or
+                dest_st.st_size == st.st_size)
+
+    def _write_journal(self, item):
+        st = item['stat']
+        self._journal_file.write(jsonutils.dumps(
+            [item['rel_path'], st.st_size, st.st_mtime]) + '\n')
+        # NOTE: Record is flushed right away, so that it is not lost if
+        # the service is stopped.
+        self._journal_file.flush()
+
+    def _scandir(self, path):
+        """Yields names and lstat results of directory entries."""
+        scandir = getattr(os, 'scandir', None)
+        if scandir is not None:
+            for entry in scandir(path):
+                yield entry.name, entry.stat(follow_symlinks=False)
+        else:
+            for name in os.listdir(path):
+                yield name, os.lstat(os.path.join(path, name))
+
+    def _scan(self, src, dest):
+        """Yields source and destination paths and lstat of tree entries.
+
+        Directories are yielded before their content.
+        """
+        subdirs = []
+        for name, st in self._scandir(src):
+            if self.cancelled or self._error:
+                return
+            if name in self.ignore_list:
+                continue
+            src_item = os.path.join(src, name)
+            dest_item = os.path.join(dest, name)
+            yield src_item, dest_item, st
+            if stat.S_ISDIR(st.st_mode):
+                subdirs.append((src_item, dest_item))
+        for src_item, dest_item in subdirs:
+            for entry in self._scan(src_item, dest_item):
+                yield entry
+
+    def _walk(self):
+        """Creates directories and yields walked directories and files.
+
+        Yields tuples of entry kind, one of 'dir', 'file' and 'copied' for
+        files copied already, and dict describing the entry. It does not
+        change the progress, so that it can run in a native thread.
+        """
+        if not os.path.isdir(self.dest):
+            os.makedirs(self.dest)
+        for src_item, dest_item, st in self._scan(self.src, self.dest):
+            if stat.S_ISDIR(st.st_mode):
+                if not os.path.isdir(dest_item):
+                    os.makedirs(dest_item)
+                yield 'dir', {'src': src_item, 'dest': dest_item}
+            elif stat.S_ISREG(st.st_mode) or stat.S_ISLNK(st.st_mode):
+                size = st.st_size if stat.S_ISREG(st.st_mode) else 0
+                rel_path = os.path.relpath(src_item, self.src)
+                if self._journal and self._is_copied(rel_path, dest_item, st):
+                    kind = 'copied'
+                else:
+                    kind = 'file'
+                yield kind, {'src': src_item, 'file_path': dest_item,
+                             'rel_path': rel_path, 'size': size, 'stat': st}
+            else:
+                LOG.warning(_LW("Skipping copy of special file %s."),
+                            src_item)
+
+    def _walk_files(self, walked):
+        """Walks the tree and puts files to be copied to walked queue.
+
+        Blocking file system calls of the walk are done in a native thread
+        to not block other green threads of the service, e.g. ones serving
+        progress and cancel requests. None is put once the walk is over.
+        """
+        try:
+            for kind, entry in tpool.Proxy(self._walk()):
+                if kind == 'dir':
+                    self.dirs.append(entry)
+                    continue
+                self.total_size += entry['size']
+                self.total_files += 1
+                if kind == 'copied':
+                    self.current_size += entry['size']
+                    self.completed_files += 1
+                else:
+                    walked.put(entry)
+        except Exception as e:
+            LOG.error(six.text_type(e))
+            if self._error is None:
+                self._error = e
+        finally:
+            self._walk_done = True
+            walked.put(None)
+
+    def _copy_item(self, item):
+        if self.cancelled or self._error:
+            return
+        item['copied'] = 0
+        self.in_progress[item['file_path']] = item
+        self.current_copy = item
+        try:
+            tpool.execute(self._copy_file, item)
+        except Exception as e:
+            LOG.error(six.text_type(e))
+            if self._error is None:
+                self._error = e
+            return
+        finally:
+            self.in_progress.pop(item['file_path'], None)
+
+        if self.cancelled:
+            # File may have been copied partially
+            return
+
+        self.current_size += item['size']
+        self.completed_files += 1
+        if self._journal_file:
+            self._write_journal(item)
+        LOG.debug(six.text_type(self.get_progress()))
+
+    def _copy_file(self, item):
+        src, dest, st = item['src'], item['file_path'], item['stat']
+
+        if stat.S_ISLNK(st.st_mode):
+            if os.path.lexists(dest):
+                os.remove(dest)
+            os.symlink(os.readlink(src), dest)
+            os.lchown(dest, st.st_uid, st.st_gid)
+            return
+
+        with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+            sendfile = getattr(os, 'sendfile', None)
+            while not self.cancelled:
+                if sendfile is not None:
+                    try:
+                        copied = sendfile(fdst.fileno(), fsrc.fileno(),
+                                          item['copied'], self.BUFFER_SIZE)
+                    except OSError:
+                        # File systems not supporting sendfile
+                        sendfile = None
+                        fsrc.seek(item['copied'])
+                        continue
+                else:
+                    buf = fsrc.read(self.BUFFER_SIZE)
+                    fdst.write(buf)
+                    copied = len(buf)
+                if not copied:
+                    break
+                item['copied'] += copied
+
+        if self.cancelled:
+            return
+        self._copy_stats(src, dest, st)
+
+    def _copy_stats(self, src, dest, st):
+        shutil.copymode(src, dest)
+        os.chown(dest, st.st_uid, st.st_gid)
+        os.utime(dest, (st.st_atime, st.st_mtime))
+
+    def _copy_dirs_stats(self):
+        # Stats of directories are copied after all their content has
+        # been written, deepest directories first.
+        for item in reversed(self.dirs):
+            if self.cancelled:
+                return
+            self._copy_stats(item['src'], item['dest'], os.stat(item['src']))
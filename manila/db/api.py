@@ -133,6 +133,17 @@ def service_update(context, service_id, values):
     return IMPL.service_update(context, service_id, values)
 
 
+def service_heartbeat(context, service_id, availability_zone=None):
+    """Increment report count of the service and refresh its update time.
+
+    Availability zone of the service is changed only if given.
+    Raises NotFound if service does not exist.
+
+    """
+    return IMPL.service_heartbeat(context, service_id,
+                                  availability_zone=availability_zone)
+
+
 ####################
 
 
@@ -305,9 +316,10 @@ def share_instances_get_all_by_share_server(context, share_server_id):
                                                         share_server_id)
 
 
-def share_instances_get_all_by_host(context, host):
+def share_instances_get_all_by_host(context, host, with_share_data=False):
     """Returns all share instances with given host."""
-    return IMPL.share_instances_get_all_by_host(context, host)
+    return IMPL.share_instances_get_all_by_host(
+        context, host, with_share_data=with_share_data)
 
 
 def share_instances_get_all_by_share_network(context, share_network_id):
@@ -344,19 +356,32 @@ def share_get(context, share_id):
     return IMPL.share_get(context, share_id)
 
 
-def share_get_all(context, filters=None, sort_key=None, sort_dir=None):
+# Keys of 'filters' that share_get_all* functions match exactly against
+# share and share instance fields.
+SHARE_FILTER_KEYS = (
+    'display_name', 'project_id', 'snapshot_id', 'share_type_id',
+    'share_proto', 'consistency_group_id', 'task_state',
+)
+SHARE_INSTANCE_FILTER_KEYS = ('status', 'host', 'share_network_id')
+
+
+def share_get_all(context, filters=None, sort_key=None, sort_dir=None,
+                  limit=None, offset=None, marker=None):
     """Get all shares."""
     return IMPL.share_get_all(
         context, filters=filters, sort_key=sort_key, sort_dir=sort_dir,
+        limit=limit, offset=offset, marker=marker,
     )
 
 
 def share_get_all_by_project(context, project_id, filters=None,
-                             is_public=False, sort_key=None, sort_dir=None):
+                             is_public=False, sort_key=None, sort_dir=None,
+                             limit=None, offset=None, marker=None):
     """Returns all shares with given project ID."""
     return IMPL.share_get_all_by_project(
         context, project_id, filters=filters, is_public=is_public,
-        sort_key=sort_key, sort_dir=sort_dir,
+        sort_key=sort_key, sort_dir=sort_dir, limit=limit, offset=offset,
+        marker=marker,
     )
 
 
@@ -370,11 +395,12 @@ def share_get_all_by_consistency_group_id(context, cg_id,
 
 
 def share_get_all_by_share_server(context, share_server_id, filters=None,
-                                  sort_key=None, sort_dir=None):
+                                  sort_key=None, sort_dir=None, limit=None,
+                                  offset=None, marker=None):
     """Returns all shares with given share server ID."""
     return IMPL.share_get_all_by_share_server(
         context, share_server_id, filters=filters, sort_key=sort_key,
-        sort_dir=sort_dir,
+        sort_dir=sort_dir, limit=limit, offset=offset, marker=marker,
     )
 
 
@@ -438,6 +464,13 @@ def share_instance_access_delete(context, mapping_id):
     return IMPL.share_instance_access_delete(context, mapping_id)
 
 
+def share_instance_access_delete_by_access_ids(context, share_instance_id,
+                                               access_ids):
+    """Deny access to share instance for several access rules at once."""
+    return IMPL.share_instance_access_delete_by_access_ids(
+        context, share_instance_id, access_ids)
+
+
 def share_instance_update_access_status(context, share_instance_id, status):
     """Update access rules status of share instance."""
     return IMPL.share_instance_update_access_status(context, share_instance_id,
@@ -711,6 +744,11 @@ def network_allocations_get_by_ip_address(context, ip_address):
     return IMPL.network_allocations_get_by_ip_address(context, ip_address)
 
 
+def network_allocations_get_ip_addresses(context):
+    """Get IP addresses of all network allocations."""
+    return IMPL.network_allocations_get_ip_addresses(context)
+
+
 ##################
 
 
@@ -1009,6 +1047,14 @@ def share_replicas_get_all(context, with_share_server=False,
         with_share_data=with_share_data)
 
 
+def share_replicas_get_all_by_host(context, host, with_share_server=False,
+                                   with_share_data=False):
+    """Returns all share replicas hosted on a host."""
+    return IMPL.share_replicas_get_all_by_host(
+        context, host, with_share_server=with_share_server,
+        with_share_data=with_share_data)
+
+
 def share_replicas_get_all_by_share(context, share_id, with_share_server=False,
                                     with_share_data=False):
     """Returns all share replicas for a given share."""
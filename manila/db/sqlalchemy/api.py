@@ -38,12 +38,20 @@ from oslo_log import log
 from oslo_utils import timeutils
 from oslo_utils import uuidutils
 import six
+from sqlalchemy import and_
+from sqlalchemy import bindparam
+from sqlalchemy import case
+from sqlalchemy import exists
 from sqlalchemy import or_
+from sqlalchemy.orm import aliased
 from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import subqueryload
+from sqlalchemy import select
 from sqlalchemy.sql.expression import true
 from sqlalchemy.sql import func
 
 from manila.common import constants
+from manila.db import api as db_api
 from manila.db.sqlalchemy import models
 from manila import exception
 from manila.i18n import _
@@ -262,6 +270,65 @@ def exact_filter(query, model, filters, legal_keys):
     return query
 
 
+def _share_instance_load_options(loader=None):
+    """Returns options that load share instance relationships in batches.
+
+    Relationships of share instances are declared as 'immediate' ones, so
+    without these options SQLAlchemy issues separate SELECTs for every
+    loaded share instance.
+
+    :param loader: loader option of the relationship that leads to share
+                   instances, None if share instances are queried directly.
+    """
+    if loader is None:
+        return [subqueryload('export_locations'),
+                joinedload('_availability_zone')]
+    return [loader.subqueryload('export_locations'),
+            loader.joinedload('_availability_zone')]
+
+
+def _share_load_options(loader=None):
+    """Returns options that load share relationships in batches.
+
+    :param loader: loader option of the relationship that leads to shares,
+                   None if shares are queried directly.
+    """
+    if loader is None:
+        instances_loader = subqueryload('instances')
+    else:
+        instances_loader = loader.subqueryload('instances')
+    return ([instances_loader] +
+            _share_instance_load_options(instances_loader))
+
+
+def _share_snapshot_load_options():
+    """Returns options that load share snapshot relationships in batches."""
+    share_instance_loader = subqueryload('instances').joinedload(
+        'share_instance')
+    return ([share_instance_loader] +
+            _share_instance_load_options(share_instance_loader) +
+            _share_load_options(joinedload('share')))
+
+
+def _share_access_load_options():
+    """Returns options that load access rule relationships in batches."""
+    instance_loader = subqueryload('instance_mappings').joinedload(
+        'instance')
+    return ([instance_loader] +
+            _share_instance_load_options(instance_loader))
+
+
+def _share_server_load_options(loader=None):
+    """Returns options that load share server relationships in batches.
+
+    :param loader: loader option of the relationship that leads to share
+                   servers, None if share servers are queried directly.
+    """
+    if loader is None:
+        return [subqueryload('_backend_details')]
+    return [loader.subqueryload('_backend_details')]
+
+
 def ensure_model_dict_has_id(model_dict):
     if not model_dict.get('id'):
         model_dict['id'] = uuidutils.generate_uuid()
@@ -445,6 +512,29 @@ def service_update(context, service_id, values):
         service_ref.save(session=session)
 
 
+@require_admin_context
+@oslo_db_api.wrap_db_retry(max_retries=5, retry_on_deadlock=True)
+def service_heartbeat(context, service_id, availability_zone=None):
+    session = get_session()
+
+    values = {'report_count': models.Service.report_count + 1,
+              'updated_at': timeutils.utcnow()}
+    if availability_zone:
+        az_values = {'availability_zone': availability_zone}
+        _ensure_availability_zone_exists(context, az_values, session)
+        values.update(az_values)
+
+    with session.begin():
+        # NOTE: Increment the counter in a single UPDATE statement instead
+        # of loading the service with its availability zone first.
+        count = model_query(
+            context, models.Service, session=session, read_deleted="no").\
+            filter_by(id=service_id).\
+            update(values, synchronize_session=False)
+    if not count:
+        raise exception.ServiceNotFound(service_id=service_id)
+
+
 ###################
 
 
@@ -728,7 +818,7 @@ def quota_usage_update(context, project_id, user_id, resource, **kwargs):
 
 
 def _reservation_create(context, uuid, usage, project_id, user_id, resource,
-                        delta, expire, session=None):
+                        delta, expire, session=None, save=True):
     reservation_ref = models.Reservation()
     reservation_ref.uuid = uuid
     reservation_ref.usage_id = usage['id']
@@ -737,7 +827,8 @@ def _reservation_create(context, uuid, usage, project_id, user_id, resource,
     reservation_ref.resource = resource
     reservation_ref.delta = delta
     reservation_ref.expire = expire
-    reservation_ref.save(session=session)
+    if save:
+        reservation_ref.save(session=session)
     return reservation_ref
 
 
@@ -762,25 +853,34 @@ def _get_user_quota_usages(context, session, project_id, user_id):
     return {row.resource: row for row in rows}
 
 
-def _get_project_quota_usages(context, session, project_id):
+def _get_quota_usages(context, session, project_id, user_id):
+    """Lock usages of a project with one query.
+
+    :returns: Tuple of usages of the given user keyed by resource and
+              usage totals of the whole project keyed by resource.
+    """
     rows = model_query(context, models.QuotaUsage,
                        read_deleted="no",
                        session=session).\
         filter_by(project_id=project_id).\
         with_lockmode('update').\
         all()
-    result = dict()
-    # Get the total count of in_use,reserved
+    user_usages = {}
+    project_usages = {}
     for row in rows:
-        if row.resource in result:
-            result[row.resource]['in_use'] += row.in_use
-            result[row.resource]['reserved'] += row.reserved
-            result[row.resource]['total'] += (row.in_use + row.reserved)
+        if row.user_id == user_id:
+            user_usages[row.resource] = row
+        # Get the total count of in_use,reserved
+        if row.resource in project_usages:
+            project_usages[row.resource]['in_use'] += row.in_use
+            project_usages[row.resource]['reserved'] += row.reserved
+            project_usages[row.resource]['total'] += (row.in_use +
+                                                      row.reserved)
         else:
-            result[row.resource] = dict(in_use=row.in_use,
-                                        reserved=row.reserved,
-                                        total=row.in_use + row.reserved)
-    return result
+            project_usages[row.resource] = dict(
+                in_use=row.in_use, reserved=row.reserved,
+                total=row.in_use + row.reserved)
+    return user_usages, project_usages
 
 
 @require_context
@@ -798,10 +898,8 @@ def quota_reserve(context, resources, project_quotas, user_quotas, deltas,
             user_id = context.user_id
 
         # Get the current usages
-        user_usages = _get_user_quota_usages(context, session,
-                                             project_id, user_id)
-        project_usages = _get_project_quota_usages(context, session,
-                                                   project_id)
+        user_usages, project_usages = _get_quota_usages(
+            context, session, project_id, user_id)
 
         # Handle usage refresh
         work = set(deltas.keys())
@@ -932,6 +1030,7 @@ def quota_reserve(context, resources, project_quotas, user_quotas, deltas,
         # Create the reservations
         if not overs:
             reservations = []
+            reservation_refs = []
             for res, delta in deltas.items():
                 reservation = _reservation_create(elevated,
                                                   uuidutils.generate_uuid(),
@@ -939,8 +1038,10 @@ def quota_reserve(context, resources, project_quotas, user_quotas, deltas,
                                                   project_id,
                                                   user_id,
                                                   res, delta, expire,
-                                                  session=session)
+                                                  session=session,
+                                                  save=False)
                 reservations.append(reservation.uuid)
+                reservation_refs.append(reservation)
 
                 # Also update the reserved quantity
                 # NOTE(Vek): Again, we are only concerned here about
@@ -957,6 +1058,9 @@ def quota_reserve(context, resources, project_quotas, user_quotas, deltas,
                 if delta > 0:
                     user_usages[res].reserved += delta
 
+            # NOTE: Insert all reservations with a single statement.
+            session.bulk_save_objects(reservation_refs)
+
         # Apply updates to the usages table
         for usage_ref in user_usages.values():
             session.add(usage_ref)
@@ -1190,7 +1294,7 @@ def share_instances_get_all(context):
     return model_query(
         context, models.ShareInstance, session=session, read_deleted="no",
     ).options(
-        joinedload('export_locations'),
+        *_share_instance_load_options()
     ).all()
 
 
@@ -1211,16 +1315,19 @@ def share_instance_delete(context, instance_id, session=None):
 
 
 @require_admin_context
-def share_instances_get_all_by_host(context, host):
+def share_instances_get_all_by_host(context, host, with_share_data=False):
     """Retrieves all share instances hosted on a host."""
+    session = get_session()
     result = (
-        model_query(context, models.ShareInstance).filter(
+        model_query(context, models.ShareInstance, session=session).filter(
             or_(
                 models.ShareInstance.host == host,
                 models.ShareInstance.host.like("{0}#%".format(host))
             )
-        ).all()
+        ).options(*_share_instance_load_options()).all()
     )
+    if with_share_data:
+        result = _set_instances_share_data(context, result, session)
     return result
 
 
@@ -1230,7 +1337,7 @@ def share_instances_get_all_by_share_network(context, share_network_id):
     result = (
         model_query(context, models.ShareInstance).filter(
             models.ShareInstance.share_network_id == share_network_id,
-        ).all()
+        ).options(*_share_instance_load_options()).all()
     )
     return result
 
@@ -1241,7 +1348,7 @@ def share_instances_get_all_by_share_server(context, share_server_id):
     result = (
         model_query(context, models.ShareInstance).filter(
             models.ShareInstance.share_server_id == share_server_id,
-        ).all()
+        ).options(*_share_instance_load_options()).all()
     )
     return result
 
@@ -1252,7 +1359,7 @@ def share_instances_get_all_by_share(context, share_id):
     result = (
         model_query(context, models.ShareInstance).filter(
             models.ShareInstance.share_id == share_id,
-        ).all()
+        ).options(*_share_instance_load_options()).all()
     )
     return result
 
@@ -1263,7 +1370,7 @@ def share_instances_get_all_by_consistency_group_id(context, cg_id):
     result = (
         model_query(context, models.Share).filter(
             models.Share.consistency_group_id == cg_id,
-        ).all()
+        ).options(*_share_load_options()).all()
     )
     instances = []
     for share in result:
@@ -1278,10 +1385,12 @@ def share_instances_get_all_by_consistency_group_id(context, cg_id):
 
 def _share_replica_get_with_filters(context, share_id=None, replica_id=None,
                                     replica_state=None, status=None,
-                                    with_share_server=True, session=None):
+                                    with_share_server=True, host=None,
+                                    session=None):
 
     query = model_query(context, models.ShareInstance, session=session,
-                        read_deleted="no")
+                        read_deleted="no").options(
+        *_share_instance_load_options())
 
     if share_id is not None:
         query = query.filter(models.ShareInstance.share_id == share_id)
@@ -1298,21 +1407,52 @@ def _share_replica_get_with_filters(context, share_id=None, replica_id=None,
     if status is not None:
         query = query.filter(models.ShareInstance.status == status)
 
+    if host is not None:
+        query = query.filter(
+            or_(
+                models.ShareInstance.host == host,
+                models.ShareInstance.host.like("{0}#%".format(host))
+            )
+        )
+
     if with_share_server:
-        query = query.options(joinedload('share_server'))
+        share_server_loader = joinedload('share_server')
+        query = query.options(
+            share_server_loader,
+            *_share_server_load_options(share_server_loader))
 
     return query
 
 
+def _set_instances_share_data(context, instances, session):
+    """Sets data of parent shares to given share instances.
+
+    Parent shares are loaded with one query per SHARE_IDS_BATCH_SIZE
+    shares instead of one query per share instance.
+    """
+    share_ids = list(set(instance['share_id'] for instance in instances))
+    parent_shares = {}
+    for i in range(0, len(share_ids), SHARE_IDS_BATCH_SIZE):
+        shares = _share_get_query(context, session=session).filter(
+            models.Share.id.in_(share_ids[i:i + SHARE_IDS_BATCH_SIZE])
+        ).options(*_share_load_options()).all()
+        parent_shares.update((share['id'], share) for share in shares)
+
+    for instance in instances:
+        parent_share = parent_shares.get(instance['share_id'])
+        if parent_share is None:
+            parent_share = share_get(
+                context, instance['share_id'], session=session)
+        instance.set_share_data(parent_share)
+
+    return instances
+
+
 def _set_replica_share_data(context, replicas, session):
     if replicas and not isinstance(replicas, list):
         replicas = [replicas]
 
-    for replica in replicas:
-        parent_share = share_get(context, replica['share_id'], session=session)
-        replica.set_share_data(parent_share)
-
-    return replicas
+    return _set_instances_share_data(context, replicas, session)
 
 
 @require_context
@@ -1330,6 +1470,22 @@ def share_replicas_get_all(context, with_share_data=False,
     return result
 
 
+@require_context
+def share_replicas_get_all_by_host(context, host, with_share_data=False,
+                                   with_share_server=True, session=None):
+    """Returns replica instances hosted on a given host."""
+    session = session or get_session()
+
+    result = _share_replica_get_with_filters(
+        context, with_share_server=with_share_server, host=host,
+        session=session).all()
+
+    if with_share_data:
+        result = _set_replica_share_data(context, result, session)
+
+    return result
+
+
 @require_context
 def share_replicas_get_all_by_share(context, share_id,
                                     with_share_data=False,
@@ -1416,6 +1572,42 @@ def share_replica_delete(context, share_replica_id, session=None):
 ################
 
 
+# Max number of share IDs used in one 'IN' clause when shares are loaded
+# in batches.
+SHARE_IDS_BATCH_SIZE = 500
+
+
+def _share_instance_primary_id_subquery():
+    """Returns subquery selecting ID of the instance of a share.
+
+    Instance is chosen the same way as 'instance' property of models.Share
+    does it, so that filters are applied to the same instance which is
+    shown as share details.
+    """
+    status_order = (constants.STATUS_REPLICATION_CHANGE,
+                    constants.STATUS_MIGRATING, constants.STATUS_AVAILABLE,
+                    constants.STATUS_ERROR)
+    status_rank = [(models.ShareInstance.status == status, rank)
+                   for rank, status in enumerate(status_order)]
+    # Statuses not listed here share the rank that follows the listed ones,
+    # transitional statuses rank after all of them.
+    status_rank.extend(
+        (models.ShareInstance.status == status, len(status_order) + 1 + rank)
+        for rank, status in enumerate(constants.TRANSITIONAL_STATUSES)
+        if status not in status_order)
+
+    return select([models.ShareInstance.id]).where(and_(
+        models.ShareInstance.share_id == models.Share.id,
+        models.ShareInstance.deleted == 'False',
+    )).order_by(
+        case([(models.ShareInstance.status ==
+               constants.STATUS_REPLICATION_CHANGE, 0)], else_=1),
+        case([(models.ShareInstance.replica_state ==
+               constants.REPLICA_STATE_ACTIVE, 0)], else_=1),
+        case(status_rank, else_=len(status_order)),
+    ).limit(1).correlate(models.Share).as_scalar()
+
+
 def _share_get_query(context, session=None):
     if session is None:
         session = get_session()
@@ -1513,17 +1705,26 @@ def share_get(context, share_id, session=None):
 def _share_get_all_with_filters(context, project_id=None, share_server_id=None,
                                 consistency_group_id=None, filters=None,
                                 is_public=False, sort_key=None,
-                                sort_dir=None):
+                                sort_dir=None, limit=None, offset=None,
+                                marker=None):
     """Returns sorted list of shares that satisfies filters.
 
     :param context: context to query under
     :param project_id: project id that owns shares
     :param share_server_id: share server that hosts shares
-    :param filters: dict of filters to specify share selection
+    :param filters: dict of filters to specify share selection. Besides
+                    'metadata' and 'extra_specs' dicts it can contain exact
+                    match filters for keys listed in
+                    manila.db.api.SHARE_FILTER_KEYS and
+                    SHARE_INSTANCE_FILTER_KEYS.
     :param is_public: public shares from other projects will be added
                       to result if True
     :param sort_key: key of models.Share to be used for sorting
     :param sort_dir: desired direction of sorting, can be 'asc' and 'desc'
+    :param limit: maximum number of shares to return
+    :param offset: number of shares to skip before the first returned one
+    :param marker: ID of the last share of the previous page, shares that
+                   follow it according to sorting are returned
     :returns: list -- models.Share
     :raises: exception.InvalidInput
     """
@@ -1531,12 +1732,41 @@ def _share_get_all_with_filters(context, project_id=None, share_server_id=None,
         sort_key = 'created_at'
     if not sort_dir:
         sort_dir = 'desc'
-    query = (
-        _share_get_query(context).join(
-            models.ShareInstance,
-            models.ShareInstance.share_id == models.Share.id
-        )
-    )
+    filters = dict(filters or {})
+
+    if sort_dir.lower() not in ('desc', 'asc'):
+        msg = _("Wrong sorting data provided: sort key is '%(sort_key)s' "
+                "and sort direction is '%(sort_dir)s'.") % {
+                    "sort_key": sort_key, "sort_dir": sort_dir}
+        raise exception.InvalidInput(reason=msg)
+
+    # Exact match filters for 'shares' table should be applied before
+    # joining 'share_instances' table, because 'filter_by' works with the
+    # last joined entity.
+    query = exact_filter(
+        _share_get_query(context).options(*_share_load_options()),
+        models.Share, filters, db_api.SHARE_FILTER_KEYS)
+
+    # NOTE: Instance filters and sorting use the instance shown in share
+    # details only, not any of its replicas. Joining a single instance per
+    # share also keeps rows unique, which pagination relies on.
+    share_instance = aliased(models.ShareInstance)
+    instance_filters = [
+        k for k in db_api.SHARE_INSTANCE_FILTER_KEYS if k in filters]
+    sort_attr = getattr(models.Share, sort_key, None)
+    if sort_attr is None and hasattr(models.ShareInstance, sort_key):
+        sort_attr = getattr(share_instance, sort_key)
+        instance_sort = True
+    else:
+        instance_sort = False
+    if sort_attr is None:
+        msg = _("Wrong sorting key provided - '%s'.") % sort_key
+        raise exception.InvalidInput(reason=msg)
+    if instance_filters or instance_sort:
+        query = query.join(
+            share_instance,
+            share_instance.id == _share_instance_primary_id_subquery())
+        query = exact_filter(query, share_instance, filters, instance_filters)
 
     if project_id:
         if is_public:
@@ -1545,50 +1775,63 @@ def _share_get_all_with_filters(context, project_id=None, share_server_id=None,
         else:
             query = query.filter(models.Share.project_id == project_id)
     if share_server_id:
-        query = query.filter(
-            models.ShareInstance.share_server_id == share_server_id)
+        query = query.filter(exists().where(and_(
+            models.ShareInstance.share_id == models.Share.id,
+            models.ShareInstance.share_server_id == share_server_id)))
 
     if consistency_group_id:
         query = query.filter(
             models.Share.consistency_group_id == consistency_group_id)
 
     # Apply filters
-    if not filters:
-        filters = {}
     if 'metadata' in filters:
         for k, v in filters['metadata'].items():
             query = query.filter(
                 or_(models.Share.share_metadata.any(  # pylint: disable=E1101
                     key=k, value=v)))
     if 'extra_specs' in filters:
-        query = query.join(
-            models.ShareTypeExtraSpecs,
+        query = query.filter(exists().where(and_(
             models.ShareTypeExtraSpecs.share_type_id ==
-            models.Share.share_type_id)
-        for k, v in filters['extra_specs'].items():
-            query = query.filter(or_(models.ShareTypeExtraSpecs.key == k,
-                                     models.ShareTypeExtraSpecs.value == v))
-
-    # Apply sorting
-    if sort_dir.lower() not in ('desc', 'asc'):
-        msg = _("Wrong sorting data provided: sort key is '%(sort_key)s' "
-                "and sort direction is '%(sort_dir)s'.") % {
-                    "sort_key": sort_key, "sort_dir": sort_dir}
-        raise exception.InvalidInput(reason=msg)
-
-    def apply_sorting(model, query):
-        sort_attr = getattr(model, sort_key)
-        sort_method = getattr(sort_attr, sort_dir.lower())
-        return query.order_by(sort_method())
-
-    try:
-        query = apply_sorting(models.Share, query)
-    except AttributeError:
-        try:
-            query = apply_sorting(models.ShareInstance, query)
-        except AttributeError:
-            msg = _("Wrong sorting key provided - '%s'.") % sort_key
+            models.Share.share_type_id,
+            *[or_(models.ShareTypeExtraSpecs.key == k,
+                  models.ShareTypeExtraSpecs.value == v)
+              for k, v in filters['extra_specs'].items()])))
+
+    is_desc = sort_dir.lower() == 'desc'
+
+    if marker:
+        marker_ref = model_query(
+            context, models.Share).filter_by(id=marker).first()
+        if not marker_ref:
+            msg = _("Marker '%s' not found.") % marker
             raise exception.InvalidInput(reason=msg)
+        if instance_sort:
+            marker_value = getattr(marker_ref.instance, sort_key, None)
+        else:
+            marker_value = getattr(marker_ref, sort_key)
+        if is_desc:
+            query = query.filter(or_(
+                sort_attr < marker_value,
+                and_(sort_attr == marker_value,
+                     models.Share.id < marker_ref.id)))
+        else:
+            query = query.filter(or_(
+                sort_attr > marker_value,
+                and_(sort_attr == marker_value,
+                     models.Share.id > marker_ref.id)))
+
+    # Share ID is used as secondary sort key to get stable order of shares
+    # with equal values of the primary sort key, it is required for
+    # consistent pagination.
+    if is_desc:
+        query = query.order_by(sort_attr.desc(), models.Share.id.desc())
+    else:
+        query = query.order_by(sort_attr.asc(), models.Share.id.asc())
+
+    if limit is not None:
+        query = query.limit(limit)
+    if offset:
+        query = query.offset(offset)
 
     # Returns list of shares that satisfy filters.
     query = query.all()
@@ -1596,19 +1839,23 @@ def _share_get_all_with_filters(context, project_id=None, share_server_id=None,
 
 
 @require_admin_context
-def share_get_all(context, filters=None, sort_key=None, sort_dir=None):
+def share_get_all(context, filters=None, sort_key=None, sort_dir=None,
+                  limit=None, offset=None, marker=None):
     query = _share_get_all_with_filters(
-        context, filters=filters, sort_key=sort_key, sort_dir=sort_dir)
+        context, filters=filters, sort_key=sort_key, sort_dir=sort_dir,
+        limit=limit, offset=offset, marker=marker)
     return query
 
 
 @require_context
 def share_get_all_by_project(context, project_id, filters=None,
-                             is_public=False, sort_key=None, sort_dir=None):
+                             is_public=False, sort_key=None, sort_dir=None,
+                             limit=None, offset=None, marker=None):
     """Returns list of shares with given project ID."""
     query = _share_get_all_with_filters(
         context, project_id=project_id, filters=filters, is_public=is_public,
-        sort_key=sort_key, sort_dir=sort_dir,
+        sort_key=sort_key, sort_dir=sort_dir, limit=limit, offset=offset,
+        marker=marker,
     )
     return query
 
@@ -1627,11 +1874,13 @@ def share_get_all_by_consistency_group_id(context, cg_id,
 
 @require_context
 def share_get_all_by_share_server(context, share_server_id, filters=None,
-                                  sort_key=None, sort_dir=None):
+                                  sort_key=None, sort_dir=None, limit=None,
+                                  offset=None, marker=None):
     """Returns list of shares with given share server."""
     query = _share_get_all_with_filters(
         context, share_server_id=share_server_id, filters=filters,
-        sort_key=sort_key, sort_dir=sort_dir,
+        sort_key=sort_key, sort_dir=sort_dir, limit=limit, offset=offset,
+        marker=marker,
     )
     return query
 
@@ -1754,8 +2003,9 @@ def share_instance_access_get(context, access_id, instance_id):
 @require_context
 def share_access_get_all_for_share(context, share_id, session=None):
     session = session or get_session()
-    return _share_access_get_query(context, session,
-                                   {'share_id': share_id}).all()
+    return _share_access_get_query(
+        context, session, {'share_id': share_id}).options(
+            *_share_access_load_options()).all()
 
 
 @require_context
@@ -1767,7 +2017,7 @@ def share_access_get_all_for_instance(context, instance_id, session=None):
         models.ShareInstanceAccessMapping.access_id ==
         models.ShareAccessMapping.id).filter(
         models.ShareInstanceAccessMapping.share_instance_id ==
-        instance_id).all()
+        instance_id).options(*_share_access_load_options()).all()
 
 
 @require_context
@@ -1836,6 +2086,42 @@ def share_instance_access_delete(context, mapping_id):
             )
 
 
+@require_context
+def share_instance_access_delete_by_access_ids(context, share_instance_id,
+                                               access_ids):
+    access_ids = list(access_ids)
+    if not access_ids:
+        return
+
+    session = get_session()
+    with session.begin():
+        for i in range(0, len(access_ids), SHARE_IDS_BATCH_SIZE):
+            batch = access_ids[i:i + SHARE_IDS_BATCH_SIZE]
+            (
+                _share_instance_access_query(
+                    context, session, instance_id=share_instance_id)
+                .filter(models.ShareInstanceAccessMapping.access_id.in_(
+                    batch))
+                .soft_delete(synchronize_session=False)
+            )
+
+            # NOTE: Remove access rules that have no mappings left.
+            mapped_ids = set(
+                row[0] for row in model_query(
+                    context, models.ShareInstanceAccessMapping,
+                    models.ShareInstanceAccessMapping.access_id,
+                    session=session, read_deleted="no").filter(
+                    models.ShareInstanceAccessMapping.access_id.in_(batch)))
+            unmapped_ids = [access_id for access_id in batch
+                            if access_id not in mapped_ids]
+            if unmapped_ids:
+                (
+                    session.query(models.ShareAccessMapping)
+                    .filter(models.ShareAccessMapping.id.in_(unmapped_ids))
+                    .soft_delete(synchronize_session=False)
+                )
+
+
 @require_context
 @oslo_db_api.wrap_db_retry(max_retries=5, retry_on_deadlock=True)
 def share_instance_update_access_status(context, share_instance_id, status):
@@ -2067,6 +2353,7 @@ def _share_snapshot_get_all_with_filters(context, project_id=None,
     if share_id:
         query = query.filter_by(share_id=share_id)
     query = query.options(joinedload('share'))
+    query = query.options(*_share_snapshot_load_options())
 
     # Apply filters
     if 'usage' in filters:
@@ -2361,16 +2648,6 @@ def share_export_locations_update(context, share_instance_id, export_locations,
 
     export_locations_paths = [el['path'] for el in export_locations]
 
-    session = get_session()
-
-    current_el_rows = _share_export_locations_get(
-        context, share_instance_id, session=session)
-
-    def get_path_list_from_rows(rows):
-        return set([l['path'] for l in rows])
-
-    current_el_paths = get_path_list_from_rows(current_el_rows)
-
     def create_indexed_time_dict(key_list):
         base = timeutils.utcnow()
         return {
@@ -2382,44 +2659,126 @@ def share_export_locations_update(context, share_instance_id, export_locations,
 
     indexed_update_time = create_indexed_time_dict(export_locations_paths)
 
-    for el in current_el_rows:
-        if delete and el['path'] not in export_locations_paths:
-            export_location_metadata_delete(context, el['uuid'])
-            el.soft_delete(session)
-        else:
-            updated_at = indexed_update_time[el['path']]
-            el.update({
-                'updated_at': updated_at,
+    el_model = models.ShareInstanceExportLocations
+    meta_model = models.ShareInstanceExportLocationsMetadata
+
+    # Desired and current export locations are compared in memory and
+    # only the difference is written with a few set-based statements.
+    session = get_session()
+    with session.begin():
+        # Only IDs and paths are loaded, loading of whole rows issues
+        # additional query per metadata item.
+        current_els = dict(model_query(
+            context, el_model, el_model.path, el_model.id,
+            session=session, read_deleted="no",
+        ).filter(
+            el_model.share_instance_id == share_instance_id,
+        ).all())
+
+        if delete:
+            deleted_ids = [el_id for path, el_id in current_els.items()
+                           if path not in indexed_update_time]
+            if deleted_ids:
+                model_query(
+                    context, meta_model, session=session, read_deleted="no",
+                ).filter(
+                    meta_model.export_location_id.in_(deleted_ids),
+                ).soft_delete(synchronize_session=False)
+                model_query(
+                    context, el_model, session=session, read_deleted="no",
+                ).filter(
+                    el_model.id.in_(deleted_ids),
+                ).soft_delete(synchronize_session=False)
+                for path in [p for p in current_els
+                             if p not in indexed_update_time]:
+                    current_els.pop(path)
+
+        # Refresh timestamps of kept export locations to store their order
+        kept_ids = {el_id: indexed_update_time[path]
+                    for path, el_id in current_els.items()
+                    if path in indexed_update_time}
+        if kept_ids:
+            model_query(
+                context, el_model, session=session, read_deleted="no",
+            ).filter(
+                el_model.id.in_(list(kept_ids)),
+            ).update({
+                'updated_at': case(kept_ids, value=el_model.id),
                 'deleted': 0,
-            })
-            el.save(session=session)
-            if el['el_metadata']:
-                export_location_metadata_update(
-                    context, el['uuid'], el['el_metadata'], session=session)
+            }, synchronize_session=False)
+
+        # Add new export locations
+        new_els = [el for el in export_locations
+                   if el['path'] not in current_els]
+        if new_els:
+            session.execute(el_model.__table__.insert(), [{
+                'uuid': uuidutils.generate_uuid(),
+                'path': el['path'],
+                'share_instance_id': share_instance_id,
+                'created_at': timeutils.utcnow(),
+                'updated_at': indexed_update_time[el['path']],
+                'deleted': 0,
+                'is_admin_only': el.get('is_admin_only', False),
+            } for el in new_els])
+
+        # Update metadata of all desired export locations at once
+        metadata = {el['path']: el['metadata'] for el in export_locations
+                    if el.get('metadata')}
+        if metadata:
+            el_ids = dict(model_query(
+                context, el_model, el_model.path, el_model.id,
+                session=session, read_deleted="no",
+            ).filter(
+                el_model.share_instance_id == share_instance_id,
+                el_model.path.in_(list(metadata)),
+            ).all())
+            _export_locations_metadata_bulk_update(
+                context, {el_ids[path]: meta
+                          for path, meta in metadata.items()}, session)
+
+        result = set(current_els) | set(export_locations_paths)
 
-    # Now add new export locations
-    for el in export_locations:
-        if el['path'] in current_el_paths:
-            # Already updated
-            continue
+    return result
 
-        location_ref = models.ShareInstanceExportLocations()
-        location_ref.update({
-            'uuid': uuidutils.generate_uuid(),
-            'path': el['path'],
-            'share_instance_id': share_instance_id,
-            'updated_at': indexed_update_time[el['path']],
-            'deleted': 0,
-            'is_admin_only': el.get('is_admin_only', False),
-        })
-        location_ref.save(session=session)
-        if not el.get('metadata'):
-            continue
-        export_location_metadata_update(
-            context, location_ref['uuid'], el.get('metadata'), session=session)
 
-    return get_path_list_from_rows(_share_export_locations_get(
-        context, share_instance_id, session=session))
+def _export_locations_metadata_bulk_update(context, metadata, session):
+    """Creates or updates metadata of several export locations at once.
+
+    :param metadata: dict with export location IDs as keys and dicts of
+        metadata as values.
+    """
+    meta_model = models.ShareInstanceExportLocationsMetadata
+    current_rows = model_query(
+        context, meta_model, meta_model.id, meta_model.export_location_id,
+        meta_model.key, meta_model.value, session=session, read_deleted="no",
+    ).filter(
+        meta_model.export_location_id.in_(list(metadata)),
+    ).all()
+    current = {(row[1], row[2]): (row[0], row[3]) for row in current_rows}
+
+    now = timeutils.utcnow()
+    new_rows = []
+    updated_rows = []
+    for el_id, el_metadata in metadata.items():
+        for key, value in el_metadata.items():
+            row = current.get((el_id, key))
+            if row is None:
+                new_rows.append({
+                    'export_location_id': el_id, 'key': key, 'value': value,
+                    'created_at': now, 'updated_at': now, 'deleted': 0,
+                })
+            elif row[1] != value:
+                updated_rows.append({
+                    'row_id': row[0], 'value': value, 'updated_at': now})
+
+    table = meta_model.__table__
+    if new_rows:
+        session.execute(table.insert(), new_rows)
+    if updated_rows:
+        session.execute(
+            table.update().where(table.c.id == bindparam('row_id')).values(
+                value=bindparam('value'), updated_at=bindparam('updated_at')),
+            updated_rows)
 
 
 #####################################
@@ -2709,6 +3068,13 @@ def share_network_remove_security_service(context, id, security_service_id):
 ###################
 
 
+def _share_server_list_load_options():
+    """Returns options that load relationships of listed share servers."""
+    instances_loader = joinedload('share_instances')
+    return (_share_server_load_options() +
+            _share_instance_load_options(instances_loader))
+
+
 def _server_get_query(context, session=None):
     if session is None:
         session = get_session()
@@ -2783,12 +3149,14 @@ def share_server_get_all_by_host_and_share_net_valid(context, host,
 
 @require_context
 def share_server_get_all(context):
-    return _server_get_query(context).all()
+    return _server_get_query(context).options(
+        *_share_server_list_load_options()).all()
 
 
 @require_context
 def share_server_get_all_by_host(context, host):
-    return _server_get_query(context).filter_by(host=host).all()
+    return _server_get_query(context).filter_by(host=host).options(
+        *_share_server_list_load_options()).all()
 
 
 @require_context
@@ -2971,6 +3339,15 @@ def network_allocations_get_by_ip_address(context, ip_address):
     return result or []
 
 
+@require_context
+def network_allocations_get_ip_addresses(context):
+    rows = model_query(
+        context, models.NetworkAllocation,
+        models.NetworkAllocation.ip_address,
+    ).distinct().all()
+    return [row[0] for row in rows]
+
+
 @require_context
 def network_allocations_get_for_share_server(context, share_server_id,
                                              session=None, label=None):
@@ -341,7 +341,7 @@ class ShareInstance(BASE, ManilaBase):
                              'display_name', 'display_description',
                              'snapshot_id', 'share_proto', 'share_type_id',
                              'is_public', 'consistency_group_id',
-                             'source_cgsnapshot_member_id')
+                             'source_cgsnapshot_member_id', 'task_state')
 
     def set_share_data(self, share):
         for share_property in self._proxified_properties:
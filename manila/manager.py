@@ -51,18 +51,70 @@ This module provides Manager, a base class for managers.
 
 """
 
+import copy
+
 from oslo_config import cfg
 from oslo_log import log
+from oslo_serialization import jsonutils
 from oslo_service import periodic_task
 
 from manila.db import base
 from manila.scheduler import rpcapi as scheduler_rpcapi
 from manila import version
 
+manager_opts = [
+    cfg.BoolOpt('report_capabilities_deltas',
+                default=False,
+                help='If set to True, services send to schedulers only '
+                     'capabilities and pools changed since their previous '
+                     'report, numbered with a sequence number. Schedulers '
+                     'ask for a full report when they miss a report. '
+                     'All schedulers have to support this before it is '
+                     'enabled.'),
+]
+
 CONF = cfg.CONF
+CONF.register_opts(manager_opts)
 LOG = log.getLogger(__name__)
 
 
+def get_capabilities_delta(old, new):
+    """Returns changes between two capability reports.
+
+    Pools are compared one by one, keyed by pool name, other
+    capabilities are compared as a whole.
+    """
+    delta = {
+        'changed': {},
+        'removed': [key for key in old if key not in new],
+    }
+    for key, value in new.items():
+        if key == 'pools':
+            continue
+        if key not in old or old[key] != value:
+            delta['changed'][key] = value
+
+    old_pools = {pool['pool_name']: pool for pool in old.get('pools') or []}
+    new_pools = {pool['pool_name']: pool for pool in new.get('pools') or []}
+    if old_pools or new_pools:
+        pools_delta = {
+            'changed': {},
+            'removed': [name for name in old_pools if name not in new_pools],
+        }
+        for name, pool in new_pools.items():
+            old_pool = old_pools.get(name, {})
+            changed = {key: value for key, value in pool.items()
+                       if key not in old_pool or old_pool[key] != value}
+            removed = [key for key in old_pool if key not in pool]
+            if changed or removed:
+                pools_delta['changed'][name] = {
+                    'changed': changed, 'removed': removed}
+        if pools_delta['changed'] or pools_delta['removed']:
+            delta['pools'] = pools_delta
+
+    return delta
+
+
 class PeriodicTasks(periodic_task.PeriodicTasks):
     def __init__(self):
         super(PeriodicTasks, self).__init__(CONF)
@@ -129,19 +181,60 @@ class SchedulerDependentManager(Manager):
         self.last_capabilities = None
         self.service_name = service_name
         self.scheduler_rpcapi = scheduler_rpcapi.SchedulerAPI()
+        self._sent_capabilities = None
+        self.capabilities_report_stats = {
+            'seq': 0,
+            'full_reports': 0,
+            'delta_reports': 0,
+            'last_report_size': 0,
+        }
         super(SchedulerDependentManager, self).__init__(host, db_driver)
 
     def update_service_capabilities(self, capabilities):
         """Remember these capabilities to send on next periodic update."""
         self.last_capabilities = capabilities
 
+    def request_full_capabilities_report(self):
+        """Make next capabilities report a full one."""
+        self._sent_capabilities = None
+
     @periodic_task.periodic_task
     def _publish_service_capabilities(self, context):
         """Pass data back to the scheduler at a periodic interval."""
-        if self.last_capabilities:
+        if not self.last_capabilities:
+            return
+
+        if not CONF.report_capabilities_deltas:
             LOG.debug('Notifying Schedulers of capabilities ...')
             self.scheduler_rpcapi.update_service_capabilities(
                 context,
                 self.service_name,
                 self.host,
                 self.last_capabilities)
+            return
+
+        stats = self.capabilities_report_stats
+        stats['seq'] += 1
+        if self._sent_capabilities is None:
+            report = self.last_capabilities
+            delta = False
+            stats['full_reports'] += 1
+        else:
+            report = get_capabilities_delta(self._sent_capabilities,
+                                            self.last_capabilities)
+            delta = True
+            stats['delta_reports'] += 1
+        stats['last_report_size'] = len(jsonutils.dumps(report))
+
+        LOG.debug('Notifying Schedulers of capabilities with %(type)s '
+                  'report %(seq)s of %(size)s bytes ...',
+                  {'type': 'delta' if delta else 'full', 'seq': stats['seq'],
+                   'size': stats['last_report_size']})
+        self.scheduler_rpcapi.update_service_capabilities(
+            context,
+            self.service_name,
+            self.host,
+            report,
+            capabilities_seq=stats['seq'],
+            capabilities_delta=delta)
+        self._sent_capabilities = copy.deepcopy(self.last_capabilities)
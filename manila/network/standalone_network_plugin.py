@@ -13,6 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import binascii
+import bisect
+import socket
+
 import netaddr
 from oslo_config import cfg
 from oslo_log import log
@@ -218,21 +222,50 @@ class StandaloneNetworkPlugin(network.NetworkBaseAPI):
     def _get_available_ips(self, context, amount):
         """Returns IP addresses from allowed IP range if there are unused IPs.
 
+        IP addresses used by network allocations are loaded with one query,
+        free addresses are then taken from gaps between used ones.
+
         :returns: IP addresses as list of text types
         :raises: exception.NetworkBadConfigurationException
         """
         ips = []
         if amount < 1:
             return ips
-        iterator = netaddr.iter_unique_ips(*self.allowed_cidrs)
-        for ip in iterator:
-            ip = six.text_type(ip)
-            if (ip in self.reserved_addresses or
-                    self.db.network_allocations_get_by_ip_address(context,
-                                                                  ip)):
+
+        # NOTE: addresses are converted to integers with inet_pton, it is
+        # much faster than netaddr for big amounts of addresses. Addresses
+        # of other IP version fail conversion and are skipped.
+        family = socket.AF_INET if self.net.version == 4 else socket.AF_INET6
+        used_ips = set()
+        for ip in (list(self.reserved_addresses) +
+                   self.db.network_allocations_get_ip_addresses(context)):
+            try:
+                packed = socket.inet_pton(family, ip)
+            except (socket.error, ValueError, TypeError):
                 continue
-            else:
-                ips.append(ip)
+            used_ips.add(int(binascii.hexlify(packed), 16))
+        used_ips = sorted(used_ips)
+
+        # Difference between used address and its index is the same for
+        # all addresses of a run of consecutive used addresses, and grows
+        # from one run to another, so runs are skipped with binary search.
+        run_keys = [ip - index for index, ip in enumerate(used_ips)]
+
+        for ip_range in netaddr.IPSet(self.allowed_cidrs).iter_ipranges():
+            current, last = ip_range.first, ip_range.last
+            index = bisect.bisect_left(used_ips, current)
+            while current <= last and len(ips) < amount:
+                if index < len(used_ips) and used_ips[index] == current:
+                    index = bisect.bisect_right(run_keys, run_keys[index])
+                    current = used_ips[index - 1] + 1
+                    continue
+                gap_last = last
+                if index < len(used_ips):
+                    gap_last = min(gap_last, used_ips[index] - 1)
+                while current <= gap_last and len(ips) < amount:
+                    ips.append(six.text_type(
+                        netaddr.IPAddress(current, self.net.version)))
+                    current += 1
             if len(ips) == amount:
                 return ips
         msg = _("No available IP addresses left in CIDRs %(cidrs)s. "
@@ -26,12 +26,14 @@ import oslo_policy.opts
 
 import manila.api.common
 import manila.api.middleware.auth
+import manila.common.client_auth
 import manila.common.config
 import manila.compute
 import manila.compute.nova
 import manila.db.api
 import manila.db.base
 import manila.exception
+import manila.manager
 import manila.network
 import manila.network.linux.interface
 import manila.network.neutron.api
@@ -48,6 +50,7 @@ import manila.scheduler.weighers
 import manila.scheduler.weighers.capacity
 import manila.scheduler.weighers.pool
 import manila.service
+import manila.share.access
 import manila.share.api
 import manila.share.driver
 import manila.share.drivers.cephfs.cephfs_native
@@ -76,6 +79,7 @@ import manila.share.drivers.zfssa.zfssashare
 import manila.share.drivers_private_data
 import manila.share.hook
 import manila.share.manager
+import manila.share.share_types
 import manila.volume
 import manila.volume.cinder
 import manila.wsgi
@@ -87,6 +91,7 @@ _global_opt_lists = [
     # Keep list alphabetically sorted
     manila.api.common.api_common_opts,
     [manila.api.middleware.auth.use_forwarded_for_opt],
+    manila.common.client_auth.client_auth_opts,
     manila.common.config.core_opts,
     manila.common.config.debug_opts,
     manila.common.config.global_opts,
@@ -95,6 +100,7 @@ _global_opt_lists = [
     manila.db.api.db_opts,
     [manila.db.base.db_driver_opt],
     manila.exception.exc_log_opts,
+    manila.manager.manager_opts,
     manila.network.linux.interface.OPTS,
     manila.network.network_opts,
     manila.network.neutron.api.neutron_opts,
@@ -147,7 +153,9 @@ _global_opt_lists = [
     manila.share.drivers.zfsonlinux.driver.zfsonlinux_opts,
     manila.share.drivers.zfssa.zfssashare.ZFSSA_OPTS,
     manila.share.hook.hook_options,
+    manila.share.access.share_access_opts,
     manila.share.manager.share_manager_opts,
+    manila.share.share_types.share_types_cache_opts,
     manila.volume._volume_opts,
     manila.volume.cinder.cinder_opts,
     manila.wsgi.eventlet_opts,
@@ -17,6 +17,7 @@
 """Quotas for shares."""
 
 import datetime
+import time
 
 from oslo_config import cfg
 from oslo_log import log
@@ -55,6 +56,13 @@ quota_opts = [
     cfg.IntOpt('max_age',
                default=0,
                help='Number of seconds between subsequent usage refreshes.'),
+    cfg.IntOpt('quota_limits_cache_ttl',
+               default=0,
+               min=0,
+               help='Number of seconds quota limits checked on resource '
+                    'reservation are cached for. Quota updates made '
+                    'through other processes are picked up after this '
+                    'time. Zero value disables caching.'),
     cfg.StrOpt('quota_driver',
                default='manila.quota.DbQuotaDriver',
                help='Default driver to use for quota checks.'), ]
@@ -70,6 +78,19 @@ class DbQuotaDriver(object):
     quota information.  The default driver utilizes the local
     database.
     """
+
+    def __init__(self):
+        # NOTE: Maps project_id to cached quota limits of the project,
+        # keyed by user, quota class and resources.
+        self._limits_cache = {}
+
+    def invalidate_cache(self, project_id=None):
+        """Drop cached quota limits of a project, of all projects if None."""
+        if project_id is None:
+            self._limits_cache.clear()
+        else:
+            self._limits_cache.pop(project_id, None)
+
     def get_by_project_and_user(self, context, project_id, user_id, resource):
         """Get a specific quota by project and user."""
 
@@ -319,6 +340,18 @@ class DbQuotaDriver(object):
             unknown = desired - set(sub_resources.keys())
             raise exception.QuotaResourceUnknown(unknown=sorted(unknown))
 
+        ttl = CONF.quota_limits_cache_ttl
+        # NOTE: Limits of other projects are cached only for admins, others
+        # have to pass the DB access checks on every call.
+        use_cache = ttl and (context.is_admin or
+                             project_id == context.project_id)
+        if use_cache:
+            cache_key = (user_id, context.quota_class,
+                         tuple(sorted(sub_resources)))
+            cached = self._limits_cache.get(project_id, {}).get(cache_key)
+            if cached and cached[0] > time.time():
+                return dict(cached[1])
+
         if user_id:
             # Grab and return the quotas (without usages)
             quotas = self.get_user_quotas(context, sub_resources,
@@ -331,7 +364,11 @@ class DbQuotaDriver(object):
                                              context.quota_class,
                                              usages=False)
 
-        return {k: v['limit'] for k, v in quotas.items()}
+        limits = {k: v['limit'] for k, v in quotas.items()}
+        if use_cache:
+            self._limits_cache.setdefault(project_id, {})[cache_key] = (
+                time.time() + ttl, dict(limits))
+        return limits
 
     def limit_check(self, context, resources, values, project_id=None,
                     user_id=None):
@@ -558,6 +595,7 @@ class DbQuotaDriver(object):
         """
 
         db.quota_destroy_all_by_project(context, project_id)
+        self.invalidate_cache(project_id)
 
     def destroy_all_by_project_and_user(self, context, project_id, user_id):
         """Destroy metadata associated with a project and user.
@@ -571,6 +609,7 @@ class DbQuotaDriver(object):
         """
 
         db.quota_destroy_all_by_project_and_user(context, project_id, user_id)
+        self.invalidate_cache(project_id)
 
     def expire(self, context):
         """Expire reservations.
@@ -1061,6 +1100,21 @@ class QuotaEngine(object):
 
         self._driver.destroy_all_by_project(context, project_id)
 
+    def invalidate_cache(self, project_id=None):
+        """Invalidate cached quota limits.
+
+        Has to be called after quotas of a project or quota classes are
+        changed.
+
+        :param project_id: The ID of the project which quotas were changed,
+                           None if quota classes were changed.
+        """
+
+        # NOTE: Custom quota drivers may not cache quota limits.
+        invalidate_cache = getattr(self._driver, 'invalidate_cache', None)
+        if invalidate_cache:
+            invalidate_cache(project_id)
+
     def expire(self, context):
         """Expire reservations.
 
@@ -132,7 +132,7 @@ class FilterScheduler(base.Scheduler):
             filter_properties=filter_properties)
 
     def _format_filter_properties(self, context, filter_properties,
-                                  request_spec):
+                                  request_spec, host_states=None):
 
         elevated = context.elevated()
 
@@ -175,7 +175,10 @@ class FilterScheduler(base.Scheduler):
         cg_support = None
         cg = request_spec.get('consistency_group')
         if cg:
-            temp_hosts = self.host_manager.get_all_host_states_share(elevated)
+            temp_hosts = host_states
+            if temp_hosts is None:
+                temp_hosts = self.host_manager.get_all_host_states_share(
+                    elevated)
             cg_host = next((host for host in temp_hosts
                             if host.host == cg.get('host')), None)
             if cg_host:
@@ -187,7 +190,10 @@ class FilterScheduler(base.Scheduler):
         active_replica_host = request_spec.get('active_replica_host')
         replication_domain = None
         if active_replica_host:
-            temp_hosts = self.host_manager.get_all_host_states_share(elevated)
+            temp_hosts = host_states
+            if temp_hosts is None:
+                temp_hosts = self.host_manager.get_all_host_states_share(
+                    elevated)
             ar_host = next((host for host in temp_hosts
                             if host.host == active_replica_host), None)
             if ar_host:
@@ -218,16 +224,16 @@ class FilterScheduler(base.Scheduler):
         """
         elevated = context.elevated()
 
-        filter_properties, share_properties = self._format_filter_properties(
-            context, filter_properties, request_spec)
-
         # Find our local list of acceptable hosts by filtering and
         # weighing our options. we virtually consume resources on
         # it so subsequent selections can adjust accordingly.
 
-        # Note: remember, we are using an iterator here. So only
-        # traverse this list once.
-        hosts = self.host_manager.get_all_host_states_share(elevated)
+        # Host states are loaded once per request and shared with
+        # filter properties formatting.
+        hosts = list(self.host_manager.get_all_host_states_share(elevated))
+
+        filter_properties, share_properties = self._format_filter_properties(
+            context, filter_properties, request_spec, host_states=hosts)
 
         # Filter local hosts based on requirements ...
         hosts = self.host_manager.get_filtered_hosts(hosts,
@@ -439,10 +445,11 @@ class FilterScheduler(base.Scheduler):
 
         elevated = context.elevated()
 
+        hosts = list(self.host_manager.get_all_host_states_share(elevated))
+
         filter_properties, share_properties = self._format_filter_properties(
-            context, filter_properties, request_spec)
+            context, filter_properties, request_spec, host_states=hosts)
 
-        hosts = self.host_manager.get_all_host_states_share(elevated)
         hosts = self.host_manager.get_filtered_hosts(hosts, filter_properties)
         hosts = self.host_manager.get_weighed_hosts(hosts, filter_properties)
 
@@ -24,16 +24,20 @@ LOG = log.getLogger(__name__)
 class CapabilitiesFilter(base_host.BaseHostFilter):
     """HostFilter to work with resource (instance & volume) type records."""
 
-    def _satisfies_extra_specs(self, capabilities, resource_type):
-        """Compare capabilities against extra specs.
+    # Matching plans compiled from extra specs of resource types, cached by
+    # resource type ID along with extra specs they were compiled from.
+    # Filter is instantiated per scheduling request, so cache is shared by
+    # all instances.
+    _extra_specs_plans = {}
 
-        Check that the capabilities provided by the services satisfy
-        the extra specs associated with the resource type.
-        """
-        extra_specs = resource_type.get('extra_specs', [])
-        if not extra_specs:
-            return True
+    @staticmethod
+    def _compile_extra_specs(extra_specs):
+        """Compile extra specs into a list of capability predicates.
 
+        Each item of the list is a tuple of extra spec key, requirement,
+        path of the capability in capabilities dict and matching function.
+        """
+        plan = []
         for key, req in extra_specs.items():
 
             # Either not scoped format, or in capabilities scope
@@ -46,16 +50,48 @@ class CapabilitiesFilter(base_host.BaseHostFilter):
             elif scope[0] == "capabilities":
                 del scope[0]
 
+            plan.append(
+                (key, req, tuple(scope), extra_specs_ops.compile_req(req)))
+        return plan
+
+    def _get_extra_specs_plan(self, resource_type):
+        extra_specs = resource_type.get('extra_specs') or {}
+        type_id = resource_type.get('id')
+        if type_id is None:
+            return self._compile_extra_specs(extra_specs)
+
+        # Extra specs are compared with ones the cached plan was compiled
+        # from, so plan is recompiled once extra specs of the type are
+        # updated or created.
+        cached = self._extra_specs_plans.get(type_id)
+        if cached is None or cached[0] != extra_specs:
+            cached = (dict(extra_specs),
+                      self._compile_extra_specs(extra_specs))
+            self._extra_specs_plans[type_id] = cached
+        return cached[1]
+
+    def _satisfies_extra_specs(self, capabilities, resource_type):
+        """Compare capabilities against extra specs.
+
+        Check that the capabilities provided by the services satisfy
+        the extra specs associated with the resource type.
+        """
+        if not resource_type.get('extra_specs'):
+            return True
+
+        for key, req, scope, matcher in self._get_extra_specs_plan(
+                resource_type):
+
             cap = capabilities
-            for index in range(len(scope)):
+            for name in scope:
                 try:
-                    cap = cap.get(scope[index])
+                    cap = cap.get(name)
                 except AttributeError:
                     cap = None
                 if cap is None:
                     LOG.debug("Host doesn't provide capability '%(cap)s' "
                               "listed in the extra specs",
-                              {'cap': scope[index]})
+                              {'cap': name})
                     return False
 
             # Make all capability values a list so we can handle lists
@@ -63,7 +99,7 @@ class CapabilitiesFilter(base_host.BaseHostFilter):
 
             # Loop through capability values looking for any match
             for cap_value in cap_list:
-                if extra_specs_ops.match(cap_value, req):
+                if matcher(cap_value):
                     break
             else:
                 # Nothing matched, so bail out
@@ -38,7 +38,30 @@ _op_methods = {'=': lambda x, y: float(x) >= float(y),
                's>=': operator.ge}
 
 
-def match(value, req):
+# Operations with numeric operands, operands of them are converted to float
+# only once when a requirement is compiled.
+_float_op_methods = {'=': operator.ge,
+                     '==': operator.eq,
+                     '!=': operator.ne,
+                     '>=': operator.ge,
+                     '<=': operator.le}
+
+
+def _no_match(value):
+    return False
+
+
+def compile_req(req):
+    """Compile extra spec requirement into a matching function.
+
+    Requirement string is split and its operator and operand are parsed
+    only once, so returned function may be cheaply applied to capability
+    values of any number of hosts.
+
+    :param req: extra spec requirement, e.g. '<is> True' or '>= 10'.
+    :returns: function that takes capability value and returns whether
+        it satisfies the requirement.
+    """
     words = req.split()
 
     op = method = None
@@ -47,30 +70,63 @@ def match(value, req):
         method = _op_methods.get(op)
 
     if op != '<or>' and not method:
-        if type(value) is bool:
-            return value == strutils.bool_from_string(
-                req, strict=False, default=req)
-        else:
+        bool_req = strutils.bool_from_string(req, strict=False, default=req)
+
+        def _match_plain(value):
+            if type(value) is bool:
+                return value == bool_req
             return value == req
 
-    if value is None:
-        return False
+        return _match_plain
 
     if op == '<or>':  # Ex: <or> v1 <or> v2 <or> v3
-        while True:
-            if words.pop(0) == value:
-                return True
-            if not words:
-                break
-            op = words.pop(0)  # remove a keyword <or>
-            if not words:
-                break
-        return False
-
-    try:
-        if words and method(value, words[0]):
-            return True
-    except ValueError:
-        pass
+        choices = words[::2]
 
-    return False
+        def _match_or(value):
+            return value is not None and value in choices
+
+        return _match_or
+
+    if not words:
+        return _no_match
+    operand = words[0]
+
+    if op in _float_op_methods:
+        try:
+            operand = float(operand)
+        except ValueError:
+            return _no_match
+        float_method = _float_op_methods[op]
+
+        def _match_float(value):
+            if value is None:
+                return False
+            try:
+                return float_method(float(value), operand)
+            except ValueError:
+                return False
+
+        return _match_float
+
+    if op == '<is>':
+        bool_operand = strutils.bool_from_string(operand)
+
+        def _match_is(value):
+            return (value is not None and
+                    strutils.bool_from_string(value) is bool_operand)
+
+        return _match_is
+
+    def _match_op(value):
+        if value is None:
+            return False
+        try:
+            return bool(method(value, operand))
+        except ValueError:
+            return False
+
+    return _match_op
+
+
+def match(value, req):
+    return compile_req(req)(value)
@@ -20,7 +20,9 @@
 Manage hosts in the current zone.
 """
 
+import collections
 import re
+import time
 try:
     from UserDict import IterableUserDict  # noqa
 except ImportError:
@@ -54,7 +56,21 @@ host_manager_opts = [
                 default=[
                     'CapacityWeigher'
                 ],
-                help='Which weigher class names to use for weighing hosts.')
+                help='Which weigher class names to use for weighing hosts.'),
+    cfg.IntOpt('scheduler_share_services_cache_ttl',
+               default=0,
+               help='Number of seconds the scheduler reuses the list of '
+                    'share services loaded from DB to check their liveness. '
+                    'Zero value means the list is loaded for every '
+                    'scheduling request.'),
+    cfg.BoolOpt('scheduler_service_liveness_from_reports',
+                default=False,
+                help='Also consider a share service up if the scheduler '
+                     'received its capabilities within service_down_time. '
+                     'This keeps live services from being skipped when '
+                     'the cached list of share services has older '
+                     'heartbeats, so scheduler_share_services_cache_ttl '
+                     'can be raised.'),
 ]
 
 CONF = cfg.CONF
@@ -135,6 +151,12 @@ class HostState(object):
         self.pools = {}
         self.updated = None
 
+    def update_service(self, service):
+        """Update service info of the host and all its pools."""
+        self.service = ReadOnlyDict(service)
+        for pool in (self.pools or {}).values():
+            pool.service = ReadOnlyDict(service)
+
     def update_capabilities(self, capabilities=None, service=None):
         # Read-only capability dicts
 
@@ -215,6 +237,10 @@ class HostState(object):
             # of pools in share capacity
             for pool_cap in pools:
                 pool_name = pool_cap['pool_name']
+                # NOTE: Backend info is added to a copy, so that reported
+                # capabilities, which later deltas are applied to, keep
+                # only reported values and no stale timestamp.
+                pool_cap = dict(pool_cap)
                 self._append_backend_info(pool_cap)
                 cur_pool = self.pools.get(pool_name, None)
                 if not cur_pool:
@@ -229,6 +255,7 @@ class HostState(object):
             # information in the capability, we have to prepare
             # a pool from backend level info, or to update the one
             # we created in self.pools.
+            capability = dict(capability)
             pool_name = self.share_backend_name
             if pool_name is None:
                 # To get DEFAULT_POOL_NAME
@@ -395,6 +422,25 @@ class HostManager(object):
     def __init__(self):
         self.service_states = {}  # { <host>: {<service>: {cap k : v}}}
         self.host_state_map = {}
+        # Timestamps of capabilities applied to host states, used to
+        # update only host states with newly reported capabilities.
+        self._host_state_timestamps = {}
+        # Version of host_state_map, it is changed whenever set of hosts
+        # or pools could have been changed.
+        self._host_state_map_version = 0
+        self._all_pools = None
+        self._all_pools_version = None
+        self._share_services = None
+        self._share_services_loaded_at = None
+        # Sequence numbers of last capability reports, used to detect
+        # missed delta reports.
+        self._capabilities_seq = {}
+        self.capabilities_update_stats = {
+            'full_updates': 0,
+            'delta_updates': 0,
+            'missed_deltas': 0,
+            'last_apply_time': 0.0,
+        }
         self.filter_handler = base_host_filter.HostFilterHandler(
             'manila.scheduler.filters')
         self.filter_classes = self.filter_handler.get_all_classes()
@@ -479,52 +525,138 @@ class HostManager(object):
                                                        hosts,
                                                        weight_properties)
 
-    def update_service_capabilities(self, service_name, host, capabilities):
-        """Update the per-service capabilities based on this notification."""
+    def update_service_capabilities(self, service_name, host, capabilities,
+                                    capabilities_seq=None,
+                                    capabilities_delta=False):
+        """Update the per-service capabilities based on this notification.
+
+        Returns False if capabilities are a delta which cannot be applied,
+        because previous report is unknown, True otherwise.
+        """
         if service_name not in ('share',):
             LOG.debug('Ignoring %(service_name)s service update '
                       'from %(host)s',
                       {'service_name': service_name, 'host': host})
-            return
+            return True
 
-        # Copy the capabilities, so we don't modify the original dict
-        capability_copy = dict(capabilities)
+        started_at = time.time()
+        stats = self.capabilities_update_stats
+        if capabilities_delta:
+            last_seq = self._capabilities_seq.get(host)
+            if (last_seq is None or host not in self.service_states or
+                    capabilities_seq != last_seq + 1):
+                LOG.debug('Missed capabilities report from %(host)s, '
+                          'expected %(expected)s, got %(seq)s.',
+                          {'host': host, 'seq': capabilities_seq,
+                           'expected': last_seq and last_seq + 1})
+                self._capabilities_seq.pop(host, None)
+                stats['missed_deltas'] += 1
+                return False
+            capability_copy = self._apply_capabilities_delta(
+                self.service_states[host], capabilities)
+            stats['delta_updates'] += 1
+        else:
+            # Copy the capabilities, so we don't modify the original dict
+            capability_copy = dict(capabilities)
+            stats['full_updates'] += 1
         capability_copy["timestamp"] = timeutils.utcnow()  # Reported time
         self.service_states[host] = capability_copy
+        if capabilities_seq is None:
+            self._capabilities_seq.pop(host, None)
+        else:
+            self._capabilities_seq[host] = capabilities_seq
+        stats['last_apply_time'] = time.time() - started_at
 
-        LOG.debug("Received %(service_name)s service update from "
-                  "%(host)s: %(cap)s" %
+        LOG.debug("Received %(service_name)s service %(type)s update from "
+                  "%(host)s with %(pools)s pools.",
                   {'service_name': service_name, 'host': host,
-                   'cap': capabilities})
+                   'type': 'delta' if capabilities_delta else 'full',
+                   'pools': len(capability_copy.get('pools') or [])})
+        return True
+
+    @staticmethod
+    def _apply_capabilities_delta(capabilities, delta):
+        """Returns copy of capabilities with delta applied."""
+        result = dict(capabilities)
+        result.pop('timestamp', None)
+        for key in delta.get('removed', []):
+            result.pop(key, None)
+        result.update(delta.get('changed', {}))
+
+        pools_delta = delta.get('pools')
+        if pools_delta:
+            pools = collections.OrderedDict(
+                (pool['pool_name'], pool)
+                for pool in result.get('pools') or [])
+            for name in pools_delta.get('removed', []):
+                pools.pop(name, None)
+            for name, pool_delta in pools_delta.get('changed', {}).items():
+                pool = dict(pools.get(name, {}))
+                for key in pool_delta.get('removed', []):
+                    pool.pop(key, None)
+                pool.update(pool_delta.get('changed', {}))
+                pools[name] = pool
+            result['pools'] = list(pools.values())
+        return result
+
+    def _get_share_services(self, context):
+        """Returns share services, reusing recently loaded list if allowed."""
+        ttl = CONF.scheduler_share_services_cache_ttl
+        now = timeutils.utcnow()
+        if (ttl <= 0 or self._share_services is None or
+                timeutils.delta_seconds(
+                    self._share_services_loaded_at, now) >= ttl):
+            self._share_services = db.service_get_all_by_topic(
+                context, CONF.share_topic)
+            self._share_services_loaded_at = now
+        return self._share_services
+
+    def _service_is_up(self, service):
+        """Checks liveness, trusting recent capability reports if allowed."""
+        last_seen = None
+        if CONF.scheduler_service_liveness_from_reports:
+            capabilities = self.service_states.get(service['host']) or {}
+            last_seen = capabilities.get('timestamp')
+        return utils.service_is_up(service, last_seen=last_seen)
 
     def _update_host_state_map(self, context):
 
         # Get resource usage across the available share nodes:
-        topic = CONF.share_topic
-        share_services = db.service_get_all_by_topic(context, topic)
+        share_services = self._get_share_services(context)
 
         active_hosts = set()
         for service in share_services:
             host = service['host']
 
             # Warn about down services and remove them from host_state_map
-            if not utils.service_is_up(service) or service['disabled']:
+            if not self._service_is_up(service) or service['disabled']:
                 LOG.warning(_LW("Share service is down. (host: %s).") % host)
                 continue
 
             # Create and register host_state if not in host_state_map
             capabilities = self.service_states.get(host, None)
             host_state = self.host_state_map.get(host)
+            service_dict = dict(service.items())
             if not host_state:
                 host_state = self.host_state_cls(
                     host,
                     capabilities=capabilities,
-                    service=dict(service.items()))
+                    service=service_dict)
                 self.host_state_map[host] = host_state
+            elif (capabilities is not None and
+                    self._host_state_timestamps.get(host) ==
+                    capabilities.get('timestamp')):
+                # Host did not report new capabilities since last update
+                host_state.update_service(service_dict)
+                active_hosts.add(host)
+                continue
 
             # Update capabilities and attributes in host_state
             host_state.update_from_share_capability(
-                capabilities, service=dict(service.items()))
+                capabilities, service=service_dict)
+            self._host_state_timestamps[host] = (
+                capabilities or {}).get('timestamp')
+            self._host_state_map_version += 1
             active_hosts.add(host)
 
         # remove non-active hosts from host_state_map
@@ -533,6 +665,8 @@ class HostManager(object):
             LOG.info(_LI("Removing non-active host: %(host)s from"
                          "scheduler cache."), {'host': host})
             self.host_state_map.pop(host, None)
+            self._host_state_timestamps.pop(host, None)
+            self._host_state_map_version += 1
 
     def get_all_host_states_share(self, context):
         """Returns a dict of all the hosts the HostManager knows about.
@@ -546,16 +680,20 @@ class HostManager(object):
 
         self._update_host_state_map(context)
 
-        # Build a pool_state map and return that map instead of host_state_map
-        all_pools = {}
-        for host, state in self.host_state_map.items():
-            for key in state.pools:
-                pool = state.pools[key]
-                # Use host.pool_name to make sure key is unique
-                pool_key = '.'.join([host, pool.pool_name])
-                all_pools[pool_key] = pool
-
-        return six.itervalues(all_pools)
+        # Build a pool_state map and return that map instead of
+        # host_state_map. It is rebuilt only if hosts or pools changed.
+        if self._all_pools_version != self._host_state_map_version:
+            all_pools = {}
+            for host, state in self.host_state_map.items():
+                for key in state.pools:
+                    pool = state.pools[key]
+                    # Use host.pool_name to make sure key is unique
+                    pool_key = '.'.join([host, pool.pool_name])
+                    all_pools[pool_key] = pool
+            self._all_pools = all_pools
+            self._all_pools_version = self._host_state_map_version
+
+        return six.itervalues(self._all_pools)
 
     def get_pools(self, context, filters=None):
         """Returns a dict of all pools on all hosts HostManager knows about."""
@@ -33,6 +33,7 @@ from manila.i18n import _LE, _LW
 from manila import manager
 from manila import rpc
 from manila.share import rpcapi as share_rpcapi
+from manila.share import share_types
 
 LOG = log.getLogger(__name__)
 
@@ -59,7 +60,7 @@ MAPPING = {
 class SchedulerManager(manager.Manager):
     """Chooses a host to create shares."""
 
-    RPC_API_VERSION = '1.6'
+    RPC_API_VERSION = '1.8'
 
     def __init__(self, scheduler_driver=None, service_name=None,
                  *args, **kwargs):
@@ -92,13 +93,21 @@ class SchedulerManager(manager.Manager):
         return self.driver.get_service_capabilities()
 
     def update_service_capabilities(self, context, service_name=None,
-                                    host=None, capabilities=None, **kwargs):
+                                    host=None, capabilities=None,
+                                    capabilities_seq=None,
+                                    capabilities_delta=False, **kwargs):
         """Process a capability update from a service node."""
         if capabilities is None:
             capabilities = {}
-        self.driver.update_service_capabilities(service_name,
-                                                host,
-                                                capabilities)
+        updated = self.driver.update_service_capabilities(
+            service_name, host, capabilities,
+            capabilities_seq=capabilities_seq,
+            capabilities_delta=capabilities_delta)
+        if updated is False:
+            # NOTE: Delta could not be applied, because earlier report
+            # was missed, so ask the service to send a full report.
+            share_rpcapi.ShareAPI().publish_service_capabilities(
+                context, host=host)
 
     def create_share_instance(self, context, request_spec=None,
                               filter_properties=None):
@@ -200,6 +209,10 @@ class SchedulerManager(manager.Manager):
     def request_service_capabilities(self, context):
         share_rpcapi.ShareAPI().publish_service_capabilities(context)
 
+    def invalidate_share_types_cache(self, context):
+        """Drop share types cached by this service."""
+        share_types.invalidate_cache()
+
     def _set_cg_error_state(self, method, context, ex, request_spec):
         LOG.warning(_LW("Failed to schedule_%(method)s: %(ex)s"),
                     {"method": method, "ex": ex})
@@ -38,15 +38,18 @@ class SchedulerAPI(object):
         1.4 - Add migrate_share_to_host method
         1.5 - Add create_share_replica
         1.6 - Add manage_share
+        1.7 - Add capabilities_seq and capabilities_delta to
+        update_service_capabilities
+        1.8 - Add invalidate_share_types_cache
     """
 
-    RPC_API_VERSION = '1.6'
+    RPC_API_VERSION = '1.8'
 
     def __init__(self):
         super(SchedulerAPI, self).__init__()
         target = messaging.Target(topic=CONF.scheduler_topic,
                                   version=self.RPC_API_VERSION)
-        self.client = rpc.get_client(target, version_cap='1.6')
+        self.client = rpc.get_client(target, version_cap='1.8')
 
     def create_share_instance(self, context, request_spec=None,
                               filter_properties=None):
@@ -59,13 +62,25 @@ class SchedulerAPI(object):
 
     def update_service_capabilities(self, context,
                                     service_name, host,
-                                    capabilities):
-        call_context = self.client.prepare(fanout=True, version='1.0')
+                                    capabilities, capabilities_seq=None,
+                                    capabilities_delta=False):
+        if capabilities_seq is None:
+            call_context = self.client.prepare(fanout=True, version='1.0')
+            call_context.cast(context,
+                              'update_service_capabilities',
+                              service_name=service_name,
+                              host=host,
+                              capabilities=capabilities)
+            return
+
+        call_context = self.client.prepare(fanout=True, version='1.7')
         call_context.cast(context,
                           'update_service_capabilities',
                           service_name=service_name,
                           host=host,
-                          capabilities=capabilities)
+                          capabilities=capabilities,
+                          capabilities_seq=capabilities_seq,
+                          capabilities_delta=capabilities_delta)
 
     def get_pools(self, context, filters=None):
         call_context = self.client.prepare(version='1.1')
@@ -113,3 +128,7 @@ class SchedulerAPI(object):
                                  driver_options=driver_options,
                                  request_spec=request_spec,
                                  filter_properties=filter_properties)
+
+    def invalidate_share_types_cache(self, context):
+        call_context = self.client.prepare(fanout=True, version='1.8')
+        call_context.cast(context, 'invalidate_share_types_cache')
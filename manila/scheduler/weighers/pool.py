@@ -33,22 +33,38 @@ CONF.register_opts(pool_weight_opts)
 
 
 class PoolWeigher(base_host.BaseHostWeigher):
+
+    def __init__(self):
+        super(PoolWeigher, self).__init__()
+        # Weigher object lives during one scheduling request, so share
+        # servers of each backend are loaded from DB only once per request.
+        self._backend_pools = {}
+        self._context = None
+
     def weight_multiplier(self):
         """Override the weight multiplier."""
         return CONF.pool_weight_multiplier
 
+    def _get_pools_with_share_servers(self, backend, pool_mapping):
+        """Returns names of backend pools that have existing share servers."""
+        if backend not in self._backend_pools:
+            if self._context is None:
+                self._context = context.get_admin_context()
+            servers = db_api.share_server_get_all_by_host(
+                self._context, backend)
+            self._backend_pools[backend] = set(
+                pool['pool_name'] for server in servers
+                for pool in pool_mapping.get(server['id'], []))
+        return self._backend_pools[backend]
+
     def _weigh_object(self, host_state, weight_properties):
         """Pools with existing share server win."""
         pool_mapping = weight_properties.get('server_pools_mapping', {})
         if not pool_mapping:
             return 0
 
-        ctx = context.get_admin_context()
-        host = utils.extract_host(host_state.host, 'backend')
-        servers = db_api.share_server_get_all_by_host(ctx, host)
+        backend = utils.extract_host(host_state.host, 'backend')
         pool = utils.extract_host(host_state.host, 'pool')
-        for server in servers:
-            if any(pool == p['pool_name'] for p in pool_mapping.get(
-                   server['id'], [])):
-                return 1
+        if pool in self._get_pools_with_share_servers(backend, pool_mapping):
+            return 1
         return 0
@@ -95,6 +95,7 @@ class Service(service.Service):
         self.periodic_fuzzy_delay = periodic_fuzzy_delay
         self.saved_args, self.saved_kwargs = args, kwargs
         self.timers = []
+        self.availability_zone = None
 
     def start(self):
         version_string = version.version_string()
@@ -107,6 +108,8 @@ class Service(service.Service):
                                                  self.host,
                                                  self.binary)
             self.service_id = service_ref['id']
+            zone_ref = service_ref['availability_zone']
+            self.availability_zone = zone_ref and zone_ref['name']
         except exception.NotFound:
             self._create_service_ref(ctxt)
 
@@ -146,6 +149,7 @@ class Service(service.Service):
                                          'report_count': 0,
                                          'availability_zone': zone})
         self.service_id = service_ref['id']
+        self.availability_zone = zone
 
     def __getattr__(self, key):
         manager = self.__dict__.get('manager', None)
@@ -229,22 +233,18 @@ class Service(service.Service):
         """Update the state of this service in the datastore."""
         ctxt = context.get_admin_context()
         zone = CONF.storage_availability_zone
-        state_catalog = {}
+        # NOTE: Availability zone is written only when it has changed.
+        changed_zone = zone if zone != self.availability_zone else None
         try:
             try:
-                service_ref = db.service_get(ctxt, self.service_id)
+                db.service_heartbeat(ctxt, self.service_id,
+                                     availability_zone=changed_zone)
             except exception.NotFound:
                 LOG.debug('The service database object disappeared, '
                           'Recreating it.')
                 self._create_service_ref(ctxt)
-                service_ref = db.service_get(ctxt, self.service_id)
-
-            state_catalog['report_count'] = service_ref['report_count'] + 1
-            if zone != service_ref['availability_zone']['name']:
-                state_catalog['availability_zone'] = zone
-
-            db.service_update(ctxt,
-                              self.service_id, state_catalog)
+                db.service_heartbeat(ctxt, self.service_id)
+            self.availability_zone = zone
 
             # TODO(termie): make this pattern be more elegant.
             if getattr(self, 'model_disconnected', False):
@@ -13,20 +13,121 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
+
+from eventlet import greenthread
+from oslo_config import cfg
 from oslo_log import log
 import six
 
 from manila.common import constants
+from manila.i18n import _LE
 from manila.i18n import _LI
 
 LOG = log.getLogger(__name__)
 
+share_access_opts = [
+    cfg.FloatOpt('access_rules_coalesce_window',
+                 default=0.0,
+                 min=0.0,
+                 help='Time in seconds to collect access rule changes '
+                      'requested for a share instance before applying them '
+                      'all with a single driver call. Zero value disables '
+                      'coalescing and changes are applied one by one.'),
+]
+
+CONF = cfg.CONF
+CONF.register_opts(share_access_opts)
+
 
 class ShareInstanceAccess(object):
 
     def __init__(self, db, driver):
         self.db = db
         self.driver = driver
+        self._pending_changes = {}
+        self._queue_stats = {
+            'applied_batches': 0,
+            'applied_changes': 0,
+            'last_latency': 0.0,
+            'max_latency': 0.0,
+        }
+
+    def queue_update_access_rules(self, context, share_instance_id,
+                                  add_rules=None, delete_rules=None,
+                                  share_server=None):
+        """Queue access rules changes for given share instance.
+
+        Changes queued for the same share instance within
+        'access_rules_coalesce_window' seconds are applied together with
+        a single 'update_access_rules' call. If the window is zero, changes
+        are applied right away.
+        """
+        window = CONF.access_rules_coalesce_window
+        if not window:
+            return self.update_access_rules(
+                context, share_instance_id, add_rules=add_rules,
+                delete_rules=delete_rules, share_server=share_server)
+
+        pending = self._pending_changes.get(share_instance_id)
+        if pending is None:
+            pending = {
+                'context': context,
+                'share_server': share_server,
+                'add_rules': {},
+                'delete_rules': {},
+                'queued_at': time.time(),
+            }
+            self._pending_changes[share_instance_id] = pending
+            greenthread.spawn_after(
+                window, self._apply_queued_access_rules, share_instance_id)
+
+        for rule in add_rules or []:
+            pending['add_rules'][rule['id']] = rule
+        for rule in delete_rules or []:
+            # NOTE: rule denied before it was applied is only deleted.
+            pending['add_rules'].pop(rule['id'], None)
+            pending['delete_rules'][rule['id']] = rule
+
+    def _apply_queued_access_rules(self, share_instance_id):
+        pending = self._pending_changes.pop(share_instance_id, None)
+        if not pending:
+            return
+
+        changes = len(pending['add_rules']) + len(pending['delete_rules'])
+        try:
+            self.update_access_rules(
+                pending['context'], share_instance_id,
+                add_rules=list(pending['add_rules'].values()),
+                delete_rules=list(pending['delete_rules'].values()),
+                share_server=pending['share_server'])
+        except Exception:
+            LOG.exception(_LE("Failed to apply %(changes)s queued access "
+                              "rule changes for share instance "
+                              "%(instance)s."),
+                          {'changes': changes, 'instance': share_instance_id})
+        finally:
+            latency = time.time() - pending['queued_at']
+            stats = self._queue_stats
+            stats['applied_batches'] += 1
+            stats['applied_changes'] += changes
+            stats['last_latency'] = latency
+            stats['max_latency'] = max(stats['max_latency'], latency)
+            LOG.debug("Applied %(changes)s queued access rule changes for "
+                      "share instance %(instance)s in %(latency).3fs, "
+                      "%(depth)s changes are still queued.",
+                      {'changes': changes, 'instance': share_instance_id,
+                       'latency': latency,
+                       'depth': self.get_queue_stats()['queue_depth']})
+
+    def get_queue_stats(self):
+        """Returns access rules queue depth and latency metrics."""
+        stats = dict(self._queue_stats)
+        stats['queued_instances'] = len(self._pending_changes)
+        stats['queue_depth'] = sum(
+            len(pending['add_rules']) + len(pending['delete_rules'])
+            for pending in self._pending_changes.values())
+        return stats
 
     def update_access_rules(self, context, share_instance_id, add_rules=None,
                             delete_rules=None, share_server=None):
@@ -169,8 +270,6 @@ class ShareInstanceAccess(object):
         if not access_rules:
             return
 
-        for rule in access_rules:
-            access_mapping = self.db.share_instance_access_get(
-                context, rule['id'], share_instance_id)
-
-            self.db.share_instance_access_delete(context, access_mapping['id'])
+        self.db.share_instance_access_delete_by_access_ids(
+            context, share_instance_id,
+            [rule['id'] for rule in access_rules])
@@ -30,6 +30,7 @@ import six
 from manila.api import extensions
 from manila.common import constants
 from manila.data import rpcapi as data_rpcapi
+from manila import db
 from manila.db import base
 from manila import exception
 from manila.i18n import _
@@ -63,6 +64,10 @@ QUOTAS = quota.QUOTAS
 class API(base.Base):
     """API for interacting with the share manager."""
 
+    # NOTE: share search options which DB layer applies as exact match
+    # filters to 'shares' and 'share_instances' tables.
+    DB_FILTER_KEYS = db.SHARE_FILTER_KEYS + db.SHARE_INSTANCE_FILTER_KEYS
+
     def __init__(self, db_driver=None):
         self.scheduler_rpcapi = scheduler_rpcapi.SchedulerAPI()
         self.share_rpcapi = share_rpcapi.ShareAPI()
@@ -1070,7 +1075,7 @@ class API(base.Base):
         return rv
 
     def get_all(self, context, search_opts=None, sort_key='created_at',
-                sort_dir='desc'):
+                sort_dir='desc', limit=None, offset=None, marker=None):
         policy.check_policy(context, 'share', 'get_all')
 
         if search_opts is None:
@@ -1107,23 +1112,39 @@ class API(base.Base):
         is_public = search_opts.pop('is_public', False)
         is_public = strutils.bool_from_string(is_public, strict=True)
 
+        all_tenants = 'all_tenants' in search_opts
+        search_opts.pop('all_tenants', None)
+        share_server_id = search_opts.pop('share_server_id', None)
+
+        # Options that can be applied by DB as exact match filters
+        for key in self.DB_FILTER_KEYS:
+            if key in search_opts:
+                filters[key] = search_opts.pop(key)
+
+        # Paginate in DB only if there are no filters left that should be
+        # applied to the loaded shares, otherwise page would be incomplete.
+        db_pagination = {}
+        if not search_opts:
+            pagination = {'limit': limit, 'offset': offset, 'marker': marker}
+            db_pagination = {
+                k: v for k, v in pagination.items() if v is not None}
+
         # Get filtered list of shares
-        if 'share_server_id' in search_opts:
+        if share_server_id is not None:
             # NOTE(vponomaryov): this is project_id independent
             policy.check_policy(context, 'share', 'list_by_share_server_id')
             shares = self.db.share_get_all_by_share_server(
-                context, search_opts.pop('share_server_id'), filters=filters,
-                sort_key=sort_key, sort_dir=sort_dir)
-        elif (context.is_admin and 'all_tenants' in search_opts):
+                context, share_server_id, filters=filters,
+                sort_key=sort_key, sort_dir=sort_dir, **db_pagination)
+        elif (context.is_admin and all_tenants):
             shares = self.db.share_get_all(
-                context, filters=filters, sort_key=sort_key, sort_dir=sort_dir)
+                context, filters=filters, sort_key=sort_key, sort_dir=sort_dir,
+                **db_pagination)
         else:
             shares = self.db.share_get_all_by_project(
                 context, project_id=context.project_id, filters=filters,
-                is_public=is_public, sort_key=sort_key, sort_dir=sort_dir)
-
-        # NOTE(vponomaryov): we do not need 'all_tenants' opt anymore
-        search_opts.pop('all_tenants', None)
+                is_public=is_public, sort_key=sort_key, sort_dir=sort_dir,
+                **db_pagination)
 
         if search_opts:
             results = []
@@ -1131,9 +1152,24 @@ class API(base.Base):
                 # values in search_opts can be only strings
                 if all(s.get(k, None) == v for k, v in search_opts.items()):
                     results.append(s)
-            shares = results
+            shares = self._paginate_shares(results, limit, offset, marker)
         return shares
 
+    @staticmethod
+    def _paginate_shares(shares, limit=None, offset=None, marker=None):
+        start = offset or 0
+        if marker:
+            for i, share in enumerate(shares):
+                if share['id'] == marker:
+                    start += i + 1
+                    break
+            else:
+                msg = _("Marker '%s' not found.") % marker
+                raise exception.InvalidInput(reason=msg)
+        if limit is None:
+            return shares[start:]
+        return shares[start:start + limit]
+
     def get_snapshot(self, context, snapshot_id):
         policy.check_policy(context, 'share_snapshot', 'get_snapshot')
         return self.db.share_snapshot_get(context, snapshot_id)
@@ -159,6 +159,15 @@ ganesha_opts = [
                default='/etc/manila/ganesha-export-templ.d',
                help='Path to directory containing Ganesha export '
                     'block templates. (Ganesha module only.)'),
+    cfg.BoolOpt('ganesha_export_per_share',
+                default=False,
+                help='If set to True, each share is exported by a single '
+                     'Ganesha export listing all clients allowed to access '
+                     'it, and all access rule changes of a share are applied '
+                     'at once. Otherwise each access rule gets its own '
+                     'export. Exports of single access rules left from '
+                     'the other mode are removed when access rules of the '
+                     'share are recovered. (Ganesha module only.)'),
 ]
 
 CONF = cfg.CONF
@@ -479,6 +488,21 @@ class ShareDriver(object):
         """
         raise NotImplementedError()
 
+    def ensure_shares(self, context, shares):
+        """Invoked to ensure that shares are exported, in bulk.
+
+        Called on service startup before 'ensure_share'. Drivers that can
+        check all their shares faster at once than one by one may
+        implement it. Shares that are absent in returned dict are ensured
+        with 'ensure_share' method.
+
+        :param shares: list of dicts with 'share' (share instance) and
+            'share_server' (share server or None) keys.
+        :return dict with share instance IDs as keys and None or list
+            with export locations as values.
+        """
+        raise NotImplementedError()
+
     def allow_access(self, context, share, access, share_server=None):
         """Allow access to the share."""
         raise NotImplementedError()
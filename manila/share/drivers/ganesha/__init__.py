@@ -25,6 +25,7 @@ import six
 from manila.common import constants
 from manila import exception
 from manila.i18n import _LI
+from manila.i18n import _LW
 from manila.share.drivers.ganesha import manager as ganesha_manager
 from manila.share.drivers.ganesha import utils as ganesha_utils
 
@@ -147,10 +148,86 @@ class GaneshaNASHelper(NASHelperBase):
         """Deny access to the share."""
         self.ganesha.remove_export("%s--%s" % (share['name'], access['id']))
 
+    def _get_export_clients(self, confdict):
+        """Return set of clients of the export."""
+        clients = confdict['EXPORT'].get('CLIENT', {}).get('Clients', '')
+        return {client.strip() for client in six.text_type(clients).split(',')
+                if client.strip()}
+
+    def _remove_rule_exports(self, share):
+        """Remove exports of single access rules of the share.
+
+        They are left from the time each access rule had its own export,
+        and would keep rules effective after they are denied.
+        """
+        prefix = share['name'] + '--'
+        for name in self.ganesha.list_exports():
+            if not name.startswith(prefix):
+                continue
+            try:
+                self.ganesha.remove_export(name)
+            except exception.GaneshaCommandFailure:
+                # NOTE: Export file is removed even if the export is not
+                # known to Ganesha, which is enough after its restart.
+                LOG.warning(_LW("Failed to remove export %s from Ganesha "
+                                "runtime."), name)
+
+    def _update_share_export(self, base_path, share, add_rules,
+                             delete_rules, recovery=False):
+        """Apply access rule changes to the single export of the share.
+
+        All changes result in at most one write of the export file and one
+        DBus call. In recovery mode add_rules are all rules of the share.
+        """
+        for rule in add_rules:
+            if rule['access_type'] != 'ip':
+                raise exception.InvalidShareAccess(
+                    'Only IP access type allowed')
+
+        name = share['name']
+        current = self.ganesha.get_export(name)
+        clients = set()
+        if current and not recovery:
+            clients = self._get_export_clients(current)
+        clients.update(rule['access_to'] for rule in add_rules)
+        clients.difference_update(rule['access_to'] for rule in delete_rules)
+
+        if not clients:
+            if current:
+                self.ganesha.remove_export(name)
+            return
+
+        if current:
+            export_id = current['EXPORT']['Export_Id']
+        else:
+            export_id = self.ganesha.allocate_export_id()
+        cf = {}
+        ganesha_utils.patch(cf, self.export_template, {
+            'EXPORT': {
+                'Export_Id': export_id,
+                'Path': os.path.join(base_path, name),
+                'Pseudo': os.path.join(base_path, name),
+                'Tag': name,
+                'CLIENT': {
+                    'Clients': ', '.join(sorted(clients))
+                },
+                'FSAL': self._fsal_hook(base_path, share, None)
+            }
+        })
+        if cf != current:
+            self.ganesha.update_export(name, cf)
+
     def update_access(self, base_path, share, add_rules, delete_rules,
                       recovery=False):
         """Update access rules of share."""
 
+        if self.configuration.ganesha_export_per_share:
+            self._update_share_export(base_path, share, add_rules,
+                                      delete_rules, recovery=recovery)
+            if recovery:
+                self._remove_rule_exports(share)
+            return
+
         if recovery:
             self.ganesha.reset_exports()
             self.ganesha.restart_service()
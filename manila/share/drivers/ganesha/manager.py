@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
 import os
 import pipes
 import re
@@ -30,6 +31,9 @@ from manila import utils
 
 LOG = log.getLogger(__name__)
 IWIDTH = 4
+# Number of export ids reserved in the database at once by
+# GaneshaManager.allocate_export_id.
+EXPORT_ID_BLOCK_SIZE = 16
 
 
 def _conf2json(conf):
@@ -194,6 +198,10 @@ class GaneshaManager(object):
                     stdout=e.stdout, stderr=e.stderr, exit_code=e.exit_code,
                     cmd=e.cmd)
         self.execute = _execute
+        # Export ids reserved in the database but not used yet.
+        self._export_ids = []
+        # Export blocks of exports managed by update_export, by export name.
+        self._exports = {}
         self.ganesha_export_dir = kwargs['ganesha_export_dir']
         self.execute('mkdir', '-p', self.ganesha_export_dir)
         self.ganesha_db_path = kwargs['ganesha_db_path']
@@ -234,19 +242,55 @@ class GaneshaManager(object):
         self._write_file(path, data)
         return path
 
+    def _list_export_files(self):
+        """Return names of export config files in export directory."""
+        return [f for f in self.execute('ls', self.ganesha_export_dir,
+                                        run_as_root=False)[0].split("\n")
+                if self.confrx.search(f) and f != "INDEX.conf"]
+
+    def _read_index(self):
+        """Return names of export files included in the index file."""
+        path = pipes.quote(self._getpath("INDEX"))
+        index = self.execute('sh', '-c',
+                             'test ! -e %s || cat %s' % (path, path),
+                             message='reading index')[0]
+        return set(os.path.basename(line.split(None, 1)[1].strip())
+                   for line in index.split("\n")
+                   if line.startswith("%include "))
+
+    def _write_index(self, index):
+        """Write the index file including given export files."""
+        index = "".join(map(lambda f: "%include " + os.path.join(
+            self.ganesha_export_dir, f) + "\n", sorted(index)))
+        self._write_conf_file("INDEX", index)
+
     def _mkindex(self):
         """Generate the index file for current exports."""
         @utils.synchronized("ganesha-index-" + self.tag, external=True)
         def _mkindex():
-            files = filter(lambda f: self.confrx.search(f) and
-                           f != "INDEX.conf",
-                           self.execute('ls', self.ganesha_export_dir,
-                                        run_as_root=False)[0].split("\n"))
-            index = "".join(map(lambda f: "%include " + os.path.join(
-                    self.ganesha_export_dir, f) + "\n", files))
-            self._write_conf_file("INDEX", index)
+            self._write_index(self._list_export_files())
         _mkindex()
 
+    def _update_index(self, add=None, remove=None):
+        """Add or remove export of given name in the index file.
+
+        Index file is re-read under the lock, because other processes
+        using the same Ganesha node may have changed it.
+        """
+        @utils.synchronized("ganesha-index-" + self.tag, external=True)
+        def _update_index():
+            index = self._read_index()
+            if add:
+                index.add(add + ".conf")
+            if remove:
+                index.discard(remove + ".conf")
+            self._write_index(index)
+        _update_index()
+
+    def list_exports(self):
+        """Return names of exports included in the index file."""
+        return sorted(self.confrx.sub('', f) for f in self._read_index())
+
     def _read_export_file(self, name):
         """Return the dict of the export identified by name."""
         return parseconf(self.execute("cat", self._getpath(name),
@@ -283,7 +327,6 @@ class GaneshaManager(object):
         """Add an export to Ganesha specified by confdict."""
         xid = confdict["EXPORT"]["Export_Id"]
         undos = []
-        _mkindex_called = False
         try:
             path = self._write_export_file(name, confdict)
             undos.append(lambda: self._rm_export_file(name))
@@ -292,30 +335,71 @@ class GaneshaManager(object):
                                     "string:EXPORT(Export_Id=%d)" % xid)
             undos.append(lambda: self._remove_export_dbus(xid))
 
-            _mkindex_called = True
-            self._mkindex()
+            self._update_index(add=name)
         except Exception:
             for u in undos:
                 u()
-            if not _mkindex_called:
-                self._mkindex()
             raise
 
     def remove_export(self, name):
         """Remove an export from Ganesha."""
         try:
-            confdict = self._read_export_file(name)
+            confdict = self._exports.pop(name, None)
+            if confdict is None:
+                confdict = self._read_export_file(name)
             self._remove_export_dbus(confdict["EXPORT"]["Export_Id"])
         finally:
             self._rm_export_file(name)
-            self._mkindex()
-
-    def get_export_id(self, bump=True):
-        """Get a new export id."""
+            self._update_index(remove=name)
+
+    def get_export(self, name):
+        """Return the dict of the export of name, None if it does not exist.
+
+        Exports managed by update_export are read only once.
+        """
+        if name not in self._exports:
+            path = pipes.quote(self._getpath(name))
+            conf = self.execute('sh', '-c',
+                                'test ! -e %s || cat %s' % (path, path),
+                                message='reading export ' + name)[0]
+            if not conf.strip():
+                return None
+            self._exports[name] = parseconf(conf)
+        return copy.deepcopy(self._exports[name])
+
+    def update_export(self, name, confdict):
+        """Create or update the export of name specified by confdict.
+
+        New exports are added to Ganesha with AddExport, existing ones
+        are reloaded in place with UpdateExport.
+        """
+        xid = confdict["EXPORT"]["Export_Id"]
+        exists = self.get_export(name) is not None
+        self._exports.pop(name, None)
+        path = self._write_export_file(name, confdict)
+        if exists:
+            self._dbus_send_ganesha("UpdateExport", "string:" + path,
+                                    "string:EXPORT(Export_Id=%d)" % xid)
+        else:
+            try:
+                self._dbus_send_ganesha("AddExport", "string:" + path,
+                                        "string:EXPORT(Export_Id=%d)" % xid)
+            except Exception:
+                self._rm_export_file(name)
+                raise
+            self._update_index(add=name)
+        self._exports[name] = copy.deepcopy(confdict)
+
+    def get_export_id(self, bump=True, count=1):
+        """Get a new export id.
+
+        With count greater than one, ids up to the returned one starting
+        with the count-th last are reserved.
+        """
         # XXX overflowing the export id (16 bit unsigned integer)
         # is not handled
         if bump:
-            bumpcode = 'update ganesha set value = value + 1;'
+            bumpcode = 'update ganesha set value = value + %d;' % count
         else:
             bumpcode = ''
         out = self.execute(
@@ -330,6 +414,14 @@ class GaneshaManager(object):
             raise exception.InvalidSqliteDB()
         return int(match.groups()[0])
 
+    def allocate_export_id(self):
+        """Get a new export id from a block reserved in the database."""
+        if not self._export_ids:
+            last_id = self.get_export_id(count=EXPORT_ID_BLOCK_SIZE)
+            self._export_ids.extend(
+                range(last_id - EXPORT_ID_BLOCK_SIZE + 1, last_id + 1))
+        return self._export_ids.pop(0)
+
     def restart_service(self):
         """Restart the Ganesha service."""
         self.execute("service", self.ganesha_service, "restart")
@@ -338,4 +430,5 @@ class GaneshaManager(object):
         """Delete all export files."""
         self.execute('sh', '-c',
                      'rm -f %s/*.conf' % pipes.quote(self.ganesha_export_dir))
+        self._exports = {}
         self._mkindex()
@@ -38,6 +38,7 @@ from manila.share import driver
 from manila.share.drivers import service_instance
 from manila import utils
 from manila import volume
+from manila.volume import watcher
 
 LOG = log.getLogger(__name__)
 
@@ -64,6 +65,22 @@ share_opts = [
     cfg.IntOpt('max_time_to_attach',
                default=120,
                help="Maximum time to wait for attaching cinder volume."),
+    cfg.FloatOpt('volume_status_poll_min_interval',
+                 default=0.5,
+                 help="Minimum number of seconds between polls of cinder "
+                      "volume and snapshot statuses. Used right after a wait "
+                      "starts or a polled status changes."),
+    cfg.FloatOpt('volume_status_poll_max_interval',
+                 default=2,
+                 help="Maximum number of seconds between polls of cinder "
+                      "volume and snapshot statuses. Interval grows up to "
+                      "this value while polled statuses stay the same."),
+    cfg.IntOpt('volume_status_poll_list_threshold',
+               default=5,
+               min=0,
+               help="Number of cinder volumes or snapshots being waited for "
+                    "above which their statuses are polled with a single "
+                    "list call instead of a get call per resource."),
     cfg.StrOpt('service_instance_smb_config_path',
                default='$share_mount_path/smb.conf',
                help="Path to SMB config in service instance."),
@@ -137,6 +154,28 @@ class GenericShareDriver(driver.ExecuteMixin, driver.ShareDriver):
         self.ssh_connections = {}
         self._setup_service_instance_manager()
         self.private_storage = kwargs.get('private_storage')
+        self._setup_status_watchers()
+
+    def _setup_status_watchers(self):
+        # NOTE: Waits for volumes and snapshots of all shares share one
+        # poller per resource type, which lists them in a single call when
+        # there are many of them.
+        min_interval = self.configuration.volume_status_poll_min_interval
+        max_interval = self.configuration.volume_status_poll_max_interval
+        list_threshold = (
+            self.configuration.volume_status_poll_list_threshold)
+        self._volume_watcher = watcher.StatusWatcher(
+            lambda volume_id: self.volume_api.get(
+                self.admin_context, volume_id),
+            lambda: self.volume_api.get_all(self.admin_context),
+            exception.VolumeNotFound, min_interval, max_interval,
+            list_threshold)
+        self._snapshot_watcher = watcher.StatusWatcher(
+            lambda snapshot_id: self.volume_api.get_snapshot(
+                self.admin_context, snapshot_id),
+            lambda: self.volume_api.get_all_snapshots(self.admin_context),
+            exception.VolumeSnapshotNotFound, min_interval, max_interval,
+            list_threshold)
 
     def _setup_service_instance_manager(self):
         self.service_instance_manager = (
@@ -407,23 +446,24 @@ class GenericShareDriver(driver.ExecuteMixin, driver.ShareDriver):
 
             attach_volume()
 
-            t = time.time()
-            while time.time() - t < self.configuration.max_time_to_attach:
-                volume = self.volume_api.get(context, volume['id'])
-                if volume['status'] == 'in-use':
-                    return volume
-                elif volume['status'] != 'attaching':
+            def is_attached(polled_volume):
+                if polled_volume and polled_volume['status'] == 'in-use':
+                    return True
+                elif (not polled_volume or
+                        polled_volume['status'] != 'attaching'):
                     raise exception.ManilaException(
                         _('Failed to attach volume %s') % volume['id'])
-                time.sleep(1)
-            else:
-                err_msg = {
-                    'volume_id': volume['id'],
-                    'max_time': self.configuration.max_time_to_attach
-                }
-                raise exception.ManilaException(
-                    _('Volume %(volume_id)s has not been attached in '
-                      '%(max_time)ss. Giving up.') % err_msg)
+                return False
+
+            err_msg = {
+                'volume_id': volume['id'],
+                'max_time': self.configuration.max_time_to_attach
+            }
+            return self._volume_watcher.wait(
+                volume['id'], is_attached,
+                self.configuration.max_time_to_attach,
+                _('Volume %(volume_id)s has not been attached in '
+                  '%(max_time)ss. Giving up.') % err_msg)
         return do_attach(volume)
 
     def _get_volume_name(self, share_id):
@@ -511,21 +551,18 @@ class GenericShareDriver(driver.ExecuteMixin, driver.ShareDriver):
                     instance_id,
                     volume['id']
                 )
-                t = time.time()
-                while time.time() - t < self.configuration.max_time_to_attach:
-                    volume = self.volume_api.get(context, volume['id'])
-                    if volume['status'] in (const.STATUS_AVAILABLE,
-                                            const.STATUS_ERROR):
-                        break
-                    time.sleep(1)
-                else:
-                    err_msg = {
-                        'volume_id': volume['id'],
-                        'max_time': self.configuration.max_time_to_attach
-                    }
-                    raise exception.ManilaException(
-                        _('Volume %(volume_id)s has not been detached in '
-                          '%(max_time)ss. Giving up.') % err_msg)
+                err_msg = {
+                    'volume_id': volume['id'],
+                    'max_time': self.configuration.max_time_to_attach
+                }
+                self._volume_watcher.wait(
+                    volume['id'],
+                    lambda polled_volume: (
+                        not polled_volume or polled_volume['status'] in (
+                            const.STATUS_AVAILABLE, const.STATUS_ERROR)),
+                    self.configuration.max_time_to_attach,
+                    _('Volume %(volume_id)s has not been detached in '
+                      '%(max_time)ss. Giving up.') % err_msg)
         do_detach()
 
     def _allocate_container(self, context, share, snapshot=None):
@@ -560,8 +597,9 @@ class GenericShareDriver(driver.ExecuteMixin, driver.ShareDriver):
     def _wait_for_available_volume(self, volume, timeout,
                                    msg_error, msg_timeout,
                                    expected_size=None):
-        t = time.time()
-        while time.time() - t < timeout:
+        def is_available(volume):
+            if not volume:
+                raise exception.ManilaException(msg_error)
             if volume['status'] == const.STATUS_AVAILABLE:
                 if expected_size and volume['size'] != expected_size:
                     LOG.debug("The volume %(vol_id)s is available but the "
@@ -572,16 +610,16 @@ class GenericShareDriver(driver.ExecuteMixin, driver.ShareDriver):
                               dict(vol_id=volume['id'],
                                    expected_size=expected_size,
                                    volume_size=volume['size']))
-                else:
-                    break
+                    return False
+                return True
             elif 'error' in volume['status'].lower():
                 raise exception.ManilaException(msg_error)
-            time.sleep(1)
-            volume = self.volume_api.get(self.admin_context, volume['id'])
-        else:
-            raise exception.ManilaException(msg_timeout)
+            return False
 
-        return volume
+        if is_available(volume):
+            return volume
+        return self._volume_watcher.wait(volume['id'], is_available,
+                                         timeout, msg_timeout)
 
     def _deallocate_container(self, context, share):
         """Deletes cinder volume."""
@@ -596,20 +634,12 @@ class GenericShareDriver(driver.ExecuteMixin, driver.ShareDriver):
                     _('Volume is still in use and '
                       'cannot be deleted now.'))
             self.volume_api.delete(context, volume['id'])
-            t = time.time()
-            while (time.time() - t <
-                   self.configuration.max_time_to_create_volume):
-                try:
-                    volume = self.volume_api.get(context, volume['id'])
-                except exception.VolumeNotFound:
-                    LOG.debug('Volume was deleted successfully')
-                    break
-                time.sleep(1)
-            else:
-                raise exception.ManilaException(
-                    _('Volume have not been '
-                      'deleted in %ss. Giving up')
-                    % self.configuration.max_time_to_create_volume)
+            self._volume_watcher.wait(
+                volume['id'], lambda polled_volume: polled_volume is None,
+                self.configuration.max_time_to_create_volume,
+                _('Volume have not been deleted in %ss. Giving up')
+                % self.configuration.max_time_to_create_volume)
+            LOG.debug('Volume was deleted successfully')
 
     def _update_share_stats(self):
         """Retrieve stats info from share volume group."""
@@ -782,32 +812,30 @@ class GenericShareDriver(driver.ExecuteMixin, driver.ShareDriver):
                                 volume_snapshot_name_template % snapshot['id'])
         volume_snapshot = self.volume_api.create_snapshot_force(
             self.admin_context, volume['id'], volume_snapshot_name, '')
-        t = time.time()
-        while time.time() - t < self.configuration.max_time_to_create_volume:
-            if volume_snapshot['status'] == const.STATUS_AVAILABLE:
-                break
-            if volume_snapshot['status'] == const.STATUS_ERROR:
+
+        def is_available(volume_snapshot):
+            if (not volume_snapshot or
+                    volume_snapshot['status'] == const.STATUS_ERROR):
                 raise exception.ManilaException(_('Failed to create volume '
                                                   'snapshot'))
-            time.sleep(1)
-            volume_snapshot = self.volume_api.get_snapshot(
-                self.admin_context,
-                volume_snapshot['id'])
+            return volume_snapshot['status'] == const.STATUS_AVAILABLE
 
-            # NOTE(xyang): We should look at whether we still need to save
-            # volume_snapshot_id in private_storage later, now that is saved
-            # in provider_location.
-            self.private_storage.update(
-                snapshot['id'], {'volume_snapshot_id': volume_snapshot['id']})
-            # NOTE(xyang): Need to update provider_location in the db so
-            # that it can be used in manage/unmanage snapshot tempest tests.
-            model_update['provider_location'] = volume_snapshot['id']
-        else:
-            raise exception.ManilaException(
-                _('Volume snapshot have not been '
-                  'created in %ss. Giving up') %
+        if not is_available(volume_snapshot):
+            volume_snapshot = self._snapshot_watcher.wait(
+                volume_snapshot['id'], is_available,
+                self.configuration.max_time_to_create_volume,
+                _('Volume snapshot have not been created in %ss. Giving up') %
                 self.configuration.max_time_to_create_volume)
 
+        # NOTE(xyang): We should look at whether we still need to save
+        # volume_snapshot_id in private_storage later, now that is saved
+        # in provider_location.
+        self.private_storage.update(
+            snapshot['id'], {'volume_snapshot_id': volume_snapshot['id']})
+        # NOTE(xyang): Need to update provider_location in the db so
+        # that it can be used in manage/unmanage snapshot tempest tests.
+        model_update['provider_location'] = volume_snapshot['id']
+
         return model_update
 
     def delete_snapshot(self, context, snapshot, share_server=None):
@@ -818,21 +846,14 @@ class GenericShareDriver(driver.ExecuteMixin, driver.ShareDriver):
             return
         self.volume_api.delete_snapshot(self.admin_context,
                                         volume_snapshot['id'])
-        t = time.time()
-        while time.time() - t < self.configuration.max_time_to_create_volume:
-            try:
-                snapshot = self.volume_api.get_snapshot(self.admin_context,
-                                                        volume_snapshot['id'])
-            except exception.VolumeSnapshotNotFound:
-                LOG.debug('Volume snapshot was deleted successfully')
-                self.private_storage.delete(snapshot['id'])
-                break
-            time.sleep(1)
-        else:
-            raise exception.ManilaException(
-                _('Volume snapshot have not been '
-                  'deleted in %ss. Giving up') %
-                self.configuration.max_time_to_create_volume)
+        self._snapshot_watcher.wait(
+            volume_snapshot['id'],
+            lambda polled_snapshot: polled_snapshot is None,
+            self.configuration.max_time_to_create_volume,
+            _('Volume snapshot have not been deleted in %ss. Giving up') %
+            self.configuration.max_time_to_create_volume)
+        LOG.debug('Volume snapshot was deleted successfully')
+        self.private_storage.delete(snapshot['id'])
 
     @ensure_server
     def ensure_share(self, context, share, share_server=None):
@@ -276,6 +276,8 @@ class GaneshaNFSHelper(ganesha.GaneshaNASHelper):
                                                **kwargs)
 
     def get_export(self, share):
+        if self.configuration.ganesha_export_per_share:
+            return ':/'.join((self.ganesha_host, share['name']))
         return ':/'.join((self.ganesha_host, share['name'] + "--<access-id>"))
 
     def init_helper(self):
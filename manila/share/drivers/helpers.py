@@ -172,7 +172,6 @@ class NFSHelper(NASHelperBase):
         """
         local_path = os.path.join(self.configuration.share_mount_path,
                                   share_name)
-        out, err = self._ssh_exec(server, ['sudo', 'exportfs'])
         # Recovery mode
         if not (add_rules or delete_rules):
 
@@ -180,25 +179,14 @@ class NFSHelper(NASHelperBase):
                 access_rules, ('ip',),
                 (const.ACCESS_LEVEL_RO, const.ACCESS_LEVEL_RW))
 
-            hosts = self._get_host_list(out, local_path)
-            for host in hosts:
-                self._ssh_exec(server, ['sudo', 'exportfs', '-u',
-                                        ':'.join((host, local_path))])
-            self._sync_nfs_temp_and_perm_files(server)
-            for access in access_rules:
-                rules_options = '%s,no_subtree_check'
-                if access['access_level'] == const.ACCESS_LEVEL_RW:
-                    rules_options = ','.join((rules_options, 'no_root_squash'))
-                self._ssh_exec(
-                    server,
-                    ['sudo', 'exportfs', '-o',
-                     rules_options % access['access_level'],
-                     ':'.join((self._get_parsed_access_to(access['access_to']),
-                               local_path))])
-            self._sync_nfs_temp_and_perm_files(server)
+            out, err = self._ssh_exec(server, ['sudo', 'exportfs', '-v'])
+            self._reconcile_exports(
+                server, local_path, access_rules,
+                self._get_host_options(out, local_path))
         # Adding/Deleting specific rules
         else:
 
+            out, err = self._ssh_exec(server, ['sudo', 'exportfs'])
             self.validate_access_rules(
                 add_rules, ('ip',),
                 (const.ACCESS_LEVEL_RO, const.ACCESS_LEVEL_RW))
@@ -237,28 +225,74 @@ class NFSHelper(NASHelperBase):
                         'name': share_name
                     })
                 else:
-                    rules_options = '%s,no_subtree_check'
-                    if access['access_level'] == const.ACCESS_LEVEL_RW:
-                        rules_options = ','.join((rules_options,
-                                                 'no_root_squash'))
                     self._ssh_exec(
                         server,
                         ['sudo', 'exportfs', '-o',
-                         rules_options % access['access_level'],
+                         self._get_export_options(access['access_level']),
                          ':'.join((access['access_to'], local_path))])
             if add_rules:
                 self._sync_nfs_temp_and_perm_files(server)
 
-    def _get_host_list(self, output, local_path):
-        entries = []
+    @staticmethod
+    def _get_export_options(access_level):
+        rules_options = '%s,no_subtree_check' % access_level
+        if access_level == const.ACCESS_LEVEL_RW:
+            rules_options = ','.join((rules_options, 'no_root_squash'))
+        return rules_options
+
+    def _get_host_options(self, output, local_path):
+        """Parses 'exportfs -v' output into host to export options map."""
+        entries = {}
         output = output.replace('\n\t\t', ' ')
-        lines = output.split('\n')
-        for line in lines:
-            items = line.split(' ')
-            if local_path == items[0]:
-                entries.append(items[1])
+        for line in output.split('\n'):
+            items = line.split()
+            if len(items) == 2 and items[0] == local_path:
+                host, __, options = items[1].partition('(')
+                entries[host] = options.rstrip(')').split(',')
         return entries
 
+    def _reconcile_exports(self, server, local_path, access_rules,
+                           current_exports):
+        """Makes exports of share match given access rules.
+
+        Only the difference between current and desired exports is applied,
+        with one 'exportfs' call per kind of change for all hosts at once,
+        so the number of commands does not grow with number of rules.
+        """
+        desired = {}
+        for access in access_rules:
+            host = self._get_parsed_access_to(access['access_to'])
+            # NOTE: if the same host has both rules, RW one wins.
+            if desired.get(host) != const.ACCESS_LEVEL_RW:
+                desired[host] = access['access_level']
+
+        hosts_to_remove = sorted(set(current_exports) - set(desired))
+        hosts_to_add = {const.ACCESS_LEVEL_RO: [], const.ACCESS_LEVEL_RW: []}
+        for host, access_level in sorted(desired.items()):
+            options = current_exports.get(host)
+            if (options is None or access_level not in options or
+                    ('no_root_squash' in options) !=
+                    (access_level == const.ACCESS_LEVEL_RW)):
+                hosts_to_add[access_level].append(host)
+
+        if not (hosts_to_remove or any(hosts_to_add.values())):
+            LOG.debug("Exports of '%s' are up to date.", local_path)
+            return
+
+        if hosts_to_remove:
+            self._ssh_exec(
+                server, ['sudo', 'exportfs', '-u'] + [
+                    ':'.join((host, local_path)) for host in hosts_to_remove])
+        for access_level in (const.ACCESS_LEVEL_RO, const.ACCESS_LEVEL_RW):
+            if hosts_to_add[access_level]:
+                self._ssh_exec(
+                    server,
+                    ['sudo', 'exportfs', '-o',
+                     self._get_export_options(access_level)] + [
+                        ':'.join((host, local_path))
+                        for host in hosts_to_add[access_level]])
+        self._sync_nfs_temp_and_perm_files(server)
+
     def _sync_nfs_temp_and_perm_files(self, server):
         """Sync changes of exports with permanent NFS config file.
 
@@ -31,6 +31,7 @@ IP_ALLOCATIONS_DHSS_FALSE = 0
 IP_ALLOCATIONS_DHSS_TRUE = 1
 SOCKET_TIMEOUT = 52
 LOGIN_SOCKET_TIMEOUT = 4
+LOOKUP_CACHE_TTL = 30
 QOS_NAME_PREFIX = 'OpenStack_'
 SYSTEM_NAME_PREFIX = "Array-"
 MIN_ARRAY_VERSION_FOR_QOS = 'V300R003C00'
@@ -20,9 +20,8 @@ from xml.etree import ElementTree as ET
 
 from oslo_log import log
 from oslo_serialization import jsonutils
+import requests
 import six
-from six.moves import http_cookiejar
-from six.moves.urllib import request as urlreq  # pylint: disable=E0611
 
 from manila import exception
 from manila.i18n import _
@@ -39,16 +38,38 @@ class RestHelper(object):
 
     def __init__(self, configuration):
         self.configuration = configuration
+        self.session = None
+        # Short living cache of IDs of storage objects looked up by name,
+        # {key: (expiration time, value)}.
+        self._lookup_cache = {}
         self.init_http_head()
 
     def init_http_head(self):
-        self.cookie = http_cookiejar.CookieJar()
+        # NOTE: Connections are kept open by the session and reused by all
+        # calls until next login.
+        if self.session:
+            self.session.close()
+        self.session = requests.Session()
         self.url = None
         self.headers = {
             "Connection": "keep-alive",
             "Content-Type": "application/json",
         }
 
+    def _get_cached(self, key):
+        cached = self._lookup_cache.get(key)
+        if cached and cached[0] > time.time():
+            return copy.deepcopy(cached[1])
+
+    def _set_cached(self, key, value):
+        self._lookup_cache[key] = (
+            time.time() + constants.LOOKUP_CACHE_TTL, copy.deepcopy(value))
+
+    def _invalidate_cached(self, kind):
+        for key in list(self._lookup_cache):
+            if key[0] == kind:
+                self._lookup_cache.pop(key, None)
+
     def do_call(self, url, data=None, method=None,
                 calltimeout=constants.SOCKET_TIMEOUT):
         """Send requests to server.
@@ -65,16 +86,16 @@ class RestHelper(object):
                       {'url': url,
                        'method': method,
                        'data': data})
-        opener = urlreq.build_opener(urlreq.HTTPCookieProcessor(self.cookie))
-        urlreq.install_opener(opener)
+        if not method:
+            method = "GET" if data is None else "POST"
         result = None
 
         try:
-            req = urlreq.Request(url, data, self.headers)
-            if method:
-                req.get_method = lambda: method
-            res_temp = urlreq.urlopen(req, timeout=calltimeout)
-            res = res_temp.read().decode("utf-8")
+            res_temp = self.session.request(method, url, data=data,
+                                            headers=self.headers,
+                                            timeout=calltimeout)
+            res_temp.raise_for_status()
+            res = res_temp.content.decode("utf-8")
 
             LOG.debug('Response Data: %(res)s.', {'res': res})
 
@@ -158,6 +179,7 @@ class RestHelper(object):
         url = "/filesystem"
         data = jsonutils.dumps(fs_param)
         result = self.call(url, data)
+        self._invalidate_cached('fs')
 
         msg = 'Create filesystem error.'
         self._assert_rest_result(result, msg)
@@ -250,6 +272,7 @@ class RestHelper(object):
         data = jsonutils.dumps(filepath)
 
         result = self.call(url, data, "POST")
+        self._invalidate_cached('share')
 
         msg = 'Create share error.'
         self._assert_rest_result(result, msg)
@@ -262,6 +285,8 @@ class RestHelper(object):
         url = "/" + share_url_type + "/" + share_id
 
         result = self.call(url, None, "DELETE")
+        self._invalidate_cached('share')
+        self._invalidate_cached('access')
         self._assert_rest_result(result, 'Delete share error.')
 
     def _delete_fs(self, fs_id):
@@ -270,6 +295,8 @@ class RestHelper(object):
         url = "/filesystem/" + fs_id
 
         result = self.call(url, None, "DELETE")
+        self._invalidate_cached('fs')
+        self._invalidate_cached('share')
         self._assert_rest_result(result, 'Delete file system error.')
 
     def _get_cifs_service_status(self):
@@ -378,6 +405,7 @@ class RestHelper(object):
         access_type = self._get_share_client_type(share_proto)
         url = "/" + access_type + "/" + access_id
         result = self.call(url, None, "DELETE")
+        self._invalidate_cached('access')
         self._assert_rest_result(result, 'delete access from share error!')
 
     def _get_access_count(self, share_id, share_client_type):
@@ -411,26 +439,27 @@ class RestHelper(object):
         return access_ids
 
     def _get_access_from_share(self, share_id, access_to, share_proto):
-        """Segments to find access for a period of 100."""
+        """Find access by name using index of all accesses of the share."""
         share_client_type = self._get_share_client_type(share_proto)
-        count = self._get_access_count(share_id, share_client_type)
-
-        access_id = None
-        range_begin = 0
-        while count > 0:
-            if access_id:
-                break
-            access_range = self._get_access_from_share_range(share_id,
-                                                             range_begin,
-                                                             share_client_type)
-            for item in access_range:
-                if item['NAME'] in (access_to, '@' + access_to):
-                    access_id = item['ID']
-
-            range_begin += 100
-            count -= 100
-
-        return access_id
+        key = ('access', share_client_type, share_id)
+        access_index = self._get_cached(key)
+        if access_index is None:
+            count = self._get_access_count(share_id, share_client_type)
+
+            access_index = {}
+            range_begin = 0
+            while count > 0:
+                access_range = self._get_access_from_share_range(
+                    share_id, range_begin, share_client_type)
+                for item in access_range:
+                    access_index[item['NAME']] = item['ID']
+
+                range_begin += 100
+                count -= 100
+            self._set_cached(key, access_index)
+
+        return (access_index.get(access_to) or
+                access_index.get('@' + access_to))
 
     def _get_access_from_share_range(self, share_id,
                                      range_begin,
@@ -494,6 +523,7 @@ class RestHelper(object):
     def _allow_access_rest(self, share_id, access_to,
                            share_proto, access_level):
         """Allow access to the share."""
+        self._invalidate_cached('access')
         if share_proto == 'NFS':
             self._allow_nfs_access_rest(share_id, access_to, access_level)
         elif share_proto == 'CIFS':
@@ -637,47 +667,25 @@ class RestHelper(object):
         return result['data']['ID']
 
     def _get_share_by_name(self, share_name, share_url_type):
-        """Segments to find share for a period of 100."""
-        count = self._get_share_count(share_url_type)
+        """Find share by its path, filtered on the storage side."""
+        key = ('share', share_url_type, share_name)
+        share = self._get_cached(key)
+        if share:
+            return share
 
-        share = {}
-        range_begin = 0
-        while True:
-            if count < 0 or share:
-                break
-            share = self._get_share_by_name_range(share_name,
-                                                  range_begin,
-                                                  share_url_type)
-            range_begin += 100
-            count -= 100
-
-        return share
-
-    def _get_share_count(self, share_url_type):
-        """Get share count."""
-        url = "/" + share_url_type + "/count"
-        result = self.call(url, None, "GET")
-        self._assert_rest_result(result, 'Get share count error!')
-
-        return int(result['data']['COUNT'])
-
-    def _get_share_by_name_range(self, share_name,
-                                 range_begin, share_url_type):
-        """Get share by share name."""
-        range_end = range_begin + 100
-        url = ("/" + share_url_type + "?range=["
-               + six.text_type(range_begin) + "-"
-               + six.text_type(range_end) + "]")
+        share_path = self._get_share_path(share_name)
+        url = ("/" + share_url_type + "?filter=SHAREPATH::"
+               + share_path + "&range=[0-100]")
         result = self.call(url, None, "GET")
         self._assert_rest_result(result, 'Get share by name error!')
 
-        share_path = self._get_share_path(share_name)
-
         share = {}
+        # NOTE: Filter matches substrings, so check path of found shares.
         for item in result.get('data', []):
             if share_path == item['SHAREPATH']:
                 share['ID'] = item['ID']
                 share['FSID'] = item['FSID']
+                self._set_cached(key, share)
                 break
 
         return share
@@ -696,13 +704,19 @@ class RestHelper(object):
         return share_url_type
 
     def _get_fsid_by_name(self, share_name):
-        url = "/FILESYSTEM?range=[0-8191]"
+        sharename = share_name.replace("-", "_")
+        key = ('fs', sharename)
+        fsid = self._get_cached(key)
+        if fsid:
+            return fsid
+
+        url = "/FILESYSTEM?filter=NAME::" + sharename + "&range=[0-100]"
         result = self.call(url, None, "GET")
         self._assert_rest_result(result, 'Get filesystem by name error!')
-        sharename = share_name.replace("-", "_")
 
         for item in result.get('data', []):
             if sharename == item['NAME']:
+                self._set_cached(key, item['ID'])
                 return item['ID']
 
     def _get_fs_info_by_id(self, fsid):
@@ -796,6 +810,8 @@ class RestHelper(object):
         }
         data = jsonutils.dumps(fs_param)
         result = self.call(url, data, "PUT")
+        self._invalidate_cached('fs')
+        self._invalidate_cached('share')
 
         msg = _("Change filesystem name error.")
         self._assert_rest_result(result, msg)
@@ -19,17 +19,22 @@ Contains classes required to issue API calls to Data ONTAP and OnCommand DFM.
 """
 
 import copy
+import threading
+import time
 
 from lxml import etree
 from oslo_log import log
+import requests
+from requests import adapters as requests_adapters
 import six
-from six.moves import urllib
 
 from manila import exception
 from manila.i18n import _
 
 LOG = log.getLogger(__name__)
 
+DEFAULT_MAX_CONNECTIONS = 10
+
 EONTAPI_EINVAL = '22'
 EAPIERROR = '13001'
 EAPINOTFOUND = '13005'
@@ -51,6 +56,58 @@ ESOURCE_IS_DIFFERENT = '17105'
 EVOL_CLONE_BEING_SPLIT = '17151'
 
 
+class ConnectionPool(object):
+    """Keep-alive HTTP connections to a single storage cluster.
+
+    A pool is shared by every NaServer talking to the same cluster endpoint,
+    so the cluster-scoped client and all vserver-tunneled clients reuse the
+    same TCP/TLS connections. At most max_connections requests are in flight
+    at once; further callers block until a connection is released.
+    """
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS):
+        self.max_connections = max_connections
+        self.session = requests.Session()
+        adapter = requests_adapters.HTTPAdapter(pool_connections=1,
+                                                pool_maxsize=max_connections,
+                                                pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def record_call(self, api_name, elapsed):
+        """Accumulates the latency of a single API call."""
+        with self._stats_lock:
+            stats = self._stats.setdefault(
+                api_name, {'calls': 0, 'total_time': 0.0, 'max_time': 0.0})
+            stats['calls'] += 1
+            stats['total_time'] += elapsed
+            stats['max_time'] = max(stats['max_time'], elapsed)
+
+    def get_stats(self):
+        """Returns a copy of the per-API latency counters."""
+        with self._stats_lock:
+            return {api_name: dict(stats)
+                    for api_name, stats in self._stats.items()}
+
+
+_connection_pools = {}
+_connection_pools_lock = threading.Lock()
+
+
+def get_connection_pool(protocol, host, port,
+                        max_connections=DEFAULT_MAX_CONNECTIONS):
+    """Returns the connection pool shared by all clients of a cluster."""
+    key = (protocol, host, six.text_type(port), max_connections)
+    with _connection_pools_lock:
+        pool = _connection_pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(max_connections=max_connections)
+            _connection_pools[key] = pool
+        return pool
+
+
 class NaServer(object):
     """Encapsulates server connection logic."""
 
@@ -67,8 +124,10 @@ class NaServer(object):
     def __init__(self, host, server_type=SERVER_TYPE_FILER,
                  transport_type=TRANSPORT_TYPE_HTTP,
                  style=STYLE_LOGIN_PASSWORD, username=None,
-                 password=None, port=None, trace=False):
+                 password=None, port=None, trace=False,
+                 max_connections=DEFAULT_MAX_CONNECTIONS):
         self._host = host
+        self._max_connections = max_connections or DEFAULT_MAX_CONNECTIONS
         self.set_server_type(server_type)
         self.set_transport_type(transport_type)
         self.set_style(style)
@@ -78,7 +137,6 @@ class NaServer(object):
         self._password = password
         self._trace = trace
         self._refresh_conn = True
-        self._trace = trace
 
         LOG.debug('Using NetApp controller: %s', self._host)
 
@@ -220,35 +278,52 @@ class NaServer(object):
         if na_element and not isinstance(na_element, NaElement):
             ValueError('NaElement must be supplied to invoke API')
 
-        request, request_element = self._create_request(na_element,
-                                                        enable_tunneling)
+        request_d, request_element = self._create_request(na_element,
+                                                          enable_tunneling)
 
         if self._trace:
             LOG.debug("Request: %s", request_element.to_string(pretty=True))
 
-        if not hasattr(self, '_opener') or not self._opener \
-                or self._refresh_conn:
-            self._build_opener()
+        if not getattr(self, '_pool', None) or self._refresh_conn:
+            self._pool = get_connection_pool(self._protocol, self._host,
+                                             self._port,
+                                             self._max_connections)
+            self._refresh_conn = False
+
+        auth = self._get_auth()
+        start = time.time()
         try:
-            if hasattr(self, '_timeout'):
-                response = self._opener.open(request, timeout=self._timeout)
-            else:
-                response = self._opener.open(request)
-        except urllib.error.HTTPError as e:
-            raise NaApiError(e.code, e.msg)
-        except urllib.error.URLError as e:
+            response = self._pool.session.post(
+                self._get_url(), data=request_d, auth=auth,
+                headers={'Content-Type': 'text/xml', 'charset': 'utf-8'},
+                timeout=getattr(self, '_timeout', None))
+            response.raise_for_status()
+            response_xml = response.content
+        except requests.HTTPError as e:
+            raise NaApiError(e.response.status_code, e.response.reason)
+        except (requests.ConnectionError, requests.Timeout) as e:
             raise exception.StorageCommunicationException(six.text_type(e))
         except Exception as e:
             raise NaApiError(message=e)
+        finally:
+            elapsed = time.time() - start
+            self._pool.record_call(na_element.get_name(), elapsed)
 
-        response_xml = response.read()
         response_element = self._get_result(response_xml)
 
         if self._trace:
-            LOG.debug("Response: %s", response_element.to_string(pretty=True))
+            LOG.debug("Response (%(elapsed).3fs): %(response)s",
+                      {'elapsed': elapsed,
+                       'response': response_element.to_string(pretty=True)})
 
         return response_element
 
+    def get_api_stats(self):
+        """Gets latency counters for the API calls made to this cluster."""
+        if not getattr(self, '_pool', None):
+            return {}
+        return self._pool.get_stats()
+
     def invoke_successfully(self, na_element, enable_tunneling=False):
         """Invokes API and checks execution status as success.
 
@@ -281,10 +356,7 @@ class NaServer(object):
             self._enable_tunnel_request(netapp_elem)
         netapp_elem.add_child_elem(na_element)
         request_d = netapp_elem.to_string()
-        request = urllib.request.Request(
-            self._get_url(), data=request_d,
-            headers={'Content-Type': 'text/xml', 'charset': 'utf-8'})
-        return request, netapp_elem
+        return request_d, netapp_elem
 
     def _enable_tunnel_request(self, netapp_elem):
         """Enables vserver or vfiler tunneling."""
@@ -323,22 +395,12 @@ class NaServer(object):
         return '%s://%s:%s/%s' % (self._protocol, self._host, self._port,
                                   self._url)
 
-    def _build_opener(self):
+    def _get_auth(self):
         if self._auth_style == NaServer.STYLE_LOGIN_PASSWORD:
-            auth_handler = self._create_basic_auth_handler()
-        else:
-            auth_handler = self._create_certificate_auth_handler()
-        opener = urllib.request.build_opener(auth_handler)
-        self._opener = opener
-
-    def _create_basic_auth_handler(self):
-        password_man = urllib.request.HTTPPasswordMgrWithDefaultRealm()
-        password_man.add_password(None, self._get_url(), self._username,
-                                  self._password)
-        auth_handler = urllib.request.HTTPBasicAuthHandler(password_man)
-        return auth_handler
-
-    def _create_certificate_auth_handler(self):
+            return self._username, self._password
+        return self._create_certificate_auth()
+
+    def _create_certificate_auth(self):
         raise NotImplementedError()
 
     def __str__(self):
@@ -33,7 +33,8 @@ class NetAppBaseClient(object):
             port=kwargs['port'],
             username=kwargs['username'],
             password=kwargs['password'],
-            trace=kwargs.get('trace', False))
+            trace=kwargs.get('trace', False),
+            max_connections=kwargs.get('max_connections'))
 
     def get_ontapi_version(self, cached=True):
         """Gets the supported ontapi version."""
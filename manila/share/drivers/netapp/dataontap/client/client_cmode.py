@@ -95,13 +95,11 @@ class NetAppCmodeClient(client_base.NetAppBaseClient):
                           max_page_length=DEFAULT_MAX_PAGE_LENGTH):
         """Invoke an iterator-style getter API."""
 
-        if not api_args:
-            api_args = {}
-
-        api_args['max-records'] = max_page_length
+        pages = self._send_iter_request_pages(api_name, api_args,
+                                              max_page_length)
 
         # Get first page
-        result = self.send_request(api_name, api_args)
+        result = next(pages)
 
         # Most commonly, we can just return here if there is no more data
         next_tag = result.get_child_content('next-tag')
@@ -116,11 +114,7 @@ class NetAppCmodeClient(client_base.NetAppBaseClient):
             raise exception.NetAppException(msg)
 
         # Get remaining pages, saving data into first page
-        while next_tag is not None:
-            next_api_args = copy.deepcopy(api_args)
-            next_api_args['tag'] = next_tag
-            next_result = self.send_request(api_name, next_api_args)
-
+        for next_result in pages:
             next_attributes_list = next_result.get_child_by_name(
                 'attributes-list') or netapp_api.NaElement('none')
 
@@ -128,13 +122,52 @@ class NetAppCmodeClient(client_base.NetAppBaseClient):
                 attributes_list.add_child_elem(record)
 
             num_records += self._get_record_count(next_result)
-            next_tag = next_result.get_child_content('next-tag')
 
         result.get_child_by_name('num-records').set_content(
             six.text_type(num_records))
         result.get_child_by_name('next-tag').set_content('')
         return result
 
+    def send_iter_request_records(self, api_name, api_args=None,
+                                  max_page_length=DEFAULT_MAX_PAGE_LENGTH):
+        """Invoke an iterator-style getter API, yielding each record.
+
+        Unlike send_iter_request, pages are not concatenated into a single
+        result, so only one page of records is held in memory at a time.
+        """
+        for result in self._send_iter_request_pages(api_name, api_args,
+                                                    max_page_length):
+            attributes_list = result.get_child_by_name('attributes-list')
+            if not attributes_list:
+                if self._has_records(result):
+                    msg = _('Missing attributes list for API %s.') % api_name
+                    raise exception.NetAppException(msg)
+                continue
+
+            for record in attributes_list.get_children():
+                yield record
+
+    def _send_iter_request_pages(self, api_name, api_args=None,
+                                 max_page_length=DEFAULT_MAX_PAGE_LENGTH):
+        """Invoke an iterator-style getter API, yielding each page."""
+
+        if not api_args:
+            api_args = {}
+
+        api_args['max-records'] = max_page_length
+
+        result = self.send_request(api_name, api_args)
+        yield result
+
+        next_tag = result.get_child_content('next-tag')
+        while next_tag:
+            next_api_args = copy.deepcopy(api_args)
+            next_api_args['tag'] = next_tag
+            result = self.send_request(api_name, next_api_args)
+            yield result
+
+            next_tag = result.get_child_content('next-tag')
+
     @na_utils.trace
     def create_vserver(self, vserver_name, root_volume_aggregate_name,
                        root_volume_name, aggregate_names, ipspace_name):
@@ -304,8 +337,8 @@ class NetAppCmodeClient(client_base.NetAppBaseClient):
                 },
             },
         }
-        volumes_data = self.send_iter_request('volume-get-iter', api_args)
-        return self._get_record_count(volumes_data)
+        pages = self._send_iter_request_pages('volume-get-iter', api_args)
+        return sum(self._get_record_count(page) for page in pages)
 
     @na_utils.trace
     def delete_vserver(self, vserver_name, vserver_client,
@@ -1745,15 +1778,9 @@ class NetAppCmodeClient(client_base.NetAppBaseClient):
                 },
             },
         }
-        result = self.send_iter_request('volume-get-iter', api_args)
-        if not self._has_records(result):
-            return []
-
         volume_list = []
-        attributes_list = result.get_child_by_name(
-            'attributes-list') or netapp_api.NaElement('none')
-
-        for volume_attributes in attributes_list.get_children():
+        for volume_attributes in self.send_iter_request_records(
+                'volume-get-iter', api_args):
 
             volume_id_attributes = volume_attributes.get_child_by_name(
                 'volume-id-attributes') or netapp_api.NaElement('none')
@@ -2048,14 +2075,10 @@ class NetAppCmodeClient(client_base.NetAppBaseClient):
                 },
             },
         }
-        result = self.send_iter_request('snapshot-get-iter', api_args)
-
-        attributes_list = result.get_child_by_name(
-            'attributes-list') or netapp_api.NaElement('none')
-
         # Build a map of snapshots, one list of snapshots per vserver
         snapshot_map = {}
-        for snapshot_info in attributes_list.get_children():
+        for snapshot_info in self.send_iter_request_records(
+                'snapshot-get-iter', api_args):
             vserver = snapshot_info.get_child_content('vserver')
             snapshot_list = snapshot_map.get(vserver, [])
             snapshot_list.append({
@@ -2114,15 +2137,10 @@ class NetAppCmodeClient(client_base.NetAppBaseClient):
                 },
             },
         }
-        result = self.send_iter_request('cifs-share-access-control-get-iter',
-                                        api_args)
-
-        attributes_list = result.get_child_by_name(
-            'attributes-list') or netapp_api.NaElement('none')
-
         rules = {}
 
-        for rule in attributes_list.get_children():
+        for rule in self.send_iter_request_records(
+                'cifs-share-access-control-get-iter', api_args):
             user_or_group = rule.get_child_content('user-or-group')
             permission = rule.get_child_content('permission')
             rules[user_or_group] = permission
@@ -2222,11 +2240,8 @@ class NetAppCmodeClient(client_base.NetAppBaseClient):
                 },
             },
         }
-        result = self.send_iter_request('export-rule-get-iter', api_args)
-
-        attributes_list = result.get_child_by_name(
-            'attributes-list') or netapp_api.NaElement('none')
-        export_rule_info_list = attributes_list.get_children()
+        export_rule_info_list = self.send_iter_request_records(
+            'export-rule-get-iter', api_args)
 
         rule_indices = [int(export_rule_info.get_child_content('rule-index'))
                         for export_rule_info in export_rule_info_list]
@@ -2377,13 +2392,9 @@ class NetAppCmodeClient(client_base.NetAppBaseClient):
                 },
             },
         }
-        result = self.send_iter_request('export-policy-get-iter', api_args)
-
-        attributes_list = result.get_child_by_name(
-            'attributes-list') or netapp_api.NaElement('none')
-
         policy_map = {}
-        for export_info in attributes_list.get_children():
+        for export_info in self.send_iter_request_records(
+                'export-policy-get-iter', api_args):
             vserver = export_info.get_child_content('vserver')
             policies = policy_map.get(vserver, [])
             policies.append(export_info.get_child_content('policy-name'))
@@ -2963,11 +2974,7 @@ class NetAppCmodeClient(client_base.NetAppBaseClient):
         if desired_attributes:
             api_args['desired-attributes'] = desired_attributes
 
-        result = self.send_iter_request('snapmirror-get-iter', api_args)
-        if not self._has_records(result):
-            return []
-        else:
-            return result.get_child_by_name('attributes-list').get_children()
+        return self.send_iter_request_records('snapmirror-get-iter', api_args)
 
     @na_utils.trace
     def get_snapmirrors(self, source_vserver, source_volume,
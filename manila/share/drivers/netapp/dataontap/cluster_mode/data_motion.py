@@ -73,6 +73,7 @@ def get_client_for_backend(backend_name, vserver_name=None):
         password=config.netapp_password,
         hostname=config.netapp_server_hostname,
         port=config.netapp_server_port,
+        max_connections=config.netapp_api_max_connections,
         vserver=vserver_name or config.netapp_vserver,
         trace=na_utils.TRACE_API)
 
@@ -129,6 +129,7 @@ class NetAppCmodeFileStorageLibrary(object):
                 password=self.configuration.netapp_password,
                 hostname=self.configuration.netapp_server_hostname,
                 port=self.configuration.netapp_server_port,
+                max_connections=self.configuration.netapp_api_max_connections,
                 vserver=vserver,
                 trace=na_utils.TRACE_API)
             self._clients[vserver] = client
@@ -36,7 +36,14 @@ netapp_connection_opts = [
     cfg.PortOpt('netapp_server_port',
                 help=('The TCP port to use for communication with the storage '
                       'system or proxy server. If not specified, Data ONTAP '
-                      'drivers will use 80 for HTTP and 443 for HTTPS.')), ]
+                      'drivers will use 80 for HTTP and 443 for HTTPS.')),
+    cfg.IntOpt('netapp_api_max_connections',
+               default=10,
+               min=1,
+               help=('Maximum number of concurrent API requests sent to the '
+                     'storage system. HTTP connections are kept alive and '
+                     'shared by all clients of the same storage system, '
+                     'including the clients tunneling to its Vservers.')), ]
 
 netapp_transport_opts = [
     cfg.StrOpt('netapp_transport_type',
@@ -248,9 +248,10 @@ class ZFSonLinuxShareDriver(zfs_utils.ExecuteMixin, driver.ShareDriver):
         if helpers:
             for helper_str in helpers:
                 share_proto, __, import_str = helper_str.partition('=')
-                helper = importutils.import_class(import_str)
-                self._helpers[share_proto.upper()] = helper(
+                helper = importutils.import_class(import_str)(
                     self.configuration)
+                self.share_options_cache(helper)
+                self._helpers[share_proto.upper()] = helper
         else:
             raise exception.BadConfigurationException(
                 reason=_(
@@ -294,10 +295,12 @@ class ZFSonLinuxShareDriver(zfs_utils.ExecuteMixin, driver.ShareDriver):
     def _get_pools_info(self):
         """Returns info about all pools used by backend."""
         pools = []
+        zpools_options = self.get_zpool_options(
+            self.zpool_list, ['free', 'size'])
         for zpool in self.zpool_list:
-            free_size = self.get_zpool_option(zpool, 'free')
+            free_size = zpools_options[zpool]['free']
             free_size = utils.translate_string_size_to_float(free_size)
-            total_size = self.get_zpool_option(zpool, 'size')
+            total_size = zpools_options[zpool]['size']
             total_size = utils.translate_string_size_to_float(total_size)
             pool = {
                 'pool_name': zpool,
@@ -572,29 +575,63 @@ class ZFSonLinuxShareDriver(zfs_utils.ExecuteMixin, driver.ShareDriver):
     @ensure_share_server_not_provided
     def ensure_share(self, context, share, share_server=None):
         """Invoked to ensure that given share is exported."""
+        pool_name = share_utils.extract_host(share['host'], level='pool')
+        out, err = self.zfs('list', '-r', pool_name)
+        dataset_names = set(
+            datum['NAME'] for datum in self.parse_zfs_answer(out))
+
+        export_locations = self._ensure_share(share, dataset_names)
+        if export_locations is None:
+            raise exception.ShareResourceNotFound(share_id=share['id'])
+        return export_locations
+
+    def ensure_shares(self, context, shares):
+        """Invoked to ensure that shares are exported, in bulk.
+
+        Lists datasets and reads their options once per zpool instead of
+        once per share.
+        """
+        pools = {}
+        for item in shares:
+            if item['share_server']:
+                continue
+            pool_name = share_utils.extract_host(
+                item['share']['host'], level='pool')
+            pools.setdefault(pool_name, []).append(item['share'])
+
+        ensured = {}
+        for pool_name, pool_shares in pools.items():
+            out, err = self.zfs('list', '-r', pool_name)
+            dataset_names = set(
+                datum['NAME'] for datum in self.parse_zfs_answer(out))
+            # NOTE: fills options cache with values of all pool datasets.
+            self.get_zfs_options(
+                [pool_name], ['sharenfs', 'mountpoint'], recursive=True)
+            for share in pool_shares:
+                # NOTE: shares absent on backend are left to 'ensure_share'
+                # to get same error handling.
+                export_locations = self._ensure_share(share, dataset_names)
+                if export_locations is not None:
+                    ensured[share['id']] = export_locations
+        return ensured
+
+    def _ensure_share(self, share, dataset_names):
         dataset_name = self.private_storage.get(share['id'], 'dataset_name')
         if not dataset_name:
             dataset_name = self._get_dataset_name(share)
+        if dataset_name not in dataset_names:
+            return None
 
-        pool_name = share_utils.extract_host(share['host'], level='pool')
-        out, err = self.zfs('list', '-r', pool_name)
-        data = self.parse_zfs_answer(out)
-        for datum in data:
-            if datum['NAME'] == dataset_name:
-                ssh_cmd = '%(username)s@%(host)s' % {
-                    'username': self.configuration.zfs_ssh_username,
-                    'host': self.service_ip,
-                }
-                self.private_storage.update(
-                    share['id'], {'ssh_cmd': ssh_cmd})
-                sharenfs = self.get_zfs_option(dataset_name, 'sharenfs')
-                if sharenfs != 'off':
-                    self.zfs('share', dataset_name)
-                export_locations = self._get_share_helper(
-                    share['share_proto']).get_exports(dataset_name)
-                return export_locations
-        else:
-            raise exception.ShareResourceNotFound(share_id=share['id'])
+        ssh_cmd = '%(username)s@%(host)s' % {
+            'username': self.configuration.zfs_ssh_username,
+            'host': self.service_ip,
+        }
+        self.private_storage.update(share['id'], {'ssh_cmd': ssh_cmd})
+        sharenfs = self.get_zfs_option(dataset_name, 'sharenfs')
+        if sharenfs != 'off':
+            self.zfs('share', dataset_name)
+        return self._get_share_helper(
+            share['share_proto']).get_exports(dataset_name)
 
     def get_network_allocations_number(self):
         """ZFS does not handle networking. Return 0."""
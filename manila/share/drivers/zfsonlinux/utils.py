@@ -52,9 +52,19 @@ def zfs_dataset_synchronized(f):
 
 class ExecuteMixin(driver.ExecuteMixin):
 
+    # NOTE: only options that are changed exclusively by 'zfs' and 'zpool'
+    # commands are cached. Space usage options like 'used' or 'free' change
+    # with data written by clients, so they are always read from backend.
+    CACHED_OPTIONS = ('mountpoint', 'sharenfs', 'readonly', 'quota')
+
+    # 'zfs' and 'zpool' subcommands that do not change any option values.
+    NON_MODIFYING_SUBCOMMANDS = (
+        'get', 'list', 'mount', 'unmount', 'share', 'unshare', 'send')
+
     def init_execute_mixin(self, *args, **kwargs):
         """Init method for mixin called in the end of driver's __init__()."""
         super(ExecuteMixin, self).init_execute_mixin(*args, **kwargs)
+        self._options_cache = {}
         if self.configuration.zfs_use_ssh:
             self.ssh_executor = ganesha_utils.SSHExecutor(
                 ip=self.configuration.zfs_service_ip,
@@ -73,11 +83,32 @@ class ExecuteMixin(driver.ExecuteMixin):
         executor = self._execute
         if self.ssh_executor:
             executor = self.ssh_executor
+        self._invalidate_options_cache(cmd)
         if cmd[0] == 'sudo':
             kwargs['run_as_root'] = True
             cmd = cmd[1:]
         return executor(*cmd, **kwargs)
 
+    def share_options_cache(self, other):
+        """Makes other ExecuteMixin instance use options cache of this one.
+
+        Driver and its share helpers run commands against the same datasets,
+        so they must share the cache to invalidate it for each other.
+        """
+        other._options_cache = self._options_cache
+
+    def _invalidate_options_cache(self, cmd):
+        """Drops cached options if command may change any of them."""
+        if not getattr(self, '_options_cache', None):
+            return
+        # NOTE: commands may be chained over SSH, like 'zfs send | zfs
+        # receive', so every 'zfs' and 'zpool' occurrence is checked.
+        for app, subcommand in zip(cmd, cmd[1:]):
+            if (app in ('zfs', 'zpool') and
+                    subcommand not in self.NON_MODIFYING_SUBCOMMANDS):
+                self._options_cache.clear()
+                return
+
     @utils.retry(exception.ProcessExecutionError,
                  interval=5, retries=36, backoff_rate=1)
     def execute_with_retry(self, *cmd, **kwargs):
@@ -91,12 +122,56 @@ class ExecuteMixin(driver.ExecuteMixin):
     def _get_option(self, resource_name, option_name, pool_level=False):
         """Returns value of requested zpool or zfs dataset option."""
         app = 'zpool' if pool_level else 'zfs'
-
-        out, err = self.execute('sudo', app, 'get', option_name, resource_name)
-
-        data = self.parse_zfs_answer(out)
-        option = data[0]['VALUE']
-        return option
+        cached = self._options_cache.get((app, resource_name), {})
+        if option_name in cached:
+            return cached[option_name]
+
+        options = self._get_options(
+            [resource_name], [option_name], pool_level=pool_level)
+        return options[resource_name][option_name]
+
+    def _get_options(self, resource_names, option_names, pool_level=False,
+                     recursive=False):
+        """Returns values of zpool or zfs dataset options in one call.
+
+        :param resource_names: list of zpool or zfs dataset names.
+        :param option_names: list of option names.
+        :param recursive: whether to also get options of all descendant
+            datasets. Not applicable for zpools.
+        :return: dict with resource names as keys and dicts with option
+            names and values as values.
+        """
+        app = 'zpool' if pool_level else 'zfs'
+        cmd = ['sudo', app, 'get', '-H', '-o', 'name,property,value']
+        if recursive:
+            cmd.append('-r')
+        cmd.append(','.join(option_names))
+        cmd.extend(resource_names)
+
+        out, err = self.execute(*cmd)
+
+        options = self.parse_zfs_get_answer(out)
+        for resource_name, resource_options in options.items():
+            cached = self._options_cache.setdefault(
+                (app, resource_name), {})
+            for option_name in self.CACHED_OPTIONS:
+                if option_name in resource_options:
+                    cached[option_name] = resource_options[option_name]
+        return options
+
+    def parse_zfs_get_answer(self, string):
+        """Parses output of 'zfs get -H -o name,property,value' command.
+
+        :return: dict with resource names as keys and dicts with option
+            names and values as values.
+        """
+        data = {}
+        for line in string.splitlines():
+            if not line:
+                continue
+            name, option_name, value = line.split('\t', 2)
+            data.setdefault(name, {})[option_name] = value
+        return data
 
     def parse_zfs_answer(self, string):
         """Returns list of dicts with data returned by ZFS shell commands."""
@@ -116,10 +191,19 @@ class ExecuteMixin(driver.ExecuteMixin):
         """Returns value of requested zpool option."""
         return self._get_option(zpool_name, option_name, True)
 
+    def get_zpool_options(self, zpool_names, option_names):
+        """Returns values of requested options of several zpools."""
+        return self._get_options(zpool_names, option_names, pool_level=True)
+
     def get_zfs_option(self, dataset_name, option_name):
         """Returns value of requested zfs dataset option."""
         return self._get_option(dataset_name, option_name, False)
 
+    def get_zfs_options(self, dataset_names, option_names, recursive=False):
+        """Returns values of requested options of several zfs datasets."""
+        return self._get_options(dataset_names, option_names,
+                                 pool_level=False, recursive=recursive)
+
     def zfs(self, *cmd, **kwargs):
         """ZFS shell commands executor."""
         return self.execute('sudo', 'zfs', *cmd, **kwargs)
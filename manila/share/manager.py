@@ -22,7 +22,11 @@
 import copy
 import datetime
 import functools
+import random
+import time
 
+from eventlet import greenpool
+from eventlet import greenthread
 from oslo_config import cfg
 from oslo_log import log
 from oslo_serialization import jsonutils
@@ -93,11 +97,31 @@ share_manager_opts = [
                deprecated_group='DEFAULT',
                min=10,
                max=60),
+    cfg.IntOpt('ensure_share_pool_size',
+               default=1,
+               min=1,
+               help='Max number of share instances ensured concurrently on '
+                    'service startup. Values greater than 1 should be used '
+                    'only with drivers able to ensure shares concurrently.'),
     cfg.IntOpt('replica_state_update_interval',
                default=300,
                help='This value, specified in seconds, determines how often '
                     'the share manager will poll for the health '
                     '(replica_state) of each replica instance.'),
+    cfg.IntOpt('replica_state_update_pool_size',
+               default=1,
+               min=1,
+               help='Max number of share replicas and replica snapshots of '
+                    'the backend that are polled concurrently during a '
+                    'periodic replica state update.'),
+    cfg.IntOpt('replica_state_update_spread',
+               default=0,
+               min=0,
+               help='Time in seconds over which polls of a periodic replica '
+                    'state update are spread, each replica being polled '
+                    'at a random offset within it. Should be lower than '
+                    'replica_state_update_interval. Zero value starts all '
+                    'polls right away.'),
 ]
 
 CONF = cfg.CONF
@@ -177,7 +201,7 @@ def add_hooks(f):
 class ShareManager(manager.SchedulerDependentManager):
     """Manages NAS storages."""
 
-    RPC_API_VERSION = '1.11'
+    RPC_API_VERSION = '1.12'
 
     def __init__(self, share_driver=None, service_name=None, *args, **kwargs):
         """Load the driver from args, or from flags."""
@@ -208,6 +232,9 @@ class ShareManager(manager.SchedulerDependentManager):
 
         self.access_helper = access.ShareInstanceAccess(self.db, self.driver)
 
+        self._replica_update_passes = {}
+        self._replica_update_stats = {}
+
         self.hooks = []
         self._init_hook_drivers()
 
@@ -274,17 +301,23 @@ class ShareManager(manager.SchedulerDependentManager):
         else:
             self.driver.initialized = True
 
-        share_instances = self.db.share_instances_get_all_by_host(ctxt,
-                                                                  self.host)
+        share_instances = self.db.share_instances_get_all_by_host(
+            ctxt, self.host, with_share_data=True)
         LOG.debug("Re-exporting %s shares", len(share_instances))
+
+        # Prefetch share servers required for all share instances in bulk
+        # instead of loading them per share instance.
+        share_servers = self.db.share_server_get_all_by_host(ctxt, self.host)
+        share_servers = {server['id']: server for server in share_servers}
+
+        instances_to_ensure = []
         for share_instance in share_instances:
-            share_ref = self.db.share_get(ctxt, share_instance['share_id'])
-            if share_ref.is_busy:
+            if share_instance['task_state'] in constants.BUSY_TASK_STATES:
                 LOG.info(
                     _LI("Share instance %(id)s: skipping export, "
                         "because it is busy with an active task: %(task)s."),
                     {'id': share_instance['id'],
-                     'task': share_ref['task_state']},
+                     'task': share_instance['task_state']},
                 )
                 continue
 
@@ -297,10 +330,60 @@ class ShareManager(manager.SchedulerDependentManager):
                 )
                 continue
 
-            self._ensure_share_instance_has_pool(ctxt, share_instance)
-            share_server = self._get_share_server(ctxt, share_instance)
-            share_instance = self.db.share_instance_get(
-                ctxt, share_instance['id'], with_share_data=True)
+            had_pool = share_utils.extract_host(
+                share_instance['host'], 'pool') is not None
+            pool = self._ensure_share_instance_has_pool(ctxt, share_instance)
+            if pool and not had_pool:
+                # NOTE: Host of legacy share instance got its pool appended,
+                # reload it for the driver to get the up to date host.
+                share_instance = self.db.share_instance_get(
+                    ctxt, share_instance['id'], with_share_data=True)
+            share_server = share_servers.get(share_instance['share_server_id'])
+            if share_server is None:
+                share_server = self._get_share_server(ctxt, share_instance)
+            instances_to_ensure.append(
+                {'share': share_instance, 'share_server': share_server})
+
+        self._ensure_share_instances(ctxt, instances_to_ensure)
+
+        self.publish_service_capabilities(ctxt)
+        LOG.info(_LI("Finished initialization of driver: '%(driver)s"
+                     "@%(host)s'"),
+                 {"driver": self.driver.__class__.__name__,
+                  "host": self.host})
+
+    def _ensure_share_instances(self, ctxt, instances_to_ensure):
+        """Ensures share instances on service startup.
+
+        Driver is asked to ensure all share instances at once first, share
+        instances it did not ensure are ensured one by one using pool of
+        green threads.
+        """
+        ensured = {}
+        if instances_to_ensure:
+            try:
+                ensured = self.driver.ensure_shares(
+                    ctxt, instances_to_ensure) or {}
+            except NotImplementedError:
+                pass
+            except Exception as e:
+                LOG.error(
+                    _LE("Caught exception trying to ensure shares in bulk, "
+                        "ensuring them one by one. Exception: \n%s."),
+                    six.text_type(e))
+
+        pool = greenpool.GreenPool(
+            self.configuration.ensure_share_pool_size)
+        for item in instances_to_ensure:
+            share_id = item['share']['id']
+            pool.spawn_n(self._ensure_share_instance, ctxt, item['share'],
+                         item['share_server'], ensured.get(share_id),
+                         share_id in ensured)
+        pool.waitall()
+
+    def _ensure_share_instance(self, ctxt, share_instance, share_server,
+                               export_locations, ensured):
+        if not ensured:
             try:
                 export_locations = self.driver.ensure_share(
                     ctxt, share_instance, share_server=share_server)
@@ -310,31 +393,25 @@ class ShareManager(manager.SchedulerDependentManager):
                         "Exception: \n%(e)s."),
                     {'s_id': share_instance['id'], 'e': six.text_type(e)},
                 )
-                continue
-
-            if export_locations:
-                self.db.share_export_locations_update(
-                    ctxt, share_instance['id'], export_locations)
+                return
 
-            if share_instance['access_rules_status'] == (
-                    constants.STATUS_OUT_OF_SYNC):
+        if export_locations:
+            self.db.share_export_locations_update(
+                ctxt, share_instance['id'], export_locations)
 
-                try:
-                    self.access_helper.update_access_rules(
-                        ctxt, share_instance['id'], share_server=share_server)
-                except Exception as e:
-                    LOG.error(
-                        _LE("Unexpected error occurred while updating access "
-                            "rules for share instance %(s_id)s. "
-                            "Exception: \n%(e)s."),
-                        {'s_id': share_instance['id'], 'e': six.text_type(e)},
-                    )
+        if share_instance['access_rules_status'] == (
+                constants.STATUS_OUT_OF_SYNC):
 
-        self.publish_service_capabilities(ctxt)
-        LOG.info(_LI("Finished initialization of driver: '%(driver)s"
-                     "@%(host)s'"),
-                 {"driver": self.driver.__class__.__name__,
-                  "host": self.host})
+            try:
+                self.access_helper.update_access_rules(
+                    ctxt, share_instance['id'], share_server=share_server)
+            except Exception as e:
+                LOG.error(
+                    _LE("Unexpected error occurred while updating access "
+                        "rules for share instance %(s_id)s. "
+                        "Exception: \n%(e)s."),
+                    {'s_id': share_instance['id'], 'e': six.text_type(e)},
+                )
 
     def _provide_share_server_for_share(self, context, share_network_id,
                                         share_instance, snapshot=None,
@@ -1442,18 +1519,72 @@ class ShareManager(manager.SchedulerDependentManager):
     @utils.require_driver_initialized
     def periodic_share_replica_update(self, context):
         LOG.debug("Updating status of share replica instances.")
-        replicas = self.db.share_replicas_get_all(context,
-                                                  with_share_data=True)
+        replicas = self.db.share_replicas_get_all_by_host(
+            context, share_utils.extract_host(self.host),
+            with_share_data=True)
+
+        self._run_replica_update_pass(
+            'share_replica_update', self._share_replica_update,
+            [((context, replica), {'share_id': replica['share_id']})
+             for replica in replicas])
+
+    def _run_replica_update_pass(self, pass_name, update_method, calls):
+        """Starts a periodic replica update pass in a green thread.
+
+        A pass is not started while the previous pass of the same name is
+        still running.
+        """
+        running = self._replica_update_passes.get(pass_name)
+        if running is not None and not running.dead:
+            LOG.warning(_LW("Previous %(pass)s pass is still running, "
+                            "skipping this one."), {'pass': pass_name})
+            return
 
-        # Filter only non-active replicas belonging to this backend
-        def qualified_replica(r):
-            return (share_utils.extract_host(r['host']) ==
-                    share_utils.extract_host(self.host))
+        self._replica_update_passes[pass_name] = greenthread.spawn(
+            self._replica_update_pass, pass_name, update_method, calls)
 
-        replicas = list(filter(lambda x: qualified_replica(x), replicas))
-        for replica in replicas:
-            self._share_replica_update(
-                context, replica, share_id=replica['share_id'])
+    def _replica_update_pass(self, pass_name, update_method, calls):
+        started_at = time.time()
+        spread = self.configuration.replica_state_update_spread
+        offsets = sorted(random.uniform(0, spread) if spread else 0
+                         for __ in calls)
+        pool = greenpool.GreenPool(
+            self.configuration.replica_state_update_pool_size)
+
+        def _update(args, kwargs):
+            try:
+                update_method(*args, **kwargs)
+            except Exception:
+                LOG.exception(_LE("Unexpected error during %s pass."),
+                              pass_name)
+
+        for offset, (args, kwargs) in zip(offsets, calls):
+            delay = started_at + offset - time.time()
+            if delay > 0:
+                greenthread.sleep(delay)
+            pool.spawn_n(_update, args, kwargs)
+        pool.waitall()
+
+        duration = time.time() - started_at
+        # NOTE: Periodic tasks run with spacing from DEFAULT group, so lag
+        # is computed from the same value.
+        lag = max(0, duration - CONF.replica_state_update_interval)
+        self._replica_update_stats[pass_name] = {
+            'items': len(calls),
+            'duration': duration,
+            'lag': lag,
+        }
+        if lag:
+            LOG.warning(_LW("%(pass)s pass over %(items)s items took "
+                            "%(duration).1fs, %(lag).1fs longer than "
+                            "replica_state_update_interval."),
+                        {'pass': pass_name, 'items': len(calls),
+                         'duration': duration, 'lag': lag})
+        else:
+            LOG.debug("%(pass)s pass over %(items)s items took "
+                      "%(duration).1fs.",
+                      {'pass': pass_name, 'items': len(calls),
+                       'duration': duration})
 
     @add_hooks
     @utils.require_driver_initialized
@@ -2108,42 +2239,43 @@ class ShareManager(manager.SchedulerDependentManager):
         LOG.debug("Updating status of share replica snapshots.")
         transitional_statuses = (constants.STATUS_CREATING,
                                  constants.STATUS_DELETING)
-        replicas = self.db.share_replicas_get_all(context,
-                                                  with_share_data=True)
-
-        def qualified_replica(r):
-            # Filter non-active replicas belonging to this backend
-            return (share_utils.extract_host(r['host']) ==
-                    share_utils.extract_host(self.host) and
-                    r['replica_state'] != constants.REPLICA_STATE_ACTIVE)
-
-        host_replicas = list(filter(
-            lambda x: qualified_replica(x), replicas))
-        transitional_replica_snapshots = []
-
-        # Get snapshot instances for each replica that are in 'creating' or
-        # 'deleting' states.
-        for replica in host_replicas:
-            filters = {
-                'share_instance_ids': replica['id'],
-                'statuses': transitional_statuses,
-            }
-            replica_snapshots = (
-                self.db.share_snapshot_instance_get_all_with_filters(
-                    context, filters, with_share_data=True)
-            )
-            transitional_replica_snapshots.extend(replica_snapshots)
+        replicas = self.db.share_replicas_get_all_by_host(
+            context, share_utils.extract_host(self.host),
+            with_share_data=True)
+
+        # Filter non-active replicas
+        replica_ids = [r['id'] for r in replicas
+                       if r['replica_state'] != constants.REPLICA_STATE_ACTIVE]
+        if not replica_ids:
+            return
 
-        for replica_snapshot in transitional_replica_snapshots:
-            replica_snapshots = (
-                self.db.share_snapshot_instance_get_all_with_filters(
-                    context,
-                    {'snapshot_ids': replica_snapshot['snapshot_id']})
-            )
-            share_id = replica_snapshot['share']['share_id']
-            self._update_replica_snapshot(
-                context, replica_snapshot,
-                replica_snapshots=replica_snapshots, share_id=share_id)
+        # Get snapshot instances for these replicas that are in 'creating'
+        # or 'deleting' states.
+        filters = {
+            'share_instance_ids': replica_ids,
+            'statuses': transitional_statuses,
+        }
+        transitional_replica_snapshots = (
+            self.db.share_snapshot_instance_get_all_with_filters(
+                context, filters, with_share_data=True)
+        )
+
+        self._run_replica_update_pass(
+            'replica_snapshot_update',
+            self._periodic_replica_snapshot_update,
+            [((context, replica_snapshot), {})
+             for replica_snapshot in transitional_replica_snapshots])
+
+    def _periodic_replica_snapshot_update(self, context, replica_snapshot):
+        replica_snapshots = (
+            self.db.share_snapshot_instance_get_all_with_filters(
+                context,
+                {'snapshot_ids': replica_snapshot['snapshot_id']})
+        )
+        share_id = replica_snapshot['share']['share_id']
+        self._update_replica_snapshot(
+            context, replica_snapshot,
+            replica_snapshots=replica_snapshots, share_id=share_id)
 
     @locked_share_replica_operation
     def _update_replica_snapshot(self, context, replica_snapshot,
@@ -2242,7 +2374,7 @@ class ShareManager(manager.SchedulerDependentManager):
 
             share_server = self._get_share_server(context, share_instance)
 
-            return self.access_helper.update_access_rules(
+            return self.access_helper.queue_update_access_rules(
                 context,
                 share_instance_id,
                 add_rules=add_rules,
@@ -2259,7 +2391,7 @@ class ShareManager(manager.SchedulerDependentManager):
         share_instance = self._get_share_instance(context, share_instance_id)
         share_server = self._get_share_server(context, share_instance)
 
-        return self.access_helper.update_access_rules(
+        return self.access_helper.queue_update_access_rules(
             context,
             share_instance_id,
             delete_rules=delete_rules,
@@ -2307,8 +2439,13 @@ class ShareManager(manager.SchedulerDependentManager):
     def publish_service_capabilities(self, context):
         """Collect driver status and then publish it."""
         self._report_driver_status(context)
+        self.request_full_capabilities_report()
         self._publish_service_capabilities(context)
 
+    def invalidate_share_types_cache(self, context):
+        """Drop share types cached by this service."""
+        share_types.invalidate_cache()
+
     def _form_server_setup_info(self, context, share_server, share_network):
         # Network info is used by driver for setting up share server
         # and getting server info on share creation.
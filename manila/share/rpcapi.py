@@ -59,6 +59,7 @@ class ShareAPI(object):
             migration_get_driver_info()
         1.11 - Add create_replicated_snapshot() and
             delete_replicated_snapshot() methods
+        1.12 - Add invalidate_share_types_cache() method
     """
 
     BASE_RPC_API_VERSION = '1.0'
@@ -67,7 +68,7 @@ class ShareAPI(object):
         super(ShareAPI, self).__init__()
         target = messaging.Target(topic=CONF.share_topic,
                                   version=self.BASE_RPC_API_VERSION)
-        self.client = rpc.get_client(target, version_cap='1.11')
+        self.client = rpc.get_client(target, version_cap='1.12')
 
     def create_share_instance(self, context, share_instance, host,
                               request_spec, filter_properties,
@@ -210,10 +211,17 @@ class ShareAPI(object):
                           share_instance_id=share_instance['id'],
                           access_rules=self._get_access_rules(access))
 
-    def publish_service_capabilities(self, context):
-        call_context = self.client.prepare(fanout=True, version='1.0')
+    def publish_service_capabilities(self, context, host=None):
+        if host:
+            call_context = self.client.prepare(server=host, version='1.0')
+        else:
+            call_context = self.client.prepare(fanout=True, version='1.0')
         call_context.cast(context, 'publish_service_capabilities')
 
+    def invalidate_share_types_cache(self, context):
+        call_context = self.client.prepare(fanout=True, version='1.12')
+        call_context.cast(context, 'invalidate_share_types_cache')
+
     def extend_share(self, context, share, new_size, reservations):
         host = utils.extract_host(share['instance']['host'])
         call_context = self.client.prepare(server=host, version='1.2')
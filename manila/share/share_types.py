@@ -15,7 +15,9 @@
 
 """Built-in share type properties."""
 
+import copy
 import re
+import time
 
 from oslo_config import cfg
 from oslo_db import exception as db_exception
@@ -30,10 +32,69 @@ from manila import db
 from manila import exception
 from manila.i18n import _
 from manila.i18n import _LE
+from manila.scheduler import rpcapi as scheduler_rpcapi
+from manila.share import rpcapi as share_rpcapi
+
+share_types_cache_opts = [
+    cfg.IntOpt('share_types_cache_ttl',
+               default=0,
+               min=0,
+               help='Number of seconds share types and their extra specs '
+                    'are cached in each service process. Cached share '
+                    'types are dropped whenever share types are changed '
+                    'by the same process. 0 disables the cache.'),
+    cfg.BoolOpt('share_types_cache_notify',
+                default=False,
+                help='If set to True, share type changes are announced to '
+                     'all scheduler and share services, so that they drop '
+                     'their cached share types before the cache time to '
+                     'live expires.'),
+]
 
 CONF = cfg.CONF
+CONF.register_opts(share_types_cache_opts)
 LOG = log.getLogger(__name__)
 
+# Cached share types, {key: (generation, expiration time, value)}.
+_cache = {}
+# Incremented on each invalidation, values loaded during an older
+# generation are not cached.
+_cache_generation = 0
+
+
+def invalidate_cache(context=None):
+    """Drops cached share types.
+
+    If context is given and share_types_cache_notify is enabled, scheduler
+    and share services are told to drop their cached share types too.
+    """
+    global _cache_generation
+    _cache_generation += 1
+    _cache.clear()
+    if context is not None and CONF.share_types_cache_notify:
+        scheduler_rpcapi.SchedulerAPI().invalidate_share_types_cache(context)
+        share_rpcapi.ShareAPI().invalidate_share_types_cache(context)
+
+
+def _get_cached(ctxt, key, getter):
+    """Returns value of getter, cached under key for the context."""
+    ttl = CONF.share_types_cache_ttl
+    if not ttl:
+        return getter()
+
+    # NOTE: Share types visible to non admin users depend on project.
+    key = (None if ctxt.is_admin else ctxt.project_id, ) + key
+    now = time.time()
+    cached = _cache.get(key)
+    if cached and cached[0] == _cache_generation and cached[1] > now:
+        return copy.deepcopy(cached[2])
+
+    generation = _cache_generation
+    value = getter()
+    if generation == _cache_generation:
+        _cache[key] = (generation, now + ttl, copy.deepcopy(value))
+    return value
+
 
 def create(context, name, extra_specs=None, is_public=True, projects=None):
     """Creates share types."""
@@ -58,6 +119,7 @@ def create(context, name, extra_specs=None, is_public=True, projects=None):
         LOG.exception(_LE('DB error: %s'), e)
         raise exception.ShareTypeCreateFailed(name=name,
                                               extra_specs=extra_specs)
+    invalidate_cache(context)
     return type_ref
 
 
@@ -68,6 +130,7 @@ def destroy(context, id):
         raise exception.InvalidShareType(reason=msg)
     else:
         db.share_type_destroy(context, id)
+        invalidate_cache(context)
 
 
 def get_all_types(context, inactive=0, search_opts=None):
@@ -80,22 +143,28 @@ def get_all_types(context, inactive=0, search_opts=None):
     if 'is_public' in search_opts:
         filters['is_public'] = search_opts.pop('is_public')
 
-    share_types = db.share_type_get_all(context, inactive, filters=filters)
-
-    for type_name, type_args in share_types.items():
-        required_extra_specs = {}
-        try:
-            required_extra_specs = get_valid_required_extra_specs(
-                type_args['extra_specs'])
-        except exception.InvalidExtraSpec as e:
-            values = {
-                'share_type': type_name,
-                'error': six.text_type(e)
-            }
-            LOG.exception(_LE('Share type %(share_type)s has invalid required'
-                              ' extra specs: %(error)s'), values)
+    def _get_all_types():
+        share_types = db.share_type_get_all(context, inactive, filters=filters)
 
-        type_args['required_extra_specs'] = required_extra_specs
+        for type_name, type_args in share_types.items():
+            required_extra_specs = {}
+            try:
+                required_extra_specs = get_valid_required_extra_specs(
+                    type_args['extra_specs'])
+            except exception.InvalidExtraSpec as e:
+                values = {
+                    'share_type': type_name,
+                    'error': six.text_type(e)
+                }
+                LOG.exception(_LE('Share type %(share_type)s has invalid '
+                                  'required extra specs: %(error)s'), values)
+
+            type_args['required_extra_specs'] = required_extra_specs
+        return share_types
+
+    share_types = _get_cached(
+        context, ('all', bool(inactive), filters.get('is_public')),
+        _get_all_types)
 
     if search_opts:
         LOG.debug("Searching by: %s", search_opts)
@@ -136,7 +205,9 @@ def get_share_type(ctxt, id, expected_fields=None):
     if ctxt is None:
         ctxt = context.get_admin_context()
 
-    return db.share_type_get(ctxt, id, expected_fields=expected_fields)
+    return _get_cached(
+        ctxt, ('id', id, tuple(sorted(expected_fields or []))),
+        lambda: db.share_type_get(ctxt, id, expected_fields=expected_fields))
 
 
 def get_share_type_by_name(context, name):
@@ -145,7 +216,8 @@ def get_share_type_by_name(context, name):
         msg = _("name cannot be None")
         raise exception.InvalidShareType(reason=msg)
 
-    return db.share_type_get_by_name(context, name)
+    return _get_cached(context, ('name', name),
+                       lambda: db.share_type_get_by_name(context, name))
 
 
 def get_share_type_by_name_or_id(context, share_type=None):
@@ -262,7 +334,9 @@ def add_share_type_access(context, share_type_id, project_id):
     if share_type_id is None:
         msg = _("share_type_id cannot be None")
         raise exception.InvalidShareType(reason=msg)
-    return db.share_type_access_add(context, share_type_id, project_id)
+    access_ref = db.share_type_access_add(context, share_type_id, project_id)
+    invalidate_cache(context)
+    return access_ref
 
 
 def remove_share_type_access(context, share_type_id, project_id):
@@ -270,7 +344,9 @@ def remove_share_type_access(context, share_type_id, project_id):
     if share_type_id is None:
         msg = _("share_type_id cannot be None")
         raise exception.InvalidShareType(reason=msg)
-    return db.share_type_access_remove(context, share_type_id, project_id)
+    result = db.share_type_access_remove(context, share_type_id, project_id)
+    invalidate_cache(context)
+    return result
 
 
 def share_types_diff(context, share_type_id1, share_type_id2):
@@ -159,8 +159,8 @@ class LimiterTest(test.TestCase):
 class PaginationParamsTest(test.TestCase):
     """Unit tests for the `manila.api.common.get_pagination_params` method.
 
-    Takes in a request object and returns 'marker' and 'limit' GET
-    params.
+    Takes in a request object and returns 'marker', 'limit' and 'offset'
+    GET params.
     """
 
     def test_no_params(self):
@@ -193,6 +193,18 @@ class PaginationParamsTest(test.TestCase):
         self.assertEqual({'marker': marker, 'limit': 20},
                          common.get_pagination_params(req))
 
+    def test_valid_offset(self):
+        """Test valid offset param."""
+        req = webob.Request.blank('/?offset=10')
+        self.assertEqual({'offset': 10}, common.get_pagination_params(req))
+
+    def test_invalid_offset(self):
+        """Test invalid offset param."""
+        for offset in ('-2', 'foo'):
+            req = webob.Request.blank('/?offset=%s' % offset)
+            self.assertRaises(
+                webob.exc.HTTPBadRequest, common.get_pagination_params, req)
+
 
 class MiscFunctionsTest(test.TestCase):
 
@@ -17,6 +17,12 @@
 Tests dealing with HTTP rate-limiting.
 """
 
+import os
+import shutil
+import tempfile
+
+import ddt
+import mock
 from oslo_serialization import jsonutils
 import six
 from six import moves
@@ -550,6 +556,146 @@ class LimiterTest(BaseLimitTestSuite):
         self.assertEqual(expected, results)
 
 
+class BackendLimiterTest(LimiterTest):
+    """Tests for the `limits.BackendLimiter` class."""
+
+    def setUp(self):
+        """Run before each test."""
+        super(BackendLimiterTest, self).setUp()
+        self.mock_object(limits.BackendLimiter, "_get_time", self._get_time)
+        userlimits = {'user:user3': ''}
+        self.limiter = limits.BackendLimiter(TEST_LIMITS, **userlimits)
+
+    def test_user_limit(self):
+        """Test user-specific limits."""
+        self.assertEqual([], self.limiter.get_limits('user3'))
+        self.assertIsInstance(self.limiter.backend,
+                              limits.MemoryLimiterBackend)
+
+    def test_get_limits(self):
+        list(self._check(3, "PUT", "/shares"))
+        self.time += 6.0
+
+        result = self.limiter.get_limits()
+
+        self.assertEqual(len(TEST_LIMITS), len(result))
+        self.assertEqual(
+            {"verb": "PUT", "URI": "/shares", "regex": "^/shares",
+             "value": 5, "remaining": 2, "unit": "MINUTE", "resetTime": 6},
+            result[4])
+        self.assertEqual(8, result[3]["remaining"])
+        self.assertEqual(7, result[1]["remaining"])
+
+
+class SQLiteBackendLimiterTest(BackendLimiterTest):
+    """Tests for `limits.BackendLimiter` with `SQLiteLimiterBackend`."""
+
+    def setUp(self):
+        """Run before each test."""
+        super(SQLiteBackendLimiterTest, self).setUp()
+        db_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, db_dir)
+        self.db_path = os.path.join(db_dir, 'limits.db')
+        self.limiter = self._create_limiter()
+
+    def _create_limiter(self):
+        return limits.BackendLimiter(
+            TEST_LIMITS, backend='manila.api.v1.limits.SQLiteLimiterBackend',
+            backend_path=self.db_path, **{'user:user3': ''})
+
+    def test_user_limit(self):
+        """Test user-specific limits."""
+        self.assertEqual([], self.limiter.get_limits('user3'))
+        self.assertIsInstance(self.limiter.backend,
+                              limits.SQLiteLimiterBackend)
+
+    def test_shared_state(self):
+        """Ensure limiters with same database enforce limits together."""
+        other_limiter = self._create_limiter()
+
+        results = list(self._check(5, "PUT", "/anything"))
+        results += [other_limiter.check_for_delay("PUT", "/anything")[0]
+                    for __ in moves.range(6)]
+
+        self.assertEqual([None] * 10 + [6.0], results)
+
+
+@ddt.ddt
+class LimiterBackendTest(test.TestCase):
+    """Tests for `limits.LimiterBackend` implementations."""
+
+    @ddt.data(limits.MemoryLimiterBackend, limits.SQLiteLimiterBackend)
+    def test_fill(self, backend_class):
+        backend = backend_class()
+
+        first = backend.fill([('a', 60, 30.0), ('b', 60, 60.0)], 0)
+        second = backend.fill([('a', 60, 30.0), ('b', 60, 60.0)], 10)
+
+        self.assertEqual([None, None], first)
+        self.assertEqual([None, 50.0], second)
+        self.assertEqual([(50.0, 10), (50.0, 10), None],
+                         backend.get_states(['a', 'b', 'c']))
+
+    @ddt.data(limits.MemoryLimiterBackend, limits.SQLiteLimiterBackend)
+    def test_empty_requests(self, backend_class):
+        backend = backend_class()
+
+        self.assertEqual([], backend.fill([], 0))
+        self.assertEqual([], backend.get_states([]))
+
+    def _get_db_path(self):
+        db_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, db_dir)
+        return os.path.join(db_dir, 'limits.db')
+
+    def test_sqlite_write_ahead_log(self):
+        backend = limits.SQLiteLimiterBackend(path=self._get_db_path())
+
+        self.assertEqual(
+            ('wal',), backend._conn.execute("PRAGMA journal_mode").fetchone())
+        # NOTE: 1 is NORMAL
+        self.assertEqual(
+            (1,), backend._conn.execute("PRAGMA synchronous").fetchone())
+
+    def test_sqlite_fill_prunes_drained_buckets(self):
+        backend = limits.SQLiteLimiterBackend()
+
+        backend.fill([('a', 60, 30.0), ('b', 120, 90.0)], 0)
+        backend.fill([('c', 60, 1.0)], 30)
+        backend.fill([('c', 60, 1.0)], 60)
+
+        self.assertEqual([None, (90.0, 0), (1.0, 60)],
+                         backend.get_states(['a', 'b', 'c']))
+        self.assertEqual(
+            (2,),
+            backend._conn.execute("SELECT COUNT(*) FROM rate_limits")
+            .fetchone())
+
+    def test_sqlite_fill_database_locked(self):
+        db_path = self._get_db_path()
+        backend = limits.SQLiteLimiterBackend(path=db_path, timeout=0)
+        other_backend = limits.SQLiteLimiterBackend(path=db_path)
+        mock_warning_log = self.mock_object(limits.LOG, 'warning')
+        other_backend._conn.execute("BEGIN IMMEDIATE")
+        self.addCleanup(other_backend._conn.execute, "ROLLBACK")
+
+        result = backend.fill([('a', 60, 30.0), ('b', 60, 60.0)], 0)
+
+        self.assertEqual([None, None], result)
+        self.assertTrue(mock_warning_log.called)
+
+    def test_sqlite_fill_in_native_thread(self):
+        backend = limits.SQLiteLimiterBackend()
+        mock_execute = self.mock_object(limits.tpool, 'execute',
+                                        mock.Mock(return_value=[None]))
+
+        result = backend.fill([('a', 60, 30.0)], 0)
+
+        self.assertEqual([None], result)
+        mock_execute.assert_called_once_with(
+            backend._fill, [('a', 60, 30.0)], 0)
+
+
 class WsgiLimiterTest(BaseLimitTestSuite):
     """Tests for `limits.WsgiLimiter` class."""
 
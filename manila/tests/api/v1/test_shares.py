@@ -539,7 +539,7 @@ class ShareAPITest(test.TestCase):
             {'id': 'id3', 'display_name': 'n3'},
         ]
         self.mock_object(share_api.API, 'get_all',
-                         mock.Mock(return_value=shares))
+                         mock.Mock(return_value=[shares[1]]))
 
         result = self.controller.index(req)
 
@@ -562,6 +562,9 @@ class ShareAPITest(test.TestCase):
             sort_key=search_opts['sort_key'],
             sort_dir=search_opts['sort_dir'],
             search_opts=search_opts_expected,
+            limit=1,
+            offset=1,
+            marker=None,
         )
         self.assertEqual(1, len(result['shares']))
         self.assertEqual(shares[1]['id'], result['shares'][0]['id'])
@@ -636,7 +639,7 @@ class ShareAPITest(test.TestCase):
             {'id': 'id3', 'display_name': 'n3'},
         ]
         self.mock_object(share_api.API, 'get_all',
-                         mock.Mock(return_value=shares))
+                         mock.Mock(return_value=[shares[1]]))
 
         result = self.controller.detail(req)
 
@@ -659,6 +662,9 @@ class ShareAPITest(test.TestCase):
             sort_key=search_opts['sort_key'],
             sort_dir=search_opts['sort_dir'],
             search_opts=search_opts_expected,
+            limit=1,
+            offset=1,
+            marker=None,
         )
         self.assertEqual(1, len(result['shares']))
         self.assertEqual(shares[1]['id'], result['shares'][0]['id'])
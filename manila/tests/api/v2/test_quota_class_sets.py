@@ -132,10 +132,13 @@ class QuotaSetsControllerTest(test.TestCase):
             }
         }
 
+        self.mock_object(quota_class_sets.QUOTAS, 'invalidate_cache')
+
         update_result = controller().update(
             req, self.class_name, body=body)
 
         self.assertEqual(expected, update_result)
+        quota_class_sets.QUOTAS.invalidate_cache.assert_called_once_with()
 
         show_result = controller().show(req, self.class_name)
 
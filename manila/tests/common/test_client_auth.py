@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import ddt
 from keystoneauth1 import loading as auth
 from keystoneauth1.loading._plugins.identity import v2
 from oslo_config import cfg
@@ -25,6 +26,7 @@ from manila import test
 from manila.tests import fake_client_exception_class
 
 
+@ddt.ddt
 class ClientAuthTestCase(test.TestCase):
     def setUp(self):
         super(ClientAuthTestCase, self).setUp()
@@ -52,6 +54,79 @@ class ClientAuthTestCase(test.TestCase):
         self.assertRaises(exception.ManilaException, self.auth.get_client,
                           self.context, admin=False)
 
+    def test_get_client_cached(self):
+        self.mock_object(auth, 'load_session_from_conf_options')
+
+        client1 = self.auth.get_client(self.context, admin=True, version=1)
+        client2 = self.auth.get_client(self.context, admin=True, version=1)
+        client3 = self.auth.get_client(self.context, admin=True, version=2)
+
+        self.assertIs(client1, client2)
+        self.assertEqual(2, self.fake_client.call_count)
+        self.assertEqual({'hits': 1, 'misses': 2, 'evictions': 0},
+                         {key: self.auth.cache_stats[key]
+                          for key in ('hits', 'misses', 'evictions')})
+        self.fake_client.assert_called_with(
+            session=mock.ANY, auth=mock.ANY, version=2)
+        self.assertIsNotNone(client3)
+
+    def test_get_client_cache_eviction(self):
+        self.flags(client_cache_size=2)
+        self.mock_object(auth, 'load_session_from_conf_options')
+        self.fake_client.side_effect = lambda **kwargs: mock.Mock()
+
+        client1 = self.auth.get_client(self.context, admin=True, version=1)
+        self.auth.get_client(self.context, admin=True, version=2)
+        self.auth.get_client(self.context, admin=True, version=1)
+        self.auth.get_client(self.context, admin=True, version=3)
+        client1_again = self.auth.get_client(self.context, admin=True,
+                                             version=1)
+        self.auth.get_client(self.context, admin=True, version=2)
+
+        self.assertIs(client1, client1_again)
+        self.assertEqual(4, self.fake_client.call_count)
+        self.assertEqual(2, self.auth.cache_stats['evictions'])
+
+    def test_get_client_cache_disabled(self):
+        self.flags(client_cache_size=0)
+        self.mock_object(auth, 'load_session_from_conf_options')
+
+        self.auth.get_client(self.context, admin=True)
+        self.auth.get_client(self.context, admin=True)
+
+        self.assertEqual(2, self.fake_client.call_count)
+        self.assertEqual({}, self.auth._clients)
+
+    @ddt.data((300, True, True), (300, False, False), (0, True, False))
+    @ddt.unpack
+    def test_get_client_token_refresh(self, window, expires, refreshed):
+        self.flags(client_token_refresh_window=window)
+        self.mock_object(auth, 'load_session_from_conf_options')
+        auth_plugin = mock.Mock()
+        auth_plugin.auth_ref.will_expire_soon.return_value = expires
+        self.auth.admin_auth = auth_plugin
+
+        self.auth.get_client(self.context, admin=True)
+
+        self.assertEqual(refreshed, auth_plugin.invalidate.called)
+        self.assertEqual(refreshed, auth_plugin.get_access.called)
+        self.assertEqual(int(refreshed),
+                         self.auth.cache_stats['token_refreshes'])
+
+    def test_get_client_token_refresh_failed(self):
+        self.mock_object(auth, 'load_session_from_conf_options')
+        auth_plugin = mock.Mock()
+        auth_plugin.auth_ref.will_expire_soon.return_value = True
+        auth_plugin.get_access.side_effect = Exception('fake')
+        self.auth.admin_auth = auth_plugin
+        mock_warning = self.mock_object(client_auth.LOG, 'warning')
+
+        client = self.auth.get_client(self.context, admin=True)
+
+        self.assertEqual(self.fake_client.return_value, client)
+        self.assertTrue(mock_warning.called)
+        self.assertEqual(0, self.auth.cache_stats['token_refreshes'])
+
     def test_load_auth_plugin_caching(self):
         self.auth.admin_auth = 'admin obj'
         result = self.auth._load_auth_plugin()
@@ -15,6 +15,10 @@
 """
 Tests For Data Manager
 """
+import os
+import shutil
+import tempfile
+
 import ddt
 import mock
 
@@ -71,6 +75,36 @@ class DataManagerTestCase(test.TestCase):
             utils.IsAMatcher(context.RequestContext), share['id'],
             {'task_state': constants.TASK_STATE_DATA_COPYING_ERROR})
 
+    def test_init_host_removes_stale_journals(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        self.flags(migration_tmp_location=tmp)
+        journal_path = os.path.join(tmp, 'fake_dest.copy_journal')
+        other_path = os.path.join(tmp, 'fake_file')
+        for path in (journal_path, other_path):
+            with open(path, 'w'):
+                pass
+        self.mock_object(db, 'share_get_all', mock.Mock(return_value=[]))
+
+        self.manager.init_host()
+
+        self.assertFalse(os.path.exists(journal_path))
+        self.assertTrue(os.path.exists(other_path))
+
+    @ddt.data(('cp', data_utils.Copy), ('native', data_utils.NativeCopy))
+    @ddt.unpack
+    def test__get_copy(self, engine, copy_class):
+        self.flags(data_copy_engine=engine)
+
+        copy = self.manager._get_copy('/src', '/dst', ['item'])
+
+        self.assertIsInstance(copy, copy_class)
+        if engine == 'native':
+            self.assertEqual('/dst.copy_journal', copy.journal_path)
+        self.assertEqual('/src', copy.src)
+        self.assertEqual('/dst', copy.dest)
+        self.assertEqual(['item'], copy.ignore_list)
+
     @ddt.data({'notify': True, 'exc': None},
               {'notify': False, 'exc': None},
               {'notify': 'fake',
@@ -140,7 +174,7 @@ class DataManagerTestCase(test.TestCase):
         get_progress = {'total_progress': 100}
 
         # mocks
-        fake_copy = mock.MagicMock(cancelled=cancelled)
+        fake_copy = mock.MagicMock(cancelled=cancelled, resumable=False)
 
         self.mock_object(db, 'share_update')
 
@@ -238,6 +272,35 @@ class DataManagerTestCase(test.TestCase):
         helper.DataServiceHelper.deny_access_to_data_service.assert_has_calls([
             mock.call(access, 'ins1_id'), mock.call(access, 'ins2_id')])
 
+    @ddt.data({'resumable': True, 'failures': 1, 'retries': 1,
+               'runs': 2, 'exc': None},
+              {'resumable': True, 'failures': 2, 'retries': 1,
+               'runs': 2, 'exc': IOError},
+              {'resumable': False, 'failures': 1, 'retries': 1,
+               'runs': 1, 'exc': IOError})
+    @ddt.unpack
+    def test__run_copy(self, resumable, failures, retries, runs, exc):
+        self.flags(data_copy_retries=retries)
+        fake_copy = mock.Mock(resumable=resumable, cancelled=False)
+        fake_copy.run.side_effect = [IOError()] * failures + [None]
+
+        if exc:
+            self.assertRaises(exc, self.manager._run_copy, fake_copy)
+        else:
+            self.manager._run_copy(fake_copy)
+
+        self.assertEqual(runs, fake_copy.run.call_count)
+        self.assertEqual(resumable, fake_copy.remove_journal.called)
+
+    def test__run_copy_cancelled(self):
+        fake_copy = mock.Mock(resumable=True, cancelled=True)
+        fake_copy.run.side_effect = IOError()
+
+        self.assertRaises(IOError, self.manager._run_copy, fake_copy)
+
+        fake_copy.run.assert_called_once_with()
+        fake_copy.remove_journal.assert_called_once_with()
+
     def test__copy_share_data_exception_access(self):
 
         migration_info_src = {'mount': 'mount_cmd_src',
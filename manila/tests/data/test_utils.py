@@ -14,8 +14,12 @@
 #    under the License.
 
 import os
+import shutil
+import tempfile
 
+import eventlet
 import mock
+from oslo_serialization import jsonutils
 
 from manila.data import utils as data_utils
 from manila import test
@@ -323,3 +327,296 @@ class CopyClassTestCase(test.TestCase):
         self._copy.copy_data.assert_called_once_with(self._copy.src)
         self._copy.copy_stats.assert_called_once_with(self._copy.src)
         self._copy.get_progress.assert_called_once_with()
+
+
+class NativeCopyClassTestCase(test.TestCase):
+    def setUp(self):
+        super(NativeCopyClassTestCase, self).setUp()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.src = os.path.join(self.tmp, 'src')
+        self.dest = os.path.join(self.tmp, 'dst')
+        os.makedirs(os.path.join(self.src, 'folder1', 'folder2'))
+        os.makedirs(os.path.join(self.src, 'item'))
+        self.files = {
+            'file1': b'a' * 100,
+            os.path.join('folder1', 'file2'): b'',
+            os.path.join('folder1', 'folder2', 'file3'): b'b' * 10000,
+            os.path.join('item', 'file4'): b'c',
+        }
+        for path, data in self.files.items():
+            with open(os.path.join(self.src, path), 'wb') as f:
+                f.write(data)
+        os.symlink('file1', os.path.join(self.src, 'folder1', 'link1'))
+        os.chmod(os.path.join(self.src, 'file1'), 0o640)
+        os.utime(os.path.join(self.src, 'folder1'), (1000, 2000))
+        os.makedirs(self.dest)
+
+        self._copy = data_utils.NativeCopy(self.src, self.dest, ['item'],
+                                           workers=2)
+        self.mock_object(data_utils, 'LOG')
+
+    def test_run(self):
+        self._copy.run()
+
+        self.assertEqual(10100, self._copy.total_size)
+        self.assertEqual(4, self._copy.total_files)
+        self.assertEqual(4, self._copy.completed_files)
+        self.assertEqual({'total_progress': 100,
+                          'current_file_path': mock.ANY,
+                          'current_file_progress': 100},
+                         self._copy.get_progress())
+        for path, data in self.files.items():
+            dest_path = os.path.join(self.dest, path)
+            if path.startswith('item'):
+                self.assertFalse(os.path.exists(dest_path))
+                continue
+            with open(dest_path, 'rb') as f:
+                self.assertEqual(data, f.read())
+        self.assertEqual(
+            'file1', os.readlink(os.path.join(self.dest, 'folder1', 'link1')))
+        self.assertEqual(
+            0o640, os.stat(os.path.join(self.dest, 'file1')).st_mode & 0o777)
+        self.assertEqual(
+            2000, os.stat(os.path.join(self.dest, 'folder1')).st_mtime)
+
+    def test_run_without_sendfile(self):
+        self.mock_object(os, 'sendfile', mock.Mock(side_effect=OSError),
+                         create=True)
+
+        self._copy.run()
+
+        with open(os.path.join(
+                self.dest, 'folder1', 'folder2', 'file3'), 'rb') as f:
+            self.assertEqual(b'b' * 10000, f.read())
+
+    def test_run_cancelled(self):
+        self._copy.cancel()
+
+        self._copy.run()
+
+        self.assertEqual([], os.listdir(self.dest))
+
+    def test_walk_yields_files_while_walking(self):
+        walk = self._copy._walk()
+
+        kind, entry = next(walk)
+        while kind != 'file':
+            kind, entry = next(walk)
+
+        self.assertEqual(os.path.join(self.src, 'file1'), entry['src'])
+        self.assertFalse(os.path.exists(
+            os.path.join(self.dest, 'folder1', 'folder2')))
+
+        entries = list(walk)
+
+        self.assertEqual(
+            sorted([os.path.join(self.src, 'folder1', 'file2'),
+                    os.path.join(self.src, 'folder1', 'link1'),
+                    os.path.join(self.src, 'folder1', 'folder2', 'file3')]),
+            sorted(e['src'] for k, e in entries if k == 'file'))
+        self.assertEqual(
+            [os.path.join(self.src, 'folder1', 'folder2')],
+            [e['src'] for k, e in entries if k == 'dir'])
+        self.assertTrue(os.path.isdir(
+            os.path.join(self.dest, 'folder1', 'folder2')))
+
+    def test_run_walks_tree_once(self):
+        scandir = self.mock_object(self._copy, '_scandir',
+                                   mock.Mock(side_effect=self._copy._scandir))
+
+        self._copy.run()
+
+        self.assertEqual(
+            sorted([self.src, os.path.join(self.src, 'folder1'),
+                    os.path.join(self.src, 'folder1', 'folder2')]),
+            sorted(c[0][0] for c in scandir.call_args_list))
+        self.assertEqual(10100, self._copy.total_size)
+
+    def test_run_walk_error(self):
+        self.mock_object(self._copy, '_scandir',
+                         mock.Mock(side_effect=OSError))
+        self.mock_object(self._copy, '_copy_dirs_stats')
+
+        self.assertRaises(OSError, self._copy.run)
+
+        self.assertFalse(self._copy._copy_dirs_stats.called)
+
+    def test_run_walk_error_waits_for_copies(self):
+        original_scandir = self._copy._scandir
+        copied = []
+
+        def scandir(path):
+            if path != self.src:
+                raise OSError()
+            return original_scandir(path)
+
+        def copy_file(item):
+            eventlet.sleep(0.01)
+            copied.append(item['src'])
+
+        self.mock_object(self._copy, '_scandir',
+                         mock.Mock(side_effect=scandir))
+        self.mock_object(self._copy, '_copy_file',
+                         mock.Mock(side_effect=copy_file))
+
+        self.assertRaises(OSError, self._copy.run)
+
+        self.assertEqual([os.path.join(self.src, 'file1')], copied)
+        self.assertEqual({}, self._copy.in_progress)
+
+    def test_get_progress_while_walking(self):
+        self._copy.total_size = 100
+        self._copy.current_size = 100
+        self._copy.current_copy = {'file_path': '/fake/path', 'size': 100,
+                                   'copied': 100}
+
+        self.assertEqual(99, self._copy.get_progress()['total_progress'])
+
+        self._copy._walk_done = True
+
+        self.assertEqual(100, self._copy.get_progress()['total_progress'])
+
+    def test_copy_file_cancelled(self):
+        src = os.path.join(self.src, 'file1')
+        item = {'src': src, 'file_path': os.path.join(self.dest, 'file1'),
+                'stat': os.lstat(src), 'copied': 0}
+        self.mock_object(self._copy, '_copy_stats')
+        self._copy.cancel()
+
+        self._copy._copy_file(item)
+
+        self.assertEqual(0, item['copied'])
+        self.assertFalse(self._copy._copy_stats.called)
+
+    def test_run_error(self):
+        self.mock_object(self._copy, '_copy_file',
+                         mock.Mock(side_effect=IOError))
+
+        self.assertRaises(IOError, self._copy.run)
+
+    def test_run_resumed(self):
+        journal_path = os.path.join(self.tmp, 'journal')
+        copy = data_utils.NativeCopy(self.src, self.dest, ['item'],
+                                     journal_path=journal_path)
+        file3 = os.path.join(self.src, 'folder1', 'folder2', 'file3')
+        original_copy_file = copy._copy_file
+
+        def copy_file(item):
+            if item['src'] == file3:
+                raise IOError()
+            original_copy_file(item)
+
+        self.mock_object(copy, '_copy_file',
+                         mock.Mock(side_effect=copy_file))
+        self.assertRaises(IOError, copy.run)
+        self.assertTrue(os.path.exists(journal_path))
+
+        # Changed file has to be copied again
+        with open(os.path.join(self.src, 'file1'), 'wb') as f:
+            f.write(b'd' * 50)
+        # Incomplete record written by stopped service is ignored
+        with open(journal_path, 'a') as f:
+            f.write('["fake')
+
+        copy = data_utils.NativeCopy(self.src, self.dest, ['item'],
+                                     journal_path=journal_path)
+        self.mock_object(copy, '_copy_file',
+                         mock.Mock(side_effect=copy._copy_file))
+        copy.run()
+
+        self.assertEqual(
+            sorted([os.path.join(self.src, 'file1'), file3]),
+            sorted(c[0][0]['src'] for c in copy._copy_file.call_args_list))
+        self.assertEqual(10050, copy.total_size)
+        self.assertEqual(10050, copy.current_size)
+        self.assertEqual(100, copy.get_progress()['total_progress'])
+        self.assertFalse(os.path.exists(journal_path))
+        with open(os.path.join(self.dest, 'file1'), 'rb') as f:
+            self.assertEqual(b'd' * 50, f.read())
+
+    def test_run_again_resumes(self):
+        journal_path = os.path.join(self.tmp, 'journal')
+        copy = data_utils.NativeCopy(self.src, self.dest, ['item'],
+                                     journal_path=journal_path)
+        file3 = os.path.join(self.src, 'folder1', 'folder2', 'file3')
+        original_copy_file = copy._copy_file
+        failures = [IOError()]
+
+        def copy_file(item):
+            if item['src'] == file3 and failures:
+                raise failures.pop()
+            original_copy_file(item)
+
+        self.mock_object(copy, '_copy_file',
+                         mock.Mock(side_effect=copy_file))
+        self.assertRaises(IOError, copy.run)
+        copy._copy_file.reset_mock()
+
+        copy.run()
+
+        self.assertTrue(copy.resumable)
+        self.assertEqual([file3], [c[0][0]['src']
+                                   for c in copy._copy_file.call_args_list])
+        self.assertEqual(10100, copy.total_size)
+        self.assertEqual(10100, copy.current_size)
+        self.assertEqual(4, copy.completed_files)
+        self.assertFalse(os.path.exists(journal_path))
+
+    def test_run_cancelled_removes_journal(self):
+        journal_path = os.path.join(self.tmp, 'journal')
+        copy = data_utils.NativeCopy(self.src, self.dest, ['item'],
+                                     journal_path=journal_path)
+        self.mock_object(copy, '_copy_file',
+                         mock.Mock(side_effect=lambda item: copy.cancel()))
+        self.mock_object(copy, '_write_journal')
+
+        copy.run()
+
+        self.assertEqual(1, copy._copy_file.call_count)
+        self.assertFalse(copy._write_journal.called)
+        self.assertFalse(os.path.exists(journal_path))
+
+    def test_run_error_keeps_journal(self):
+        journal_path = os.path.join(self.tmp, 'journal')
+        copy = data_utils.NativeCopy(self.src, self.dest, ['item'],
+                                     journal_path=journal_path)
+        file1 = os.path.join(self.src, 'file1')
+        original_copy_file = copy._copy_file
+        journaled = []
+
+        def copy_file(item):
+            if item['src'] == file1:
+                original_copy_file(item)
+                return
+            # Record of the copied file is flushed before next copy ends
+            with open(journal_path) as f:
+                journaled.extend(jsonutils.loads(line)[0] for line in f)
+            raise IOError()
+
+        self.mock_object(copy, '_copy_file',
+                         mock.Mock(side_effect=copy_file))
+
+        self.assertRaises(IOError, copy.run)
+
+        self.assertEqual(['file1'], journaled)
+        self.assertTrue(os.path.exists(journal_path))
+        with open(journal_path) as f:
+            self.assertEqual(['file1'],
+                             [jsonutils.loads(line)[0] for line in f])
+
+    def test_get_progress(self):
+        self._copy.total_size = 1000
+        self._copy.current_size = 100
+        self._copy.current_copy = {'file_path': '/fake/path', 'size': 400,
+                                   'copied': 100}
+        self._copy.in_progress = {'/fake/path': self._copy.current_copy}
+
+        expected = {'total_progress': 20,
+                    'current_file_path': '/fake/path',
+                    'current_file_progress': 25}
+
+        self.assertEqual(expected, self._copy.get_progress())
+
+    def test_get_progress_current_copy_none(self):
+        self.assertEqual({'total_progress': 100}, self._copy.get_progress())
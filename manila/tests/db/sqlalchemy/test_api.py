@@ -17,16 +17,20 @@
 
 """Testing of SQLAlchemy backend."""
 
+import datetime
+
 import ddt
 from oslo_db import exception as db_exception
 from oslo_utils import uuidutils
 import six
+from sqlalchemy import event
 
 from manila.common import constants
 from manila import context
 from manila.db.sqlalchemy import api as db_api
 from manila.db.sqlalchemy import models
 from manila import exception
+from manila import quota
 from manila import test
 from manila.tests import db_utils
 
@@ -120,6 +124,50 @@ class ShareAccessDatabaseAPITestCase(test.TestCase):
             "fake_status"
         )
 
+    def test_share_instance_access_delete_by_access_ids(self):
+        share = db_utils.create_share()
+        instance = db_utils.create_share_instance(share_id=share['id'])
+        other_instance = db_utils.create_share_instance(share_id=share['id'])
+        shared_rule = db_utils.create_access(share_id=share['id'],
+                                             access_to='fake_ip_1')
+        rule = db_utils.create_access(share_id=share['id'],
+                                      access_to='fake_ip_2')
+        kept_rule = db_utils.create_access(share_id=share['id'],
+                                           access_to='fake_ip_3')
+
+        for instance_id in (share.instance['id'], other_instance['id']):
+            db_api.share_instance_access_delete_by_access_ids(
+                self.ctxt, instance_id, [rule['id']])
+        db_api.share_instance_access_delete_by_access_ids(
+            self.ctxt, instance['id'], [shared_rule['id'], rule['id']])
+
+        def _get_instance_ids(access_id):
+            return sorted(mapping['share_instance_id'] for mapping in
+                          db_api.share_instance_access_get_all(
+                              self.ctxt, access_id))
+
+        self.assertEqual(
+            sorted([share.instance['id'], other_instance['id']]),
+            _get_instance_ids(shared_rule['id']))
+        self.assertEqual([], _get_instance_ids(rule['id']))
+        self.assertEqual(
+            sorted([share.instance['id'], instance['id'],
+                    other_instance['id']]),
+            _get_instance_ids(kept_rule['id']))
+        self.assertRaises(exception.NotFound, db_api.share_access_get,
+                          self.ctxt, rule['id'])
+        self.assertEqual(
+            shared_rule['id'],
+            db_api.share_access_get(self.ctxt, shared_rule['id'])['id'])
+
+    def test_share_instance_access_delete_by_access_ids_empty(self):
+        self.mock_object(db_api, 'get_session')
+
+        db_api.share_instance_access_delete_by_access_ids(
+            self.ctxt, 'fake_instance_id', [])
+
+        self.assertFalse(db_api.get_session.called)
+
 
 @ddt.ddt
 class ShareDatabaseAPITestCase(test.TestCase):
@@ -217,6 +265,111 @@ class ShareDatabaseAPITestCase(test.TestCase):
         self.assertEqual(2, len(actual_result))
         self.assertEqual(shares[0]['id'], actual_result[1]['id'])
 
+    def test_share_get_all_with_limit_and_offset(self):
+        shares = [db_utils.create_share(display_name='share%s' % i)
+                  for i in range(5)]
+
+        actual_result = db_api.share_get_all(
+            self.ctxt, sort_key='display_name', sort_dir='asc', limit=2,
+            offset=1)
+
+        self.assertEqual([s['id'] for s in shares[1:3]],
+                         [s['id'] for s in actual_result])
+
+    @ddt.data('asc', 'desc')
+    def test_share_get_all_with_marker(self, sort_dir):
+        shares = [db_utils.create_share(size=1) for i in range(4)]
+        expected = sorted([s['id'] for s in shares],
+                          reverse=(sort_dir == 'desc'))
+
+        actual_result = db_api.share_get_all(
+            self.ctxt, sort_key='size', sort_dir=sort_dir, limit=2,
+            marker=expected[0])
+
+        self.assertEqual(expected[1:3], [s['id'] for s in actual_result])
+
+    def test_share_get_all_with_not_found_marker(self):
+        db_utils.create_share()
+
+        self.assertRaises(exception.InvalidInput, db_api.share_get_all,
+                          self.ctxt, marker='fake_marker')
+
+    def test_share_get_all_with_limit_and_replicas(self):
+        shares = [db_utils.create_share(size=i) for i in range(3)]
+        db_utils.create_share_replica(share_id=shares[0]['id'])
+
+        actual_result = db_api.share_get_all(
+            self.ctxt, sort_key='size', sort_dir='asc', limit=2)
+
+        self.assertEqual([s['id'] for s in shares[:2]],
+                         [s['id'] for s in actual_result])
+
+    @ddt.data('asc', 'desc')
+    def test_share_get_all_paginate_by_instance_field_with_replicas(
+            self, sort_dir):
+        shares = []
+        for host, replica_host in (('host2', 'host9'), ('host3', 'host1'),
+                                   ('host1', None)):
+            share = db_utils.create_share(
+                host=host, replication_type='readable',
+                replica_state=constants.REPLICA_STATE_ACTIVE)
+            if replica_host:
+                db_utils.create_share_replica(
+                    share_id=share['id'], host=replica_host,
+                    replica_state=constants.REPLICA_STATE_OUT_OF_SYNC)
+            shares.append(share)
+        expected = [shares[i]['id'] for i in (2, 0, 1)]
+        if sort_dir == 'desc':
+            expected.reverse()
+
+        actual_result = []
+        marker = None
+        for __ in range(4):
+            page = db_api.share_get_all(
+                self.ctxt, sort_key='host', sort_dir=sort_dir, limit=1,
+                marker=marker)
+            if not page:
+                break
+            marker = page[0]['id']
+            actual_result.append(marker)
+
+        self.assertEqual(expected, actual_result)
+
+    def test_share_get_all_by_project_with_exact_filters(self):
+        share = db_utils.create_share(
+            display_name='fake_name', status=constants.STATUS_AVAILABLE)
+        db_utils.create_share(display_name='fake_name')
+        db_utils.create_share(status=constants.STATUS_AVAILABLE)
+
+        actual_result = db_api.share_get_all_by_project(
+            self.ctxt, 'fake', filters={
+                'display_name': 'fake_name',
+                'status': constants.STATUS_AVAILABLE,
+            })
+
+        self.assertEqual([share['id']], [s['id'] for s in actual_result])
+
+    @ddt.data(({'host': 'fake_host_active'}, True),
+              ({'host': 'fake_host_replica'}, False),
+              ({'status': constants.STATUS_AVAILABLE}, True),
+              ({'status': constants.STATUS_ERROR}, False))
+    @ddt.unpack
+    def test_share_get_all_instance_filters_with_replicas(
+            self, filters, matches):
+        share = db_utils.create_share(
+            host='fake_host_active', status=constants.STATUS_AVAILABLE,
+            replication_type='readable',
+            replica_state=constants.REPLICA_STATE_ACTIVE)
+        db_utils.create_share_replica(
+            share_id=share['id'], host='fake_host_replica',
+            status=constants.STATUS_ERROR,
+            replica_state=constants.REPLICA_STATE_OUT_OF_SYNC)
+
+        actual_result = db_api.share_get_all(self.ctxt, filters=filters)
+
+        self.assertEqual([share['id']] if matches else [],
+                         [s['id'] for s in actual_result])
+
     @ddt.data(None, 'writable')
     def test_share_get_has_replicas_field(self, replication_type):
         share = db_utils.create_share(replication_type=replication_type)
@@ -275,6 +428,31 @@ class ShareDatabaseAPITestCase(test.TestCase):
                         with_share_data,
                         expected_share_keys.issubset(replica.keys()))
 
+    @ddt.data(True, False)
+    def test_share_replicas_get_all_by_host(self, with_share_data):
+        share = db_utils.create_share()
+        expected = [
+            db_utils.create_share_replica(
+                replica_state=constants.REPLICA_STATE_ACTIVE,
+                share_id=share['id'], host='fake_host@backend'),
+            db_utils.create_share_replica(
+                replica_state=constants.REPLICA_STATE_IN_SYNC,
+                share_id=share['id'], host='fake_host@backend#pool'),
+        ]
+        db_utils.create_share_replica(
+            replica_state=constants.REPLICA_STATE_IN_SYNC,
+            share_id=share['id'], host='fake_host@backend2#pool')
+        db_utils.create_share_replica(
+            share_id=share['id'], host='fake_host@backend#pool')
+
+        share_replicas = db_api.share_replicas_get_all_by_host(
+            self.ctxt, 'fake_host@backend', with_share_data=with_share_data)
+
+        self.assertEqual(sorted(r['id'] for r in expected),
+                         sorted(r['id'] for r in share_replicas))
+        for replica in share_replicas:
+            self.assertEqual(with_share_data, 'project_id' in replica.keys())
+
     @ddt.data({'with_share_data': False, 'with_share_server': False},
               {'with_share_data': False, 'with_share_server': True},
               {'with_share_data': True, 'with_share_server': False},
@@ -509,6 +687,98 @@ class ShareDatabaseAPITestCase(test.TestCase):
                     self.ctxt, rule_id, instance['id']))
 
 
+@ddt.ddt
+class ShareListQueryCountTestCase(test.TestCase):
+    """Checks that amount of SELECTs does not depend on amount of rows."""
+
+    def setUp(self):
+        super(ShareListQueryCountTestCase, self).setUp()
+        self.ctxt = context.get_admin_context()
+        self.engine = db_api.get_engine()
+
+    def _create_shares(self, count):
+        az = db_api.availability_zone_create_if_not_exist(
+            self.ctxt, 'fake_az')
+        shares, instances, export_locations = [], [], []
+        for i in range(count):
+            share_id = uuidutils.generate_uuid()
+            instance_id = uuidutils.generate_uuid()
+            shares.append({'id': share_id, 'deleted': 'False',
+                           'project_id': 'fake', 'size': 1})
+            instances.append({'id': instance_id, 'share_id': share_id,
+                              'deleted': 'False', 'host': 'fake_host',
+                              'status': constants.STATUS_AVAILABLE,
+                              'availability_zone_id': az['id']})
+            export_locations.append({'uuid': uuidutils.generate_uuid(),
+                                     'share_instance_id': instance_id,
+                                     'path': 'fake_path', 'deleted': 0,
+                                     'is_admin_only': False})
+        with self.engine.begin() as conn:
+            conn.execute(models.Share.__table__.insert(), shares)
+            conn.execute(models.ShareInstance.__table__.insert(), instances)
+            conn.execute(
+                models.ShareInstanceExportLocations.__table__.insert(),
+                export_locations)
+
+    def _count_selects(self, func, *args, **kwargs):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            # NOTE: 'SELECT 1' is a connection liveness check of oslo.db
+            statement = statement.strip().upper()
+            if statement.startswith('SELECT') and statement != 'SELECT 1':
+                statements.append(statement)
+
+        event.listen(
+            self.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            event.remove(
+                self.engine, 'before_cursor_execute', before_cursor_execute)
+        return result, len(statements)
+
+    @ddt.data(1, 100, 10000)
+    def test_share_get_all_by_project(self, count):
+        self._create_shares(count)
+
+        shares, selects = self._count_selects(
+            db_api.share_get_all_by_project, self.ctxt, 'fake')
+
+        self.assertEqual(count, len(shares))
+        self.assertEqual(3, selects)
+        # Relationships are loaded already, so access does not query DB
+        _, selects = self._count_selects(
+            lambda: [(s.instance.availability_zone, s.export_locations)
+                     for s in shares])
+        self.assertEqual(0, selects)
+
+    @ddt.data(1, 100, 10000)
+    def test_share_instances_get_all_by_host(self, count):
+        self._create_shares(count)
+
+        instances, selects = self._count_selects(
+            db_api.share_instances_get_all_by_host, self.ctxt, 'fake_host')
+
+        self.assertEqual(count, len(instances))
+        self.assertEqual(2, selects)
+
+    @ddt.data(1, 100, 1000)
+    def test_share_instances_get_all_by_host_with_share_data(self, count):
+        self._create_shares(count)
+
+        instances, selects = self._count_selects(
+            db_api.share_instances_get_all_by_host, self.ctxt, 'fake_host',
+            with_share_data=True)
+
+        self.assertEqual(count, len(instances))
+        for instance in instances:
+            self.assertEqual('fake', instance['project_id'])
+        # Parent shares are loaded in batches of SHARE_IDS_BATCH_SIZE
+        batches = -(-count // db_api.SHARE_IDS_BATCH_SIZE)
+        self.assertEqual(2 + 3 * batches, selects)
+
+
 @ddt.ddt
 class ConsistencyGroupDatabaseAPITestCase(test.TestCase):
 
@@ -1050,6 +1320,79 @@ class ShareExportLocationsDatabaseAPITestCase(test.TestCase):
         for location in locations:
             self.assertIn(location['path'], admin_result)
 
+    def test_update_metadata(self):
+        share = db_utils.create_share()
+        db_api.share_export_locations_update(
+            self.ctxt, share.instance['id'],
+            [{'path': 'fake1/1/', 'metadata': {'foo': 'bar'}},
+             {'path': 'fake2/2/', 'metadata': {'quuz': 'bar'}}], True)
+
+        result = db_api.share_export_locations_update(
+            self.ctxt, share.instance['id'],
+            [{'path': 'fake1/1/', 'metadata': {'foo': 'quuz', 'bar': 'foo'}},
+             'fake3/3/'], True)
+
+        self.assertEqual({'fake1/1/', 'fake3/3/'}, result)
+        els = db_api.share_export_locations_get_by_share_instance_id(
+            self.ctxt, share.instance['id'])
+        self.assertEqual(['fake1/1/', 'fake3/3/'], [el.path for el in els])
+        self.assertEqual({'foo': 'quuz', 'bar': 'foo'}, els[0].el_metadata)
+        self.assertEqual({}, els[1].el_metadata)
+        deleted_metadata = db_api.model_query(
+            self.ctxt, models.ShareInstanceExportLocationsMetadata,
+            read_deleted='only').filter_by(key='quuz').all()
+        self.assertEqual(1, len(deleted_metadata))
+
+    def test_update_without_delete_keeps_other_locations(self):
+        share = db_utils.create_share()
+        db_api.share_export_locations_update(
+            self.ctxt, share.instance['id'], ['fake1/1/', 'fake2/2/'], False)
+
+        result = db_api.share_export_locations_update(
+            self.ctxt, share.instance['id'], ['fake3/3/', 'fake1/1/'], False)
+
+        self.assertEqual({'fake1/1/', 'fake2/2/', 'fake3/3/'}, result)
+        self.assertEqual(
+            ['fake2/2/', 'fake3/3/', 'fake1/1/'],
+            db_api.share_export_locations_get(self.ctxt, share['id']))
+
+    def _count_update_statements(self, share, locations):
+        engine = db_api.get_engine()
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            # NOTE: 'SELECT 1' is a connection liveness check of oslo.db
+            if statement.strip().upper() != 'SELECT 1':
+                statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            db_api.share_export_locations_update(
+                self.ctxt, share.instance['id'], locations, True)
+        finally:
+            event.remove(
+                engine, 'before_cursor_execute', before_cursor_execute)
+        return len(statements)
+
+    def _get_statements_count(self, count):
+        share = db_utils.create_share()
+        locations = [{'path': 'fake/%s' % i, 'metadata': {'foo': 'bar'}}
+                     for i in range(count)]
+        created = self._count_update_statements(share, locations)
+
+        # Change metadata, remove one export location and add another one
+        for location in locations:
+            location['metadata'] = {'foo': 'quuz', 'bar': 'foo'}
+        locations[0]['path'] = 'fake/new'
+        updated = self._count_update_statements(share, locations)
+
+        return created, updated
+
+    def test_update_statements_count(self):
+        # Count of statements does not depend on count of export locations
+        self.assertEqual(self._get_statements_count(2),
+                         self._get_statements_count(100))
+
     def test_get_user_export_locations_old_view(self):
         ctxt_user = context.RequestContext(
             user_id='fake user', project_id='fake project', is_admin=False)
@@ -1999,6 +2342,33 @@ class ServiceDatabaseAPITestCase(test.TestCase):
         valid_values.update(update_data)
         self.assertSubDictMatch(valid_values, service.to_dict())
 
+    def test_heartbeat(self):
+        service = db_api.service_create(self.ctxt, self.service_data)
+
+        db_api.service_heartbeat(self.ctxt, service['id'])
+        db_api.service_heartbeat(self.ctxt, service['id'])
+        updated = db_api.service_get(self.ctxt, service['id'])
+
+        self.assertEqual(2, updated['report_count'])
+        self.assertIsNotNone(updated['updated_at'])
+        self.assertEqual(service['availability_zone_id'],
+                         updated['availability_zone_id'])
+
+    def test_heartbeat_availability_zone(self):
+        service = db_api.service_create(self.ctxt, self.service_data)
+
+        db_api.service_heartbeat(self.ctxt, service['id'],
+                                 availability_zone='fake_zone2')
+        updated = db_api.service_get(self.ctxt, service['id'])
+
+        az = db_api.availability_zone_get(self.ctxt, 'fake_zone2')
+        self.assertEqual(az.id, updated['availability_zone_id'])
+        self.assertEqual(1, updated['report_count'])
+
+    def test_heartbeat_not_found(self):
+        self.assertRaises(exception.ServiceNotFound,
+                          db_api.service_heartbeat, self.ctxt, 'fake_id')
+
 
 @ddt.ddt
 class AvailabilityZonesDatabaseAPITestCase(test.TestCase):
@@ -2135,3 +2505,76 @@ class NetworkAllocationsDatabaseAPITestCase(test.TestCase):
         )
         for na in result:
             self.assertIn(na.label, ('admin', 'user', None))
+
+    def test_network_allocations_get_ip_addresses(self):
+        self._setup_network_allocations_get_for_share_server()
+        allocations = db_api.network_allocations_get_for_share_server(
+            self.ctxt, self.share_server_id)
+        db_api.network_allocation_delete(self.ctxt, allocations[0]['id'])
+
+        result = db_api.network_allocations_get_ip_addresses(self.ctxt)
+
+        expected = set(na['ip_address'] for na in allocations[1:])
+        self.assertEqual(expected, set(result))
+        self.assertEqual(len(expected), len(result))
+
+
+@ddt.ddt
+class QuotaReservationDatabaseAPITestCase(test.TestCase):
+
+    def setUp(self):
+        super(QuotaReservationDatabaseAPITestCase, self).setUp()
+        self.ctxt = context.RequestContext(
+            'fake_user', 'fake_project', is_admin=True)
+        self.resources = {
+            'shares': quota.ReservableResource('shares', '_sync_shares'),
+            'gigabytes': quota.ReservableResource('gigabytes',
+                                                  '_sync_gigabytes'),
+        }
+        self.quotas = {'shares': 10, 'gigabytes': 100}
+        self.expire = datetime.datetime.utcnow() + datetime.timedelta(
+            seconds=3600)
+
+    def _reserve(self, deltas):
+        return db_api.quota_reserve(
+            self.ctxt, self.resources, self.quotas, self.quotas, deltas,
+            self.expire, 0, 0)
+
+    def _get_usages(self):
+        return db_api.quota_usage_get_all_by_project_and_user(
+            self.ctxt, 'fake_project', 'fake_user')
+
+    def test_quota_reserve(self):
+        db_utils.create_share(project_id='fake_project', user_id='fake_user',
+                              size=1)
+
+        reservations = self._reserve({'shares': 2, 'gigabytes': 20})
+
+        self.assertEqual(2, len(reservations))
+        usages = self._get_usages()
+        self.assertEqual({'in_use': 1, 'reserved': 2}, usages['shares'])
+        self.assertEqual({'in_use': 1, 'reserved': 20}, usages['gigabytes'])
+
+    def test_quota_reserve_over_quota(self):
+        self._reserve({'shares': 8})
+
+        self.assertRaises(exception.OverQuota, self._reserve, {'shares': 3})
+
+        self.assertEqual({'in_use': 0, 'reserved': 8},
+                         self._get_usages()['shares'])
+
+    @ddt.data(True, False)
+    def test_reservations_commit_rollback(self, commit):
+        reservations = self._reserve({'shares': 2, 'gigabytes': 20})
+        reservations += self._reserve({'shares': 1})
+
+        if commit:
+            db_api.reservation_commit(self.ctxt, reservations,
+                                      'fake_project', 'fake_user')
+            expected = {'in_use': 3, 'reserved': 0}
+        else:
+            db_api.reservation_rollback(self.ctxt, reservations,
+                                        'fake_project', 'fake_user')
+            expected = {'in_use': 0, 'reserved': 0}
+
+        self.assertEqual(expected, self._get_usages()['shares'])
@@ -350,7 +350,7 @@ class StandaloneNetworkPluginTest(test.TestCase):
         self.mock_object(instance.db, 'share_network_update')
         self.mock_object(instance.db, 'network_allocation_create')
         self.mock_object(
-            instance.db, 'network_allocations_get_by_ip_address',
+            instance.db, 'network_allocations_get_ip_addresses',
             mock.Mock(return_value=[]))
 
         allocations = instance.allocate_network(
@@ -366,8 +366,8 @@ class StandaloneNetworkPluginTest(test.TestCase):
         }
         instance.db.share_network_update.assert_called_once_with(
             fake_context, fake_share_network['id'], na_data)
-        instance.db.network_allocations_get_by_ip_address.assert_has_calls(
-            [mock.call(fake_context, '10.0.0.2')])
+        instance.db.network_allocations_get_ip_addresses.\
+            assert_called_once_with(fake_context)
         instance.db.network_allocation_create.assert_called_once_with(
             fake_context,
             dict(share_server_id=fake_share_server['id'],
@@ -375,14 +375,7 @@ class StandaloneNetworkPluginTest(test.TestCase):
                  label='user', **na_data))
 
     def test_allocate_network_two_ip_addresses_ipv4_two_usages_exist(self):
-        ctxt = type('FakeCtxt', (object,), {'fake': ['10.0.0.2', '10.0.0.4']})
-
-        def fake_get_allocations_by_ip_address(context, ip_address):
-            if ip_address not in context.fake:
-                context.fake.append(ip_address)
-                return []
-            else:
-                return context.fake
+        ctxt = type('FakeCtxt', (object,), {})
 
         data = {
             'DEFAULT': {
@@ -395,8 +388,8 @@ class StandaloneNetworkPluginTest(test.TestCase):
         self.mock_object(instance.db, 'share_network_update')
         self.mock_object(instance.db, 'network_allocation_create')
         self.mock_object(
-            instance.db, 'network_allocations_get_by_ip_address',
-            mock.Mock(side_effect=fake_get_allocations_by_ip_address))
+            instance.db, 'network_allocations_get_ip_addresses',
+            mock.Mock(return_value=['10.0.0.2', '10.0.0.4', 'fe80::2']))
 
         allocations = instance.allocate_network(
             ctxt, fake_share_server, fake_share_network, count=2)
@@ -411,9 +404,8 @@ class StandaloneNetworkPluginTest(test.TestCase):
         }
         instance.db.share_network_update.assert_called_once_with(
             ctxt, fake_share_network['id'], dict(**na_data))
-        instance.db.network_allocations_get_by_ip_address.assert_has_calls(
-            [mock.call(ctxt, '10.0.0.2'), mock.call(ctxt, '10.0.0.3'),
-             mock.call(ctxt, '10.0.0.4'), mock.call(ctxt, '10.0.0.5')])
+        instance.db.network_allocations_get_ip_addresses.\
+            assert_called_once_with(ctxt)
         instance.db.network_allocation_create.assert_has_calls([
             mock.call(
                 ctxt,
@@ -439,8 +431,8 @@ class StandaloneNetworkPluginTest(test.TestCase):
         self.mock_object(instance.db, 'share_network_update')
         self.mock_object(instance.db, 'network_allocation_create')
         self.mock_object(
-            instance.db, 'network_allocations_get_by_ip_address',
-            mock.Mock(return_value=['not empty list']))
+            instance.db, 'network_allocations_get_ip_addresses',
+            mock.Mock(return_value=['10.0.0.2']))
 
         self.assertRaises(
             exception.NetworkBadConfigurationException,
@@ -453,5 +445,54 @@ class StandaloneNetworkPluginTest(test.TestCase):
                  cidr=six.text_type(instance.net.cidr),
                  gateway=six.text_type(instance.gateway),
                  ip_version=4))
-        instance.db.network_allocations_get_by_ip_address.assert_has_calls(
-            [mock.call(fake_context, '10.0.0.2')])
+        instance.db.network_allocations_get_ip_addresses.\
+            assert_called_once_with(fake_context)
+
+    @ddt.data(
+        ([], 3, ['10.0.0.10', '10.0.0.11', '10.0.0.12']),
+        (['10.0.0.10', '10.0.0.11', '10.0.0.13'], 3,
+         ['10.0.0.12', '10.0.0.14', '10.0.0.15']),
+        (['10.0.0.%s' % i for i in range(10, 21)], 2,
+         ['10.0.0.30', '10.0.0.31']),
+        (['10.0.0.%s' % i for i in range(10, 21)] + ['10.0.0.31'], 2,
+         ['10.0.0.30', '10.0.0.32']),
+    )
+    @ddt.unpack
+    def test__get_available_ips(self, used_ips, amount, expected):
+        data = {
+            'DEFAULT': {
+                'standalone_network_plugin_gateway': '10.0.0.1',
+                'standalone_network_plugin_mask': '24',
+                'standalone_network_plugin_allowed_ip_ranges': (
+                    '10.0.0.30-10.0.0.40,10.0.0.10-10.0.0.20'),
+            },
+        }
+        with test_utils.create_temp_config_with_opts(data):
+            instance = plugin.StandaloneNetworkPlugin()
+        self.mock_object(
+            instance.db, 'network_allocations_get_ip_addresses',
+            mock.Mock(return_value=used_ips))
+
+        result = instance._get_available_ips(fake_context, amount)
+
+        self.assertEqual(expected, result)
+
+    def test__get_available_ips_ipv6(self):
+        data = {
+            'DEFAULT': {
+                'standalone_network_plugin_gateway': '2001:db8::1',
+                'standalone_network_plugin_mask': '64',
+                'standalone_network_plugin_ip_version': 6,
+            },
+        }
+        with test_utils.create_temp_config_with_opts(data):
+            instance = plugin.StandaloneNetworkPlugin()
+        self.mock_object(
+            instance.db, 'network_allocations_get_ip_addresses',
+            mock.Mock(return_value=['2001:db8::2', '10.0.0.3',
+                                    '2001:0db8::0:4']))
+
+        result = instance._get_available_ips(fake_context, 3)
+
+        self.assertEqual(['2001:db8::3', '2001:db8::5', '2001:db8::6'],
+                         result)
@@ -51,7 +51,9 @@ class SchedulerTestCase(test.TestCase):
             self.driver.update_service_capabilities(
                 service_name, host, capabilities)
             self.driver.host_manager.update_service_capabilities.\
-                assert_called_once_with(service_name, host, capabilities)
+                assert_called_once_with(service_name, host, capabilities,
+                                        capabilities_seq=None,
+                                        capabilities_delta=False)
 
     def test_hosts_up(self):
         service1 = {'host': 'host1'}
@@ -236,6 +236,38 @@ class FilterSchedulerTestCase(test_base.SchedulerTestCase):
         self.assertEqual('host5#_pool0', weighed_host.obj.host)
         self.assertTrue(_mock_service_get_all_by_topic.called)
 
+    @mock.patch('manila.db.service_get_all_by_topic')
+    def test__schedule_share_loads_host_states_once(
+            self, _mock_service_get_all_by_topic):
+        sched = fakes.FakeFilterScheduler()
+        sched.host_manager = fakes.FakeHostManager()
+        fake_context = context.RequestContext('user', 'project',
+                                              is_admin=True)
+        fakes.mock_host_manager_db_calls(_mock_service_get_all_by_topic)
+        self.mock_object(
+            sched.host_manager, 'get_all_host_states_share',
+            mock.Mock(
+                side_effect=sched.host_manager.get_all_host_states_share))
+        request_spec = {
+            'share_type': {
+                'name': 'NFS',
+                'extra_specs': {'consistency_group_support': 'pool'}
+            },
+            'share_properties': {'project_id': 1, 'size': 1},
+            'share_instance_properties': {'project_id': 1, 'size': 1},
+            'consistency_group': {
+                'id': 'fake-cg-id',
+                'host': 'host5#_pool0',
+            },
+            'active_replica_host': 'host5#_pool0',
+        }
+
+        weighed_host = sched._schedule_share(fake_context, request_spec, {})
+
+        self.assertEqual('host5#_pool0', weighed_host.obj.host)
+        self.assertEqual(
+            1, sched.host_manager.get_all_host_states_share.call_count)
+
     def _setup_dedupe_fakes(self, extra_specs):
         sched = fakes.FakeFilterScheduler()
         sched.host_manager = fakes.FakeHostManager()
@@ -18,9 +18,11 @@ Tests For CapabilitiesFilter.
 """
 
 import ddt
+import mock
 from oslo_context import context
 
 from manila.scheduler.filters import capabilities
+from manila.scheduler.filters import extra_specs_ops
 from manila import test
 from manila.tests.scheduler import fakes
 
@@ -166,3 +168,27 @@ class HostFiltersTestCase(test.TestCase):
             ecaps={'scope_lv0': {'opt1': [True, False]}},
             especs={'capabilities:scope_lv1:opt1': '<is> True'},
             passes=False)
+
+    def test_capability_filter_caches_extra_specs_plan(self):
+        resource_type = {'id': 'fake_type_id', 'name': 'fake_type',
+                         'extra_specs': {'opt1': '1', 'opt2': '<is> True'}}
+        filter_properties = {'resource_type': resource_type}
+        host = fakes.FakeHostState(
+            'host1', {'capabilities': {'opt1': '1', 'opt2': True}})
+        self.mock_object(extra_specs_ops, 'compile_req',
+                         mock.Mock(side_effect=extra_specs_ops.compile_req))
+
+        with mock.patch.dict(
+                capabilities.CapabilitiesFilter._extra_specs_plans,
+                clear=True):
+            for i in range(3):
+                self.assertTrue(capabilities.CapabilitiesFilter().host_passes(
+                    host, filter_properties))
+
+            self.assertEqual(2, extra_specs_ops.compile_req.call_count)
+
+            # Plan is recompiled when extra specs of the type are updated
+            resource_type['extra_specs'] = {'opt1': '2', 'opt2': '<is> True'}
+
+            self.assertFalse(self.filter.host_passes(host, filter_properties))
+            self.assertEqual(4, extra_specs_ops.compile_req.call_count)
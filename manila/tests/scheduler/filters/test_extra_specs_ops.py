@@ -73,3 +73,19 @@ class ExtraSpecsOpsTestCase(test.TestCase):
     def test_extra_specs_matches_simple(self, value, req, matches):
         self._do_extra_specs_ops_test(
             value, req, matches)
+
+    @ddt.unpack
+    @ddt.data(
+        ('12', '<or> 11 <or> 12', True),
+        ('11', '<or>', False),
+        ('3', '>= foo', False),
+        ('foo', '>= 3', False),
+        (None, '<in> 1', False),
+        (None, '<is> False', False),
+    )
+    def test_compile_req(self, value, req, matches):
+        matcher = extra_specs_ops.compile_req(req)
+
+        self.assertEqual(matches, matcher(value))
+        # Compiled requirement can be applied to values repeatedly
+        self.assertEqual(matches, matcher(value))
@@ -142,6 +142,131 @@ class HostManagerTestCase(test.TestCase):
         }
         self.assertDictMatch(service_states, expected)
 
+    def test_update_service_capabilities_delta(self):
+        capabilities = {
+            'share_backend_name': 'AAA',
+            'driver_version': '1.0',
+            'obsolete': 'value',
+            'pools': [
+                {'pool_name': 'pool1', 'free_capacity_gb': 10,
+                 'reserved_percentage': 0},
+                {'pool_name': 'pool2', 'free_capacity_gb': 20},
+                {'pool_name': 'pool3', 'free_capacity_gb': 30},
+            ],
+        }
+        delta = {
+            'changed': {'driver_version': '1.1'},
+            'removed': ['obsolete'],
+            'pools': {
+                'changed': {
+                    'pool1': {'changed': {'free_capacity_gb': 5},
+                              'removed': ['reserved_percentage']},
+                    'pool4': {'changed': {'pool_name': 'pool4',
+                                          'free_capacity_gb': 40},
+                              'removed': []},
+                },
+                'removed': ['pool2'],
+            },
+        }
+        self.mock_object(timeutils, 'utcnow', mock.Mock(return_value=31337))
+
+        self.assertTrue(self.host_manager.update_service_capabilities(
+            'share', 'host1', capabilities, capabilities_seq=1))
+        self.assertTrue(self.host_manager.update_service_capabilities(
+            'share', 'host1', delta, capabilities_seq=2,
+            capabilities_delta=True))
+
+        expected = {
+            'share_backend_name': 'AAA',
+            'driver_version': '1.1',
+            'timestamp': 31337,
+            'pools': [
+                {'pool_name': 'pool1', 'free_capacity_gb': 5},
+                {'pool_name': 'pool3', 'free_capacity_gb': 30},
+                {'pool_name': 'pool4', 'free_capacity_gb': 40},
+            ],
+        }
+        self.assertEqual(expected, self.host_manager.service_states['host1'])
+        self.assertEqual(10, capabilities['pools'][0]['free_capacity_gb'])
+        stats = self.host_manager.capabilities_update_stats
+        self.assertEqual(1, stats['full_updates'])
+        self.assertEqual(1, stats['delta_updates'])
+        self.assertEqual(0, stats['missed_deltas'])
+
+    def test_update_service_capabilities_delta_after_consume(self):
+        capabilities = {
+            'share_backend_name': 'AAA',
+            'driver_version': '1.0',
+            'pools': [
+                {'pool_name': 'pool1', 'total_capacity_gb': 100,
+                 'free_capacity_gb': 100, 'reserved_percentage': 0},
+            ],
+        }
+        delta = {
+            'changed': {},
+            'removed': [],
+            'pools': {
+                'changed': {
+                    'pool1': {'changed': {'free_capacity_gb': 50},
+                              'removed': []},
+                },
+                'removed': [],
+            },
+        }
+        self.mock_object(
+            db, 'service_get_all_by_topic',
+            mock.Mock(return_value=fakes.SHARE_SERVICES_NO_POOLS[:1]))
+        self.mock_object(utils, 'service_is_up', mock.Mock(return_value=True))
+
+        self.host_manager.update_service_capabilities(
+            'share', 'host1', capabilities, capabilities_seq=1)
+        pool = list(self.host_manager.get_all_host_states_share(
+            'fake_context'))[0]
+        pool.consume_from_share({'size': 10})
+        self.assertEqual(90, pool.free_capacity_gb)
+
+        self.host_manager.update_service_capabilities(
+            'share', 'host1', delta, capabilities_seq=2,
+            capabilities_delta=True)
+        pool = list(self.host_manager.get_all_host_states_share(
+            'fake_context'))[0]
+
+        self.assertEqual(50, pool.free_capacity_gb)
+        self.assertNotIn(
+            'timestamp',
+            self.host_manager.service_states['host1']['pools'][0])
+
+    @ddt.data(
+        {'full_seq': 1, 'delta_seq': 3},
+        {'full_seq': None, 'delta_seq': 2},
+    )
+    @ddt.unpack
+    def test_update_service_capabilities_missed_delta(self, full_seq,
+                                                      delta_seq):
+        capabilities = {'driver_version': '1.0'}
+        delta = {'changed': {'driver_version': '1.1'}, 'removed': []}
+
+        self.host_manager.update_service_capabilities(
+            'share', 'host1', capabilities, capabilities_seq=full_seq)
+        result = self.host_manager.update_service_capabilities(
+            'share', 'host1', delta, capabilities_seq=delta_seq,
+            capabilities_delta=True)
+
+        self.assertFalse(result)
+        self.assertEqual(
+            '1.0',
+            self.host_manager.service_states['host1']['driver_version'])
+        self.assertEqual(
+            1, self.host_manager.capabilities_update_stats['missed_deltas'])
+
+    def test_update_service_capabilities_delta_unknown_host(self):
+        result = self.host_manager.update_service_capabilities(
+            'share', 'host1', {'changed': {}, 'removed': []},
+            capabilities_seq=2, capabilities_delta=True)
+
+        self.assertFalse(result)
+        self.assertNotIn('host1', self.host_manager.service_states)
+
     def test_get_all_host_states_share(self):
         context = 'fake_context'
         topic = CONF.share_topic
@@ -175,6 +300,94 @@ class HostManagerTestCase(test.TestCase):
                 self.assertEqual(share_node, host_state_map[host].service)
             db.service_get_all_by_topic.assert_called_once_with(context, topic)
 
+    def test_get_all_host_states_share_skips_unchanged_capabilities(self):
+        context = 'fake_context'
+        self.mock_object(
+            db, 'service_get_all_by_topic',
+            mock.Mock(return_value=fakes.SHARE_SERVICES_WITH_POOLS[:4]))
+        self.mock_object(utils, 'service_is_up', mock.Mock(return_value=True))
+        service_states = copy.deepcopy(fakes.SHARE_SERVICE_STATES_WITH_POOLS)
+
+        with mock.patch.dict(self.host_manager.service_states,
+                             service_states):
+            pools = list(self.host_manager.get_all_host_states_share(context))
+            self.mock_object(host_manager.HostState,
+                             'update_from_share_capability')
+
+            pools_again = list(
+                self.host_manager.get_all_host_states_share(context))
+
+            self.assertFalse(
+                host_manager.HostState.update_from_share_capability.called)
+            self.assertEqual(sorted(map(id, pools)),
+                             sorted(map(id, pools_again)))
+
+            # Only host with newly reported capabilities is updated
+            self.host_manager.service_states['host1@AAA'] = dict(
+                service_states['host1@AAA'], timestamp=timeutils.utcnow())
+            self.host_manager.get_all_host_states_share(context)
+
+            host_manager.HostState.update_from_share_capability.\
+                assert_called_once_with(
+                    self.host_manager.service_states['host1@AAA'],
+                    service=fakes.SHARE_SERVICES_WITH_POOLS[0])
+
+    def test_get_all_host_states_share_refreshes_service(self):
+        context = 'fake_context'
+        services = copy.deepcopy(fakes.SHARE_SERVICES_WITH_POOLS[:1])
+        self.mock_object(
+            db, 'service_get_all_by_topic',
+            mock.Mock(return_value=services))
+        self.mock_object(utils, 'service_is_up', mock.Mock(return_value=True))
+
+        with mock.patch.dict(self.host_manager.service_states,
+                             fakes.SHARE_SERVICE_STATES_WITH_POOLS):
+            self.host_manager.get_all_host_states_share(context)
+            services[0]['updated_at'] = timeutils.utcnow()
+            pools = list(self.host_manager.get_all_host_states_share(context))
+
+            host_state = self.host_manager.host_state_map['host1@AAA']
+            self.assertEqual(services[0], host_state.service)
+            for pool in pools:
+                self.assertEqual(services[0], pool.service)
+
+    @ddt.data(0, 60)
+    def test_get_all_host_states_share_services_cache_ttl(self, ttl):
+        self.flags(scheduler_share_services_cache_ttl=ttl)
+        context = 'fake_context'
+        self.mock_object(
+            db, 'service_get_all_by_topic',
+            mock.Mock(return_value=fakes.SHARE_SERVICES_WITH_POOLS[:4]))
+        self.mock_object(utils, 'service_is_up', mock.Mock(return_value=True))
+
+        with mock.patch.dict(self.host_manager.service_states,
+                             fakes.SHARE_SERVICE_STATES_WITH_POOLS):
+            self.host_manager.get_all_host_states_share(context)
+            self.host_manager.get_all_host_states_share(context)
+
+        self.assertEqual(1 if ttl else 2,
+                         db.service_get_all_by_topic.call_count)
+
+    @ddt.data((True, True), (True, False), (False, True))
+    @ddt.unpack
+    def test__service_is_up(self, use_reports, reported):
+        self.flags(scheduler_service_liveness_from_reports=use_reports)
+        self.mock_object(utils, 'service_is_up', mock.Mock(return_value=True))
+        service = {'host': 'host1', 'updated_at': None}
+        timestamp = timeutils.utcnow()
+        service_states = {}
+        if reported:
+            service_states['host1'] = {'timestamp': timestamp}
+
+        with mock.patch.dict(self.host_manager.service_states,
+                             service_states):
+            result = self.host_manager._service_is_up(service)
+
+        self.assertTrue(result)
+        utils.service_is_up.assert_called_once_with(
+            service,
+            last_seen=timestamp if use_reports and reported else None)
+
     def test_get_pools_no_pools(self):
         context = 'fake_context'
         self.mock_object(utils, 'service_is_up', mock.Mock(return_value=True))
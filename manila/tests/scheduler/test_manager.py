@@ -29,6 +29,7 @@ from manila.scheduler.drivers import base
 from manila.scheduler.drivers import filter
 from manila.scheduler import manager
 from manila.share import rpcapi as share_rpcapi
+from manila.share import share_types
 from manila import test
 from manila.tests import db_utils
 from manila.tests import fake_share as fakes
@@ -105,7 +106,9 @@ class SchedulerManagerTestCase(test.TestCase):
             self.manager.update_service_capabilities(
                 self.context, service_name=service_name, host=host)
             (self.manager.driver.update_service_capabilities.
-                assert_called_once_with(service_name, host, {}))
+                assert_called_once_with(service_name, host, {},
+                                        capabilities_seq=None,
+                                        capabilities_delta=False))
         with mock.patch.object(self.manager.driver,
                                'update_service_capabilities', mock.Mock()):
             capabilities = {'fake_capability': 'fake_value'}
@@ -113,7 +116,40 @@ class SchedulerManagerTestCase(test.TestCase):
                 self.context, service_name=service_name, host=host,
                 capabilities=capabilities)
             (self.manager.driver.update_service_capabilities.
-                assert_called_once_with(service_name, host, capabilities))
+                assert_called_once_with(service_name, host, capabilities,
+                                        capabilities_seq=None,
+                                        capabilities_delta=False))
+
+    @ddt.data(True, False)
+    def test_update_service_capabilities_delta(self, applied):
+        self.mock_object(self.manager.driver, 'update_service_capabilities',
+                         mock.Mock(return_value=applied))
+        self.mock_object(share_rpcapi.ShareAPI,
+                         'publish_service_capabilities')
+        capabilities = {'changed': {'fake_capability': 'fake_value'}}
+
+        self.manager.update_service_capabilities(
+            self.context, service_name='share', host='fake_host',
+            capabilities=capabilities, capabilities_seq=3,
+            capabilities_delta=True)
+
+        (self.manager.driver.update_service_capabilities.
+            assert_called_once_with('share', 'fake_host', capabilities,
+                                    capabilities_seq=3,
+                                    capabilities_delta=True))
+        if applied:
+            self.assertFalse(
+                share_rpcapi.ShareAPI.publish_service_capabilities.called)
+        else:
+            (share_rpcapi.ShareAPI.publish_service_capabilities.
+                assert_called_once_with(self.context, host='fake_host'))
+
+    def test_invalidate_share_types_cache(self):
+        self.mock_object(share_types, 'invalidate_cache')
+
+        self.manager.invalidate_share_types_cache(self.context)
+
+        share_types.invalidate_cache.assert_called_once_with()
 
     @mock.patch.object(db, 'share_update', mock.Mock())
     def test_create_share_exception_puts_share_in_error_state(self):
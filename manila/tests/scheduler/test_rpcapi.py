@@ -80,6 +80,23 @@ class SchedulerRpcAPITestCase(test.TestCase):
                                  capabilities='fake_capabilities',
                                  fanout=True)
 
+    def test_update_service_capabilities_delta(self):
+        self._test_scheduler_api('update_service_capabilities',
+                                 rpc_method='cast',
+                                 service_name='fake_name',
+                                 host='fake_host',
+                                 capabilities='fake_capabilities',
+                                 capabilities_seq=2,
+                                 capabilities_delta=True,
+                                 fanout=True,
+                                 version='1.7')
+
+    def test_invalidate_share_types_cache(self):
+        self._test_scheduler_api('invalidate_share_types_cache',
+                                 rpc_method='cast',
+                                 fanout=True,
+                                 version='1.8')
+
     def test_create_share_instance(self):
         self._test_scheduler_api('create_share_instance',
                                  rpc_method='cast',
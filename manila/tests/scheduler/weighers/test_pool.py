@@ -178,3 +178,22 @@ class PoolWeigherTestCase(test.TestCase):
         weighed_host = self._get_weighed_host(self._get_all_hosts(),
                                               weight_properties)
         self.assertEqual(0.0, weighed_host.weight)
+
+    def test_share_servers_loaded_once_per_backend(self):
+        weight_properties = {
+            'server_pools_mapping': {
+                'fake_server_id3': [{'pool_name': 'pool4a'}],
+            },
+        }
+        hosts = list(self._get_all_hosts())
+        weigher = pool.PoolWeigher()
+        weighed_objs = [base_host.WeighedHost(host, 0.0) for host in hosts]
+
+        weights = weigher.weigh_objects(weighed_objs, weight_properties)
+
+        backends = set(utils.extract_host(host.host) for host in hosts)
+        self.assertEqual(len(backends),
+                         db_api.share_server_get_all_by_host.call_count)
+        self.assertEqual(
+            [1 if host.host == 'host@DDD#pool4a' else 0 for host in hosts],
+            weights)
@@ -267,6 +267,60 @@ class GaneshaManagerTestCase(test.TestCase):
             'INDEX', test_index)
         self.assertIsNone(ret)
 
+    def test_read_index(self):
+        test_index = ('%include /fakedir0/export.d/fakefile.conf\n'
+                      '%include /fakedir0/export.d/fakefile2.conf\n')
+        self.mock_object(self._manager, 'execute',
+                         mock.Mock(return_value=(test_index, '')))
+
+        ret = self._manager._read_index()
+
+        index_path = '/fakedir0/export.d/INDEX.conf'
+        self._manager.execute.assert_called_once_with(
+            'sh', '-c', 'test ! -e %(path)s || cat %(path)s' %
+            {'path': index_path}, message='reading index')
+        self.assertEqual(set(['fakefile.conf', 'fakefile2.conf']), ret)
+
+    def test_update_index(self):
+        # Index changed by another process between the updates is re-read.
+        indexes = [
+            '%include /fakedir0/export.d/fakefile.conf\n',
+            '%include /fakedir0/export.d/fakefile.conf\n'
+            '%include /fakedir0/export.d/fakefile2.conf\n'
+            '%include /fakedir0/export.d/otherfile.conf\n',
+        ]
+        self.mock_object(self._manager, 'execute',
+                         mock.Mock(side_effect=[(i, '') for i in indexes]))
+        self.mock_object(self._manager, '_write_conf_file')
+
+        self._manager._update_index(add='fakefile2')
+        self._manager._update_index(remove='fakefile')
+
+        self.assertEqual(2, self._manager.execute.call_count)
+        self._manager._write_conf_file.assert_has_calls([
+            mock.call('INDEX', '%include /fakedir0/export.d/fakefile.conf\n'
+                               '%include /fakedir0/export.d/fakefile2.conf\n'),
+            mock.call('INDEX', '%include /fakedir0/export.d/fakefile2.conf\n'
+                               '%include /fakedir0/export.d/otherfile.conf\n'),
+        ])
+
+    def test_update_index_not_found(self):
+        self.mock_object(self._manager, 'execute',
+                         mock.Mock(return_value=('', '')))
+        self.mock_object(self._manager, '_write_conf_file')
+
+        self._manager._update_index(add='fakefile')
+
+        self._manager._write_conf_file.assert_called_once_with(
+            'INDEX', '%include /fakedir0/export.d/fakefile.conf\n')
+
+    def test_list_exports(self):
+        self.mock_object(self._manager, '_read_index', mock.Mock(
+            return_value=set(['fakefile2.conf', 'fakefile.conf'])))
+
+        self.assertEqual(['fakefile', 'fakefile2'],
+                         self._manager.list_exports())
+
     def test_read_export_file(self):
         test_args = ('cat', test_path)
         test_kwargs = {'message': 'reading export fakefile'}
@@ -348,22 +402,22 @@ class GaneshaManagerTestCase(test.TestCase):
         self.mock_object(self._manager, '_write_export_file',
                          mock.Mock(return_value=test_path))
         self.mock_object(self._manager, '_dbus_send_ganesha')
-        self.mock_object(self._manager, '_mkindex')
+        self.mock_object(self._manager, '_update_index')
         ret = self._manager.add_export(test_name, test_dict_str)
         self._manager._write_export_file.assert_called_once_with(
             test_name, test_dict_str)
         self._manager._dbus_send_ganesha.assert_called_once_with(
             'AddExport', 'string:' + test_path,
             'string:EXPORT(Export_Id=101)')
-        self._manager._mkindex.assert_called_once_with()
+        self._manager._update_index.assert_called_once_with(add=test_name)
         self.assertIsNone(ret)
 
-    def test_add_export_error_during_mkindex(self):
+    def test_add_export_error_during_update_index(self):
         self.mock_object(self._manager, '_write_export_file',
                          mock.Mock(return_value=test_path))
         self.mock_object(self._manager, '_dbus_send_ganesha')
         self.mock_object(
-            self._manager, '_mkindex',
+            self._manager, '_update_index',
             mock.Mock(side_effect=exception.GaneshaCommandFailure))
         self.mock_object(self._manager, '_rm_export_file')
         self.mock_object(self._manager, '_remove_export_dbus')
@@ -374,7 +428,7 @@ class GaneshaManagerTestCase(test.TestCase):
         self._manager._dbus_send_ganesha.assert_called_once_with(
             'AddExport', 'string:' + test_path,
             'string:EXPORT(Export_Id=101)')
-        self._manager._mkindex.assert_called_once_with()
+        self._manager._update_index.assert_called_once_with(add=test_name)
         self._manager._rm_export_file.assert_called_once_with(test_name)
         self._manager._remove_export_dbus.assert_called_once_with(
             test_export_id)
@@ -384,7 +438,7 @@ class GaneshaManagerTestCase(test.TestCase):
             self._manager, '_write_export_file',
             mock.Mock(side_effect=exception.GaneshaCommandFailure))
         self.mock_object(self._manager, '_dbus_send_ganesha')
-        self.mock_object(self._manager, '_mkindex')
+        self.mock_object(self._manager, '_update_index')
         self.mock_object(self._manager, '_rm_export_file')
         self.mock_object(self._manager, '_remove_export_dbus')
         self.assertRaises(exception.GaneshaCommandFailure,
@@ -392,7 +446,7 @@ class GaneshaManagerTestCase(test.TestCase):
         self._manager._write_export_file.assert_called_once_with(
             test_name, test_dict_str)
         self.assertFalse(self._manager._dbus_send_ganesha.called)
-        self._manager._mkindex.assert_called_once_with()
+        self.assertFalse(self._manager._update_index.called)
         self.assertFalse(self._manager._rm_export_file.called)
         self.assertFalse(self._manager._remove_export_dbus.called)
 
@@ -402,7 +456,7 @@ class GaneshaManagerTestCase(test.TestCase):
         self.mock_object(
             self._manager, '_dbus_send_ganesha',
             mock.Mock(side_effect=exception.GaneshaCommandFailure))
-        self.mock_object(self._manager, '_mkindex')
+        self.mock_object(self._manager, '_update_index')
         self.mock_object(self._manager, '_rm_export_file')
         self.mock_object(self._manager, '_remove_export_dbus')
         self.assertRaises(exception.GaneshaCommandFailure,
@@ -413,13 +467,13 @@ class GaneshaManagerTestCase(test.TestCase):
             'AddExport', 'string:' + test_path,
             'string:EXPORT(Export_Id=101)')
         self._manager._rm_export_file.assert_called_once_with(test_name)
-        self._manager._mkindex.assert_called_once_with()
+        self.assertFalse(self._manager._update_index.called)
         self.assertFalse(self._manager._remove_export_dbus.called)
 
     def test_remove_export(self):
         self.mock_object(self._manager, '_read_export_file',
                          mock.Mock(return_value=test_dict_unicode))
-        methods = ('_remove_export_dbus', '_rm_export_file', '_mkindex')
+        methods = ('_remove_export_dbus', '_rm_export_file', '_update_index')
         for method in methods:
             self.mock_object(self._manager, method)
         ret = self._manager.remove_export(test_name)
@@ -427,14 +481,15 @@ class GaneshaManagerTestCase(test.TestCase):
         self._manager._remove_export_dbus.assert_called_once_with(
             test_dict_unicode['EXPORT']['Export_Id'])
         self._manager._rm_export_file.assert_called_once_with(test_name)
-        self._manager._mkindex.assert_called_once_with()
+        self._manager._update_index.assert_called_once_with(
+            remove=test_name)
         self.assertIsNone(ret)
 
     def test_remove_export_error_during_read_export_file(self):
         self.mock_object(
             self._manager, '_read_export_file',
             mock.Mock(side_effect=exception.GaneshaCommandFailure))
-        methods = ('_remove_export_dbus', '_rm_export_file', '_mkindex')
+        methods = ('_remove_export_dbus', '_rm_export_file', '_update_index')
         for method in methods:
             self.mock_object(self._manager, method)
         self.assertRaises(exception.GaneshaCommandFailure,
@@ -442,7 +497,8 @@ class GaneshaManagerTestCase(test.TestCase):
         self._manager._read_export_file.assert_called_once_with(test_name)
         self.assertFalse(self._manager._remove_export_dbus.called)
         self._manager._rm_export_file.assert_called_once_with(test_name)
-        self._manager._mkindex.assert_called_once_with()
+        self._manager._update_index.assert_called_once_with(
+            remove=test_name)
 
     def test_remove_export_error_during_remove_export_dbus(self):
         self.mock_object(self._manager, '_read_export_file',
@@ -450,7 +506,7 @@ class GaneshaManagerTestCase(test.TestCase):
         self.mock_object(
             self._manager, '_remove_export_dbus',
             mock.Mock(side_effect=exception.GaneshaCommandFailure))
-        methods = ('_rm_export_file', '_mkindex')
+        methods = ('_rm_export_file', '_update_index')
         for method in methods:
             self.mock_object(self._manager, method)
         self.assertRaises(exception.GaneshaCommandFailure,
@@ -459,7 +515,116 @@ class GaneshaManagerTestCase(test.TestCase):
         self._manager._remove_export_dbus.assert_called_once_with(
             test_dict_unicode['EXPORT']['Export_Id'])
         self._manager._rm_export_file.assert_called_once_with(test_name)
-        self._manager._mkindex.assert_called_once_with()
+        self._manager._update_index.assert_called_once_with(
+            remove=test_name)
+
+    def test_get_export(self):
+        self.mock_object(self._manager, 'execute',
+                         mock.Mock(return_value=(test_ganesha_cnf, '')))
+
+        ret = self._manager.get_export(test_name)
+        ret['EXPORT']['Export_Id'] = 102
+        ret2 = self._manager.get_export(test_name)
+
+        self._manager.execute.assert_called_once_with(
+            'sh', '-c', 'test ! -e %(path)s || cat %(path)s' %
+            {'path': test_path}, message='reading export ' + test_name)
+        self.assertEqual(test_dict_unicode, ret2)
+
+    def test_get_export_not_found(self):
+        self.mock_object(self._manager, 'execute',
+                         mock.Mock(return_value=('', '')))
+
+        self.assertIsNone(self._manager.get_export(test_name))
+        self.assertNotIn(test_name, self._manager._exports)
+
+    def test_update_export_new(self):
+        self.mock_object(self._manager, 'get_export',
+                         mock.Mock(return_value=None))
+        self.mock_object(self._manager, '_write_export_file',
+                         mock.Mock(return_value=test_path))
+        self.mock_object(self._manager, '_dbus_send_ganesha')
+        self.mock_object(self._manager, '_update_index')
+
+        self._manager.update_export(test_name, test_dict_str)
+
+        self._manager._write_export_file.assert_called_once_with(
+            test_name, test_dict_str)
+        self._manager._dbus_send_ganesha.assert_called_once_with(
+            'AddExport', 'string:' + test_path,
+            'string:EXPORT(Export_Id=101)')
+        self._manager._update_index.assert_called_once_with(add=test_name)
+        self.assertEqual(test_dict_str, self._manager._exports[test_name])
+
+    def test_update_export_existing(self):
+        self._manager._exports[test_name] = test_dict_unicode
+        self.mock_object(self._manager, '_write_export_file',
+                         mock.Mock(return_value=test_path))
+        self.mock_object(self._manager, '_dbus_send_ganesha')
+        self.mock_object(self._manager, '_update_index')
+
+        self._manager.update_export(test_name, test_dict_str)
+
+        self._manager._dbus_send_ganesha.assert_called_once_with(
+            'UpdateExport', 'string:' + test_path,
+            'string:EXPORT(Export_Id=101)')
+        self.assertFalse(self._manager._update_index.called)
+        self.assertEqual(test_dict_str, self._manager._exports[test_name])
+
+    def test_update_export_error_during_dbus_send_ganesha(self):
+        self.mock_object(self._manager, 'get_export',
+                         mock.Mock(return_value=None))
+        self.mock_object(self._manager, '_write_export_file',
+                         mock.Mock(return_value=test_path))
+        self.mock_object(
+            self._manager, '_dbus_send_ganesha',
+            mock.Mock(side_effect=exception.GaneshaCommandFailure))
+        self.mock_object(self._manager, '_rm_export_file')
+        self.mock_object(self._manager, '_update_index')
+
+        self.assertRaises(exception.GaneshaCommandFailure,
+                          self._manager.update_export, test_name,
+                          test_dict_str)
+
+        self._manager._rm_export_file.assert_called_once_with(test_name)
+        self.assertFalse(self._manager._update_index.called)
+        self.assertNotIn(test_name, self._manager._exports)
+
+    def test_remove_export_cached(self):
+        self._manager._exports[test_name] = test_dict_unicode
+        methods = ('_read_export_file', '_remove_export_dbus',
+                   '_rm_export_file', '_update_index')
+        for method in methods:
+            self.mock_object(self._manager, method)
+
+        self._manager.remove_export(test_name)
+
+        self.assertFalse(self._manager._read_export_file.called)
+        self._manager._remove_export_dbus.assert_called_once_with(101)
+        self.assertNotIn(test_name, self._manager._exports)
+
+    def test_allocate_export_id(self):
+        self.mock_object(self._manager, 'get_export_id',
+                         mock.Mock(side_effect=[116, 132]))
+
+        ids = [self._manager.allocate_export_id()
+               for i in range(manager.EXPORT_ID_BLOCK_SIZE + 1)]
+
+        self.assertEqual(list(range(101, 118)), ids)
+        self._manager.get_export_id.assert_has_calls([
+            mock.call(count=manager.EXPORT_ID_BLOCK_SIZE),
+            mock.call(count=manager.EXPORT_ID_BLOCK_SIZE)])
+
+    def test_get_export_id_count(self):
+        self.mock_object(self._manager, 'execute',
+                         mock.Mock(return_value=('exportid|116', '')))
+        ret = self._manager.get_export_id(count=16)
+        self._manager.execute.assert_called_once_with(
+            'sqlite3', self._manager.ganesha_db_path,
+            'update ganesha set value = value + 16;'
+            'select * from ganesha where key = "exportid";',
+            run_as_root=False)
+        self.assertEqual(116, ret)
 
     def test_get_export_id(self):
         self.mock_object(self._manager, 'execute',
@@ -25,6 +25,7 @@ import xml.dom.minidom
 import ddt
 import mock
 from oslo_serialization import jsonutils
+import requests
 
 from manila import context
 from manila.data import utils as data_utils
@@ -396,7 +397,7 @@ class FakeHuaweiNasHelper(helper.RestHelper):
                     data = """{"error":{"code":0},"data":{
                          "ID":"10"}}"""
 
-            if url == "/NFSHARE?range=[100-200]":
+            if url.startswith("/NFSHARE?filter=SHAREPATH::"):
                 if self.share_exist:
                     data = """{"error":{"code":0},
                         "data":[{"ID":"1",
@@ -418,27 +419,13 @@ class FakeHuaweiNasHelper(helper.RestHelper):
                         "NAME":"test",
                         "SHAREPATH":"/share_fake_uuid_fail/"}]}"""
 
-            if url == "/CIFSHARE?range=[100-200]":
+            if url.startswith("/CIFSHARE?filter=SHAREPATH::"):
                 data = """{"error":{"code":0},
                     "data":[{"ID":"2",
                     "FSID":"4",
                     "NAME":"test",
                     "SHAREPATH":"/share_fake_uuid/"}]}"""
 
-            if url == "/NFSHARE?range=[0-100]":
-                data = """{"error":{"code":0},
-                    "data":[{"ID":"1",
-                    "FSID":"4",
-                    "NAME":"test_fail",
-                    "SHAREPATH":"/share_fake_uuid_fail/"}]}"""
-
-            if url == "/CIFSHARE?range=[0-100]":
-                data = """{"error":{"code":0},
-                    "data":[{"ID":"2",
-                    "FSID":"4",
-                    "NAME":"test_fail",
-                    "SHAREPATH":"/share_fake_uuid_fail/"}]}"""
-
             if url == "/NFSHARE/1" or url == "/CIFSHARE/2":
                 data = """{"error":{"code":0}}"""
                 self.delete_flag = True
@@ -528,10 +515,6 @@ class FakeHuaweiNasHelper(helper.RestHelper):
                     data = """{"error":{"code":0}}"""
                     self.allow_rw_flagg = True
 
-            if url == "/NFSHARE/count" or url == "/CIFSHARE/count":
-                data = """{"error":{"code":0},"data":{
-                            "COUNT":"196"}}"""
-
             if url == "/NFS_SHARE_AUTH_CLIENT/count?filter=PARENTID::1"\
                       or url == "/CIFS_SHARE_AUTH_CLIENT/count?filter="\
                       "PARENTID::2":
@@ -559,7 +542,7 @@ class FakeHuaweiNasHelper(helper.RestHelper):
                     "SUPPORTV4":"true"}}"""
                 self.setupserver_flag = True
 
-            if url == "/FILESYSTEM?range=[0-8191]":
+            if url.startswith("/FILESYSTEM?filter=NAME::"):
                 data = """{"error":{"code":0},
                 "data":[{"ID":"4",
                 "NAME":"share_fake_uuid"}]}"""
@@ -2327,6 +2310,104 @@ class HuaweiShareDriverTestCase(test.TestCase):
         self.assertTrue(self.driver.plugin.helper.allow_flag)
         self.assertTrue(self.driver.plugin.helper.allow_rw_flag)
 
+    def test_get_share_by_name_cached(self):
+        rest_helper = self.driver.plugin.helper
+        self.mock_object(rest_helper, 'call',
+                         mock.Mock(side_effect=rest_helper.call))
+
+        share = rest_helper._get_share_by_name('share-fake-uuid', 'NFSHARE')
+        cached_share = rest_helper._get_share_by_name('share-fake-uuid',
+                                                      'NFSHARE')
+        rest_helper._delete_share_by_id(share['ID'], 'NFSHARE')
+        rest_helper._get_share_by_name('share-fake-uuid', 'NFSHARE')
+
+        self.assertEqual({'ID': '1', 'FSID': '4'}, share)
+        self.assertEqual(share, cached_share)
+        rest_helper.call.assert_has_calls([
+            mock.call('/NFSHARE?filter=SHAREPATH::/share_fake_uuid/'
+                      '&range=[0-100]', None, 'GET'),
+            mock.call('/NFSHARE/1', None, 'DELETE'),
+            mock.call('/NFSHARE?filter=SHAREPATH::/share_fake_uuid/'
+                      '&range=[0-100]', None, 'GET'),
+        ])
+        self.assertEqual(3, rest_helper.call.call_count)
+
+    def test_get_share_by_name_not_found_not_cached(self):
+        rest_helper = self.driver.plugin.helper
+        rest_helper.share_exist = False
+        self.mock_object(rest_helper, 'call',
+                         mock.Mock(side_effect=rest_helper.call))
+
+        self.assertEqual({}, rest_helper._get_share_by_name(
+            'share-fake-uuid', 'NFSHARE'))
+        self.assertEqual({}, rest_helper._get_share_by_name(
+            'share-fake-uuid', 'NFSHARE'))
+        self.assertEqual(2, rest_helper.call.call_count)
+
+    def test_get_fsid_by_name_cached(self):
+        rest_helper = self.driver.plugin.helper
+        self.mock_object(rest_helper, 'call',
+                         mock.Mock(side_effect=rest_helper.call))
+
+        self.assertEqual('4', rest_helper._get_fsid_by_name('share-fake-uuid'))
+        self.assertEqual('4', rest_helper._get_fsid_by_name('share-fake-uuid'))
+
+        rest_helper.call.assert_called_once_with(
+            '/FILESYSTEM?filter=NAME::share_fake_uuid&range=[0-100]',
+            None, 'GET')
+
+    def test_get_access_from_share_cached(self):
+        rest_helper = self.driver.plugin.helper
+        self.mock_object(rest_helper, 'call',
+                         mock.Mock(side_effect=rest_helper.call))
+
+        access_id = rest_helper._get_access_from_share('1', '100.112.0.2',
+                                                       'NFS')
+        other_access_id = rest_helper._get_access_from_share(
+            '1', '100.112.0.1_fail', 'NFS')
+        rest_helper._remove_access_from_share(access_id, 'NFS')
+        rest_helper._get_access_from_share('1', '100.112.0.2', 'NFS')
+
+        self.assertEqual('5', access_id)
+        self.assertEqual('0', other_access_id)
+        # Count and two pages for each scan of accesses and one delete.
+        self.assertEqual(7, rest_helper.call.call_count)
+
+    def test_do_call_reuses_session(self):
+        rest_helper = helper.RestHelper(self.configuration)
+        response = mock.Mock(content=b'{"error":{"code":0}}')
+        self.mock_object(rest_helper.session, 'request',
+                         mock.Mock(return_value=response))
+
+        rest_helper.do_call('http://fake/rest/filesystem', '{}')
+        result = rest_helper.do_call('http://fake/rest/filesystem/4',
+                                     method='DELETE')
+
+        self.assertEqual({"error": {"code": 0}}, result)
+        rest_helper.session.request.assert_has_calls([
+            mock.call('POST', 'http://fake/rest/filesystem', data='{}',
+                      headers=rest_helper.headers,
+                      timeout=constants.SOCKET_TIMEOUT),
+            mock.call('DELETE', 'http://fake/rest/filesystem/4', data=None,
+                      headers=rest_helper.headers,
+                      timeout=constants.SOCKET_TIMEOUT),
+        ])
+
+    def test_do_call_bad_response(self):
+        rest_helper = helper.RestHelper(self.configuration)
+        response = mock.Mock()
+        response.raise_for_status.side_effect = requests.HTTPError
+        self.mock_object(rest_helper.session, 'request',
+                         mock.Mock(return_value=response))
+
+        result = rest_helper.do_call('http://fake/rest/filesystem')
+
+        self.assertEqual(constants.ERROR_CONNECT_TO_SERVER,
+                         result['error']['code'])
+        rest_helper.session.request.assert_called_once_with(
+            'GET', 'http://fake/rest/filesystem', data=None,
+            headers=rest_helper.headers, timeout=constants.SOCKET_TIMEOUT)
+
     def test_allow_access_ip_ro_success(self):
         access_ro = {
             'access_type': 'ip',
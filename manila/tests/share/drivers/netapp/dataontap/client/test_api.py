@@ -20,7 +20,7 @@ Tests for NetApp API layer
 """
 import ddt
 import mock
-from six.moves import urllib
+import requests
 
 from manila import exception
 from manila.share.drivers.netapp.dataontap.client import api
@@ -174,32 +174,33 @@ class NetAppApiServerTests(test.TestCase):
 
         self.assertRaises(ValueError, self.root.invoke_elem, na_element)
 
-    def test_invoke_elem_http_error(self):
-        """Tests handling of HTTPError"""
-        na_element = fake.FAKE_NA_ELEMENT
+    def _mock_post(self, **kwargs):
         self.mock_object(self.root, '_create_request', mock.Mock(
             return_value=('abc', fake.FAKE_NA_ELEMENT)))
         self.mock_object(api, 'LOG')
-        self.root._opener = fake.FAKE_HTTP_OPENER
-        self.mock_object(self.root, '_build_opener')
-        self.mock_object(self.root._opener, 'open', mock.Mock(
-            side_effect=urllib.error.HTTPError(url='', hdrs='',
-                                               fp=None, code='401',
-                                               msg='httperror')))
-
-        self.assertRaises(api.NaApiError, self.root.invoke_elem,
-                          na_element)
+        pool = api.ConnectionPool()
+        self.mock_object(api, 'get_connection_pool',
+                         mock.Mock(return_value=pool))
+        return self.mock_object(pool.session, 'post', mock.Mock(**kwargs))
 
-    def test_invoke_elem_urlerror(self):
-        """Tests handling of URLError"""
+    def test_invoke_elem_http_error(self):
+        """Tests handling of HTTPError"""
         na_element = fake.FAKE_NA_ELEMENT
-        self.mock_object(self.root, '_create_request', mock.Mock(
-            return_value=('abc', fake.FAKE_NA_ELEMENT)))
-        self.mock_object(api, 'LOG')
-        self.root._opener = fake.FAKE_HTTP_OPENER
-        self.mock_object(self.root, '_build_opener')
-        self.mock_object(self.root._opener, 'open', mock.Mock(
-            side_effect=urllib.error.URLError(reason='urlerror')))
+        response = mock.Mock(status_code=401, reason='httperror')
+        response.raise_for_status.side_effect = requests.HTTPError(
+            response=response)
+        self._mock_post(return_value=response)
+
+        result = self.assertRaises(api.NaApiError, self.root.invoke_elem,
+                                   na_element)
+        self.assertEqual(401, result.code)
+        self.assertEqual('httperror', result.message)
+
+    @ddt.data(requests.ConnectionError, requests.Timeout)
+    def test_invoke_elem_connection_error(self, side_effect):
+        """Tests handling of connection errors"""
+        na_element = fake.FAKE_NA_ELEMENT
+        self._mock_post(side_effect=side_effect)
 
         self.assertRaises(exception.StorageCommunicationException,
                           self.root.invoke_elem,
@@ -208,13 +209,7 @@ class NetAppApiServerTests(test.TestCase):
     def test_invoke_elem_unknown_exception(self):
         """Tests handling of Unknown Exception"""
         na_element = fake.FAKE_NA_ELEMENT
-        self.mock_object(self.root, '_create_request', mock.Mock(
-            return_value=('abc', fake.FAKE_NA_ELEMENT)))
-        self.mock_object(api, 'LOG')
-        self.root._opener = fake.FAKE_HTTP_OPENER
-        self.mock_object(self.root, '_build_opener')
-        self.mock_object(self.root._opener, 'open', mock.Mock(
-            side_effect=Exception))
+        self._mock_post(side_effect=Exception)
 
         exception = self.assertRaises(api.NaApiError, self.root.invoke_elem,
                                       na_element)
@@ -224,17 +219,109 @@ class NetAppApiServerTests(test.TestCase):
         """Tests the method invoke_elem with valid parameters"""
         na_element = fake.FAKE_NA_ELEMENT
         self.root._trace = True
-        self.mock_object(self.root, '_create_request', mock.Mock(
-            return_value=('abc', fake.FAKE_NA_ELEMENT)))
-        self.mock_object(api, 'LOG')
-        self.root._opener = fake.FAKE_HTTP_OPENER
-        self.mock_object(self.root, '_build_opener')
+        self.root.set_timeout(30)
+        mock_post = self._mock_post()
         self.mock_object(self.root, '_get_result', mock.Mock(
             return_value=fake.FAKE_NA_ELEMENT))
-        opener_mock = self.mock_object(
-            self.root._opener, 'open', mock.Mock())
-        opener_mock.read.side_effect = ['resp1', 'resp2']
 
         self.root.invoke_elem(na_element)
 
         self.assertEqual(2, api.LOG.debug.call_count)
+        mock_post.assert_called_once_with(
+            'http://127.0.0.1:80/' + api.NaServer.URL_FILER, data='abc',
+            auth=(None, None), timeout=30,
+            headers={'Content-Type': 'text/xml', 'charset': 'utf-8'})
+        self.root._get_result.assert_called_once_with(
+            mock_post.return_value.content)
+        stats = self.root.get_api_stats()
+        self.assertEqual(1, stats[na_element.get_name()]['calls'])
+
+    def test_invoke_elem_reuses_pool(self):
+        """Tests that the connection pool is only looked up once"""
+        na_element = fake.FAKE_NA_ELEMENT
+        self._mock_post()
+        self.mock_object(self.root, '_get_result', mock.Mock(
+            return_value=fake.FAKE_NA_ELEMENT))
+
+        self.root.invoke_elem(na_element)
+        self.root.invoke_elem(na_element)
+
+        api.get_connection_pool.assert_called_once_with(
+            'http', '127.0.0.1', '80', api.DEFAULT_MAX_CONNECTIONS)
+        self.assertEqual(
+            2, self.root.get_api_stats()[na_element.get_name()]['calls'])
+
+    def test_invoke_elem_certificate_auth(self):
+        self.root.set_style(api.NaServer.STYLE_CERTIFICATE)
+        self._mock_post()
+
+        self.assertRaises(NotImplementedError, self.root.invoke_elem,
+                          fake.FAKE_NA_ELEMENT)
+
+    def test_get_api_stats_no_calls(self):
+        self.assertEqual({}, self.root.get_api_stats())
+
+
+class NetAppApiConnectionPoolTests(test.TestCase):
+    """Test case for the shared NetApp API connection pools."""
+
+    def setUp(self):
+        super(NetAppApiConnectionPoolTests, self).setUp()
+        patcher = mock.patch.dict(api._connection_pools, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_connection_pool(self):
+        pool1 = api.get_connection_pool('https', '127.0.0.1', 443)
+        pool2 = api.get_connection_pool('https', '127.0.0.1', '443')
+        pool3 = api.get_connection_pool('https', '127.0.0.2', 443)
+        pool4 = api.get_connection_pool('https', '127.0.0.1', 443,
+                                        max_connections=2)
+
+        self.assertIs(pool1, pool2)
+        self.assertIsNot(pool1, pool3)
+        self.assertIsNot(pool1, pool4)
+        self.assertEqual(2, pool4.max_connections)
+
+    def test_connection_pool_shared_by_vserver_clients(self):
+        cluster_client = api.NaServer('127.0.0.1', username='admin',
+                                      password='pass')
+        vserver_client = api.NaServer('127.0.0.1', username='admin',
+                                      password='pass')
+        vserver_client.set_api_version(1, 20)
+        vserver_client.set_vserver('fake_vserver')
+        for client in (cluster_client, vserver_client):
+            self.mock_object(client, '_get_result', mock.Mock(
+                return_value=fake.FAKE_NA_ELEMENT))
+        pool = api.get_connection_pool('http', '127.0.0.1', '80')
+        self.mock_object(pool.session, 'post')
+
+        cluster_client.invoke_elem(fake.FAKE_NA_ELEMENT)
+        vserver_client.invoke_elem(fake.FAKE_NA_ELEMENT,
+                                   enable_tunneling=True)
+
+        self.assertEqual(2, pool.session.post.call_count)
+        self.assertEqual(1, len(api._connection_pools))
+
+    def test_connection_pool_bounds_connections(self):
+        pool = api.ConnectionPool(max_connections=3)
+
+        adapter = pool.session.get_adapter('https://127.0.0.1')
+        self.assertEqual(3, adapter._pool_maxsize)
+        self.assertTrue(adapter._pool_block)
+        self.assertIs(adapter, pool.session.get_adapter('http://127.0.0.1'))
+
+    def test_record_call(self):
+        pool = api.ConnectionPool()
+
+        pool.record_call('volume-get-iter', 0.5)
+        pool.record_call('volume-get-iter', 1.5)
+        pool.record_call('system-get-version', 0.1)
+
+        expected = {
+            'volume-get-iter': {
+                'calls': 2, 'total_time': 2.0, 'max_time': 1.5},
+            'system-get-version': {
+                'calls': 1, 'total_time': 0.1, 'max_time': 0.1},
+        }
+        self.assertEqual(expected, pool.get_stats())
@@ -130,9 +130,12 @@ class NetAppClientCmodeTestCase(test.TestCase):
     def test_send_iter_request(self):
 
         api_responses = [
-            netapp_api.NaElement(fake.STORAGE_DISK_GET_ITER_RESPONSE_PAGE_1),
-            netapp_api.NaElement(fake.STORAGE_DISK_GET_ITER_RESPONSE_PAGE_2),
-            netapp_api.NaElement(fake.STORAGE_DISK_GET_ITER_RESPONSE_PAGE_3),
+            netapp_api.NaElement(
+                copy.deepcopy(fake.STORAGE_DISK_GET_ITER_RESPONSE_PAGE_1)),
+            netapp_api.NaElement(
+                copy.deepcopy(fake.STORAGE_DISK_GET_ITER_RESPONSE_PAGE_2)),
+            netapp_api.NaElement(
+                copy.deepcopy(fake.STORAGE_DISK_GET_ITER_RESPONSE_PAGE_3)),
         ]
         mock_send_request = self.mock_object(
             self.client, 'send_request',
@@ -229,6 +232,67 @@ class NetAppClientCmodeTestCase(test.TestCase):
                           self.client.send_iter_request,
                           'storage-disk-get-iter')
 
+    def test_send_iter_request_records(self):
+
+        api_responses = [
+            netapp_api.NaElement(
+                copy.deepcopy(fake.STORAGE_DISK_GET_ITER_RESPONSE_PAGE_1)),
+            netapp_api.NaElement(
+                copy.deepcopy(fake.STORAGE_DISK_GET_ITER_RESPONSE_PAGE_2)),
+            netapp_api.NaElement(
+                copy.deepcopy(fake.STORAGE_DISK_GET_ITER_RESPONSE_PAGE_3)),
+        ]
+        mock_send_request = self.mock_object(
+            self.client, 'send_request',
+            mock.Mock(side_effect=api_responses))
+
+        result = self.client.send_iter_request_records(
+            'storage-disk-get-iter', max_page_length=10)
+
+        # Pages are only requested as records are consumed
+        self.assertFalse(mock_send_request.called)
+        first_record = next(result)
+        self.assertEqual(1, mock_send_request.call_count)
+
+        disk_names = [first_record.get_child_content('disk-name')]
+        disk_names.extend(record.get_child_content('disk-name')
+                          for record in result)
+        self.assertEqual(28, len(disk_names))
+        self.assertEqual('cluster3-01:v4.16', disk_names[0])
+
+        mock_send_request.assert_has_calls([
+            mock.call('storage-disk-get-iter', {'max-records': 10}),
+            mock.call('storage-disk-get-iter',
+                      {'max-records': 10, 'tag': 'next_tag_1'}),
+            mock.call('storage-disk-get-iter',
+                      {'max-records': 10, 'tag': 'next_tag_2'}),
+        ])
+
+    def test_send_iter_request_records_not_found(self):
+
+        api_response = netapp_api.NaElement(fake.NO_RECORDS_RESPONSE)
+        self.mock_object(self.client,
+                         'send_request',
+                         mock.Mock(return_value=api_response))
+
+        result = self.client.send_iter_request_records(
+            'storage-disk-get-iter')
+
+        self.assertEqual([], list(result))
+
+    def test_send_iter_request_records_invalid(self):
+
+        api_response = netapp_api.NaElement(
+            fake.INVALID_GET_ITER_RESPONSE_NO_ATTRIBUTES)
+        self.mock_object(self.client,
+                         'send_request',
+                         mock.Mock(return_value=api_response))
+
+        result = self.client.send_iter_request_records(
+            'storage-disk-get-iter')
+
+        self.assertRaises(exception.NetAppException, list, result)
+
     def test_set_vserver(self):
         self.client.set_vserver(fake.VSERVER_NAME)
         self.client.connection.set_vserver.assert_has_calls(
@@ -517,13 +581,32 @@ class NetAppClientCmodeTestCase(test.TestCase):
 
         api_response = netapp_api.NaElement(fake.VOLUME_COUNT_RESPONSE)
         self.mock_object(self.client,
-                         'send_iter_request',
+                         'send_request',
                          mock.Mock(return_value=api_response))
 
         result = self.client.get_vserver_volume_count()
 
         self.assertEqual(2, result)
 
+    def test_get_vserver_volume_count_multiple_pages(self):
+
+        api_responses = [
+            netapp_api.NaElement(
+                copy.deepcopy(fake.STORAGE_DISK_GET_ITER_RESPONSE_PAGE_1)),
+            netapp_api.NaElement(
+                copy.deepcopy(fake.STORAGE_DISK_GET_ITER_RESPONSE_PAGE_2)),
+            netapp_api.NaElement(
+                copy.deepcopy(fake.STORAGE_DISK_GET_ITER_RESPONSE_PAGE_3)),
+        ]
+        self.mock_object(self.client,
+                         'send_request',
+                         mock.Mock(side_effect=api_responses))
+
+        result = self.client.get_vserver_volume_count()
+
+        self.assertEqual(28, result)
+        self.assertEqual(3, self.client.send_request.call_count)
+
     def test_delete_vserver_no_volumes(self):
 
         self.mock_object(self.client,
@@ -3027,13 +3110,14 @@ class NetAppClientCmodeTestCase(test.TestCase):
         api_response = netapp_api.NaElement(
             fake.VOLUME_GET_ITER_CLONE_CHILDREN_RESPONSE)
         self.mock_object(self.client,
-                         'send_iter_request',
+                         'send_request',
                          mock.Mock(return_value=api_response))
 
         result = self.client.get_clone_children_for_snapshot(
             fake.SHARE_NAME, fake.SNAPSHOT_NAME)
 
         volume_get_iter_args = {
+            'max-records': 50,
             'query': {
                 'volume-attributes': {
                     'volume-clone-attributes': {
@@ -3052,7 +3136,7 @@ class NetAppClientCmodeTestCase(test.TestCase):
                 },
             },
         }
-        self.client.send_iter_request.assert_has_calls([
+        self.client.send_request.assert_has_calls([
             mock.call('volume-get-iter', volume_get_iter_args)])
 
         expected = [
@@ -3065,7 +3149,7 @@ class NetAppClientCmodeTestCase(test.TestCase):
 
         api_response = netapp_api.NaElement(fake.NO_RECORDS_RESPONSE)
         self.mock_object(self.client,
-                         'send_iter_request',
+                         'send_request',
                          mock.Mock(return_value=api_response))
 
         result = self.client.get_clone_children_for_snapshot(
@@ -3475,12 +3559,13 @@ class NetAppClientCmodeTestCase(test.TestCase):
         api_response = netapp_api.NaElement(
             fake.SNAPSHOT_GET_ITER_DELETED_RESPONSE)
         self.mock_object(self.client,
-                         'send_iter_request',
+                         'send_request',
                          mock.Mock(return_value=api_response))
 
         result = self.client._get_deleted_snapshots()
 
         snapshot_get_iter_args = {
+            'max-records': 50,
             'query': {
                 'snapshot-info': {
                     'name': 'deleted_manila_*',
@@ -3495,7 +3580,7 @@ class NetAppClientCmodeTestCase(test.TestCase):
                 },
             },
         }
-        self.client.send_iter_request.assert_has_calls([
+        self.client.send_request.assert_has_calls([
             mock.call('snapshot-get-iter', snapshot_get_iter_args)])
 
         expected = {
@@ -3587,12 +3672,13 @@ class NetAppClientCmodeTestCase(test.TestCase):
         api_response = netapp_api.NaElement(
             fake.CIFS_SHARE_ACCESS_CONTROL_GET_ITER)
         self.mock_object(self.client,
-                         'send_iter_request',
+                         'send_request',
                          mock.Mock(return_value=api_response))
 
         result = self.client.get_cifs_share_access(fake.SHARE_NAME)
 
         cifs_share_access_control_get_iter_args = {
+            'max-records': 50,
             'query': {
                 'cifs-share-access-control': {
                     'share': fake.SHARE_NAME,
@@ -3605,7 +3691,7 @@ class NetAppClientCmodeTestCase(test.TestCase):
                 },
             },
         }
-        self.client.send_iter_request.assert_has_calls([
+        self.client.send_request.assert_has_calls([
             mock.call('cifs-share-access-control-get-iter',
                       cifs_share_access_control_get_iter_args)])
 
@@ -3621,7 +3707,7 @@ class NetAppClientCmodeTestCase(test.TestCase):
 
         api_response = netapp_api.NaElement(fake.NO_RECORDS_RESPONSE)
         self.mock_object(self.client,
-                         'send_iter_request',
+                         'send_request',
                          mock.Mock(return_value=api_response))
 
         result = self.client.get_cifs_share_access(fake.SHARE_NAME)
@@ -3823,13 +3909,14 @@ class NetAppClientCmodeTestCase(test.TestCase):
 
         api_response = netapp_api.NaElement(fake.EXPORT_RULE_GET_ITER_RESPONSE)
         self.mock_object(self.client,
-                         'send_iter_request',
+                         'send_request',
                          mock.Mock(return_value=api_response))
 
         result = self.client._get_nfs_export_rule_indices(
             fake.EXPORT_POLICY_NAME, fake.IP_ADDRESS)
 
         export_rule_get_iter_args = {
+            'max-records': 50,
             'query': {
                 'export-rule-info': {
                     'policy-name': fake.EXPORT_POLICY_NAME,
@@ -3846,7 +3933,7 @@ class NetAppClientCmodeTestCase(test.TestCase):
             },
         }
         self.assertListEqual(['1', '3'], result)
-        self.client.send_iter_request.assert_has_calls([
+        self.client.send_request.assert_has_calls([
             mock.call('export-rule-get-iter', export_rule_get_iter_args)])
 
     def test_remove_nfs_export_rule(self):
@@ -4119,12 +4206,13 @@ class NetAppClientCmodeTestCase(test.TestCase):
         api_response = netapp_api.NaElement(
             fake.DELETED_EXPORT_POLICY_GET_ITER_RESPONSE)
         self.mock_object(self.client,
-                         'send_iter_request',
+                         'send_request',
                          mock.Mock(return_value=api_response))
 
         result = self.client._get_deleted_nfs_export_policies()
 
         export_policy_get_iter_args = {
+            'max-records': 50,
             'query': {
                 'export-policy-info': {
                     'policy-name': 'deleted_manila_*',
@@ -4138,7 +4226,7 @@ class NetAppClientCmodeTestCase(test.TestCase):
             },
         }
         self.assertSequenceEqual(fake.DELETED_EXPORT_POLICIES, result)
-        self.client.send_iter_request.assert_has_calls([
+        self.client.send_request.assert_has_calls([
             mock.call('export-policy-get-iter', export_policy_get_iter_args)])
 
     def test_get_ems_log_destination_vserver(self):
@@ -4956,7 +5044,7 @@ class NetAppClientCmodeTestCase(test.TestCase):
 
         api_response = netapp_api.NaElement(fake.SNAPMIRROR_GET_ITER_RESPONSE)
         self.mock_object(self.client,
-                         'send_iter_request',
+                         'send_request',
                          mock.Mock(return_value=api_response))
 
         desired_attributes = {
@@ -4973,8 +5061,10 @@ class NetAppClientCmodeTestCase(test.TestCase):
             fake.SM_SOURCE_VSERVER, fake.SM_SOURCE_VOLUME,
             fake.SM_DEST_VSERVER, fake.SM_DEST_VOLUME,
             desired_attributes=desired_attributes)
+        result = list(result)
 
         snapmirror_get_iter_args = {
+            'max-records': 50,
             'query': {
                 'snapmirror-info': {
                     'source-vserver': fake.SM_SOURCE_VSERVER,
@@ -4993,7 +5083,7 @@ class NetAppClientCmodeTestCase(test.TestCase):
                 },
             },
         }
-        self.client.send_iter_request.assert_has_calls([
+        self.client.send_request.assert_has_calls([
             mock.call('snapmirror-get-iter', snapmirror_get_iter_args)])
         self.assertEqual(1, len(result))
 
@@ -5001,13 +5091,13 @@ class NetAppClientCmodeTestCase(test.TestCase):
 
         api_response = netapp_api.NaElement(fake.NO_RECORDS_RESPONSE)
         self.mock_object(self.client,
-                         'send_iter_request',
+                         'send_request',
                          mock.Mock(return_value=api_response))
 
-        result = self.client._get_snapmirrors()
+        result = list(self.client._get_snapmirrors())
 
-        self.client.send_iter_request.assert_has_calls([
-            mock.call('snapmirror-get-iter', {})])
+        self.client.send_request.assert_has_calls([
+            mock.call('snapmirror-get-iter', {'max-records': 50})])
 
         self.assertEqual([], result)
 
@@ -5016,7 +5106,7 @@ class NetAppClientCmodeTestCase(test.TestCase):
         api_response = netapp_api.NaElement(
             fake.SNAPMIRROR_GET_ITER_FILTERED_RESPONSE)
         self.mock_object(self.client,
-                         'send_iter_request',
+                         'send_request',
                          mock.Mock(return_value=api_response))
 
         desired_attributes = ['source-vserver', 'source-volume',
@@ -5029,6 +5119,7 @@ class NetAppClientCmodeTestCase(test.TestCase):
             desired_attributes=desired_attributes)
 
         snapmirror_get_iter_args = {
+            'max-records': 50,
             'query': {
                 'snapmirror-info': {
                     'source-vserver': fake.SM_SOURCE_VSERVER,
@@ -5060,7 +5151,7 @@ class NetAppClientCmodeTestCase(test.TestCase):
             'schedule': 'daily',
         }]
 
-        self.client.send_iter_request.assert_has_calls([
+        self.client.send_request.assert_has_calls([
             mock.call('snapmirror-get-iter', snapmirror_get_iter_args)])
         self.assertEqual(expected, result)
 
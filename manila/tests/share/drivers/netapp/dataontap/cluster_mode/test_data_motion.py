@@ -74,7 +74,7 @@ class NetAppCDOTDataMotionTestCase(test.TestCase):
         self.mock_cmode_client.assert_called_once_with(
             hostname='fake_hostname', password='fake_password',
             username='fake_user', transport_type='https', port=8866,
-            trace=mock.ANY, vserver=None)
+            max_connections=10, trace=mock.ANY, vserver=None)
 
     def test_get_client_for_backend_with_vserver(self):
         self.mock_object(data_motion, "get_backend_configuration",
@@ -88,7 +88,7 @@ class NetAppCDOTDataMotionTestCase(test.TestCase):
         self.mock_cmode_client.assert_called_once_with(
             hostname='fake_hostname', password='fake_password',
             username='fake_user', transport_type='https', port=8866,
-            trace=mock.ANY, vserver='fake_vserver')
+            max_connections=10, trace=mock.ANY, vserver='fake_vserver')
 
     def test_get_config_for_backend(self):
         self.mock_object(data_motion, "CONF")
@@ -286,6 +286,105 @@ class GaneshaNASHelperTestCase(test.TestCase):
         self.assertFalse(self._helper.ganesha.reset_exports.called)
         self.assertFalse(self._helper.ganesha.restart_service.called)
 
+    def _fake_share_export(self, clients, export_id=101):
+        return {
+            'key': 'value',
+            'EXPORT': {
+                'Export_Id': export_id,
+                'Path': '/fakepath/fakename',
+                'Pseudo': '/fakepath/fakename',
+                'Tag': 'fakename',
+                'CLIENT': {'Clients': clients},
+                'FSAL': 'fakefsal',
+            },
+        }
+
+    def _setup_export_per_share(self, current=None):
+        self.flags(ganesha_export_per_share=True)
+        self.mock_object(self._helper, '_fsal_hook',
+                         mock.Mock(return_value='fakefsal'))
+        self._helper.ganesha.get_export.return_value = current
+        self._helper.ganesha.allocate_export_id.return_value = 101
+        self._helper.ganesha.list_exports.return_value = []
+
+    def test_update_access_export_per_share_new(self):
+        self._setup_export_per_share()
+        add_rules = [fake_share.fake_access(access_to='10.0.0.2'),
+                     fake_share.fake_access(access_to='10.0.0.1')]
+
+        self._helper.update_access(fake_basepath, self.share, add_rules, [])
+
+        self._helper.ganesha.get_export.assert_called_once_with('fakename')
+        self._helper.ganesha.allocate_export_id.assert_called_once_with()
+        self._helper.ganesha.update_export.assert_called_once_with(
+            'fakename', self._fake_share_export('10.0.0.1, 10.0.0.2'))
+        self.assertFalse(self._helper.ganesha.add_export.called)
+        self.assertFalse(self._helper.ganesha.restart_service.called)
+
+    def test_update_access_export_per_share_existing(self):
+        self._setup_export_per_share(
+            self._fake_share_export('10.0.0.1, 10.0.0.2', export_id=105))
+        add_rules = [fake_share.fake_access(access_to='10.0.0.3')]
+        delete_rules = [fake_share.fake_access(access_to='10.0.0.1')]
+
+        self._helper.update_access(fake_basepath, self.share, add_rules,
+                                   delete_rules)
+
+        self.assertFalse(self._helper.ganesha.allocate_export_id.called)
+        self._helper.ganesha.update_export.assert_called_once_with(
+            'fakename',
+            self._fake_share_export('10.0.0.2, 10.0.0.3', export_id=105))
+
+    def test_update_access_export_per_share_unchanged(self):
+        self._setup_export_per_share(self._fake_share_export('10.0.0.1'))
+        add_rules = [fake_share.fake_access(access_to='10.0.0.1')]
+
+        self._helper.update_access(fake_basepath, self.share, add_rules, [])
+
+        self.assertFalse(self._helper.ganesha.update_export.called)
+
+    def test_update_access_export_per_share_last_rule_removed(self):
+        self._setup_export_per_share(self._fake_share_export('10.0.0.1'))
+        delete_rules = [fake_share.fake_access(access_to='10.0.0.1')]
+
+        self._helper.update_access(fake_basepath, self.share, [],
+                                   delete_rules)
+
+        self._helper.ganesha.remove_export.assert_called_once_with(
+            'fakename')
+        self.assertFalse(self._helper.ganesha.update_export.called)
+
+    def test_update_access_export_per_share_recovery(self):
+        self._setup_export_per_share(
+            self._fake_share_export('10.0.0.1, 10.0.0.2'))
+        self._helper.ganesha.list_exports.return_value = [
+            'fakename', 'fakename--fakeaccessid1', 'fakename--fakeaccessid2',
+            'othername--fakeaccessid3']
+        self._helper.ganesha.remove_export.side_effect = [
+            exception.GaneshaCommandFailure, None]
+        add_rules = [fake_share.fake_access(access_to='10.0.0.3')]
+
+        self._helper.update_access(fake_basepath, self.share, add_rules, [],
+                                   recovery=True)
+
+        self._helper.ganesha.update_export.assert_called_once_with(
+            'fakename', self._fake_share_export('10.0.0.3'))
+        self._helper.ganesha.remove_export.assert_has_calls([
+            mock.call('fakename--fakeaccessid1'),
+            mock.call('fakename--fakeaccessid2')])
+        self.assertEqual(2, self._helper.ganesha.remove_export.call_count)
+        self.assertFalse(self._helper.ganesha.reset_exports.called)
+        self.assertFalse(self._helper.ganesha.restart_service.called)
+
+    def test_update_access_export_per_share_invalid_access_type(self):
+        self._setup_export_per_share()
+        add_rules = [fake_share.fake_access(access_type='notip')]
+
+        self.assertRaises(exception.InvalidShareAccess,
+                          self._helper.update_access, fake_basepath,
+                          self.share, add_rules, [])
+        self.assertFalse(self._helper.ganesha.update_export.called)
+
     def test_update_access_recovery(self):
         self.mock_object(self._helper, '_allow_access')
         self.mock_object(self._helper, '_deny_access')
@@ -16,10 +16,12 @@
 
 """Unit tests for the Generic driver module."""
 
+import itertools
 import os
 import time
 
 import ddt
+import eventlet
 import mock
 from oslo_concurrency import processutils
 from oslo_config import cfg
@@ -160,6 +162,8 @@ class GenericShareDriverTestCase(test.TestCase):
 
     def setUp(self):
         super(GenericShareDriverTestCase, self).setUp()
+        self.flags(volume_status_poll_min_interval=0,
+                   volume_status_poll_max_interval=0)
         self._context = context.get_admin_context()
         self._execute = mock.Mock(return_value=('', ''))
 
@@ -901,8 +905,7 @@ class GenericShareDriverTestCase(test.TestCase):
                           fake_volume, 5, 'error', 'timeout')
         self.assertFalse(mock_sleep.called)
 
-    @mock.patch('time.sleep')
-    def test_wait_for_extending_volume(self, mock_sleep):
+    def test_wait_for_extending_volume(self):
         initial_size = 1
         expected_size = 2
         mock_volume = fake_volume.FakeVolume(status='available',
@@ -926,7 +929,27 @@ class GenericShareDriverTestCase(test.TestCase):
         self._driver.volume_api.get.assert_has_calls(
             [mock.call(self._driver.admin_context, mock_volume['id'])] *
             expected_get_count)
-        mock_sleep.assert_has_calls([mock.call(1)] * expected_get_count)
+
+    def test_wait_for_available_volumes_batched(self):
+        volumes = [{'status': 'creating', 'id': 'fake%s' % i}
+                   for i in range(3)]
+        available_volumes = [dict(volume, status='available')
+                             for volume in volumes]
+        self.mock_object(self._driver.volume_api, 'get_all',
+                         mock.Mock(return_value=available_volumes))
+        self.mock_object(self._driver.volume_api, 'get')
+        self._driver._volume_watcher.list_threshold = 2
+        pool = eventlet.GreenPool()
+
+        results = list(pool.imap(
+            lambda volume: self._driver._wait_for_available_volume(
+                volume, 5, "error", "timeout"),
+            volumes))
+
+        self.assertEqual(available_volumes, results)
+        self._driver.volume_api.get_all.assert_called_once_with(
+            self._driver.admin_context)
+        self.assertFalse(self._driver.volume_api.get.called)
 
     @ddt.data(mock.Mock(return_value={'status': 'creating', 'id': 'fake'}),
               mock.Mock(return_value={'status': 'error', 'id': 'fake'}))
@@ -934,7 +957,7 @@ class GenericShareDriverTestCase(test.TestCase):
         fake_volume = {'status': 'creating', 'id': 'fake'}
         self.mock_object(self._driver.volume_api, 'get', volume_get_mock)
         self.mock_object(time, 'time',
-                         mock.Mock(side_effect=[1.0, 1.33, 1.67, 2.0]))
+                         mock.Mock(side_effect=itertools.count(1.0, 0.33)))
 
         self.assertRaises(
             exception.ManilaException,
@@ -1146,9 +1169,10 @@ class GenericShareDriverTestCase(test.TestCase):
         self.mock_object(self._driver.volume_api, 'create_snapshot_force',
                          mock.Mock(return_value=fake_vol_snap))
 
-        self._driver.create_snapshot(self._context, fake_vol_snap,
-                                     share_server=self.server)
+        result = self._driver.create_snapshot(self._context, fake_vol_snap,
+                                              share_server=self.server)
 
+        self.assertEqual({'provider_location': fake_vol_snap['id']}, result)
         self._driver._get_volume.assert_called_once_with(
             self._driver.admin_context, fake_vol_snap['share_id'])
         self._driver.volume_api.create_snapshot_force.assert_called_once_with(
@@ -1157,6 +1181,30 @@ class GenericShareDriverTestCase(test.TestCase):
             CONF.volume_snapshot_name_template % fake_vol_snap['id'],
             ''
         )
+        self.fake_private_storage.update.assert_called_once_with(
+            fake_vol_snap['id'], {'volume_snapshot_id': fake_vol_snap['id']})
+
+    def test_create_snapshot_wait_for_available(self):
+        fake_vol = fake_volume.FakeVolume()
+        fake_vol_snap = fake_volume.FakeVolumeSnapshot(
+            share_id=fake_vol['id'], status='creating')
+        fake_vol_snap_available = fake_volume.FakeVolumeSnapshot(
+            share_id=fake_vol['id'])
+        self.mock_object(self._driver, '_get_volume',
+                         mock.Mock(return_value=fake_vol))
+        self.mock_object(self._driver.volume_api, 'create_snapshot_force',
+                         mock.Mock(return_value=fake_vol_snap))
+        self.mock_object(self._driver.volume_api, 'get_snapshot',
+                         mock.Mock(return_value=fake_vol_snap_available))
+
+        result = self._driver.create_snapshot(self._context, fake_vol_snap,
+                                              share_server=self.server)
+
+        self.assertEqual({'provider_location': fake_vol_snap['id']}, result)
+        self._driver.volume_api.get_snapshot.assert_called_once_with(
+            self._driver.admin_context, fake_vol_snap['id'])
+        self.fake_private_storage.update.assert_called_once_with(
+            fake_vol_snap['id'], {'volume_snapshot_id': fake_vol_snap['id']})
 
     def test_delete_snapshot(self):
         fake_vol_snap = fake_volume.FakeVolumeSnapshot()
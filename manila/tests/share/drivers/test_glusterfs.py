@@ -347,6 +347,7 @@ class GlusterNFSVolHelperTestCase(test.TestCase):
             self._helper.gluster_manager.set_vol_option.call_args_list)
 
 
+@ddt.ddt
 class GaneshaNFSHelperTestCase(test.TestCase):
     """Tests GaneshaNFSHelper."""
 
@@ -377,10 +378,16 @@ class GaneshaNFSHelperTestCase(test.TestCase):
             [mock.call(self._root_execute, self.fake_conf,
                        tag='GLUSTER-Ganesha-example.com')])
 
-    def test_get_export(self):
+    @ddt.data((False, 'example.com:/fakename--<access-id>'),
+              (True, 'example.com:/fakename'))
+    @ddt.unpack
+    def test_get_export(self, export_per_share, expected):
+        self.flags(ganesha_export_per_share=export_per_share)
+        self._helper.configuration = self.fake_conf
+
         ret = self._helper.get_export(self.share)
 
-        self.assertEqual('example.com:/fakename--<access-id>', ret)
+        self.assertEqual(expected, ret)
 
     def test_init_remote_ganesha_server(self):
         ssh_execute = mock.Mock(return_value=('', ''))
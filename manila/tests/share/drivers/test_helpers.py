@@ -156,16 +156,24 @@ class NFSHelperTestCase(test.TestCase):
             [],
             [])
 
-    def test_get_host_list(self):
-        fake_exportfs = ('/shares/share-1\n\t\t20.0.0.3\n'
-                         '/shares/share-1\n\t\t20.0.0.6\n'
-                         '/shares/share-2\n\t\t10.0.0.2\n'
-                         '/shares/share-2\n\t\t10.0.0.5\n'
-                         '/shares/share-3\n\t\t30.0.0.4\n'
-                         '/shares/share-3\n\t\t30.0.0.7\n')
-        expected = ['20.0.0.3', '20.0.0.6']
-        result = self._helper._get_host_list(fake_exportfs, '/shares/share-1')
+    def test__get_host_options(self):
+        fake_exportfs = (
+            '/shares/share-1\n\t\t20.0.0.3(rw,wdelay,no_root_squash)\n'
+            '/shares/share-1\n\t\t20.0.0.6(ro,wdelay,root_squash)\n'
+            '/shares/share-2\n\t\t10.0.0.2(rw,wdelay,no_root_squash)\n'
+            '/shares/s3     \t30.0.0.4/255.255.255.0(ro,root_squash)\n')
+        expected = {
+            '20.0.0.3': ['rw', 'wdelay', 'no_root_squash'],
+            '20.0.0.6': ['ro', 'wdelay', 'root_squash'],
+        }
+
+        result = self._helper._get_host_options(
+            fake_exportfs, '/shares/share-1')
+
         self.assertEqual(expected, result)
+        self.assertEqual(
+            {'30.0.0.4/255.255.255.0': ['ro', 'root_squash']},
+            self._helper._get_host_options(fake_exportfs, '/shares/s3'))
 
     @ddt.data(const.ACCESS_LEVEL_RW, const.ACCESS_LEVEL_RO)
     def test_update_access_recovery_mode(self, access_level):
@@ -173,25 +181,83 @@ class NFSHelperTestCase(test.TestCase):
         if access_level == const.ACCESS_LEVEL_RW:
             expected_mount_options = ','.join((expected_mount_options,
                                                'no_root_squash'))
-        access_rules = [test_generic.get_fake_access_rule(
-            '1.1.1.1', access_level), ]
+        access_rules = [
+            test_generic.get_fake_access_rule('1.1.1.1', access_level),
+            test_generic.get_fake_access_rule('2.2.2.0/24', access_level),
+        ]
         self.mock_object(self._helper, '_sync_nfs_temp_and_perm_files')
-        self.mock_object(self._helper, '_get_host_list',
-                         mock.Mock(return_value=['1.1.1.1']))
+        self.mock_object(self._helper, '_get_host_options',
+                         mock.Mock(return_value={
+                             '3.3.3.3': ['rw', 'no_root_squash'],
+                             '4.4.4.4': ['ro', 'root_squash']}))
+
         self._helper.update_access(self.server, self.share_name, access_rules,
                                    [], [])
+
         local_path = os.path.join(CONF.share_mount_path, self.share_name)
         self._ssh_exec.assert_has_calls([
-            mock.call(self.server, ['sudo', 'exportfs']),
+            mock.call(self.server, ['sudo', 'exportfs', '-v']),
             mock.call(
                 self.server, ['sudo', 'exportfs', '-u',
-                              ':'.join([access_rules[0]['access_to'],
-                                        local_path])]),
+                              ':'.join(['3.3.3.3', local_path]),
+                              ':'.join(['4.4.4.4', local_path])]),
             mock.call(self.server, ['sudo', 'exportfs', '-o',
                                     expected_mount_options % access_level,
+                                    ':'.join(['1.1.1.1', local_path]),
+                                    ':'.join(['2.2.2.0/255.255.255.0',
+                                              local_path])]),
+        ])
+        self.assertEqual(3, self._ssh_exec.call_count)
+        self._helper._sync_nfs_temp_and_perm_files.assert_called_once_with(
+            self.server)
+
+    def test_update_access_recovery_mode_up_to_date(self):
+        access_rules = [
+            test_generic.get_fake_access_rule('1.1.1.1',
+                                              const.ACCESS_LEVEL_RW),
+            test_generic.get_fake_access_rule('2.2.2.2',
+                                              const.ACCESS_LEVEL_RO),
+        ]
+        self.mock_object(self._helper, '_sync_nfs_temp_and_perm_files')
+        self.mock_object(self._helper, '_get_host_options',
+                         mock.Mock(return_value={
+                             '1.1.1.1': ['rw', 'no_root_squash'],
+                             '2.2.2.2': ['ro', 'root_squash']}))
+
+        self._helper.update_access(self.server, self.share_name, access_rules,
+                                   [], [])
+
+        self._ssh_exec.assert_called_once_with(
+            self.server, ['sudo', 'exportfs', '-v'])
+        self.assertFalse(self._helper._sync_nfs_temp_and_perm_files.called)
+
+    def test_update_access_recovery_mode_changed_level(self):
+        access_rules = [
+            test_generic.get_fake_access_rule('1.1.1.1',
+                                              const.ACCESS_LEVEL_RO),
+            test_generic.get_fake_access_rule('2.2.2.2',
+                                              const.ACCESS_LEVEL_RW),
+            test_generic.get_fake_access_rule('2.2.2.2',
+                                              const.ACCESS_LEVEL_RO),
+        ]
+        self.mock_object(self._helper, '_sync_nfs_temp_and_perm_files')
+        self.mock_object(self._helper, '_get_host_options',
+                         mock.Mock(return_value={
+                             '1.1.1.1': ['rw', 'no_root_squash'],
+                             '2.2.2.2': ['rw', 'no_root_squash']}))
+
+        self._helper.update_access(self.server, self.share_name, access_rules,
+                                   [], [])
+
+        local_path = os.path.join(CONF.share_mount_path, self.share_name)
+        self._ssh_exec.assert_has_calls([
+            mock.call(self.server, ['sudo', 'exportfs', '-v']),
+            mock.call(self.server, ['sudo', 'exportfs', '-o',
+                                    'ro,no_subtree_check',
                                     ':'.join(['1.1.1.1', local_path])]),
         ])
-        self._helper._sync_nfs_temp_and_perm_files.assert_called_with(
+        self.assertEqual(2, self._ssh_exec.call_count)
+        self._helper._sync_nfs_temp_and_perm_files.assert_called_once_with(
             self.server)
 
     def test_sync_nfs_temp_and_perm_files(self):
@@ -150,6 +150,9 @@ class ZFSonLinuxShareDriverTestCase(test.TestCase):
         self.assertEqual(
             self.driver._helpers,
             {'FOO': mock_import_class.return_value.return_value})
+        self.assertIs(
+            self.driver._options_cache,
+            mock_import_class.return_value.return_value._options_cache)
 
     def test__setup_helpers_error(self):
         self.configuration.zfs_share_helpers = []
@@ -216,8 +219,9 @@ class ZFSonLinuxShareDriverTestCase(test.TestCase):
     @ddt.data(None, '', 'foo_replication_domain')
     def test__get_pools_info(self, replication_domain):
         self.mock_object(
-            self.driver, 'get_zpool_option',
-            mock.Mock(side_effect=['2G', '3G', '5G', '4G']))
+            self.driver, 'get_zpool_options',
+            mock.Mock(return_value={'foo': {'free': '2G', 'size': '3G'},
+                                    'bar': {'free': '5G', 'size': '4G'}}))
         self.configuration.replication_domain = replication_domain
         self.driver.zpool_list = ['foo', 'bar']
         expected = [
@@ -245,12 +249,8 @@ class ZFSonLinuxShareDriverTestCase(test.TestCase):
         result = self.driver._get_pools_info()
 
         self.assertEqual(expected, result)
-        self.driver.get_zpool_option.assert_has_calls([
-            mock.call('foo', 'free'),
-            mock.call('foo', 'size'),
-            mock.call('bar', 'free'),
-            mock.call('bar', 'size'),
-        ])
+        self.driver.get_zpool_options.assert_called_once_with(
+            ['foo', 'bar'], ['free', 'size'])
 
     @ddt.data(
         ([], {'compression': [True, False], 'dedupe': [True, False]}),
@@ -898,6 +898,61 @@ class ZFSonLinuxShareDriverTestCase(test.TestCase):
             'fake_context', 'fake_share', share_server={'id': 'fake_server'},
         )
 
+    def test_ensure_shares(self):
+        shares = [
+            {'id': 'fake_share_id_%s' % i,
+             'host': 'hostname@backend_name#%s' % pool,
+             'share_proto': 'NFS'}
+            for i, pool in enumerate(('foo', 'foo', 'bar', 'foo'))
+        ]
+        for share in shares[:3]:
+            self.driver.private_storage.update(
+                share['id'], {'dataset_name': '%s/%s' % (
+                    share['host'].split('#')[1], share['id'])})
+        items = [{'share': share, 'share_server': None} for share in shares]
+        items.append({'share': {'id': 'fake_dhss_share'},
+                      'share_server': {'id': 'fake_server'}})
+        self.mock_object(
+            self.driver, '_get_dataset_name',
+            mock.Mock(return_value='foo/absent'))
+        self.mock_object(
+            self.driver, 'zfs', mock.Mock(side_effect=lambda *cmd: (
+                '%s_list' % cmd[-1] if cmd[0] == 'list' else '', '')))
+        self.mock_object(
+            self.driver, 'parse_zfs_answer',
+            mock.Mock(side_effect=lambda out: {
+                'foo_list': [{'NAME': 'foo'},
+                             {'NAME': 'foo/fake_share_id_0'},
+                             {'NAME': 'foo/fake_share_id_1'}],
+                'bar_list': [{'NAME': 'bar/fake_share_id_2'}],
+            }[out]))
+        self.mock_object(self.driver, 'get_zfs_options')
+        self.mock_object(
+            self.driver, 'get_zfs_option', mock.Mock(return_value='on'))
+        mock_helper = self.mock_object(self.driver, '_get_share_helper')
+        mock_helper.return_value.get_exports.side_effect = (
+            lambda dataset_name: [dataset_name])
+
+        result = self.driver.ensure_shares('fake_context', items)
+
+        self.assertEqual({
+            'fake_share_id_0': ['foo/fake_share_id_0'],
+            'fake_share_id_1': ['foo/fake_share_id_1'],
+            'fake_share_id_2': ['bar/fake_share_id_2'],
+        }, result)
+        self.driver.get_zfs_options.assert_has_calls([
+            mock.call(['foo'], ['sharenfs', 'mountpoint'], recursive=True),
+            mock.call(['bar'], ['sharenfs', 'mountpoint'], recursive=True),
+        ], any_order=True)
+        self.assertEqual(2, self.driver.get_zfs_options.call_count)
+        self.driver.zfs.assert_has_calls([
+            mock.call('list', '-r', 'foo'),
+            mock.call('share', 'foo/fake_share_id_0'),
+            mock.call('list', '-r', 'bar'),
+            mock.call('share', 'bar/fake_share_id_2'),
+        ], any_order=True)
+        self.assertEqual(5, self.driver.zfs.call_count)
+
     def test_get_network_allocations_number(self):
         self.assertEqual(0, self.driver.get_network_allocations_number())
 
@@ -142,8 +142,7 @@ class ExecuteMixinTestCase(test.TestCase):
 
     @ddt.data(True, False)
     def test__get_option(self, pool_level):
-        out = """NAME   PROPERTY              VALUE                  SOURCE\n
-foo_resource_name  bar_option_name           some_value              local"""
+        out = "foo_resource_name\tbar_option_name\tsome value\n"
         self.mock_object(
             self.driver, '_execute', mock.Mock(return_value=(out, '')))
         res_name = 'foo_resource_name'
@@ -152,10 +151,98 @@ foo_resource_name  bar_option_name           some_value              local"""
         result = self.driver._get_option(
             res_name, opt_name, pool_level=pool_level)
 
-        self.assertEqual('some_value', result)
+        self.assertEqual('some value', result)
         self.driver._execute.assert_called_once_with(
-            'zpool' if pool_level else 'zfs', 'get', opt_name, res_name,
-            run_as_root=True)
+            'zpool' if pool_level else 'zfs', 'get', '-H', '-o',
+            'name,property,value', opt_name, res_name, run_as_root=True)
+
+    def test__get_option_cached(self):
+        out = "foo_dataset\tmountpoint\t/foo_dataset\n"
+        self.mock_object(
+            self.driver, '_execute', mock.Mock(return_value=(out, '')))
+
+        for i in range(3):
+            result = self.driver.get_zfs_option('foo_dataset', 'mountpoint')
+            self.assertEqual('/foo_dataset', result)
+
+        self.driver._execute.assert_called_once_with(
+            'zfs', 'get', '-H', '-o', 'name,property,value', 'mountpoint',
+            'foo_dataset', run_as_root=True)
+
+    def test__get_option_volatile_not_cached(self):
+        out = "foo_dataset\tused\t1G\n"
+        self.mock_object(
+            self.driver, '_execute', mock.Mock(return_value=(out, '')))
+
+        self.driver.get_zfs_option('foo_dataset', 'used')
+        self.driver.get_zfs_option('foo_dataset', 'used')
+
+        self.assertEqual(2, self.driver._execute.call_count)
+
+    @ddt.data(
+        (('sudo', 'zfs', 'get', 'foo'), False),
+        (('sudo', 'zfs', 'list', '-r', 'foo'), False),
+        (('sudo', 'zfs', 'share', 'foo'), False),
+        (('sudo', 'zfs', 'set', 'readonly=on', 'foo'), True),
+        (('sudo', 'zpool', 'export', 'foo'), True),
+        (('ssh', 'fake_ssh_cmd', 'sudo', 'zfs', 'send', '-vDp', 'foo@bar',
+          '|', 'sudo', 'zfs', 'receive', '-v', 'foo'), True),
+        (('lsof', '-w', '/foo'), False),
+    )
+    @ddt.unpack
+    def test_execute_invalidates_options_cache(self, cmd, invalidated):
+        self.mock_object(self.driver, '_execute')
+        self.driver._options_cache[('zfs', 'foo')] = {'readonly': 'off'}
+
+        self.driver.execute(*cmd)
+
+        self.assertEqual(invalidated, not self.driver._options_cache)
+
+    def test_get_zfs_options(self):
+        out = ("foo\tsharenfs\toff\nfoo\tmountpoint\t/foo\n"
+               "foo/bar\tsharenfs\trw=1.1.1.1,no_root_squash\n"
+               "foo/bar\tmountpoint\t/foo/bar\n\n")
+        self.mock_object(
+            self.driver, '_execute', mock.Mock(return_value=(out, '')))
+
+        result = self.driver.get_zfs_options(
+            ['foo'], ['sharenfs', 'mountpoint'], recursive=True)
+
+        expected = {
+            'foo': {'sharenfs': 'off', 'mountpoint': '/foo'},
+            'foo/bar': {'sharenfs': 'rw=1.1.1.1,no_root_squash',
+                        'mountpoint': '/foo/bar'},
+        }
+        self.assertEqual(expected, result)
+        self.driver._execute.assert_called_once_with(
+            'zfs', 'get', '-H', '-o', 'name,property,value', '-r',
+            'sharenfs,mountpoint', 'foo', run_as_root=True)
+        self.assertEqual(
+            '/foo/bar', self.driver.get_zfs_option('foo/bar', 'mountpoint'))
+        self.assertEqual(1, self.driver._execute.call_count)
+
+    def test_get_zpool_options(self):
+        out = "foo\tfree\t2G\nfoo\tsize\t3G\nbar\tfree\t5G\n"
+        self.mock_object(
+            self.driver, '_execute', mock.Mock(return_value=(out, '')))
+
+        result = self.driver.get_zpool_options(['foo', 'bar'],
+                                               ['free', 'size'])
+
+        expected = {'foo': {'free': '2G', 'size': '3G'},
+                    'bar': {'free': '5G'}}
+        self.assertEqual(expected, result)
+        self.driver._execute.assert_called_once_with(
+            'zpool', 'get', '-H', '-o', 'name,property,value', 'free,size',
+            'foo', 'bar', run_as_root=True)
+        self.assertEqual({}, self.driver._options_cache[('zpool', 'foo')])
+
+    def test_share_options_cache(self):
+        other = FakeShareDriver()
+
+        self.driver.share_options_cache(other)
+
+        self.assertIs(self.driver._options_cache, other._options_cache)
 
     def test_parse_zfs_answer(self):
         not_parsed_str = ''
@@ -356,9 +443,7 @@ class NFSviaZFSHelperTestCase(test.TestCase):
 %(dn)s_some_other     3.58M  15.8G  28.5K  /%(dn)s\n
              """ % {'dn': dataset_name}, ''),
             ('fake_set_opt_result', ''),
-            ("""NAME                     PROPERTY    VALUE            SOURCE\n
-%s          mountpoint  /%s  default\n
-             """ % (dataset_name, dataset_name), ''),
+            ("%s\tmountpoint\t/%s\n" % (dataset_name, dataset_name), ''),
             ('fake_1_result', ''),
             ('fake_2_result', ''),
             ('fake_3_result', ''),
@@ -400,7 +485,8 @@ class NFSviaZFSHelperTestCase(test.TestCase):
                 access_str,
                 dataset_name, run_as_root=True),
             mock.call(
-                'zfs', 'get', 'mountpoint', dataset_name, run_as_root=True),
+                'zfs', 'get', '-H', '-o', 'name,property,value', 'mountpoint',
+                dataset_name, run_as_root=True),
             mock.call(
                 'exportfs', '-u', '4.4.4.4:/%s' % dataset_name,
                 run_as_root=True),
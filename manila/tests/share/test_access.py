@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from eventlet import greenthread
 import mock
 
 from manila.common import constants
@@ -146,3 +147,88 @@ class ShareInstanceAccessTestCase(test.TestCase):
             mock.call(self.context, share_instance, original_rules,
                       add_rules=[], delete_rules=[], share_server=None)
         ])
+
+    def test_queue_update_access_rules_no_window(self):
+        self.flags(access_rules_coalesce_window=0)
+        add_rules = [{'id': 'fake_rule_id'}]
+        self.mock_object(self.share_access_helper, 'update_access_rules',
+                         mock.Mock(return_value='fake'))
+        self.mock_object(greenthread, 'spawn_after')
+
+        result = self.share_access_helper.queue_update_access_rules(
+            self.context, self.share_instance['id'], add_rules=add_rules,
+            share_server='fake_server')
+
+        self.assertEqual('fake', result)
+        self.share_access_helper.update_access_rules.assert_called_once_with(
+            self.context, self.share_instance['id'], add_rules=add_rules,
+            delete_rules=None, share_server='fake_server')
+        self.assertFalse(greenthread.spawn_after.called)
+
+    def test_queue_update_access_rules_coalesced(self):
+        self.flags(access_rules_coalesce_window=2)
+        rule_1 = {'id': 'fake_rule_id_1'}
+        rule_2 = {'id': 'fake_rule_id_2'}
+        rule_3 = {'id': 'fake_rule_id_3'}
+        self.mock_object(self.share_access_helper, 'update_access_rules')
+        self.mock_object(greenthread, 'spawn_after')
+        helper = self.share_access_helper
+
+        helper.queue_update_access_rules(
+            self.context, self.share_instance['id'], add_rules=[rule_1],
+            share_server='fake_server')
+        helper.queue_update_access_rules(
+            self.context, self.share_instance['id'],
+            add_rules=[rule_2, rule_3], share_server='fake_server')
+        helper.queue_update_access_rules(
+            self.context, self.share_instance['id'], delete_rules=[rule_3],
+            share_server='fake_server')
+
+        self.assertFalse(helper.update_access_rules.called)
+        greenthread.spawn_after.assert_called_once_with(
+            2, helper._apply_queued_access_rules, self.share_instance['id'])
+        stats = helper.get_queue_stats()
+        self.assertEqual(1, stats['queued_instances'])
+        self.assertEqual(3, stats['queue_depth'])
+
+        helper._apply_queued_access_rules(self.share_instance['id'])
+
+        helper.update_access_rules.assert_called_once_with(
+            self.context, self.share_instance['id'], add_rules=mock.ANY,
+            delete_rules=[rule_3], share_server='fake_server')
+        call_kwargs = helper.update_access_rules.call_args[1]
+        self.assertEqual(sorted([rule_1, rule_2], key=lambda r: r['id']),
+                         sorted(call_kwargs['add_rules'],
+                                key=lambda r: r['id']))
+        stats = helper.get_queue_stats()
+        self.assertEqual(0, stats['queue_depth'])
+        self.assertEqual(1, stats['applied_batches'])
+        self.assertEqual(3, stats['applied_changes'])
+
+    def test__apply_queued_access_rules_exception(self):
+        self.flags(access_rules_coalesce_window=1)
+        self.mock_object(self.share_access_helper, 'update_access_rules',
+                         mock.Mock(side_effect=exception.ManilaException))
+        self.mock_object(greenthread, 'spawn_after')
+        self.mock_object(access.LOG, 'exception')
+        self.share_access_helper.queue_update_access_rules(
+            self.context, self.share_instance['id'],
+            add_rules=[{'id': 'fake_rule_id'}])
+
+        self.share_access_helper._apply_queued_access_rules(
+            self.share_instance['id'])
+
+        self.assertTrue(access.LOG.exception.called)
+        self.assertEqual(
+            0, self.share_access_helper.get_queue_stats()['queued_instances'])
+
+    def test__remove_access_rules(self):
+        rules = [{'id': 'fake_rule_id_1'}, {'id': 'fake_rule_id_2'}]
+        self.mock_object(db, 'share_instance_access_delete_by_access_ids')
+
+        self.share_access_helper._remove_access_rules(
+            self.context, rules, self.share_instance['id'])
+
+        db.share_instance_access_delete_by_access_ids.assert_called_once_with(
+            self.context, self.share_instance['id'],
+            ['fake_rule_id_1', 'fake_rule_id_2'])
@@ -388,29 +388,33 @@ class ShareAPITestCase(test.TestCase):
 
     def test_get_all_admin_filter_by_status(self):
         ctx = context.RequestContext('fake_uid', 'fake_pid_2', is_admin=True)
-        self.mock_object(db_api, 'share_get_all_by_project',
-                         mock.Mock(return_value=_FAKE_LIST_OF_ALL_SHARES[1:]))
+        self.mock_object(
+            db_api, 'share_get_all_by_project',
+            mock.Mock(return_value=_FAKE_LIST_OF_ALL_SHARES[2::4]))
         shares = self.api.get_all(ctx, {'status': constants.STATUS_AVAILABLE})
         share_api.policy.check_policy.assert_has_calls([
             mock.call(ctx, 'share', 'get_all'),
         ])
         db_api.share_get_all_by_project.assert_called_once_with(
             ctx, sort_dir='desc', sort_key='created_at',
-            project_id='fake_pid_2', filters={}, is_public=False
+            project_id='fake_pid_2',
+            filters={'status': constants.STATUS_AVAILABLE}, is_public=False
         )
         self.assertEqual(_FAKE_LIST_OF_ALL_SHARES[2::4], shares)
 
     def test_get_all_admin_filter_by_status_and_all_tenants(self):
         ctx = context.RequestContext('fake_uid', 'fake_pid_2', is_admin=True)
-        self.mock_object(db_api, 'share_get_all',
-                         mock.Mock(return_value=_FAKE_LIST_OF_ALL_SHARES))
+        self.mock_object(
+            db_api, 'share_get_all',
+            mock.Mock(return_value=_FAKE_LIST_OF_ALL_SHARES[1::2]))
         shares = self.api.get_all(
             ctx, {'status': constants.STATUS_ERROR, 'all_tenants': 1})
         share_api.policy.check_policy.assert_has_calls([
             mock.call(ctx, 'share', 'get_all'),
         ])
         db_api.share_get_all.assert_called_once_with(
-            ctx, sort_dir='desc', sort_key='created_at', filters={})
+            ctx, sort_dir='desc', sort_key='created_at',
+            filters={'status': constants.STATUS_ERROR})
         self.assertEqual(_FAKE_LIST_OF_ALL_SHARES[1::2], shares)
 
     def test_get_all_non_admin_filter_by_all_tenants(self):
@@ -439,7 +443,8 @@ class ShareAPITestCase(test.TestCase):
         ])
         db_api.share_get_all_by_project.assert_called_once_with(
             ctx, sort_dir='desc', sort_key='created_at',
-            project_id='fake_pid_2', filters={}, is_public=False
+            project_id='fake_pid_2',
+            filters={'status': constants.STATUS_ERROR}, is_public=False
         )
 
         # two items expected, one filtered
@@ -455,11 +460,55 @@ class ShareAPITestCase(test.TestCase):
         ])
         db_api.share_get_all_by_project.assert_has_calls([
             mock.call(ctx, sort_dir='desc', sort_key='created_at',
-                      project_id='fake_pid_2', filters={}, is_public=False),
+                      project_id='fake_pid_2',
+                      filters={'status': constants.STATUS_ERROR},
+                      is_public=False),
             mock.call(ctx, sort_dir='desc', sort_key='created_at',
-                      project_id='fake_pid_2', filters={}, is_public=False),
+                      project_id='fake_pid_2',
+                      filters={'status': constants.STATUS_AVAILABLE},
+                      is_public=False),
         ])
 
+    def test_get_all_with_pagination(self):
+        ctx = context.RequestContext('fake_uid', 'fake_pid_2', is_admin=False)
+        self.mock_object(db_api, 'share_get_all_by_project',
+                         mock.Mock(return_value=_FAKE_LIST_OF_ALL_SHARES[2:3]))
+
+        shares = self.api.get_all(
+            ctx, {'status': constants.STATUS_AVAILABLE}, limit=1, offset=1,
+            marker='fake_marker')
+
+        self.assertEqual(_FAKE_LIST_OF_ALL_SHARES[2:3], shares)
+        db_api.share_get_all_by_project.assert_called_once_with(
+            ctx, sort_dir='desc', sort_key='created_at',
+            project_id='fake_pid_2',
+            filters={'status': constants.STATUS_AVAILABLE}, is_public=False,
+            limit=1, offset=1, marker='fake_marker')
+
+    def test_get_all_with_pagination_and_not_db_filters(self):
+        ctx = context.RequestContext('fake_uid', 'fake_pid_2', is_admin=False)
+        fake_shares = [dict(share, id=i) for i, share in enumerate(
+            _FAKE_LIST_OF_ALL_SHARES)]
+        self.mock_object(db_api, 'share_get_all_by_project',
+                         mock.Mock(return_value=fake_shares))
+
+        shares = self.api.get_all(ctx, {'name': 'bar'}, limit=1, marker=1)
+
+        self.assertEqual(fake_shares[3:4], shares)
+        db_api.share_get_all_by_project.assert_called_once_with(
+            ctx, sort_dir='desc', sort_key='created_at',
+            project_id='fake_pid_2', filters={}, is_public=False)
+
+    def test_get_all_with_not_found_marker(self):
+        ctx = context.RequestContext('fake_uid', 'fake_pid_2', is_admin=False)
+        fake_shares = [dict(share, id=i) for i, share in enumerate(
+            _FAKE_LIST_OF_ALL_SHARES)]
+        self.mock_object(db_api, 'share_get_all_by_project',
+                         mock.Mock(return_value=fake_shares))
+
+        self.assertRaises(exception.InvalidInput, self.api.get_all,
+                          ctx, {'name': 'bar'}, marker='fake_marker')
+
     @ddt.data('True', 'true', '1', 'yes', 'y', 'on', 't', True)
     def test_get_all_non_admin_public(self, is_public):
         ctx = context.RequestContext('fake_uid', 'fake_pid_2',
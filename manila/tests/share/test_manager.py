@@ -14,6 +14,7 @@
 #    under the License.
 
 """Test of Share Manager for Manila."""
+import copy
 import datetime
 import random
 
@@ -173,7 +174,8 @@ class ShareManagerTestCase(test.TestCase):
         self.assertTrue(self.share_manager.driver.initialized)
         self.share_manager.db.share_instances_get_all_by_host.\
             assert_called_once_with(utils.IsAMatcher(context.RequestContext),
-                                    self.share_manager.host)
+                                    self.share_manager.host,
+                                    with_share_data=True)
         self.share_manager.driver.do_setup.assert_called_once_with(
             utils.IsAMatcher(context.RequestContext))
         self.share_manager.driver.check_for_setup_error.\
@@ -241,25 +243,30 @@ class ShareManagerTestCase(test.TestCase):
         self.assertFalse(self.share_manager.driver.initialized)
 
     def _setup_init_mocks(self, setup_access_rules=True):
-        instances = [
+        shares = [
             db_utils.create_share(id='fake_id_1',
                                   status=constants.STATUS_AVAILABLE,
-                                  display_name='fake_name_1').instance,
+                                  display_name='fake_name_1'),
             db_utils.create_share(id='fake_id_2',
                                   status=constants.STATUS_ERROR,
-                                  display_name='fake_name_2').instance,
+                                  display_name='fake_name_2'),
             db_utils.create_share(id='fake_id_3',
                                   status=constants.STATUS_AVAILABLE,
-                                  display_name='fake_name_3').instance,
+                                  display_name='fake_name_3'),
             db_utils.create_share(
                 id='fake_id_4',
                 status=constants.STATUS_AVAILABLE,
                 task_state=constants.TASK_STATE_MIGRATION_IN_PROGRESS,
-                display_name='fake_name_4').instance,
+                display_name='fake_name_4'),
             db_utils.create_share(id='fake_id_5',
                                   status=constants.STATUS_AVAILABLE,
-                                  display_name='fake_name_5').instance,
+                                  display_name='fake_name_5'),
         ]
+        instances = []
+        for share in shares:
+            instance = share.instance
+            instance.set_share_data(share)
+            instances.append(instance)
 
         instances[4]['access_rules_status'] = constants.STATUS_OUT_OF_SYNC
 
@@ -313,7 +320,8 @@ class ShareManagerTestCase(test.TestCase):
         # verification of call
         self.share_manager.db.share_instances_get_all_by_host.\
             assert_called_once_with(utils.IsAMatcher(context.RequestContext),
-                                    self.share_manager.host)
+                                    self.share_manager.host,
+                                    with_share_data=True)
         exports_update = self.share_manager.db.share_export_locations_update
         exports_update.assert_has_calls([
             mock.call(mock.ANY, instances[0]['id'], fake_export_locations),
@@ -327,6 +335,12 @@ class ShareManagerTestCase(test.TestCase):
             mock.call(utils.IsAMatcher(context.RequestContext), instances[0]),
             mock.call(utils.IsAMatcher(context.RequestContext), instances[2]),
         ])
+        self.share_manager.db.share_instance_get.assert_has_calls([
+            mock.call(utils.IsAMatcher(context.RequestContext),
+                      instances[0]['id'], with_share_data=True),
+            mock.call(utils.IsAMatcher(context.RequestContext),
+                      instances[2]['id'], with_share_data=True),
+        ])
         self.share_manager._get_share_server.assert_has_calls([
             mock.call(utils.IsAMatcher(context.RequestContext), instances[0]),
             mock.call(utils.IsAMatcher(context.RequestContext), instances[2]),
@@ -344,6 +358,107 @@ class ShareManagerTestCase(test.TestCase):
             mock.call(mock.ANY, instances[4]['id'], share_server=share_server),
         ])
 
+    def test_init_host_with_ensure_shares_in_bulk(self):
+        instances = self._setup_init_mocks(setup_access_rules=False)
+        fake_export_locations = ['fake/path/1', 'fake/path']
+        share_server = {'id': 'fake_server_id'}
+        instances[2]['share_server_id'] = share_server['id']
+        self.mock_object(self.share_manager.db,
+                         'share_instances_get_all_by_host',
+                         mock.Mock(return_value=instances))
+        self.mock_object(self.share_manager.db,
+                         'share_server_get_all_by_host',
+                         mock.Mock(return_value=[share_server]))
+        self.mock_object(self.share_manager.db,
+                         'share_export_locations_update')
+        ensured = {
+            instances[0]['id']: None,
+            instances[2]['id']: fake_export_locations,
+        }
+        self.mock_object(self.share_manager.driver, 'ensure_shares',
+                         mock.Mock(return_value=ensured))
+        self.mock_object(self.share_manager.driver, 'ensure_share',
+                         mock.Mock(return_value=None))
+        self.mock_object(self.share_manager, '_ensure_share_instance_has_pool',
+                         mock.Mock(return_value=None))
+        self.mock_object(self.share_manager, 'publish_service_capabilities')
+        self.mock_object(self.share_manager.access_helper,
+                         'update_access_rules')
+
+        self.share_manager.init_host()
+
+        self.share_manager.driver.ensure_shares.assert_called_once_with(
+            utils.IsAMatcher(context.RequestContext), [
+                {'share': instances[0], 'share_server': None},
+                {'share': instances[2], 'share_server': share_server},
+                {'share': instances[4], 'share_server': None},
+            ])
+        self.share_manager.driver.ensure_share.assert_called_once_with(
+            utils.IsAMatcher(context.RequestContext), instances[4],
+            share_server=None)
+        self.share_manager.db.share_export_locations_update.\
+            assert_called_once_with(
+                utils.IsAMatcher(context.RequestContext), instances[2]['id'],
+                fake_export_locations)
+        self.share_manager.access_helper.update_access_rules.\
+            assert_called_once_with(
+                utils.IsAMatcher(context.RequestContext), instances[4]['id'],
+                share_server=None)
+
+    def test_init_host_reloads_share_instance_with_new_pool(self):
+        instances = self._setup_init_mocks(setup_access_rules=False)[:3]
+        instances[2]['host'] = 'fake_host@fake_backend#fake_pool'
+        reloaded_instance = copy.deepcopy(instances[0])
+        reloaded_instance['host'] = 'fake_host#fake_pool'
+        self.mock_object(self.share_manager.db,
+                         'share_instances_get_all_by_host',
+                         mock.Mock(return_value=instances))
+        self.mock_object(self.share_manager.db, 'share_update')
+        self.mock_object(self.share_manager.db, 'share_instance_get',
+                         mock.Mock(return_value=reloaded_instance))
+        self.mock_object(self.share_manager.driver, 'get_pool',
+                         mock.Mock(return_value='fake_pool'))
+        self.mock_object(self.share_manager.driver, 'ensure_shares',
+                         mock.Mock(side_effect=NotImplementedError))
+        self.mock_object(self.share_manager.driver, 'ensure_share',
+                         mock.Mock(return_value=None))
+        self.mock_object(self.share_manager, 'publish_service_capabilities')
+
+        self.share_manager.init_host()
+
+        self.share_manager.driver.get_pool.assert_called_once_with(
+            instances[0])
+        self.share_manager.db.share_instance_get.assert_called_once_with(
+            utils.IsAMatcher(context.RequestContext), instances[0]['id'],
+            with_share_data=True)
+        self.share_manager.driver.ensure_share.assert_has_calls([
+            mock.call(utils.IsAMatcher(context.RequestContext),
+                      reloaded_instance, share_server=None),
+            mock.call(utils.IsAMatcher(context.RequestContext),
+                      instances[2], share_server=None),
+        ])
+
+    def test_init_host_with_exception_on_ensure_shares(self):
+        instances = self._setup_init_mocks(setup_access_rules=False)
+        self.mock_object(self.share_manager.db,
+                         'share_instances_get_all_by_host',
+                         mock.Mock(return_value=instances))
+        self.mock_object(self.share_manager.driver, 'ensure_shares',
+                         mock.Mock(side_effect=exception.ManilaException))
+        self.mock_object(self.share_manager.driver, 'ensure_share',
+                         mock.Mock(return_value=None))
+        self.mock_object(self.share_manager, '_ensure_share_instance_has_pool',
+                         mock.Mock(return_value=None))
+        self.mock_object(self.share_manager, 'publish_service_capabilities')
+        self.mock_object(self.share_manager.access_helper,
+                         'update_access_rules')
+        self.mock_object(manager.LOG, 'error')
+
+        self.share_manager.init_host()
+
+        self.assertEqual(3, self.share_manager.driver.ensure_share.call_count)
+        self.assertEqual(1, manager.LOG.error.call_count)
+
     def test_init_host_with_exception_on_ensure_share(self):
         def raise_exception(*args, **kwargs):
             raise exception.ManilaException(message="Fake raise")
@@ -371,7 +486,8 @@ class ShareManagerTestCase(test.TestCase):
         # verification of call
         self.share_manager.db.share_instances_get_all_by_host.\
             assert_called_once_with(utils.IsAMatcher(context.RequestContext),
-                                    self.share_manager.host)
+                                    self.share_manager.host,
+                                    with_share_data=True)
         self.share_manager.driver.do_setup.assert_called_once_with(
             utils.IsAMatcher(context.RequestContext))
         self.share_manager.driver.check_for_setup_error.assert_called_with()
@@ -433,7 +549,7 @@ class ShareManagerTestCase(test.TestCase):
         # verification of call
         smanager.db.share_instances_get_all_by_host.\
             assert_called_once_with(utils.IsAMatcher(context.RequestContext),
-                                    smanager.host)
+                                    smanager.host, with_share_data=True)
         smanager.driver.do_setup.assert_called_once_with(
             utils.IsAMatcher(context.RequestContext))
         smanager.driver.check_for_setup_error.assert_called_with()
@@ -471,6 +587,13 @@ class ShareManagerTestCase(test.TestCase):
             mock.call(mock.ANY, mock.ANY),
         ])
 
+    def test_invalidate_share_types_cache(self):
+        self.mock_object(share_types, 'invalidate_cache')
+
+        self.share_manager.invalidate_share_types_cache(self.context)
+
+        share_types.invalidate_cache.assert_called_once_with()
+
     def test_create_share_instance_from_snapshot_with_server(self):
         """Test share can be created from snapshot if server exists."""
         network = db_utils.create_share_network()
@@ -1174,18 +1297,22 @@ class ShareManagerTestCase(test.TestCase):
         self.assertTrue(mock_info_log.called)
         self.assertFalse(mock_snap_instance_update.called)
 
+    def _mock_replica_update_pass_spawn(self):
+        return self.mock_object(
+            manager.greenthread, 'spawn',
+            mock.Mock(side_effect=lambda f, *args: f(*args)))
+
     @ddt.data('openstack1@watson#_pool0', 'openstack1@newton#_pool0')
     def test_periodic_share_replica_update(self, host):
         mock_debug_log = self.mock_object(manager.LOG, 'debug')
+        self._mock_replica_update_pass_spawn()
         replicas = [
             fake_replica(host='openstack1@watson#pool4'),
             fake_replica(host='openstack1@watson#pool5'),
-            fake_replica(host='openstack1@newton#pool5'),
-            fake_replica(host='openstack1@newton#pool5'),
-
         ]
-        self.mock_object(self.share_manager.db, 'share_replicas_get_all',
-                         mock.Mock(return_value=replicas))
+        mock_get_replicas = self.mock_object(
+            self.share_manager.db, 'share_replicas_get_all_by_host',
+            mock.Mock(return_value=replicas))
         mock_update_method = self.mock_object(
             self.share_manager, '_share_replica_update')
 
@@ -1193,8 +1320,81 @@ class ShareManagerTestCase(test.TestCase):
 
         self.share_manager.periodic_share_replica_update(self.context)
 
+        mock_get_replicas.assert_called_once_with(
+            self.context, host.split('#')[0], with_share_data=True)
+        mock_update_method.assert_has_calls(
+            [mock.call(self.context, r, share_id=r['share_id'])
+             for r in replicas])
         self.assertEqual(2, mock_update_method.call_count)
-        self.assertEqual(1, mock_debug_log.call_count)
+        self.assertEqual(2, mock_debug_log.call_count)
+        self.assertEqual(
+            2, self.share_manager._replica_update_stats[
+                'share_replica_update']['items'])
+
+    def test__run_replica_update_pass_previous_pass_running(self):
+        mock_warning_log = self.mock_object(manager.LOG, 'warning')
+        mock_spawn = self.mock_object(manager.greenthread, 'spawn')
+        self.share_manager._replica_update_passes['fake_pass'] = mock.Mock(
+            dead=False)
+
+        self.share_manager._run_replica_update_pass(
+            'fake_pass', mock.Mock(), [((), {})])
+
+        self.assertFalse(mock_spawn.called)
+        self.assertTrue(mock_warning_log.called)
+
+    def test__run_replica_update_pass_previous_pass_finished(self):
+        mock_spawn = self.mock_object(manager.greenthread, 'spawn')
+        self.share_manager._replica_update_passes['fake_pass'] = mock.Mock(
+            dead=True)
+        update_method = mock.Mock()
+        calls = [((), {})]
+
+        self.share_manager._run_replica_update_pass(
+            'fake_pass', update_method, calls)
+
+        mock_spawn.assert_called_once_with(
+            self.share_manager._replica_update_pass, 'fake_pass',
+            update_method, calls)
+        self.assertEqual(
+            mock_spawn.return_value,
+            self.share_manager._replica_update_passes['fake_pass'])
+
+    def test__replica_update_pass_spread(self):
+        self.mock_object(self.share_manager.configuration,
+                         'replica_state_update_spread', 60)
+        self.mock_object(self.share_manager.configuration,
+                         'replica_state_update_pool_size', 2)
+        self.flags(replica_state_update_interval=340)
+        self.mock_object(manager.random, 'uniform',
+                         mock.Mock(side_effect=[30, 10]))
+        self.mock_object(manager.time, 'time',
+                         mock.Mock(side_effect=[100, 100, 110, 450]))
+        mock_pool = mock.Mock(spawn_n=lambda f, *args: f(*args))
+        self.mock_object(manager.greenpool, 'GreenPool',
+                         mock.Mock(return_value=mock_pool))
+        mock_sleep = self.mock_object(manager.greenthread, 'sleep')
+        mock_warning_log = self.mock_object(manager.LOG, 'warning')
+        mock_exception_log = self.mock_object(manager.LOG, 'exception')
+        update_method = mock.Mock(side_effect=[None, Exception('fake')])
+
+        self.share_manager._replica_update_pass(
+            'fake_pass', update_method,
+            [(('fake_1', ), {'share_id': 'fake_share_1'}),
+             (('fake_2', ), {'share_id': 'fake_share_2'})])
+
+        mock_sleep.assert_has_calls([mock.call(10), mock.call(20)])
+        update_method.assert_has_calls([
+            mock.call('fake_1', share_id='fake_share_1'),
+            mock.call('fake_2', share_id='fake_share_2'),
+        ])
+        self.assertTrue(mock_exception_log.called)
+        self.assertTrue(mock_warning_log.called)
+        manager.greenpool.GreenPool.assert_called_once_with(2)
+        mock_pool.waitall.assert_called_once_with()
+        self.assertEqual(
+            {'items': 2, 'duration': 350, 'lag': 10},
+            self.share_manager._replica_update_stats['fake_pass'])
 
     @ddt.data(constants.REPLICA_STATE_IN_SYNC,
               constants.REPLICA_STATE_OUT_OF_SYNC)
@@ -4644,6 +4844,7 @@ class ShareManagerTestCase(test.TestCase):
 
     def test_periodic_share_replica_snapshot_update(self):
         mock_debug_log = self.mock_object(manager.LOG, 'debug')
+        self._mock_replica_update_pass_spawn()
         replicas = 3 * [
             fake_replica(host='malfoy@manor#_pool0',
                          replica_state=constants.REPLICA_STATE_IN_SYNC)
@@ -4652,12 +4853,15 @@ class ShareManagerTestCase(test.TestCase):
         snapshot = fakes.fake_snapshot(create_instance=True,
                                        status=constants.STATUS_DELETING)
         snapshot_instances = 3 * [
-            fakes.fake_snapshot_instance(base_snapshot=snapshot)
+            fakes.fake_snapshot_instance(base_snapshot=snapshot,
+                                         share={'share_id': 'fake_share_id'})
         ]
         self.mock_object(
-            db, 'share_replicas_get_all', mock.Mock(return_value=replicas))
-        self.mock_object(db, 'share_snapshot_instance_get_all_with_filters',
-                         mock.Mock(return_value=snapshot_instances))
+            db, 'share_replicas_get_all_by_host',
+            mock.Mock(return_value=replicas))
+        mock_get_snapshot_instances = self.mock_object(
+            db, 'share_snapshot_instance_get_all_with_filters',
+            mock.Mock(return_value=snapshot_instances))
         mock_snapshot_update_call = self.mock_object(
             self.share_manager, '_update_replica_snapshot')
 
@@ -4665,27 +4869,36 @@ class ShareManagerTestCase(test.TestCase):
             self.context)
 
         self.assertIsNone(retval)
-        self.assertEqual(1, mock_debug_log.call_count)
-        self.assertEqual(0, mock_snapshot_update_call.call_count)
+        self.assertEqual(2, mock_debug_log.call_count)
+        mock_get_snapshot_instances.assert_has_calls([
+            mock.call(self.context,
+                      {'share_instance_ids': [r['id'] for r in replicas[:3]],
+                       'statuses': (constants.STATUS_CREATING,
+                                    constants.STATUS_DELETING)},
+                      with_share_data=True),
+            mock.call(self.context,
+                      {'snapshot_ids': snapshot_instances[0]['snapshot_id']}),
+        ])
+        self.assertEqual(3, mock_snapshot_update_call.call_count)
+        mock_snapshot_update_call.assert_called_with(
+            self.context, snapshot_instances[0],
+            replica_snapshots=snapshot_instances,
+            share_id='fake_share_id')
 
     @ddt.data(True, False)
     def test_periodic_share_replica_snapshot_update_nothing_to_update(
             self, has_instances):
         mock_debug_log = self.mock_object(manager.LOG, 'debug')
+        self._mock_replica_update_pass_spawn()
         replicas = 3 * [
             fake_replica(host='malfoy@manor#_pool0',
                          replica_state=constants.REPLICA_STATE_IN_SYNC)
         ]
-        replicas.append(fake_replica(replica_state=constants.STATUS_ACTIVE))
-        snapshot = fakes.fake_snapshot(create_instance=True,
-                                       status=constants.STATUS_DELETING)
-        snapshot_instances = 3 * [
-            fakes.fake_snapshot_instance(base_snapshot=snapshot)
-        ]
-        self.mock_object(db, 'share_replicas_get_all',
-                         mock.Mock(side_effect=[[], replicas]))
+        self.mock_object(db, 'share_replicas_get_all_by_host',
+                         mock.Mock(return_value=replicas if has_instances
+                                   else []))
         self.mock_object(db, 'share_snapshot_instance_get_all_with_filters',
-                         mock.Mock(side_effect=[snapshot_instances, []]))
+                         mock.Mock(return_value=[]))
         mock_snapshot_update_call = self.mock_object(
             self.share_manager, '_update_replica_snapshot')
 
@@ -4693,7 +4906,10 @@ class ShareManagerTestCase(test.TestCase):
             self.context)
 
         self.assertIsNone(retval)
-        self.assertEqual(1, mock_debug_log.call_count)
+        self.assertEqual(1 + has_instances, mock_debug_log.call_count)
+        self.assertEqual(
+            has_instances,
+            db.share_snapshot_instance_get_all_with_filters.called)
         self.assertEqual(0, mock_snapshot_update_call.call_count)
 
     def test__update_replica_snapshot_replica_deleted_from_database(self):
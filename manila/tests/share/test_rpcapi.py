@@ -18,6 +18,7 @@ Unit Tests for manila.share.rpcapi.
 
 import copy
 
+import mock
 from oslo_config import cfg
 from oslo_serialization import jsonutils
 
@@ -172,6 +173,24 @@ class ShareRpcAPITestCase(test.TestCase):
                              share_instance=self.fake_share,
                              force=False)
 
+    def test_publish_service_capabilities_to_host(self):
+        self._test_share_api('publish_service_capabilities',
+                             rpc_method='cast',
+                             version='1.0',
+                             host='fake_host1')
+
+    def test_invalidate_share_types_cache(self):
+        self.mock_object(self.rpcapi.client, 'prepare',
+                         mock.Mock(return_value=self.rpcapi.client))
+        self.mock_object(self.rpcapi.client, 'cast')
+
+        self.rpcapi.invalidate_share_types_cache(self.ctxt)
+
+        self.rpcapi.client.prepare.assert_called_once_with(
+            fanout=True, version='1.12')
+        self.rpcapi.client.cast.assert_called_once_with(
+            self.ctxt, 'invalidate_share_types_cache')
+
     def test_allow_access(self):
         self._test_share_api('allow_access',
                              rpc_method='cast',
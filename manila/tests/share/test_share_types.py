@@ -131,6 +131,133 @@ class ShareTypesTestCase(test.TestCase):
         extra_spec = share_types.get_share_type_extra_specs(id)
         self.assertEqual(share_type['extra_specs'], extra_spec)
 
+    def _enable_cache(self):
+        self.flags(share_types_cache_ttl=60)
+        self.addCleanup(share_types.invalidate_cache)
+        self.mock_object(share_types.time, 'time',
+                         mock.Mock(return_value=100))
+
+    def test_get_share_type_cached(self):
+        self._enable_cache()
+        share_type = self.fake_type_w_extra['test_with_extra']
+        self.mock_object(db, 'share_type_get',
+                         mock.Mock(return_value=share_type))
+
+        share_types.get_share_type(self.context, 'fooid-2')
+        returned_type = share_types.get_share_type(self.context, 'fooid-2')
+        returned_type['extra_specs']['gold'] = 'False'
+        returned_type = share_types.get_share_type(self.context, 'fooid-2')
+
+        self.assertEqual(share_type, returned_type)
+        db.share_type_get.assert_called_once_with(
+            self.context, 'fooid-2', expected_fields=None)
+
+    def test_get_share_type_cache_expired(self):
+        self._enable_cache()
+        self.mock_object(db, 'share_type_get',
+                         mock.Mock(return_value={'id': 'fooid-2'}))
+
+        share_types.get_share_type(self.context, 'fooid-2')
+        share_types.time.time.return_value = 161
+        share_types.get_share_type(self.context, 'fooid-2')
+
+        self.assertEqual(2, db.share_type_get.call_count)
+
+    def test_get_share_type_cache_disabled(self):
+        self.mock_object(db, 'share_type_get',
+                         mock.Mock(return_value={'id': 'fooid-2'}))
+
+        share_types.get_share_type(self.context, 'fooid-2')
+        share_types.get_share_type(self.context, 'fooid-2')
+
+        self.assertEqual(2, db.share_type_get.call_count)
+
+    def test_get_share_type_cached_per_project(self):
+        self._enable_cache()
+        self.mock_object(db, 'share_type_get',
+                         mock.Mock(return_value={'id': 'fooid-2'}))
+        user_context = context.RequestContext('fake_user', 'fake_project')
+
+        share_types.get_share_type(self.context, 'fooid-2')
+        share_types.get_share_type(user_context, 'fooid-2')
+        share_types.get_share_type(user_context, 'fooid-2')
+
+        db.share_type_get.assert_has_calls([
+            mock.call(self.context, 'fooid-2', expected_fields=None),
+            mock.call(user_context, 'fooid-2', expected_fields=None)])
+        self.assertEqual(2, db.share_type_get.call_count)
+
+    def test_get_all_types_cached(self):
+        self._enable_cache()
+        self.mock_object(db, 'share_type_get_all', mock.Mock(
+            return_value=copy.deepcopy(self.fake_type_w_extra)))
+
+        share_types.get_all_types(self.context)
+        returned_types = share_types.get_all_types(
+            self.context, search_opts={"extra_specs": {"gold": "True"}})
+
+        db.share_type_get_all.assert_called_once_with(
+            self.context, 0, filters={})
+        self.assertEqual(['test_with_extra'], list(returned_types))
+
+    def test_get_share_type_invalidated_while_loading(self):
+        self._enable_cache()
+
+        def fake_share_type_get(*args, **kwargs):
+            share_types.invalidate_cache()
+            return {'id': 'fooid-2'}
+
+        self.mock_object(db, 'share_type_get',
+                         mock.Mock(side_effect=fake_share_type_get))
+
+        share_types.get_share_type(self.context, 'fooid-2')
+        share_types.get_share_type(self.context, 'fooid-2')
+
+        self.assertEqual(2, db.share_type_get.call_count)
+
+    def test_create_invalidates_cache(self):
+        self._enable_cache()
+        self.mock_object(db, 'share_type_get_by_name',
+                         mock.Mock(side_effect=[
+                             exception.ShareTypeNotFoundByName(
+                                 share_type_name='type1'),
+                             {'name': 'type1'}]))
+        self.mock_object(db, 'share_type_create')
+        extra_specs = {
+            constants.ExtraSpecs.DRIVER_HANDLES_SHARE_SERVERS: 'true'
+        }
+        self.assertRaises(exception.ShareTypeNotFoundByName,
+                          share_types.get_share_type_by_name,
+                          self.context, 'type1')
+
+        share_types.create(self.context, 'type1', extra_specs)
+
+        self.assertEqual({'name': 'type1'},
+                         share_types.get_share_type_by_name(self.context,
+                                                            'type1'))
+
+    @ddt.data(True, False)
+    def test_invalidate_cache_notify(self, notify):
+        self.flags(share_types_cache_notify=notify)
+        self.mock_object(share_types.scheduler_rpcapi.SchedulerAPI,
+                         'invalidate_share_types_cache')
+        self.mock_object(share_types.share_rpcapi.ShareAPI,
+                         'invalidate_share_types_cache')
+
+        share_types.invalidate_cache(self.context)
+
+        scheduler_api = share_types.scheduler_rpcapi.SchedulerAPI
+        share_api = share_types.share_rpcapi.ShareAPI
+        if notify:
+            (scheduler_api.invalidate_share_types_cache.
+                assert_called_once_with(self.context))
+            share_api.invalidate_share_types_cache.assert_called_once_with(
+                self.context)
+        else:
+            self.assertFalse(
+                scheduler_api.invalidate_share_types_cache.called)
+            self.assertFalse(share_api.invalidate_share_types_cache.called)
+
     def test_share_types_diff(self):
         share_type1 = self.fake_type['test']
         share_type2 = self.fake_type_w_extra['test_with_extra']
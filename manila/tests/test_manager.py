@@ -15,6 +15,8 @@
 
 """Test of Base Manager for Manila."""
 
+import copy
+
 import ddt
 import mock
 from oslo_utils import importutils
@@ -115,6 +117,61 @@ class SchedulerDependentManagerTestCase(test.TestCase):
                 self.context, self.service_name, self.host, last_capabilities)
         manager.LOG.debug.assert_called_once_with(mock.ANY)
 
+    def test__publish_service_capabilities_deltas(self):
+        self.flags(report_capabilities_deltas=True)
+        update = self.mock_object(
+            self.sched_manager.scheduler_rpcapi, 'update_service_capabilities')
+        capabilities = {
+            'driver_version': '1.0',
+            'pools': [{'pool_name': 'pool1', 'free_capacity_gb': 10},
+                      {'pool_name': 'pool2', 'free_capacity_gb': 20}],
+        }
+
+        self.sched_manager.update_service_capabilities(capabilities)
+        self.sched_manager._publish_service_capabilities(self.context)
+        self.sched_manager.update_service_capabilities({
+            'driver_version': '1.0',
+            'pools': [{'pool_name': 'pool1', 'free_capacity_gb': 5}],
+        })
+        self.sched_manager._publish_service_capabilities(self.context)
+        self.sched_manager.request_full_capabilities_report()
+        self.sched_manager._publish_service_capabilities(self.context)
+
+        expected_delta = {
+            'changed': {},
+            'removed': [],
+            'pools': {
+                'changed': {
+                    'pool1': {'changed': {'free_capacity_gb': 5},
+                              'removed': []},
+                },
+                'removed': ['pool2'],
+            },
+        }
+        update.assert_has_calls([
+            mock.call(self.context, self.service_name, self.host,
+                      capabilities, capabilities_seq=1,
+                      capabilities_delta=False),
+            mock.call(self.context, self.service_name, self.host,
+                      expected_delta, capabilities_seq=2,
+                      capabilities_delta=True),
+            mock.call(self.context, self.service_name, self.host,
+                      self.sched_manager.last_capabilities,
+                      capabilities_seq=3, capabilities_delta=False),
+        ])
+        stats = self.sched_manager.capabilities_report_stats
+        self.assertEqual(2, stats['full_reports'])
+        self.assertEqual(1, stats['delta_reports'])
+        self.assertEqual(3, stats['seq'])
+
+    def test_get_capabilities_delta_no_changes(self):
+        capabilities = {'foo': 'bar', 'pools': [{'pool_name': 'pool1'}]}
+
+        delta = manager.get_capabilities_delta(capabilities,
+                                               copy.deepcopy(capabilities))
+
+        self.assertEqual({'changed': {}, 'removed': []}, delta)
+
     @ddt.data(None, '', [], {}, {'foo': 'bar'})
     def test_update_service_capabilities(self, capabilities):
         self.sched_manager.update_service_capabilities(capabilities)
@@ -156,6 +156,9 @@ class FakeDriver(object):
     def destroy_all_by_project(self, context, project_id):
         self.called.append(('destroy_all_by_project', context, project_id))
 
+    def invalidate_cache(self, project_id=None):
+        self.called.append(('invalidate_cache', project_id))
+
     def expire(self, context):
         self.called.append(('expire', context))
 
@@ -583,6 +586,19 @@ class QuotaEngineTestCase(test.TestCase):
                            context,
                            'test_project'), ], driver.called)
 
+    def test_invalidate_cache(self):
+        driver = FakeDriver()
+        quota_obj = self._make_quota_obj(driver)
+        quota_obj.invalidate_cache('test_project')
+
+        self.assertEqual([('invalidate_cache', 'test_project'), ],
+                         driver.called)
+
+    def test_invalidate_cache_not_supported_by_driver(self):
+        quota_obj = self._make_quota_obj(object())
+
+        quota_obj.invalidate_cache('test_project')
+
     def test_expire(self):
         context = FakeContext(None, None)
         driver = FakeDriver()
@@ -1002,6 +1018,60 @@ class DbQuotaDriverTestCase(test.TestCase):
         self.assertEqual(['get_project_quotas'], self.calls)
         self.assertEqual(dict(shares=10, gigabytes=1000, ), result)
 
+    def test_get_quotas_cached(self):
+        self.flags(quota_limits_cache_ttl=60)
+        self._stub_get_project_quotas()
+        context = FakeContext('test_project', 'test_class')
+
+        for i in range(2):
+            result = self.driver._get_quotas(
+                context, quota.QUOTAS._resources, ['shares', 'gigabytes'],
+                True, project_id='test_project')
+            self.assertEqual(dict(shares=10, gigabytes=1000), result)
+
+        self.assertEqual(['get_project_quotas'], self.calls)
+
+        self.driver.invalidate_cache('test_project')
+        self.driver._get_quotas(context, quota.QUOTAS._resources,
+                                ['shares', 'gigabytes'], True,
+                                project_id='test_project')
+
+        self.assertEqual(['get_project_quotas'] * 2, self.calls)
+
+    def test_get_quotas_cache_expired(self):
+        self.flags(quota_limits_cache_ttl=60)
+        self._stub_get_project_quotas()
+        self.mock_object(quota.time, 'time',
+                         mock.Mock(side_effect=[100, 161, 161]))
+        context = FakeContext('test_project', 'test_class')
+
+        for i in range(2):
+            self.driver._get_quotas(context, quota.QUOTAS._resources,
+                                    ['shares'], True,
+                                    project_id='test_project')
+
+        self.assertEqual(['get_project_quotas'] * 2, self.calls)
+
+    def test_get_quotas_not_cached_for_other_project(self):
+        self.flags(quota_limits_cache_ttl=60)
+        self._stub_get_project_quotas()
+        context = FakeContext('test_project', 'test_class')
+
+        for i in range(2):
+            self.driver._get_quotas(context, quota.QUOTAS._resources,
+                                    ['shares'], True,
+                                    project_id='other_project')
+
+        self.assertEqual(['get_project_quotas'] * 2, self.calls)
+        self.assertEqual({}, self.driver._limits_cache)
+
+    def test_invalidate_cache_all(self):
+        self.driver._limits_cache = {'fake_1': {}, 'fake_2': {}}
+
+        self.driver.invalidate_cache()
+
+        self.assertEqual({}, self.driver._limits_cache)
+
     def _stub_quota_reserve(self):
         def fake_quota_reserve(context, resources, quotas, user_quotas,
                                deltas, expire, until_refresh, max_age,
@@ -1105,11 +1175,13 @@ class DbQuotaDriverTestCase(test.TestCase):
 
     def test_delete_by_project(self):
         self._stub_quota_delete_all_by_project()
+        self.driver._limits_cache = {'test_project': {}, 'other': {}}
         self.driver.destroy_all_by_project(FakeContext('test_project',
                                                        'test_class'),
                                            'test_project')
         self.assertEqual([('quota_destroy_all_by_project',
                            ('test_project')), ], self.calls)
+        self.assertEqual({'other': {}}, self.driver._limits_cache)
 
 
 class FakeSession(object):
@@ -1119,6 +1191,9 @@ class FakeSession(object):
     def add(self, instance):
         pass
 
+    def bulk_save_objects(self, objects):
+        pass
+
     def __enter__(self):
         return self
 
@@ -1168,11 +1243,8 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
         def fake_get_session():
             return FakeSession()
 
-        def fake_get_project_quota_usages(context, session, project_id):
-            return self.usages.copy()
-
-        def fake_get_user_quota_usages(context, session, project_id, user_id):
-            return self.usages.copy()
+        def fake_get_quota_usages(context, session, project_id, user_id):
+            return self.usages.copy(), self.usages.copy()
 
         def fake_quota_usage_create(context, project_id, user_id, resource,
                                     in_use, reserved, until_refresh,
@@ -1187,7 +1259,7 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
 
         def fake_reservation_create(context, uuid, usage_id, project_id,
                                     user_id, resource, delta, expire,
-                                    session=None):
+                                    session=None, save=True):
             reservation_ref = self._make_reservation(
                 uuid, usage_id, project_id, user_id, resource, delta, expire,
                 timeutils.utcnow(), timeutils.utcnow())
@@ -1197,10 +1269,8 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
             return reservation_ref
 
         self.mock_object(sqa_api, 'get_session', fake_get_session)
-        self.mock_object(sqa_api, '_get_project_quota_usages',
-                         fake_get_project_quota_usages)
-        self.mock_object(sqa_api, '_get_user_quota_usages',
-                         fake_get_user_quota_usages)
+        self.mock_object(sqa_api, '_get_quota_usages',
+                         fake_get_quota_usages)
         self.mock_object(sqa_api, '_quota_usage_create',
                          fake_quota_usage_create)
         self.mock_object(sqa_api, '_reservation_create',
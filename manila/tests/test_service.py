@@ -162,7 +162,7 @@ class ServiceTestCase(test.TestCase):
                        mock.Mock(side_effect=fake_service_get_by_args))
     @mock.patch.object(service.db, 'service_create',
                        mock.Mock(return_value=service_ref))
-    @mock.patch.object(service.db, 'service_get',
+    @mock.patch.object(service.db, 'service_heartbeat',
                        mock.Mock(side_effect=fake_service_get))
     def test_report_state_newly_disconnected(self):
         serv = service.Service(host, binary, topic, CONF.fake_manager)
@@ -173,17 +173,14 @@ class ServiceTestCase(test.TestCase):
             mock.ANY, host, binary)
         service.db.service_create.assert_called_once_with(
             mock.ANY, service_create)
-        service.db.service_get.assert_called_once_with(mock.ANY, mock.ANY)
+        service.db.service_heartbeat.assert_called_once_with(
+            mock.ANY, mock.ANY, availability_zone=None)
 
     @mock.patch.object(service.db, 'service_get_by_args',
                        mock.Mock(side_effect=fake_service_get_by_args))
     @mock.patch.object(service.db, 'service_create',
                        mock.Mock(return_value=service_ref))
-    @mock.patch.object(service.db, 'service_get',
-                       mock.Mock(return_value=service_ref))
-    @mock.patch.object(service.db, 'service_update',
-                       mock.Mock(return_value=service_ref.
-                                 update({'report_count': 1})))
+    @mock.patch.object(service.db, 'service_heartbeat', mock.Mock())
     def test_report_state_newly_connected(self):
         serv = service.Service(host, binary, topic, CONF.fake_manager)
         serv.start()
@@ -194,10 +191,43 @@ class ServiceTestCase(test.TestCase):
             mock.ANY, host, binary)
         service.db.service_create.assert_called_once_with(
             mock.ANY, service_create)
-        service.db.service_get.assert_called_once_with(
-            mock.ANY, service_ref['id'])
-        service.db.service_update.assert_called_once_with(
-            mock.ANY, service_ref['id'], mock.ANY)
+        service.db.service_heartbeat.assert_called_once_with(
+            mock.ANY, service_ref['id'], availability_zone=None)
+
+    def test_report_state_availability_zone_changed(self):
+        self.mock_object(service.db, 'service_get_by_args',
+                         mock.Mock(return_value=service_ref))
+        self.mock_object(service.db, 'service_heartbeat')
+        self.flags(storage_availability_zone='zone2')
+        serv = service.Service(host, binary, topic, CONF.fake_manager)
+        serv.start()
+
+        serv.report_state()
+        serv.report_state()
+
+        service.db.service_heartbeat.assert_has_calls([
+            mock.call(mock.ANY, service_ref['id'], availability_zone='zone2'),
+            mock.call(mock.ANY, service_ref['id'], availability_zone=None)])
+        self.assertEqual('zone2', serv.availability_zone)
+
+    def test_report_state_service_disappeared(self):
+        self.mock_object(service.db, 'service_get_by_args',
+                         mock.Mock(return_value=service_ref))
+        self.mock_object(service.db, 'service_create',
+                         mock.Mock(return_value=dict(service_ref, id=2)))
+        self.mock_object(service.db, 'service_heartbeat', mock.Mock(
+            side_effect=[exception.ServiceNotFound(service_id=1), None]))
+        serv = service.Service(host, binary, topic, CONF.fake_manager)
+        serv.start()
+
+        serv.report_state()
+
+        self.assertFalse(serv.model_disconnected)
+        service.db.service_create.assert_called_once_with(
+            mock.ANY, service_create)
+        service.db.service_heartbeat.assert_has_calls([
+            mock.call(mock.ANY, 1, availability_zone=None),
+            mock.call(mock.ANY, 2)])
 
 
 class TestWSGIService(test.TestCase):
@@ -289,6 +289,25 @@ class GenericUtilsTestCase(test.TestCase):
             self.assertFalse(result)
             timeutils.utcnow.assert_called_once_with()
 
+    @ddt.data((1, True), (-1, False), (None, False))
+    @ddt.unpack
+    def test_service_is_up_last_seen(self, seen_ago, expected):
+        fts_func = datetime.datetime.fromtimestamp
+        fake_now = 1000
+        down_time = 5
+        self.flags(service_down_time=down_time)
+        service = {'updated_at': fts_func(fake_now - down_time - 1),
+                   'created_at': fts_func(fake_now - down_time - 1)}
+        last_seen = None
+        if seen_ago is not None:
+            last_seen = fts_func(fake_now - down_time + seen_ago)
+        self.mock_object(timeutils, 'utcnow',
+                         mock.Mock(return_value=fts_func(fake_now)))
+
+        result = utils.service_is_up(service, last_seen=last_seen)
+
+        self.assertEqual(expected, result)
+
     def test_is_ipv6_configured0(self):
         fake_fd = mock.Mock()
         fake_fd.read.return_value = 'test'
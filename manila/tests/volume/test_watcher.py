@@ -0,0 +1,174 @@
+# Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import eventlet
+import mock
+
+from manila import exception
+from manila import test
+from manila.volume import watcher
+
+
+class StatusWatcherTestCase(test.TestCase):
+
+    def setUp(self):
+        super(StatusWatcherTestCase, self).setUp()
+        self.volumes = {}
+        self.get = mock.Mock(side_effect=self._fake_get)
+        self.get_all = mock.Mock(
+            side_effect=lambda: list(self.volumes.values()))
+        self.watcher = watcher.StatusWatcher(
+            self.get, self.get_all, exception.VolumeNotFound, 0, 0)
+
+    def _fake_get(self, volume_id):
+        if volume_id not in self.volumes:
+            raise exception.VolumeNotFound(volume_id=volume_id)
+        return self.volumes[volume_id]
+
+    def _set_status(self, volume_id, status):
+        self.volumes[volume_id] = {'id': volume_id, 'status': status}
+
+    def _is_available(self, volume):
+        if volume['status'] == 'available':
+            return True
+        self._set_status(volume['id'], 'available')
+        return False
+
+    def test_wait_single_resource(self):
+        self._set_status('fake_id', 'creating')
+
+        result = self.watcher.wait('fake_id', self._is_available, 5,
+                                   'timeout')
+
+        self.assertEqual({'id': 'fake_id', 'status': 'available'}, result)
+        self.get.assert_has_calls([mock.call('fake_id')] * 2)
+        self.assertFalse(self.get_all.called)
+        self.assertEqual({}, dict(self.watcher._waiters))
+
+    def test_wait_many_resources(self):
+        ids = ['fake_id%s' % i for i in range(10)]
+        for volume_id in ids:
+            self._set_status(volume_id, 'creating')
+        self._set_status('other_id', 'available')
+        pool = eventlet.GreenPool()
+
+        results = list(pool.imap(
+            lambda volume_id: self.watcher.wait(
+                volume_id, self._is_available, 5, 'timeout'),
+            ids))
+
+        self.assertEqual(
+            [{'id': volume_id, 'status': 'available'} for volume_id in ids],
+            results)
+        self.assertEqual(2, self.get_all.call_count)
+        self.assertFalse(self.get.called)
+
+    def test_wait_many_resources_below_list_threshold(self):
+        self.watcher.list_threshold = 3
+        ids = ['fake_id%s' % i for i in range(3)]
+        for volume_id in ids:
+            self._set_status(volume_id, 'creating')
+        pool = eventlet.GreenPool()
+
+        results = list(pool.imap(
+            lambda volume_id: self.watcher.wait(
+                volume_id, self._is_available, 5, 'timeout'),
+            ids))
+
+        self.assertEqual(
+            [{'id': volume_id, 'status': 'available'} for volume_id in ids],
+            results)
+        self.assertEqual(6, self.get.call_count)
+        self.assertFalse(self.get_all.called)
+
+    def test_wait_deleted_resource(self):
+        result = self.watcher.wait('fake_id', lambda volume: volume is None,
+                                   5, 'timeout')
+
+        self.assertIsNone(result)
+        self.get.assert_called_once_with('fake_id')
+
+    def test_wait_get_error(self):
+        self.get.side_effect = exception.ManilaException('fake')
+
+        self.assertRaises(exception.ManilaException, self.watcher.wait,
+                          'fake_id', lambda volume: True, 5, 'timeout')
+
+    def test_wait_list_error(self):
+        self.get_all.side_effect = exception.ManilaException('fake')
+        self._set_status('fake_id1', 'available')
+        self._set_status('fake_id2', 'available')
+        pool = eventlet.GreenPool()
+
+        results = list(pool.imap(
+            lambda volume_id: self.watcher.wait(
+                volume_id, lambda volume: True, 5, 'timeout'),
+            ['fake_id1', 'fake_id2']))
+
+        self.assertEqual([self.volumes['fake_id1'], self.volumes['fake_id2']],
+                         results)
+        self.assertEqual(2, self.get.call_count)
+
+    def test_wait_timeout(self):
+        self._set_status('fake_id', 'creating')
+        self.watcher.min_interval = self.watcher.max_interval = 0.01
+
+        self.assertRaises(exception.ManilaException, self.watcher.wait,
+                          'fake_id', lambda volume: False, 0.05, 'timeout')
+        self.assertEqual({}, dict(self.watcher._waiters))
+
+    def test_poll_interval_backoff(self):
+        self._set_status('fake_id', 'creating')
+        self.watcher.min_interval = 0.001
+        self.watcher.max_interval = 0.004
+        intervals = []
+        real_sleep = self.watcher._sleep
+
+        def sleep():
+            intervals.append(self.watcher._interval)
+            real_sleep()
+
+        self.mock_object(self.watcher, '_sleep', mock.Mock(side_effect=sleep))
+        statuses = ['creating', 'creating', 'creating', 'available']
+
+        def is_available(volume):
+            if volume['status'] == 'available':
+                return True
+            self._set_status('fake_id', statuses.pop(0))
+            return False
+
+        self.watcher.wait('fake_id', is_available, 5, 'timeout')
+
+        self.assertEqual([0.001, 0.001, 0.002, 0.004, 0.004], intervals[:5])
+
+    def test_wait_wakes_sleeping_poller(self):
+        self._set_status('fake_id1', 'creating')
+        self._set_status('fake_id2', 'available')
+        self.watcher.min_interval = 0.01
+        self.watcher.max_interval = 60
+        waiter = eventlet.spawn(
+            self.watcher.wait, 'fake_id1',
+            lambda volume: volume['status'] == 'available', 5, 'timeout')
+        while not self.watcher.stats['polls']:
+            eventlet.sleep(0.01)
+        # NOTE: Make the poller sleep for max_interval after its next poll.
+        self.watcher._interval = self.watcher.max_interval
+        eventlet.sleep(0.05)
+        self._set_status('fake_id1', 'available')
+
+        result = self.watcher.wait('fake_id2', lambda volume: True, 1,
+                                   'timeout')
+
+        self.assertEqual(self.volumes['fake_id2'], result)
+        self.assertEqual(self.volumes['fake_id1'], waiter.wait())
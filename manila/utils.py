@@ -404,9 +404,15 @@ def file_open(*args, **kwargs):
     return file(*args, **kwargs)
 
 
-def service_is_up(service):
-    """Check whether a service is up based on last heartbeat."""
+def service_is_up(service, last_seen=None):
+    """Check whether a service is up based on last heartbeat.
+
+    :param last_seen: time the service was last heard from otherwise, used
+        instead of the heartbeat stored in DB if it is more recent.
+    """
     last_heartbeat = service['updated_at'] or service['created_at']
+    if last_seen and last_seen > last_heartbeat:
+        last_heartbeat = last_seen
     # Timestamps in DB are UTC.
     tdelta = timeutils.utcnow() - last_heartbeat
     elapsed = tdelta.total_seconds()
@@ -0,0 +1,176 @@
+# Copyright 2016 Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Batched polling of cinder volume and snapshot statuses.
+"""
+
+import collections
+import time
+
+import eventlet
+from eventlet import queue
+from oslo_log import log
+
+from manila import exception
+from manila.i18n import _LW
+
+LOG = log.getLogger(__name__)
+
+
+class StatusWatcher(object):
+    """Polls statuses of cinder resources on behalf of many waiters.
+
+    A single green thread fetches all watched resources, with one list call
+    if more than list_threshold resources are watched and with a get call
+    per resource otherwise, and passes them to the waiters.
+    Polling interval is reset to its minimum when a wait starts or a watched
+    resource changes its status, and doubles up to its maximum otherwise.
+    A wait that starts while the poller sleeps shortens its sleep to the
+    minimum interval.
+    """
+
+    def __init__(self, get, get_all, not_found, min_interval, max_interval,
+                 list_threshold=1):
+        """Initializes the watcher.
+
+        :param get: callable returning resource by its ID.
+        :param get_all: callable returning list of resources.
+        :param not_found: exception class raised by get for missing resource.
+        :param min_interval: minimum number of seconds between polls.
+        :param max_interval: maximum number of seconds between polls.
+        :param list_threshold: number of watched resources above which they
+            are fetched with get_all.
+        """
+        self._get = get
+        self._get_all = get_all
+        self._not_found = not_found
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.list_threshold = list_threshold
+        self._interval = min_interval
+        self._waiters = collections.defaultdict(list)
+        self._statuses = {}
+        self._polling = False
+        self._wakeup = queue.LightQueue()
+        self.stats = {'polls': 0, 'get_calls': 0, 'list_calls': 0}
+
+    def wait(self, resource_id, is_ready, timeout, msg_timeout):
+        """Waits until is_ready returns True for polled resource.
+
+        :param is_ready: callable receiving the resource, or None once it
+            is not found. It may raise an exception to stop waiting.
+        :returns: the resource accepted by is_ready.
+        :raises: ManilaException with msg_timeout if the resource is not
+            ready in timeout seconds.
+        """
+        results = queue.LightQueue()
+        self._waiters[resource_id].append(results)
+        self._interval = self.min_interval
+        if self._polling:
+            self._wakeup.put(None)
+        else:
+            self._polling = True
+            self._wakeup = queue.LightQueue()
+            eventlet.spawn_n(self._poll)
+
+        deadline = time.time() + timeout
+        try:
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise exception.ManilaException(msg_timeout)
+                try:
+                    resource = results.get(timeout=remaining)
+                except queue.Empty:
+                    raise exception.ManilaException(msg_timeout)
+                if isinstance(resource, Exception):
+                    raise resource
+                if is_ready(resource):
+                    return resource
+        finally:
+            waiters = self._waiters[resource_id]
+            waiters.remove(results)
+            if not waiters:
+                del self._waiters[resource_id]
+                self._statuses.pop(resource_id, None)
+
+    def _poll(self):
+        try:
+            while self._waiters:
+                self._sleep()
+                resource_ids = list(self._waiters)
+                if not resource_ids:
+                    break
+                resources = self._fetch(resource_ids)
+                self.stats['polls'] += 1
+
+                changed = False
+                for resource_id, resource in resources.items():
+                    if isinstance(resource, Exception):
+                        status = resource
+                    else:
+                        status = resource and resource['status']
+                    if self._statuses.get(resource_id) != status:
+                        self._statuses[resource_id] = status
+                        changed = True
+                    for results in list(self._waiters.get(resource_id, [])):
+                        results.put(resource)
+
+                if changed:
+                    self._interval = self.min_interval
+                else:
+                    self._interval = min(self._interval * 2,
+                                         self.max_interval)
+        finally:
+            self._polling = False
+
+    def _sleep(self):
+        """Sleeps for the polling interval, which waits may shorten."""
+        start = time.time()
+        while True:
+            remaining = start + self._interval - time.time()
+            try:
+                self._wakeup.get(timeout=max(remaining, 0))
+            except queue.Empty:
+                return
+
+    def _fetch(self, resource_ids):
+        """Returns dict of resources, None or errors, keyed by ID."""
+        resources = {}
+        if len(resource_ids) > self.list_threshold:
+            try:
+                self.stats['list_calls'] += 1
+                resources = {
+                    resource['id']: resource
+                    for resource in self._get_all()
+                    if resource['id'] in resource_ids}
+            except Exception as e:
+                LOG.warning(_LW("Failed to list resources, polling them "
+                                "one by one: %s"), e)
+
+        # NOTE: Resources missing from the list may be deleted or just not
+        # fit in its page, so they are checked one by one.
+        for resource_id in resource_ids:
+            if resource_id in resources:
+                continue
+            try:
+                self.stats['get_calls'] += 1
+                resources[resource_id] = self._get(resource_id)
+            except self._not_found:
+                resources[resource_id] = None
+            except Exception as e:
+                resources[resource_id] = e
+        return resources
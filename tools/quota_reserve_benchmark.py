@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# Measure how many share creations per second quota reservations allow for
+# a single project. Reserves and commits share quotas the way share create
+# does, from several green threads at once, against the database configured
+# in given manila config file. Quotas of the benchmark project are removed
+# afterwards.
+#
+# Usage: quota_reserve_benchmark.py --config-file /etc/manila/manila.conf
+#        [--concurrency 10] [--requests 1000]
+
+import eventlet
+eventlet.monkey_patch()
+
+import sys  # noqa
+import time  # noqa
+
+from oslo_config import cfg  # noqa
+
+from manila import context  # noqa
+from manila import quota  # noqa
+
+CONF = cfg.CONF
+CONF.register_cli_opts([
+    cfg.IntOpt('concurrency', default=10,
+               help='Number of concurrent share creations.'),
+    cfg.IntOpt('requests', default=1000,
+               help='Total number of share creations.'),
+    cfg.StrOpt('project-id', default='quota-benchmark',
+               help='Project to reserve quotas in.'),
+])
+
+QUOTAS = quota.QUOTAS
+
+
+def _create(ctxt):
+    reservations = QUOTAS.reserve(ctxt, shares=1, gigabytes=1)
+    QUOTAS.commit(ctxt, reservations)
+
+
+def main():
+    CONF(sys.argv[1:], project='manila')
+    ctxt = context.RequestContext('quota-benchmark', CONF.project_id,
+                                  is_admin=True)
+    # NOTE: Lift quotas so that no request is rejected.
+    ctxt.quota_class = None
+    for resource in ('shares', 'gigabytes'):
+        CONF.set_override('quota_%s' % resource, -1)
+
+    pool = eventlet.GreenPool(CONF.concurrency)
+    started_at = time.time()
+    try:
+        for __ in range(CONF.requests):
+            pool.spawn_n(_create, ctxt)
+        pool.waitall()
+        duration = time.time() - started_at
+    finally:
+        QUOTAS.destroy_all_by_project(ctxt, CONF.project_id)
+
+    print("%(requests)s creations with concurrency %(concurrency)s took "
+          "%(duration).2fs, %(rate).1f creations per second per project." %
+          {'requests': CONF.requests, 'concurrency': CONF.concurrency,
+           'duration': duration, 'rate': CONF.requests / duration})
+
+
+if __name__ == '__main__':
+    main()